@@ -2,6 +2,7 @@
 Classe principale de l'Agent Véhicule - VERSION KINSHASA AVEC DÉCISION MULTI-ROUTES
 """
 import time
+from datetime import datetime
 from typing import List, Optional, Dict, Any
 
 # Imports absolus
@@ -27,7 +28,8 @@ class AgentVehicule:
     avec système de décision multi-routes
     """
     
-    def __init__(self, etat_initial: str, etat_final: str, strategie: str = "rapide"):
+    def __init__(self, etat_initial: str, etat_final: str, strategie: str = "rapide",
+                 heure_depart: Optional[datetime] = None):
         """
         Initialise l'agent véhicule pour Kinshasa
         
@@ -35,13 +37,17 @@ class AgentVehicule:
             etat_initial: Point de départ (Place de la Victoire)
             etat_final: Point d'arrivée (Gare Centrale)
             strategie: Stratégie de décision ("rapide", "economique", "securise", "confort", "equilibre")
+            heure_depart: Heure de départ prévue, qui détermine le trafic
+                (défaut: heure de la planification)
         """
+        config.assurer_dossiers()
         self.etat = EtatAgent(etat_initial, etat_final)
         self.service_routing = ServiceRouting()
         self.generateur_carte = GenerateurCarte()
         self.generateur_rapport = GenerateurRapport()
         self.decision_maker = DecisionMaker()
         self.strategie = strategie
+        self.heure_depart = heure_depart
         self.routes_alternatives = []
         self.route_choisie = None
         self.analyse_routes = {}
@@ -82,10 +88,11 @@ class AgentVehicule:
         point_depart.type_point = "depart"
         point_arrivee.type_point = "arrivee"
         
-        # 2. Générer 5 routes alternatives
-        print("🛣️  Génération des routes alternatives...")
+        # 2. Générer les routes alternatives (calculées sur le réseau, au trafic de l'heure de départ)
+        heure_depart = self.heure_depart or datetime.now()
+        print(f"🛣️  Génération des routes alternatives (départ {heure_depart:%d/%m %H:%M})...")
         self.routes_alternatives = self.decision_maker.generer_routes_alternatives(
-            point_depart, point_arrivee
+            point_depart, point_arrivee, heure_depart=heure_depart
         )
         
         # 3. Choisir la meilleure route selon la stratégie
@@ -111,6 +118,9 @@ class AgentVehicule:
         print(f"   🚦 Niveau embouteillages: {caracteristiques['niveau_embouteillage']:.1%}")
         print(f"   🛡️  Niveau sécurité: {caracteristiques['niveau_securite']:.1%}")
         print(f"   🛣️  Confort route: {caracteristiques['confort_route']:.1%}")
+        if "accessibilite_transport" in caracteristiques:
+            print(f"   🚌 Accès transport: {caracteristiques['accessibilite_transport']:.1%} "
+                  f"(marche moyenne {caracteristiques['temps_marche_arret_min']:.1f} min)")
         print(f"   📍 Nombre d'étapes: {len(self.route_choisie.points)}")
         
         return self.route_choisie.points
@@ -179,6 +189,10 @@ class AgentVehicule:
             Trajet calculé ou None en cas d'erreur
         """
         try:
+            # Trajet le long des voies si le réseau routier a été compilé
+            if self.service_routing.graphe is not None:
+                return self.service_routing.calculer_trajet(depart, arrivee)
+                
             # Calculer la distance
             distance_km = calculer_distance_haversine(depart, arrivee)
             
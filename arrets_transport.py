@@ -0,0 +1,156 @@
+"""
+Arrêts de transport en commun : arrêts les plus proches et temps de marche - VERSION KINSHASA
+
+Une requête porte sur un lot de points (ex. tous les points d'un
+itinéraire) : les k arrêts les plus proches de chacun sont cherchés dans
+l'index spatial du gestionnaire de données, avec la distance et le temps
+de marche.
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Imports absolus
+from core.etat import Point
+from utils.config import config
+from utils.helpers import coordonnees_points, longueurs_cumulees
+from utils.paresseux import SingletonParesseux, module_paresseux
+
+np = module_paresseux("numpy")
+
+def distance_marche_km(distance_km):
+    """Distance de marche estimée à partir de la distance à vol d'oiseau (scalaire ou tableau)"""
+    return distance_km * config.MARCHE_FACTEUR_DETOUR
+
+def temps_marche_min(distance_marche):
+    """Temps de marche en minutes pour une distance de marche en km (scalaire ou tableau)"""
+    return distance_marche / config.VITESSE_MARCHE_KMH * 60
+
+def rayon_marche_km(temps_max_min: float) -> float:
+    """Distance à vol d'oiseau atteignable à pied en temps_max_min minutes"""
+    return temps_max_min / 60 * config.VITESSE_MARCHE_KMH / config.MARCHE_FACTEUR_DETOUR
+
+@dataclass
+class ArretsProches:
+    """
+    Résultat d'une requête par lot : ligne i = point i, colonne j = j-ième arrêt le plus proche
+    
+    Une case sans arrêt (moins de k arrêts, ou aucun dans le rayon) a
+    l'indice -1 et des distance et temps infinis.
+    """
+    indices: "np.ndarray"  # (n, k) entiers, rang de l'arrêt dans le résultat
+    distances_km: "np.ndarray"  # (n, k) distance de marche
+    temps_marche_min: "np.ndarray"  # (n, k)
+    _fournisseur: Callable[[int], Point]
+    
+    def __len__(self) -> int:
+        return len(self.indices)
+    
+    def arrets(self, i: int) -> List[Tuple[Point, float, float]]:
+        """
+        Arrêts proches du point i
+        
+        Returns:
+            Liste (arret, distance_marche_km, temps_marche_min), du plus proche au plus loin
+        """
+        return [
+            (self._fournisseur(int(indice)), float(distance), float(temps))
+            for indice, distance, temps in zip(self.indices[i], self.distances_km[i], self.temps_marche_min[i])
+            if indice >= 0
+        ]
+
+class ServiceArrets:
+    """
+    Recherche des arrêts de bus du gestionnaire de données
+    
+    Les requêtes passent par l'index spatial du gestionnaire (recherche par
+    lot de plus_proches_lot), tenu à jour à chaque modification des arrêts.
+    """
+    
+    def __init__(self, gestionnaire=None):
+        """
+        Args:
+            gestionnaire: GestionnaireDonnees (défaut: instance globale)
+        """
+        self._gestionnaire = gestionnaire
+    
+    @property
+    def gestionnaire(self):
+        if self._gestionnaire is None:
+            from services.data_manager import gestionnaire_donnees
+            self._gestionnaire = gestionnaire_donnees
+        return self._gestionnaire
+    
+    def __len__(self) -> int:
+        return len(self.gestionnaire.arrets_bus)
+    
+    def arrets_proches(self, latitudes, longitudes, k: int = None,
+                       rayon_max_km: Optional[float] = None) -> ArretsProches:
+        """
+        Les k arrêts les plus proches de chaque point d'un lot
+        
+        Args:
+            latitudes: Latitudes des points (tableau ou séquence)
+            longitudes: Longitudes des points
+            k: Nombre d'arrêts par point (défaut: config.ARRETS_PROCHES_K)
+            rayon_max_km: Distance maximale à vol d'oiseau (None = sans limite)
+                
+        Returns:
+            ArretsProches (n lignes, k colonnes)
+        """
+        k = config.ARRETS_PROCHES_K if k is None else k
+        arrets, indices, distances = self.gestionnaire.points_proches_lot(
+            latitudes, longitudes, k, rayon_max_km, type_point="arret_bus"
+        )
+        distances = distance_marche_km(distances)
+        return ArretsProches(indices, distances, temps_marche_min(distances), arrets.__getitem__)
+    
+    def arrets_proches_points(self, points: Sequence[Point], k: int = None,
+                              rayon_max_km: Optional[float] = None) -> ArretsProches:
+        """Comme arrets_proches, pour une liste de points ou un PointStore"""
+        latitudes, longitudes = coordonnees_points(points)
+        return self.arrets_proches(latitudes, longitudes, k, rayon_max_km)
+    
+    def accessibilite(self, points: Sequence[Point], pas_km: float = None,
+                      temps_max_min: float = None) -> Dict[str, float]:
+        """
+        Accessibilité en transport en commun le long d'un itinéraire
+        
+        L'itinéraire est échantillonné à pas régulier, puis l'arrêt le plus
+        proche de tous les échantillons est cherché en une seule requête.
+        
+        Args:
+            points: Points de l'itinéraire, dans l'ordre
+            pas_km: Pas d'échantillonnage (défaut: config.ARRETS_PAS_ECHANTILLON_KM)
+            temps_max_min: Marche maximale acceptée (défaut: config.MARCHE_TEMPS_MAX_MIN)
+            
+        Returns:
+            {"accessibilite_transport": part de l'itinéraire à moins de
+            temps_max_min d'un arrêt (0 à 1), "temps_marche_arret_min": temps
+            de marche moyen jusqu'à l'arrêt le plus proche, plafonné à temps_max_min}
+        """
+        pas_km = config.ARRETS_PAS_ECHANTILLON_KM if pas_km is None else pas_km
+        temps_max_min = config.MARCHE_TEMPS_MAX_MIN if temps_max_min is None else temps_max_min
+        latitudes, longitudes = self._echantillonner(points, pas_km)
+        if not len(latitudes):
+            return {"accessibilite_transport": 0.0, "temps_marche_arret_min": temps_max_min}
+            
+        proches = self.arrets_proches(latitudes, longitudes, k=1, rayon_max_km=rayon_marche_km(temps_max_min))
+        temps = np.minimum(proches.temps_marche_min[:, 0], temps_max_min)
+        return {
+            "accessibilite_transport": round(float(np.mean(temps < temps_max_min)), 2),
+            "temps_marche_arret_min": round(float(np.mean(temps)), 2)
+        }
+    
+    @staticmethod
+    def _echantillonner(points: Sequence[Point], pas_km: float) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Positions régulièrement espacées le long de la polyligne (extrémités comprises)"""
+        latitudes, longitudes = coordonnees_points(points)
+        if len(latitudes) < 2:
+            return latitudes, longitudes
+        cumul = longueurs_cumulees(latitudes, longitudes)
+        nombre = max(2, int(np.ceil(cumul[-1] / pas_km)) + 1)
+        abscisses = np.linspace(0.0, cumul[-1], nombre)
+        return np.interp(abscisses, cumul, latitudes), np.interp(abscisses, cumul, longitudes)
+
+# Instance globale, construite au premier usage
+service_arrets = SingletonParesseux(ServiceArrets, "service_arrets")
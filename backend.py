@@ -1,4 +1,4 @@
-from flask import Flask, render_template
+from flask import Flask, jsonify, render_template, request
 import os
 
 app = Flask(__name__, static_folder='.', template_folder='.')
@@ -16,6 +16,16 @@ def simulation():
 def apropos():
     return render_template('apropos.html')
 
+@app.route('/api/autocompletion')
+def autocompletion():
+    """Suggestions de lieux pour le champ de saisie (?q=...&limite=8)"""
+    from services.data_manager import gestionnaire_donnees
+    
+    saisie = request.args.get('q', '')
+    limite = min(request.args.get('limite', 8, type=int), 50)
+    suggestions = gestionnaire_donnees.autocompleter(saisie, limite)
+    return jsonify([point.to_dict() for point in suggestions])
+
 # Servir les fichiers statiques
 @app.route('/<path:path>')
 def serve_static(path):
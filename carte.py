@@ -1,13 +1,16 @@
 """
 Génération de cartes interactives - VERSION KINSHASA CORRIGÉE
 """
-import folium
 from typing import List, Dict, Any
 
 # Imports absolus
 from core.etat import Trajet, Point
 from utils.config import config
 from utils.helpers import calculer_barycentre
+from utils.paresseux import SingletonParesseux, module_paresseux
+
+# folium n'est importé qu'à la première carte générée
+folium = module_paresseux("folium")
 
 class GenerateurCarte:
     """
@@ -61,6 +64,9 @@ class GenerateurCarte:
         # Ajouter les marqueurs des points importants
         self._ajouter_marqueurs_carte(carte, trajets)
         
+        # Ajouter les arrêts de bus accessibles à pied
+        self._ajouter_arrets_carte(carte, tous_points)
+        
         # Ajouter un titre amélioré
         self._ajouter_titre_carte_ameliore(carte, titre)
         
@@ -96,13 +102,10 @@ class GenerateurCarte:
             tiles='OpenStreetMap'
         )
         
-        # Couleurs pour les différentes routes - CORRECTION DES COULEURS
+        # Couleurs pour les différentes routes (générées à la demande, dans l'ordre)
+        palette = ['green', 'blue', 'purple', 'orange', 'red', 'darkblue', 'cadetblue']
         couleurs_routes = {
-            "Route Principale - Boulevard du 30 Juin": 'blue',
-            "Route Secondaire - Avenue des Aviateurs": 'purple', 
-            "Route Scénique - Centre Ville": 'orange',
-            "Route Rapide - Voie Express": 'green',
-            "Route Économique - Itinéraire Court": 'red'
+            route.nom: palette[i % len(palette)] for i, route in enumerate(routes_alternatives)
         }
         
         print(f"   🎨 Génération de {len(routes_alternatives)} routes avec couleurs...")
@@ -181,6 +184,9 @@ class GenerateurCarte:
                 )
                 marqueur.add_to(carte)
         
+        # Ajouter les arrêts de bus accessibles à pied depuis la route choisie
+        self._ajouter_arrets_carte(carte, route_choisie.points)
+        
         # Ajouter un titre amélioré
         self._ajouter_titre_carte_ameliore(carte, titre)
         
@@ -199,7 +205,7 @@ class GenerateurCarte:
         
         return nom_fichier
     
-    def _ajouter_trajet_carte(self, carte: folium.Map, trajet: Trajet, index: int):
+    def _ajouter_trajet_carte(self, carte: "folium.Map", trajet: Trajet, index: int):
         """
         Ajoute un trajet à la carte
         
@@ -229,7 +235,7 @@ class GenerateurCarte:
             tooltip=f"Distance: {trajet.distance_km:.1f} km"
         ).add_to(carte)
     
-    def _ajouter_marqueurs_carte(self, carte: folium.Map, trajets: List[Trajet]):
+    def _ajouter_marqueurs_carte(self, carte: "folium.Map", trajets: List[Trajet]):
         """
         Ajoute les marqueurs des points importants à la carte
         
@@ -260,8 +266,10 @@ class GenerateurCarte:
                 )
                 points_deja_ajoutes.add(trajet.arrivee.nom)
             
-            # Marqueurs des points intermédiaires
+            # Marqueurs des points intermédiaires (pas ceux du tracé routier)
             for point_inter in trajet.points_intermediaires:
+                if point_inter.type_point == "trace":
+                    continue
                 if point_inter.nom not in points_deja_ajoutes:
                     self._ajouter_marqueur_point(
                         carte, point_inter,
@@ -269,7 +277,35 @@ class GenerateurCarte:
                     )
                     points_deja_ajoutes.add(point_inter.nom)
     
-    def _ajouter_marqueur_point(self, carte: folium.Map, point: Point, 
+    def _ajouter_arrets_carte(self, carte: "folium.Map", points: List[Point]):
+        """
+        Ajoute les arrêts de bus accessibles à pied depuis des points
+        (une seule requête vectorisée pour tous les points)
+        
+        Args:
+            carte: Carte Folium
+            points: Points de l'itinéraire
+        """
+        try:
+            from services.arrets_transport import rayon_marche_km, service_arrets
+            proches = service_arrets.arrets_proches_points(
+                points, rayon_max_km=rayon_marche_km(config.MARCHE_TEMPS_MAX_MIN)
+            )
+        except Exception as e:
+            print(f"⚠️  Arrêts de bus non affichés: {e}")
+            return
+        
+        arrets_deja_ajoutes = set()
+        for i in range(len(proches)):
+            for arret, _, temps_min in proches.arrets(i):
+                if arret.nom not in arrets_deja_ajoutes:
+                    self._ajouter_marqueur_point(
+                        carte, arret,
+                        self.couleurs["arret_bus"], "bus", "fa", f"Arrêt de bus - {temps_min:.0f} min à pied"
+                    )
+                    arrets_deja_ajoutes.add(arret.nom)
+    
+    def _ajouter_marqueur_point(self, carte: "folium.Map", point: Point, 
                               couleur: str, icone: str, prefixe: str, type_point: str):
         """
         Ajoute un marqueur individuel à la carte
@@ -301,7 +337,7 @@ class GenerateurCarte:
             icon=folium.Icon(color=couleur, icon=icone, prefix=prefixe)
         ).add_to(carte)
     
-    def _ajouter_titre_carte_ameliore(self, carte: folium.Map, titre: str):
+    def _ajouter_titre_carte_ameliore(self, carte: "folium.Map", titre: str):
         """
         Ajoute un titre amélioré à la carte
         
@@ -333,7 +369,7 @@ class GenerateurCarte:
         '''
         carte.get_root().html.add_child(folium.Element(titre_html))
     
-    def _ajouter_legende_carte_amelioree(self, carte: folium.Map):
+    def _ajouter_legende_carte_amelioree(self, carte: "folium.Map"):
         """
         Ajoute une légende améliorée à la carte
         
@@ -387,7 +423,7 @@ class GenerateurCarte:
         '''
         carte.get_root().html.add_child(folium.Element(legende_html))
     
-    def _ajouter_legende_multi_routes_amelioree(self, carte: folium.Map, couleurs_routes: Dict, route_choisie_nom: str):
+    def _ajouter_legende_multi_routes_amelioree(self, carte: "folium.Map", couleurs_routes: Dict, route_choisie_nom: str):
         """
         Ajoute une légende améliorée pour la carte multi-routes
         
@@ -494,4 +530,4 @@ class GenerateurCarte:
         carte.get_root().html.add_child(folium.Element(legende_html))
 
 # Instance globale du générateur de cartes
-generateur_carte = GenerateurCarte()
\ No newline at end of file
+generateur_carte = SingletonParesseux(GenerateurCarte, "generateur_carte")
\ No newline at end of file
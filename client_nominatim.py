@@ -0,0 +1,227 @@
+"""
+Client HTTP adaptatif pour Nominatim : reprises, backoff et disjoncteur - VERSION KINSHASA
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+# Imports absolus
+from utils.config import config
+from utils.paresseux import module_paresseux
+from utils.telemetrie import Telemetrie
+
+# requests n'est importé qu'au premier appel réseau
+requests = module_paresseux("requests")
+
+# Codes HTTP signalant une surcharge ou une indisponibilité temporaire
+CODES_REESSAYABLES = {429, 502, 503, 504}
+
+class ServiceIndisponibleErreur(Exception):
+    """Levée sans appel réseau lorsque le disjoncteur est ouvert ou en mode hors ligne"""
+
+class Disjoncteur:
+    """
+    Disjoncteur (circuit breaker) partagé entre threads
+    
+    - fermé : les appels passent ; seuil_echecs échecs consécutifs l'ouvrent
+    - ouvert : les appels échouent immédiatement pendant duree_ouverture
+    - semi-ouvert : un seul appel d'essai ; succès → fermé, échec → ouvert
+    """
+    
+    FERME = "ferme"
+    OUVERT = "ouvert"
+    SEMI_OUVERT = "semi_ouvert"
+    
+    def __init__(self, seuil_echecs: int = None, duree_ouverture: float = None):
+        self.seuil_echecs = config.DISJONCTEUR_SEUIL_ECHECS if seuil_echecs is None else seuil_echecs
+        self.duree_ouverture = config.DISJONCTEUR_DUREE_OUVERTURE if duree_ouverture is None else duree_ouverture
+        self.etat = self.FERME
+        self.echecs_consecutifs = 0
+        self._ouvert_jusqua = 0.0
+        self._essai_en_cours = False
+        self._verrou = threading.Lock()
+    
+    def autoriser(self) -> bool:
+        """Indique si un appel peut être tenté maintenant"""
+        with self._verrou:
+            if self.etat == self.FERME:
+                return True
+            if self.etat == self.OUVERT and time.monotonic() >= self._ouvert_jusqua:
+                self.etat = self.SEMI_OUVERT
+                self._essai_en_cours = False
+            if self.etat == self.SEMI_OUVERT and not self._essai_en_cours:
+                self._essai_en_cours = True
+                return True
+            return False
+    
+    def signaler_succes(self):
+        """Referme le disjoncteur après un appel réussi"""
+        with self._verrou:
+            self.etat = self.FERME
+            self.echecs_consecutifs = 0
+            self._essai_en_cours = False
+    
+    def abandonner_essai(self):
+        """
+        Libère l'appel d'essai interrompu sans réponse (annulation) : un
+        prochain appel pourra le retenter
+        """
+        with self._verrou:
+            self._essai_en_cours = False
+    
+    def signaler_echec(self, duree_min: float = 0.0, forcer: bool = False):
+        """
+        Comptabilise un échec ; ouvre le disjoncteur au-delà du seuil
+        
+        Args:
+            duree_min: Durée minimale d'ouverture (ex. Retry-After du serveur)
+            forcer: Ouvre le disjoncteur même sous le seuil
+        """
+        with self._verrou:
+            self.echecs_consecutifs += 1
+            if forcer or self.etat == self.SEMI_OUVERT or self.echecs_consecutifs >= self.seuil_echecs:
+                self.etat = self.OUVERT
+                self._ouvert_jusqua = time.monotonic() + max(self.duree_ouverture, duree_min)
+                self._essai_en_cours = False
+                print(f"⛔ Nominatim indisponible : appels suspendus "
+                      f"{max(self.duree_ouverture, duree_min):.0f}s")
+
+def lire_retry_after(valeur: Optional[str]) -> Optional[float]:
+    """
+    Interprète l'en-tête Retry-After (secondes ou date HTTP)
+    
+    Returns:
+        Délai en secondes, ou None si absent ou illisible
+    """
+    if not valeur:
+        return None
+    try:
+        return max(0.0, float(valeur))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(valeur).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def calculer_backoff(tentative: int, retry_after: Optional[float] = None) -> float:
+    """
+    Délai avant la tentative suivante : Retry-After s'il est fourni (non
+    plafonné, voir retry_after_excessif), sinon backoff exponentiel plafonné
+    avec gigue
+    
+    Args:
+        tentative: Numéro de la tentative échouée (0 pour la première)
+        retry_after: Délai imposé par le serveur en secondes
+    """
+    if retry_after is not None:
+        return retry_after
+    delai = config.NOMINATIM_BACKOFF_BASE * (2 ** tentative)
+    return min(delai, config.NOMINATIM_BACKOFF_MAX) * random.uniform(0.5, 1.0)
+
+def retry_after_excessif(retry_after: Optional[float]) -> bool:
+    """
+    Vrai si le serveur demande d'attendre plus que config.NOMINATIM_BACKOFF_MAX :
+    pas de reprise, le disjoncteur reste ouvert pendant retry_after
+    """
+    return retry_after is not None and retry_after > config.NOMINATIM_BACKOFF_MAX
+
+def point_acces_url(url: str) -> str:
+    """Dernier segment du chemin ("search", "reverse"), utilisé comme étiquette"""
+    return url.rstrip('/').rsplit('/', 1)[-1]
+
+class ClientNominatim:
+    """
+    Effectue les requêtes GET vers Nominatim avec :
+    - respect du débit (fonction d'attente fournie par le service)
+    - reprises sur 429/502/503/504 et erreurs de connexion, en honorant Retry-After
+    - disjoncteur pour échouer immédiatement pendant une panne
+    - métriques : requêtes par code HTTP, erreurs, reprises et latence
+    """
+    
+    def __init__(self, session: "requests.Session", attendre: Callable[[], Any],
+                 disjoncteur: Disjoncteur = None, max_tentatives: int = None,
+                 telemetrie: Telemetrie = None):
+        self.session = session
+        self.attendre = attendre
+        self.disjoncteur = disjoncteur or Disjoncteur()
+        self.max_tentatives = config.NOMINATIM_MAX_TENTATIVES if max_tentatives is None else max_tentatives
+        self.telemetrie = telemetrie or Telemetrie()
+    
+    def obtenir_json(self, url: str, params: Dict[str, Any], headers: Dict[str, str],
+                     timeout: float = None) -> Any:
+        """
+        Effectue une requête GET et retourne le JSON décodé
+        
+        Raises:
+            ServiceIndisponibleErreur: disjoncteur ouvert ou mode hors ligne
+            requests.RequestException: échec définitif de la requête
+        """
+        if config.GEOCODAGE_HORS_LIGNE:
+            raise ServiceIndisponibleErreur("Mode hors ligne : appel Nominatim désactivé")
+        timeout = config.NOMINATIM_TIMEOUT if timeout is None else timeout
+        point_acces = point_acces_url(url)
+        tentative = 0
+        while True:
+            if not self.disjoncteur.autoriser():
+                self.telemetrie.incrementer("nominatim_erreurs_total", point_acces=point_acces, type="disjoncteur")
+                raise ServiceIndisponibleErreur("Nominatim temporairement indisponible")
+                
+            # Chaque sortie de ce bloc rend un verdict au disjoncteur, sans
+            # quoi un appel d'essai le laisserait semi-ouvert indéfiniment
+            debut = time.perf_counter()
+            try:
+                self.attendre()
+                debut = time.perf_counter()
+                response = self.session.get(url, params=params, headers=headers, timeout=timeout)
+            except requests.Timeout:
+                # Pas de reprise : chaque nouvel essai coûterait un timeout complet
+                self.telemetrie.incrementer("nominatim_erreurs_total", point_acces=point_acces, type="timeout")
+                self.disjoncteur.signaler_echec()
+                raise
+            except requests.ConnectionError:
+                self.telemetrie.incrementer("nominatim_erreurs_total", point_acces=point_acces, type="connexion")
+                self.disjoncteur.signaler_echec()
+                if tentative + 1 >= self.max_tentatives:
+                    raise
+                self.telemetrie.incrementer("nominatim_reprises_total", point_acces=point_acces)
+                time.sleep(calculer_backoff(tentative))
+                tentative += 1
+                continue
+            except Exception:
+                # Autre erreur d'appel (URL invalide, trop de redirections...)
+                self.telemetrie.incrementer("nominatim_erreurs_total", point_acces=point_acces, type="autre")
+                self.disjoncteur.signaler_echec()
+                raise
+            except BaseException:
+                self.disjoncteur.abandonner_essai()
+                raise
+            finally:
+                self.telemetrie.observer("nominatim_duree_secondes", time.perf_counter() - debut,
+                                         point_acces=point_acces)
+                
+            self.telemetrie.incrementer("nominatim_requetes_total", point_acces=point_acces,
+                                        code=response.status_code)
+            if response.status_code in CODES_REESSAYABLES:
+                retry_after = lire_retry_after(response.headers.get('Retry-After'))
+                excessif = retry_after_excessif(retry_after)
+                self.disjoncteur.signaler_echec(retry_after or 0.0, forcer=excessif)
+                if excessif or tentative + 1 >= self.max_tentatives:
+                    response.raise_for_status()
+                response.close()
+                delai = calculer_backoff(tentative, retry_after)
+                print(f"   ⏳ Nominatim HTTP {response.status_code}, nouvel essai dans {delai:.1f}s")
+                self.telemetrie.incrementer("nominatim_reprises_total", point_acces=point_acces)
+                time.sleep(delai)
+                tentative += 1
+                continue
+                
+            if response.status_code >= 500:
+                self.disjoncteur.signaler_echec()
+            else:
+                # Réponse complète, erreur client (400, 403, 404) comprise : le service répond
+                self.disjoncteur.signaler_succes()
+            response.raise_for_status()
+            return response.json()
@@ -0,0 +1,104 @@
+"""
+Regroupement des appels identiques simultanés (single-flight) - VERSION KINSHASA
+"""
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# Import absolu
+from utils.paresseux import module_paresseux
+
+# asyncio n'est importé que par la variante asynchrone (VolUniqueAsync)
+asyncio = module_paresseux("asyncio")
+
+class _AppelEnCours:
+    """Appel partagé entre le thread qui l'exécute et ceux qui l'attendent"""
+    
+    def __init__(self):
+        self.termine = threading.Event()
+        self.resultat: Any = None
+        self.erreur: BaseException = None
+        self.attentes = 0
+
+class VolUnique:
+    """
+    Garantit qu'une seule exécution par clé est en cours à un instant donné
+    
+    Le premier thread exécute la fonction ; les threads arrivant avec la même
+    clé pendant l'exécution attendent et reçoivent le même résultat (ou la
+    même exception).
+    """
+    
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self._en_cours: Dict[Hashable, _AppelEnCours] = {}
+    
+    def executer(self, cle: Hashable, fonction: Callable[[], Any]) -> Any:
+        """
+        Exécute fonction() ou attend l'exécution déjà en cours pour cette clé
+        
+        Returns:
+            Résultat de l'exécution partagée
+        """
+        with self._verrou:
+            appel = self._en_cours.get(cle)
+            meneur = appel is None
+            if meneur:
+                appel = _AppelEnCours()
+                self._en_cours[cle] = appel
+            else:
+                appel.attentes += 1
+                
+        if not meneur:
+            appel.termine.wait()
+            if appel.erreur is not None:
+                raise appel.erreur
+            return appel.resultat
+            
+        try:
+            appel.resultat = fonction()
+            return appel.resultat
+        except BaseException as e:
+            appel.erreur = e
+            raise
+        finally:
+            with self._verrou:
+                del self._en_cours[cle]
+            appel.termine.set()
+    
+    def en_cours(self) -> int:
+        """Nombre de clés en cours d'exécution"""
+        with self._verrou:
+            return len(self._en_cours)
+
+class VolUniqueAsync:
+    """
+    Équivalent asyncio de VolUnique
+    
+    La coroutine du premier appelant tourne dans une tâche partagée ;
+    l'annulation d'un appelant n'interrompt pas les autres.
+    """
+    
+    def __init__(self):
+        self._en_cours: Dict[Hashable, "asyncio.Task"] = {}
+    
+    async def executer(self, cle: Hashable, fabrique: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Attend la tâche en cours pour cette clé ou en lance une avec fabrique()
+        
+        Returns:
+            Résultat de la tâche partagée
+        """
+        tache = self._en_cours.get(cle)
+        if tache is None:
+            tache = asyncio.ensure_future(fabrique())
+            self._en_cours[cle] = tache
+            tache.add_done_callback(lambda t: self._retirer(cle, t))
+        return await asyncio.shield(tache)
+    
+    def _retirer(self, cle: Hashable, tache: "asyncio.Task"):
+        if self._en_cours.get(cle) is tache:
+            del self._en_cours[cle]
+    
+    def en_cours(self) -> int:
+        """Nombre de clés en cours d'exécution"""
+        return len(self._en_cours)
@@ -17,15 +17,75 @@ class Config:
     # Paramètres OpenStreetMap
     NOMINATIM_URL: str = "https://nominatim.openstreetmap.org/search"
     NOMINATIM_DELAY: float = 1.0
+    NOMINATIM_RAFALE: float = 1.0  # jetons disponibles en rafale
+    GEOCODAGE_LOT_WORKERS: int = 4
+    NOMINATIM_TIMEOUT: float = 10.0
+    NOMINATIM_MAX_TENTATIVES: int = 3
+    NOMINATIM_BACKOFF_BASE: float = 1.0  # secondes, doublé à chaque reprise
+    NOMINATIM_BACKOFF_MAX: float = 30.0
+    DISJONCTEUR_SEUIL_ECHECS: int = 3  # échecs consécutifs avant ouverture
+    DISJONCTEUR_DUREE_OUVERTURE: float = 60.0  # secondes
+    GAZETTEER_SEUIL: float = 0.75  # score minimal d'une correspondance approchée
+    RAYON_INVERSE_LOCAL_KM: float = 0.1  # distance max. pour nommer un point connu
+    PRECISION_CACHE_INVERSE: int = 4  # décimales conservées (~11 m)
+    GEOCODAGE_HORS_LIGNE: bool = False  # True : aucun appel réseau (instantané/cache seuls)
     
     # Paramètres de l'agent
     VITESSE_MOYENNE_KMH: float = 25.0
     RAYON_RECHERCHE_KM: float = 2.0
     
+    # Accès aux arrêts de transport en commun (à pied)
+    VITESSE_MARCHE_KMH: float = 4.5
+    MARCHE_FACTEUR_DETOUR: float = 1.3  # distance à pied / distance à vol d'oiseau
+    MARCHE_TEMPS_MAX_MIN: float = 10.0  # au-delà, un arrêt n'est plus considéré accessible
+    ARRETS_PROCHES_K: int = 3
+    ARRETS_PAS_ECHANTILLON_KM: float = 0.2  # pas d'échantillonnage d'un itinéraire
+    
     # Fichiers de données
     FICHIER_POINTS_INTERET: str = "data/points_interet.json"
     FICHIER_ARRETS_BUS: str = "data/arrets_bus.json"
+    FICHIER_POINTS_INTERET_BINAIRE: str = "data/points_interet.bin"  # prioritaire s'il existe
+    FICHIER_ARRETS_BUS_BINAIRE: str = "data/arrets_bus.bin"
+    FICHIER_JOURNAL_POINTS_INTERET: str = "data/points_interet.journal"
+    FICHIER_JOURNAL_ARRETS_BUS: str = "data/arrets_bus.journal"
+    JOURNAL_SEUIL_COMPACTION: int = 10000  # opérations (au moins la taille des données)
+    JOURNAL_SYNCHRONISER: bool = True  # fsync après chaque lot
+    
     FICHIER_CACHE_GEOCODING: str = "data/cache_geocoding.json"
+    FICHIER_CACHE_GEOCODING_DB: str = "data/cache_geocoding.db"
+    FICHIER_INSTANTANE_GEOCODING: str = "data/instantane_geocoding.bin"
+    
+    # Import de points en masse (GeoJSON, CSV, OSM)
+    IMPORT_RAYON_DOUBLON_M: float = 50.0  # homonymes plus proches = même lieu
+    IMPORT_TAILLE_LOT: int = 5000
+    
+    # Réseau routier compilé (python -m services.graphe_routier extrait.osm.pbf)
+    FICHIER_GRAPHE_ROUTIER: str = "data/reseau_routier.npz"
+    FICHIER_HIERARCHIE_ROUTIERE: str = "data/reseau_routier.ch.npz"  # python -m services.hierarchie_routiere
+    FICHIER_MATRICE_TRAJETS: str = "data/matrice_trajets.npz"
+    MATRICE_MAX_POINTS: int = 5000  # au-delà, les points les moins récemment utilisés sont évincés
+    MATRICE_LOT_SAUVEGARDE: int = 256  # points nouveaux avant réécriture de la matrice
+    OPTIMISATION_BUDGET_S: float = 1.0  # amélioration locale de l'ordre d'une tournée
+    
+    # Itinéraires alternatifs (méthode des pénalités, services.routes_alternatives)
+    ALTERNATIVES_K: int = 5
+    ALTERNATIVES_SEUIL_DIVERSITE: float = 0.3  # part minimale de longueur non partagée
+    ALTERNATIVES_ETIREMENT_MAX: float = 0.5  # durée max. = (1 + étirement) × plus rapide
+    ALTERNATIVES_PENALITE: float = 1.4  # facteur appliqué aux arcs de chaque chemin trouvé
+    ALTERNATIVES_BUDGET_S: float = 0.5  # temps de calcul maximal par trajet
+    ALTERNATIVES_ETAPES: int = 4  # points intermédiaires d'une route du graphe routier
+    ALTERNATIVES_CONNEXIONS: int = 5  # voisins de chaque lieu connu (sans graphe routier)
+    ALTERNATIVES_MAX_LIEUX: int = 300
+    
+    # Profils de trafic (python -m services.profils_trafic ; défaut: profils de Kinshasa intégrés)
+    FICHIER_PROFILS_TRAFIC: str = "data/profils_trafic.npz"
+    TRAFIC_RAYON_CENTRE_KM: float = 3.0  # zone centre autour de la Gare Centrale (Gombe)
+    
+    # Cache de géocodage
+    CACHE_GEOCODING_BACKEND: str = "sqlite"  # "sqlite" ou "json"
+    CACHE_GEOCODING_TTL: float = 30 * 24 * 3600  # secondes (0 = sans expiration)
+    CACHE_GEOCODING_TTL_NEGATIF: float = 24 * 3600  # lieux introuvables
+    CACHE_GEOCODING_MAX_ENTREES: int = 100000
     
     # Paramètres de visualisation
     COULEUR_DEPART: str = "green"
@@ -48,10 +108,22 @@ class Config:
     POINTS_INTERET_KINSHASA: Dict = None
     
     def __post_init__(self):
-        """Vérification et création des dossiers nécessaires"""
-        self._creer_structure_dossiers()
+        """
+        Initialisation des valeurs par défaut
+        
+        Aucun accès disque ici : les dossiers sont créés par assurer_dossiers,
+        appelé par l'application (AgentVehicule) et non à l'import.
+        """
+        self._dossiers_crees = False
         self._initialiser_points_interet()
     
+    def assurer_dossiers(self):
+        """Crée la structure de dossiers si besoin (une seule fois par processus)"""
+        if self._dossiers_crees:
+            return
+        self._creer_structure_dossiers()
+        self._dossiers_crees = True
+    
     def _creer_structure_dossiers(self):
         """Crée la structure de dossiers si elle n'existe pas"""
         dossiers = [
@@ -3,11 +3,42 @@ Gestion des données locales et points d'intérêt - VERSION KINSHASA
 """
 import json
 import os
-from typing import Dict, List, Optional
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 # Imports absolus
 from core.etat import Point
 from utils.config import config
+from utils.index_spatial import FiltrePoint, IndexSpatialGrille
+from services.index_noms import IndexNoms
+from services.jeu_points_binaire import PointsModifiables, ecrire_jeu_points, ouvrir_jeu_points
+from services.journal_points import JournalPoints, etat_final, operation_ajout, operation_retrait
+from utils.paresseux import SingletonParesseux
+
+# Catégories de points (préfixe des clés de l'index des noms)
+CATEGORIE_POINTS_INTERET = "poi"
+CATEGORIE_ARRETS_BUS = "arret_bus"
+
+# Priorité des catégories lorsque plusieurs lieux portent le même nom
+PRIORITE_POINTS_INTERET = 0
+PRIORITE_ARRETS_BUS = 1
+PRIORITES = {
+    CATEGORIE_POINTS_INTERET: PRIORITE_POINTS_INTERET,
+    CATEGORIE_ARRETS_BUS: PRIORITE_ARRETS_BUS
+}
+
+def _ecrire_json_atomique(data: Dict, fichier: str):
+    """Écrit un fichier JSON via un fichier temporaire remplacé atomiquement"""
+    dossier = os.path.dirname(fichier)
+    if dossier:
+        os.makedirs(dossier, exist_ok=True)
+    temporaire = f"{fichier}.{os.getpid()}.tmp"
+    with open(temporaire, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporaire, fichier)
 
 class GestionnaireDonnees:
     """
@@ -17,9 +48,55 @@ class GestionnaireDonnees:
     def __init__(self):
         self.points_interet = self._charger_points_interet()
         self.arrets_bus = self._charger_arrets_bus()
+        self.index_spatial = IndexSpatialGrille()
+        self._indexer_points(self.points_interet)
+        self._indexer_points(self.arrets_bus)
+        self._index_noms: Optional[IndexNoms] = None
+        self._verrou_noms = threading.Lock()
+        
+        # Incrémentée à chaque modification d'une catégorie (invalide les index dérivés)
+        self.versions = {CATEGORIE_POINTS_INTERET: 0, CATEGORIE_ARRETS_BUS: 0}
+        
+        # Modifications journalisées depuis la dernière compaction
+        self._verrou_modifications = threading.RLock()
+        self._transaction: Optional[Dict[str, List[Dict]]] = None
+        self._journaux = {
+            CATEGORIE_POINTS_INTERET: JournalPoints(config.FICHIER_JOURNAL_POINTS_INTERET, config.JOURNAL_SYNCHRONISER),
+            CATEGORIE_ARRETS_BUS: JournalPoints(config.FICHIER_JOURNAL_ARRETS_BUS, config.JOURNAL_SYNCHRONISER)
+        }
+        for categorie, journal in self._journaux.items():
+            self._appliquer(categorie, journal.relire())
+    
+    @property
+    def index_noms(self) -> IndexNoms:
+        """Index des noms, construit à la première recherche par nom"""
+        with self._verrou_noms:
+            if self._index_noms is None:
+                index_noms = IndexNoms()
+                index_noms.ajouter_lot(
+                    [((CATEGORIE_POINTS_INTERET, nom), nom, point, PRIORITE_POINTS_INTERET)
+                     for nom, point in self.points_interet.items()] +
+                    [((CATEGORIE_ARRETS_BUS, nom), nom, point, PRIORITE_ARRETS_BUS)
+                     for nom, point in self.arrets_bus.items()]
+                )
+                self._index_noms = index_noms
+            return self._index_noms
+    
+    def _indexer_points(self, points: Dict[str, Point]):
+        """Ajoute des points à l'index spatial (grille précalculée d'un jeu binaire si possible)"""
+        if isinstance(points, PointsModifiables) and not points.modifie and \
+                points.jeu.taille_cellule == self.index_spatial.taille_cellule:
+            jeu = points.jeu
+            self.index_spatial.inserer_grille(jeu.grille(), jeu.latitudes, jeu.longitudes, jeu.point)
+        else:
+            self.index_spatial.inserer_points(points.values())
     
     def _charger_points_interet(self) -> Dict[str, Point]:
-        """Charge les points d'intérêt depuis le fichier"""
+        """Charge les points d'intérêt depuis le fichier (binaire mappé s'il existe)"""
+        points_binaires = ouvrir_jeu_points(config.FICHIER_POINTS_INTERET_BINAIRE, config.FICHIER_POINTS_INTERET)
+        if points_binaires is not None:
+            return points_binaires
+            
         try:
             if os.path.exists(config.FICHIER_POINTS_INTERET):
                 with open(config.FICHIER_POINTS_INTERET, 'r', encoding='utf-8') as f:
@@ -31,25 +108,30 @@ class GestionnaireDonnees:
                 return points_charges
             else:
                 # Créer le fichier avec les points par défaut de Kinshasa
-                self._sauvegarder_points_interet(config.POINTS_INTERET_KINSHASA)
-                return {nom: Point.from_dict(point_data) for nom, point_data in config.POINTS_INTERET_KINSHASA.items()}
+                points_par_defaut = {nom: Point.from_dict(point_data) for nom, point_data in config.POINTS_INTERET_KINSHASA.items()}
+                self._sauvegarder_points_interet(points_par_defaut)
+                return points_par_defaut
                 
         except Exception as e:
             print(f"⚠️  Erreur chargement points intérêt: {e}")
             # Retourner les points par défaut de Kinshasa
             return {nom: Point.from_dict(point_data) for nom, point_data in config.POINTS_INTERET_KINSHASA.items()}
     
-    def _sauvegarder_points_interet(self, points: Dict[str, Point]):
-        """Sauvegarde les points d'intérêt dans le fichier"""
+    def _sauvegarder_points_interet(self, points: Dict[str, Point]) -> bool:
+        """Réécrit le fichier des points d'intérêt (binaire s'il existe), remplacé atomiquement"""
         try:
-            data = {nom: point.to_dict() for nom, point in points.items()}
-            with open(config.FICHIER_POINTS_INTERET, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            if os.path.exists(config.FICHIER_POINTS_INTERET_BINAIRE):
+                ecrire_jeu_points(points, config.FICHIER_POINTS_INTERET_BINAIRE)
+            else:
+                data = {nom: point.to_dict() for nom, point in points.items()}
+                _ecrire_json_atomique(data, config.FICHIER_POINTS_INTERET)
+            return True
         except Exception as e:
             print(f"⚠️  Erreur sauvegarde points intérêt: {e}")
+            return False
     
     def _charger_arrets_bus(self) -> Dict[str, Point]:
-        """Charge les arrêts de bus depuis le fichier"""
+        """Charge les arrêts de bus depuis le fichier (binaire mappé s'il existe)"""
         arrets_par_defaut = {
             "Arrêt Victoire": Point("Arrêt Victoire", -4.4420, 15.2665, "arret_bus"),
             "Arrêt Gare": Point("Arrêt Gare", -4.4405, 15.2695, "arret_bus"),
@@ -59,6 +141,10 @@ class GestionnaireDonnees:
             "Arrêt Hôpital": Point("Arrêt Hôpital", -4.4355, 15.2755, "arret_bus")
         }
         
+        arrets_binaires = ouvrir_jeu_points(config.FICHIER_ARRETS_BUS_BINAIRE, config.FICHIER_ARRETS_BUS)
+        if arrets_binaires is not None:
+            return arrets_binaires
+            
         try:
             if os.path.exists(config.FICHIER_ARRETS_BUS):
                 with open(config.FICHIER_ARRETS_BUS, 'r', encoding='utf-8') as f:
@@ -77,14 +163,18 @@ class GestionnaireDonnees:
             print(f"⚠️  Erreur chargement arrêts bus: {e}")
             return arrets_par_defaut
     
-    def _sauvegarder_arrets_bus(self, arrets: Dict[str, Point]):
-        """Sauvegarde les arrêts de bus dans le fichier"""
+    def _sauvegarder_arrets_bus(self, arrets: Dict[str, Point]) -> bool:
+        """Réécrit le fichier des arrêts de bus (binaire s'il existe), remplacé atomiquement"""
         try:
-            data = {nom: point.to_dict() for nom, point in arrets.items()}
-            with open(config.FICHIER_ARRETS_BUS, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            if os.path.exists(config.FICHIER_ARRETS_BUS_BINAIRE):
+                ecrire_jeu_points(arrets, config.FICHIER_ARRETS_BUS_BINAIRE)
+            else:
+                data = {nom: point.to_dict() for nom, point in arrets.items()}
+                _ecrire_json_atomique(data, config.FICHIER_ARRETS_BUS)
+            return True
         except Exception as e:
             print(f"⚠️  Erreur sauvegarde arrêts bus: {e}")
+            return False
     
     def obtenir_points_interet(self) -> List[Point]:
         """Retourne la liste des points d'intérêt"""
@@ -95,28 +185,262 @@ class GestionnaireDonnees:
         return list(self.arrets_bus.values())
     
     def ajouter_point_interet(self, nom: str, point: Point):
-        """Ajoute un nouveau point d'intérêt"""
-        self.points_interet[nom] = point
-        self._sauvegarder_points_interet(self.points_interet)
+        """Ajoute (ou remplace) un point d'intérêt"""
+        self.ajouter_points_en_masse({nom: point}, CATEGORIE_POINTS_INTERET)
     
     def ajouter_arret_bus(self, nom: str, point: Point):
-        """Ajoute un nouvel arrêt de bus"""
-        self.arrets_bus[nom] = point
-        self._sauvegarder_arrets_bus(self.arrets_bus)
+        """Ajoute (ou remplace) un arrêt de bus"""
+        self.ajouter_points_en_masse({nom: point}, CATEGORIE_ARRETS_BUS)
+    
+    def ajouter_points_en_masse(self, points: Union[Dict[str, Point], Iterable[Tuple[str, Point]]],
+                                categorie: str = CATEGORIE_POINTS_INTERET) -> int:
+        """
+        Ajoute (ou remplace) un lot de points
+        
+        Le lot est écrit en une seule ligne du journal : le coût est
+        proportionnel à la taille du lot, pas au nombre de points existants.
+        
+        Args:
+            points: Dictionnaire ou paires (nom, point)
+            categorie: CATEGORIE_POINTS_INTERET ou CATEGORIE_ARRETS_BUS
+            
+        Returns:
+            Nombre de points du lot
+        """
+        paires = points.items() if isinstance(points, dict) else points
+        operations = [operation_ajout(nom, point) for nom, point in paires]
+        self._modifier(categorie, operations)
+        return len(operations)
+    
+    def retirer_point(self, nom: str, categorie: str = CATEGORIE_POINTS_INTERET) -> bool:
+        """
+        Retire un point d'intérêt ou un arrêt de bus
+        
+        Dans une transaction, le retrait est toujours enregistré (le point
+        peut avoir été ajouté plus tôt dans la même transaction).
+        
+        Returns:
+            True si le point existait (hors modifications non validées)
+        """
+        with self._verrou_modifications:
+            existe = nom in self._collection(categorie)
+            if existe or self._transaction is not None:
+                self._modifier(categorie, [operation_retrait(nom)])
+            return existe
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Regroupe des modifications jusqu'à la sortie du bloc
+        
+        Elles sont alors journalisées (un lot par catégorie) et appliquées
+        ensemble ; une exception dans le bloc les abandonne toutes.
+        
+        Exemple:
+            with gestionnaire_donnees.transaction():
+                gestionnaire_donnees.ajouter_point_interet(nom, point)
+                gestionnaire_donnees.retirer_point(ancien_nom)
+        """
+        with self._verrou_modifications:
+            if self._transaction is not None:
+                # Transaction imbriquée : fait partie de la transaction englobante
+                yield self
+                return
+                
+            self._transaction = {}
+            try:
+                yield self
+            except BaseException:
+                self._transaction = None
+                raise
+            lots, self._transaction = self._transaction, None
+            self._valider(lots)
+    
+    def compacter(self, categorie: Optional[str] = None):
+        """
+        Réécrit le fichier principal (remplacement atomique) puis vide le journal
+        
+        Un arrêt entre les deux étapes est sans danger : rejouer le journal
+        sur le nouveau fichier redonne le même état.
+        
+        Args:
+            categorie: Catégorie à compacter (défaut: toutes)
+        """
+        with self._verrou_modifications:
+            for nom_categorie in ([categorie] if categorie else list(self._journaux)):
+                if nom_categorie == CATEGORIE_POINTS_INTERET:
+                    sauvegarde = self._sauvegarder_points_interet(self.points_interet)
+                else:
+                    sauvegarde = self._sauvegarder_arrets_bus(self.arrets_bus)
+                if sauvegarde:
+                    self._journaux[nom_categorie].vider()
+    
+    def _collection(self, categorie: str) -> Dict[str, Point]:
+        """Points d'une catégorie"""
+        if categorie == CATEGORIE_POINTS_INTERET:
+            return self.points_interet
+        if categorie == CATEGORIE_ARRETS_BUS:
+            return self.arrets_bus
+        raise ValueError(f"Catégorie de points inconnue: {categorie}")
+    
+    def _modifier(self, categorie: str, operations: List[Dict]):
+        """Valide des opérations, ou les met de côté pendant une transaction"""
+        self._collection(categorie)
+        with self._verrou_modifications:
+            if self._transaction is not None:
+                self._transaction.setdefault(categorie, []).extend(operations)
+            else:
+                self._valider({categorie: operations})
+    
+    def _valider(self, lots: Dict[str, List[Dict]]):
+        """Journalise puis applique des lots d'opérations, compacte si besoin"""
+        for categorie, operations in lots.items():
+            try:
+                self._journaux[categorie].ajouter(operations)
+            except Exception as e:
+                print(f"⚠️  Erreur journal {categorie}: {e}")
+            self._appliquer(categorie, operations)
+            
+            # Compaction quand le journal dépasse la taille des données : coût amorti constant
+            seuil = max(config.JOURNAL_SEUIL_COMPACTION, len(self._collection(categorie)))
+            if self._journaux[categorie].nombre_operations > seuil:
+                self.compacter(categorie)
+    
+    def _appliquer(self, categorie: str, operations: List[Dict]):
+        """Applique des opérations aux points en mémoire et aux index"""
+        points = self._collection(categorie)
+        ajouts = []
+        with self._verrou_noms:
+            for cle, point in etat_final(operations).items():
+                ancien = points.get(cle)
+                if ancien is not None:
+                    self.index_spatial.retirer(ancien)
+                if point is None:
+                    if ancien is not None:
+                        del points[cle]
+                        if self._index_noms is not None:
+                            self._index_noms.retirer((categorie, cle))
+                    continue
+                self.index_spatial.inserer(point)
+                points[cle] = point
+                ajouts.append(((categorie, cle), cle, point, PRIORITES[categorie]))
+                
+            if ajouts and self._index_noms is not None:
+                self._index_noms.ajouter_lot(ajouts)
+            if operations:
+                self.versions[categorie] += 1
+    
+    @staticmethod
+    def _filtre(type_point: Optional[str], commune: Optional[str]) -> Optional[FiltrePoint]:
+        """Prédicat sur le type et la commune (None = pas de contrainte)"""
+        if type_point is None and commune is None:
+            return None
+        commune = commune.lower() if commune else None
+        
+        def filtre(point: Point) -> bool:
+            if type_point is not None and point.type_point != type_point:
+                return False
+            if commune is not None and (point.commune or "").lower() != commune:
+                return False
+            return True
+        return filtre
+    
+    def points_proches(self, latitude: float, longitude: float, k: int = 5,
+                       rayon_max_km: Optional[float] = None, type_point: Optional[str] = None,
+                       commune: Optional[str] = None) -> List[Tuple[Point, float]]:
+        """
+        Les k points d'intérêt ou arrêts de bus les plus proches
+        
+        Args:
+            latitude: Latitude de référence
+            longitude: Longitude de référence
+            k: Nombre de points recherchés
+            rayon_max_km: Distance maximale (défaut: sans limite)
+            type_point: Ne retenir que ce type de point (ex. "arret_bus")
+            commune: Ne retenir que cette commune (insensible à la casse)
+            
+        Returns:
+            Liste (point, distance_km) triée par distance croissante
+        """
+        return self.index_spatial.plus_proches(
+            latitude, longitude, k, rayon_max_km, self._filtre(type_point, commune)
+        )
+    
+    def points_proches_lot(self, latitudes, longitudes, k: int = 5,
+                           rayon_max_km: Optional[float] = None, type_point: Optional[str] = None,
+                           commune: Optional[str] = None):
+        """
+        Les k points les plus proches de chaque position d'un lot (voir points_proches)
+        
+        Returns:
+            Tuple (points trouvés, indices (n, k) dans cette liste, distances km (n, k)) ;
+            une case sans point a l'indice -1 et une distance infinie
+        """
+        return self.index_spatial.plus_proches_lot(
+            latitudes, longitudes, k, rayon_max_km, self._filtre(type_point, commune)
+        )
+    
+    def points_dans_rayon(self, latitude: float, longitude: float, rayon_km: float,
+                          type_point: Optional[str] = None,
+                          commune: Optional[str] = None) -> List[Tuple[Point, float]]:
+        """
+        Points d'intérêt et arrêts de bus situés dans un rayon
+        
+        Returns:
+            Liste (point, distance_km) triée par distance croissante
+        """
+        return self.index_spatial.rechercher_rayon(
+            latitude, longitude, rayon_km, self._filtre(type_point, commune)
+        )
+    
+    def points_dans_rectangle(self, lat_min: float, lon_min: float, lat_max: float, lon_max: float,
+                              type_point: Optional[str] = None,
+                              commune: Optional[str] = None) -> List[Point]:
+        """
+        Points d'intérêt et arrêts de bus situés dans un rectangle de coordonnées
+        
+        Returns:
+            Liste des points, sans ordre particulier
+        """
+        return self.index_spatial.rechercher_rectangle(
+            lat_min, lon_min, lat_max, lon_max, self._filtre(type_point, commune)
+        )
     
     def rechercher_point_par_nom(self, nom: str) -> Optional[Point]:
-        """Recherche un point par son nom"""
-        # Chercher dans les points d'intérêt
-        for point_nom, point in self.points_interet.items():
-            if nom.lower() in point_nom.lower():
-                return point
+        """
+        Recherche le point dont le nom correspond le mieux
         
-        # Chercher dans les arrêts de bus
-        for point_nom, point in self.arrets_bus.items():
-            if nom.lower() in point_nom.lower():
-                return point
+        Accents, casse et ponctuation sont ignorés ; à défaut de préfixe,
+        le nom peut apparaître n'importe où (ex. "central" → "Marché Central").
+        """
+        resultats = self.index_noms.rechercher(nom, limite=1, sous_chaine=True)
+        return resultats[0][0] if resultats else None
+    
+    def rechercher_points_par_nom(self, nom: str, limite: int = 10) -> List[Point]:
+        """
+        Recherche les points dont le nom correspond, classés par pertinence
+        
+        Args:
+            nom: Nom ou début de nom (chaque mot peut être un préfixe)
+            limite: Nombre maximal de résultats
+            
+        Returns:
+            Points d'intérêt et arrêts de bus du plus au moins pertinent
+        """
+        return [point for point, _ in self.index_noms.rechercher(nom, limite, sous_chaine=True)]
+    
+    def autocompleter(self, saisie: str, limite: int = 8) -> List[Point]:
+        """
+        Suggestions de lieux pour une saisie en cours (appel à chaque frappe)
         
-        return None
+        Args:
+            saisie: Texte saisi, le dernier mot pouvant être incomplet
+            limite: Nombre maximal de suggestions
+            
+        Returns:
+            Points suggérés du plus au moins pertinent
+        """
+        return self.index_noms.autocompleter(saisie, limite)
     
     def obtenir_points_pour_itineraire(self) -> List[Point]:
         """
@@ -150,4 +474,4 @@ class GestionnaireDonnees:
         return points_selectionnes
 
 # Instance globale du gestionnaire de données
-gestionnaire_donnees = GestionnaireDonnees()
+gestionnaire_donnees = SingletonParesseux(GestionnaireDonnees, "gestionnaire_donnees")
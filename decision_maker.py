@@ -2,10 +2,12 @@
 Système de décision multi-routes pour l'Agent Véhicule - VERSION KINSHASA RÉELLE
 """
 from dataclasses import dataclass, field
+from datetime import datetime
 from typing import List, Dict, Any, Tuple
-import random
-import math
 from core.etat import Point
+from utils.config import config
+from utils.helpers import (calculer_distance_haversine, calculer_distance_totale, calculer_distances_segments,
+                           coordonnees_points)
 
 @dataclass
 class RouteAlternative:
@@ -22,74 +24,23 @@ class DecisionMaker:
     Prend des décisions intelligentes sur les itinéraires
     """
     
-    def __init__(self):
-        self.routes_predefinies = {}
-        self._initialiser_routes_kinshasa()
-    
-    def _initialiser_routes_kinshasa(self):
-        """Initialise les routes prédéfinies pour Kinshasa avec points réels"""
-        self.routes_predefinies = {
-            "route_principale": {
-                "nom": "Route Principale - Boulevard du 30 Juin",
-                "points_cles": [
-                    "Place de la Victoire", 
-                    "Tour de l'Échangeur",
-                    "Boulevard du 30 Juin", 
-                    "Avenue de la Justice",
-                    "Palais du Peuple", 
-                    "Gare Centrale"
-                ],
-                "poids": {"temps": 0.8, "cout": 0.6, "securite": 0.7, "confort": 0.8}
-            },
-            "route_secondaire": {
-                "nom": "Route Secondaire - Avenue des Aviateurs",
-                "points_cles": [
-                    "Place de la Victoire",
-                    "Carrefour Forescom",
-                    "Avenue des Aviateurs", 
-                    "Place du Marché",
-                    "Marché Central",
-                    "Gare Centrale"
-                ],
-                "poids": {"temps": 0.6, "cout": 0.8, "securite": 0.8, "confort": 0.6}
-            },
-            "route_scenique": {
-                "nom": "Route Scénique - Centre Ville",
-                "points_cles": [
-                    "Place de la Victoire",
-                    "Stade des Martyrs",
-                    "Avenue de la Libération",
-                    "Hôpital Général de Kinshasa", 
-                    "Immeuble Sozacom",
-                    "Gare Centrale"
-                ],
-                "poids": {"temps": 0.4, "cout": 0.7, "securite": 0.9, "confort": 0.9}
-            },
-            "route_rapide": {
-                "nom": "Route Rapide - Voie Express",
-                "points_cles": [
-                    "Place de la Victoire",
-                    "Boulevard du 30 Juin", 
-                    "Avenue de la Justice",
-                    "Avenue des Aviateurs",
-                    "Palais du Peuple",
-                    "Gare Centrale"
-                ],
-                "poids": {"temps": 0.9, "cout": 0.5, "securite": 0.6, "confort": 0.7}
-            },
-            "route_economique": {
-                "nom": "Route Économique - Itinéraire Court",
-                "points_cles": [
-                    "Place de la Victoire",
-                    "Tour de l'Échangeur", 
-                    "Avenue de la Libération",
-                    "Hôpital Général de Kinshasa",
-                    "Marché Central",
-                    "Gare Centrale"
-                ],
-                "poids": {"temps": 0.5, "cout": 0.9, "securite": 0.7, "confort": 0.5}
-            }
-        }
+    def __init__(self, service_arrets=None, service_matrice=None, generateur_alternatives=None,
+                 profils_trafic=None):
+        """
+        Args:
+            service_arrets: ServiceArrets pour l'accessibilité en transport
+                en commun (défaut: instance globale, chargée au premier calcul)
+            service_matrice: ServiceMatrice des coûts de segments (défaut:
+                instance globale, chargée au premier calcul)
+            generateur_alternatives: GenerateurAlternatives des routes (défaut:
+                sur le graphe routier partagé, créé au premier calcul)
+            profils_trafic: ProfilsTrafic selon l'heure de départ (défaut:
+                instance globale, chargée au premier calcul)
+        """
+        self.service_arrets = service_arrets
+        self.service_matrice = service_matrice
+        self.generateur_alternatives = generateur_alternatives
+        self.profils_trafic = profils_trafic
     
     def definir_strategie(self, strategie: str) -> Dict[str, float]:
         """
@@ -111,130 +62,138 @@ class DecisionMaker:
         
         return strategies.get(strategie, strategies["rapide"])
     
-    def generer_routes_alternatives(self, depart: Point, arrivee: Point) -> List[RouteAlternative]:
+    def generer_routes_alternatives(self, depart: Point, arrivee: Point, k: int = None,
+                                    seuil_diversite: float = None,
+                                    heure_depart: datetime = None) -> List[RouteAlternative]:
         """
-        Génère plusieurs routes alternatives entre départ et arrivée
+        Génère des routes alternatives diversifiées entre départ et arrivée,
+        calculées à la demande sur le réseau (méthode des pénalités)
         
         Args:
             depart: Point de départ
             arrivee: Point d'arrivée
+            k: Nombre maximal de routes (défaut: config.ALTERNATIVES_K)
+            seuil_diversite: Part minimale d'une route non partagée avec les
+                précédentes (défaut: config.ALTERNATIVES_SEUIL_DIVERSITE)
+            heure_depart: Heure de départ, qui détermine le trafic (défaut: maintenant)
             
         Returns:
-            Liste des routes alternatives
+            Liste des routes alternatives, la plus rapide en premier
         """
-        routes = []
+        if self.generateur_alternatives is None:
+            from services.routes_alternatives import GenerateurAlternatives
+            self.generateur_alternatives = GenerateurAlternatives()
+        heure_depart = heure_depart or datetime.now()
         
-        for route_id, route_info in self.routes_predefinies.items():
-            # Créer les points pour cette route en utilisant les coordonnées réelles
-            points_route = [depart]  # Commence par le départ
-            
-            # Ajouter les points intermédiaires avec coordonnées réelles
-            for point_nom in route_info["points_cles"][1:-1]:  # Exclure départ et arrivée
-                point_intermediaire = self._creer_point_intermediaire(point_nom, depart, arrivee)
-                points_route.append(point_intermediaire)
-            
-            # Terminer par l'arrivée
-            points_route.append(arrivee)
-            
+        routes = []
+        for itineraire in self.generateur_alternatives.generer(depart, arrivee, k, seuil_diversite):
             # Calculer les caractéristiques de la route
             caracteristiques = self._calculer_caracteristiques_route(
-                points_route, route_info["poids"]
+                itineraire.points, itineraire.poids, heure_depart, itineraire.segments
             )
-            
-            # Créer la route alternative
-            route = RouteAlternative(
-                nom=route_info["nom"],
-                points=points_route,
+            routes.append(RouteAlternative(
+                nom=itineraire.nom,
+                points=itineraire.points,
                 caracteristiques=caracteristiques
-            )
-            
-            routes.append(route)
+            ))
         
         return routes
     
-    def _creer_point_intermediaire(self, nom_point: str, depart: Point, arrivee: Point) -> Point:
-        """Crée un point intermédiaire avec coordonnées réalistes"""
-        # Coordonnées prédéfinies pour les points connus de Kinshasa
-        points_coordonnees = {
-            "Tour de l'Échangeur": (-4.33500, 15.30600),
-            "Boulevard du 30 Juin": (-4.32800, 15.30900),
-            "Avenue de la Justice": (-4.32000, 15.31100),
-            "Palais du Peuple": (-4.31800, 15.31200),
-            "Carrefour Forescom": (-4.33000, 15.30700),
-            "Avenue des Aviateurs": (-4.32200, 15.30800),
-            "Place du Marché": (-4.32600, 15.31000),
-            "Marché Central": (-4.32500, 15.31000),
-            "Stade des Martyrs": (-4.33200, 15.30800),
-            "Avenue de la Libération": (-4.31900, 15.31200),
-            "Hôpital Général de Kinshasa": (-4.32200, 15.31100),
-            "Immeuble Sozacom": (-4.31700, 15.31300)
-        }
-        
-        if nom_point in points_coordonnees:
-            lat, lon = points_coordonnees[nom_point]
-            return Point(nom_point, lat, lon, "intermediaire")
-        else:
-            # Point non prédéfini, générer aléatoirement
-            return Point(
-                nom_point,
-                depart.latitude + (arrivee.latitude - depart.latitude) * random.uniform(0.2, 0.8),
-                depart.longitude + (arrivee.longitude - depart.longitude) * random.uniform(0.2, 0.8),
-                "intermediaire"
-            )
-    
-    def _calculer_caracteristiques_route(self, points: List[Point], poids_base: Dict[str, float]) -> Dict[str, float]:
+    def _calculer_caracteristiques_route(self, points: List[Point], poids_base: Dict[str, float],
+                                         heure_depart: datetime = None, segments=None) -> Dict[str, float]:
         """
         Calcule les caractéristiques d'une route en USD
-        """
-        # Calculer la distance totale
-        distance_km = self._calculer_distance_totale(points)
         
-        # Calculer le temps estimé (25 km/h moyenne à Kinshasa)
-        temps_estime_min = (distance_km / 25) * 60
+        Args:
+            points: Points de la route
+            poids_base: Poids de la route (temps, cout, securite, confort)
+            heure_depart: Heure de départ, qui détermine le trafic (défaut: maintenant)
+            segments: (distances km, durées min, latitudes, longitudes des
+                milieux) des arcs parcourus ; défaut: segments entre points
+                consécutifs, lus dans la matrice des trajets
+        """
+        # Distance et temps nominal de chaque segment, temps estimé selon le
+        # trafic à l'heure de départ
+        segments = segments if segments is not None else self._calculer_couts_route(points)
+        distances_km, temps_nominal_min = segments[0], segments[1]
+        distance_km = float(distances_km.sum())
+        temps_estime_min = self._calculer_temps_trafic(segments, heure_depart or datetime.now())
         
         # Calculer le coût en essence en USD (environ 1.5 USD/litre, consommation 7L/100km)
         cout_essence_usd = distance_km * 0.07 * 1.5  # 7L/100km * 1.5 USD/L
         
-        # Générer des caractéristiques basées sur les poids
-        return {
+        # Embouteillage : part du temps de parcours perdue par rapport au temps nominal
+        temps_total_min = float(temps_estime_min.sum())
+        embouteillage = 1 - float(temps_nominal_min.sum()) / temps_total_min if temps_total_min > 0 else 0.0
+        caracteristiques = {
             "distance_km": round(distance_km, 2),
-            "temps_estime_min": round(temps_estime_min, 2),
+            "temps_estime_min": round(temps_total_min, 2),
             "cout_essence_usd": round(cout_essence_usd, 2),
-            "niveau_embouteillage": round(random.uniform(0.3, 0.9) * poids_base["temps"], 2),
-            "niveau_securite": round(random.uniform(0.6, 0.95) * poids_base["securite"], 2),
-            "confort_route": round(random.uniform(0.5, 0.9) * poids_base["confort"], 2),
+            "niveau_embouteillage": round(min(max(embouteillage, 0.0), 1.0), 2),
+            "niveau_securite": round(poids_base["securite"], 2),
+            "confort_route": round(poids_base["confort"], 2),
             "score_global": round(sum(poids_base.values()) / len(poids_base), 2)
         }
+        caracteristiques.update(self._calculer_accessibilite_transport(points))
+        return caracteristiques
+    
+    def _calculer_accessibilite_transport(self, points: List[Point]) -> Dict[str, float]:
+        """
+        Accessibilité des arrêts de bus le long de la route (requête
+        vectorisée sur tout l'itinéraire échantillonné)
+        """
+        try:
+            if self.service_arrets is None:
+                from services.arrets_transport import service_arrets
+                self.service_arrets = service_arrets
+            return self.service_arrets.accessibilite(points)
+        except Exception as e:
+            print(f"⚠️  Accessibilité transport indisponible: {e}")
+            return {}
+    
+    def _calculer_couts_route(self, points: List[Point]) -> Tuple["np.ndarray", ...]:
+        """
+        Distance (km), temps nominal (minutes) et point milieu de chaque
+        segment d'une route, coûts lus dans la matrice des trajets (calculés
+        une fois par couple de points, réutilisés d'une stratégie et d'une
+        exécution à l'autre)
+        """
+        latitudes, longitudes = coordonnees_points(points)
+        milieux = (latitudes[:-1] + latitudes[1:]) / 2, (longitudes[:-1] + longitudes[1:]) / 2
+        try:
+            if self.service_matrice is None:
+                from services.matrice_trajets import service_matrice
+                self.service_matrice = service_matrice
+            return self.service_matrice.couts_segments(points) + milieux
+        except Exception as e:
+            print(f"⚠️  Matrice des trajets indisponible: {e}")
+            distances = calculer_distances_segments(points)
+            return (distances, distances / config.VITESSE_MOYENNE_KMH * 60) + milieux
+    
+    def _calculer_temps_trafic(self, segments, heure_depart: datetime) -> "np.ndarray":
+        """
+        Temps (minutes) de chaque segment pour un départ à heure_depart,
+        calculé en un appel vectorisé sur toute la route (profils de trafic)
+        """
+        distances_km, durees_min, latitudes, longitudes = segments
+        try:
+            if self.profils_trafic is None:
+                from services.profils_trafic import profils_trafic
+                self.profils_trafic = profils_trafic
+            return self.profils_trafic.durees_segments(latitudes, longitudes, distances_km,
+                                                       durees_min, heure_depart)
+        except Exception as e:
+            print(f"⚠️  Profils de trafic indisponibles: {e}")
+            return durees_min
     
     def _calculer_distance_totale(self, points: List[Point]) -> float:
         """Calcule la distance totale d'une route en km"""
-        if len(points) < 2:
-            return 0.0
-        
-        distance_totale = 0.0
-        for i in range(len(points) - 1):
-            # Utiliser la formule Haversine pour une distance précise
-            distance_segment = self._calculer_distance_haversine(points[i], points[i+1])
-            distance_totale += distance_segment
-        
-        return distance_totale
+        # Formule Haversine vectorisée sur tous les segments
+        return calculer_distance_totale(points)
     
     def _calculer_distance_haversine(self, point1: Point, point2: Point) -> float:
         """Calcule la distance entre deux points avec la formule Haversine"""
-        R = 6371  # Rayon de la Terre en km
-        
-        lat1 = math.radians(point1.latitude)
-        lon1 = math.radians(point1.longitude)
-        lat2 = math.radians(point2.latitude)
-        lon2 = math.radians(point2.longitude)
-        
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        
-        return R * c
+        return calculer_distance_haversine(point1, point2)
     
     def choisir_meilleure_route(self, routes: List[RouteAlternative], poids_strategie: Dict[str, float]) -> Tuple[RouteAlternative, Dict[str, Any]]:
         """
@@ -246,10 +205,12 @@ class DecisionMaker:
         analyse = {}
         meilleure_route = None
         meilleur_score = -1
+        # Les temps sont comparés à celui de la route la plus rapide
+        temps_reference = min(route.caracteristiques["temps_estime_min"] for route in routes)
         
         for route in routes:
             # Calculer le score pondéré selon la stratégie
-            score = self._calculer_score_route(route, poids_strategie)
+            score = self._calculer_score_route(route, poids_strategie, temps_reference)
             
             # Stocker l'analyse
             analyse[route.nom] = {
@@ -265,14 +226,22 @@ class DecisionMaker:
         
         return meilleure_route, analyse
     
-    def _calculer_score_route(self, route: RouteAlternative, poids_strategie: Dict[str, float]) -> float:
+    def _calculer_score_route(self, route: RouteAlternative, poids_strategie: Dict[str, float],
+                              temps_reference: float = None) -> float:
         """
         Calcule le score d'une route selon la stratégie
+        
+        Args:
+            route: Route évaluée
+            poids_strategie: Poids de chaque critère
+            temps_reference: Temps estimé de la route la plus rapide (défaut:
+                celui de la route, le critère temps vaut alors son poids)
         """
         carac = route.caracteristiques
+        temps = carac["temps_estime_min"]
         
-        # Normaliser les caractéristiques (inverser pour l'embouteillage et coût)
-        score_temps = (1 - carac["niveau_embouteillage"]) * poids_strategie["temps"]
+        # Normaliser les caractéristiques (temps relatif à la plus rapide, coût inversé)
+        score_temps = (temps_reference / temps if temps_reference and temps > 0 else 1.0) * poids_strategie["temps"]
         score_cout = (1 - carac["cout_essence_usd"] / 5) * poids_strategie["cout"]  # Normaliser le coût (max 5 USD)
         score_securite = carac["niveau_securite"] * poids_strategie["securite"]
         score_confort = carac["confort_route"] * poids_strategie["confort"]
@@ -1,11 +1,18 @@
 """
 Gestion des états de l'Agent Véhicule - VERSION KINSHASA
 """
+from collections import abc
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterable, Iterator, Optional, Sequence, Tuple
 from enum import Enum
 import time
 
+# Import absolu
+from utils.paresseux import module_paresseux
+
+# NumPy n'est importé qu'au premier calcul vectorisé
+np = module_paresseux("numpy")
+
 class StatutAgent(Enum):
     """Statuts possibles de l'agent"""
     INACTIF = "inactif"
@@ -14,22 +21,50 @@ class StatutAgent(Enum):
     ARRIVE = "arrivé"
     ERREUR = "erreur"
 
-@dataclass
 class Point:
-    """Représente un point géographique"""
-    nom: str
-    latitude: float
-    longitude: float
-    type_point: str = "inconnu"  # "depart", "arrivee", "arret", "intermediaire"
+    """
+    Représente un point géographique
+    
+    Classe à __slots__ (pas de __dict__ par instance) : mêmes champs, même
+    constructeur et même égalité que l'ancienne dataclass.
+    """
+    
+    __slots__ = ("nom", "latitude", "longitude", "type_point", "commune")
+    
+    def __init__(self, nom: str, latitude: float, longitude: float,
+                 type_point: str = "inconnu", commune: Optional[str] = None):
+        self.nom = nom
+        self.latitude = latitude
+        self.longitude = longitude
+        self.type_point = type_point  # "depart", "arrivee", "arret", "intermediaire"
+        self.commune = commune
+    
+    def _champs(self) -> Tuple:
+        return (self.nom, self.latitude, self.longitude, self.type_point, self.commune)
+    
+    def __eq__(self, autre) -> bool:
+        if autre.__class__ is not self.__class__:
+            return NotImplemented
+        return self._champs() == autre._champs()
+    
+    # Point est modifiable (type_point est réaffecté) : pas de hachage
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        return (f"Point(nom={self.nom!r}, latitude={self.latitude!r}, longitude={self.longitude!r}, "
+                f"type_point={self.type_point!r}, commune={self.commune!r})")
     
     def to_dict(self) -> Dict:
         """Convertit le point en dictionnaire"""
-        return {
+        data = {
             "nom": self.nom,
             "latitude": self.latitude,
             "longitude": self.longitude,
             "type_point": self.type_point
         }
+        if self.commune is not None:
+            data["commune"] = self.commune
+        return data
     
     @classmethod
     def from_dict(cls, data: Dict):
@@ -38,8 +73,173 @@ class Point:
             nom=data["nom"],
             latitude=data["latitude"],
             longitude=data["longitude"],
-            type_point=data.get("type_point", "inconnu")
+            type_point=data.get("type_point", "inconnu"),
+            commune=data.get("commune")
+        )
+
+class _TableChaines:
+    """Chaînes internées : chaque valeur distincte est stockée une seule fois"""
+    
+    __slots__ = ("valeurs", "_codes")
+    
+    def __init__(self):
+        self.valeurs: List[str] = []
+        self._codes: Dict[str, int] = {}
+    
+    def coder(self, valeur: str) -> int:
+        code = self._codes.get(valeur)
+        if code is None:
+            code = self._codes[valeur] = len(self.valeurs)
+            self.valeurs.append(valeur)
+        return code
+
+class PointStore(abc.Sequence):
+    """
+    Collection compacte de points en colonnes (struct-of-arrays)
+    
+    - latitudes et longitudes : tableaux float64 contigus
+    - noms, types et communes : codes entiers vers des chaînes internées
+    
+    Se parcourt et s'indexe comme une liste de Point en lecture : chaque
+    accès recrée un Point indépendant, dont la modification ne change pas
+    le store (ajouter/append pour l'enrichir) ; latitudes et longitudes
+    sont des vues sans copie, en lecture seule, utilisables directement
+    par les fonctions vectorisées de utils.helpers. Réservé aux parcours
+    en masse (ex. tracé routier d'un trajet) : les fonctions publiques
+    qui produisent des points modifiables renvoient des listes.
+    """
+    
+    SANS_COMMUNE = -1
+    
+    def __init__(self, capacite: int = 16):
+        capacite = max(1, capacite)
+        self._latitudes = np.empty(capacite, dtype=np.float64)
+        self._longitudes = np.empty(capacite, dtype=np.float64)
+        self._codes_noms = np.empty(capacite, dtype=np.int32)
+        self._codes_types = np.empty(capacite, dtype=np.int16)
+        self._codes_communes = np.empty(capacite, dtype=np.int32)
+        self._taille = 0
+        self._noms = _TableChaines()
+        self._types = _TableChaines()
+        self._communes = _TableChaines()
+    
+    @classmethod
+    def depuis_points(cls, points: Iterable[Point]) -> "PointStore":
+        """Construit un store à partir de points existants"""
+        points = list(points)
+        store = cls(len(points))
+        store.etendre(points)
+        return store
+    
+    @classmethod
+    def depuis_colonnes(cls, noms: Sequence[str], latitudes, longitudes,
+                        type_point: str = "inconnu", commune: Optional[str] = None) -> "PointStore":
+        """
+        Construit un store à partir de colonnes (ex. coordonnées calculées
+        par NumPy), tous les points partageant le même type et la même commune
+        """
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        taille = len(latitudes)
+        store = cls(taille)
+        store._latitudes[:taille] = latitudes
+        store._longitudes[:taille] = longitudes
+        store._codes_noms[:taille] = [store._noms.coder(nom) for nom in noms]
+        store._codes_types[:taille] = store._types.coder(type_point)
+        store._codes_communes[:taille] = cls.SANS_COMMUNE if commune is None else store._communes.coder(commune)
+        store._taille = taille
+        return store
+    
+    @classmethod
+    def depuis_dicts(cls, donnees: Iterable[Dict]) -> "PointStore":
+        """Construit un store depuis des dictionnaires au format Point.to_dict"""
+        return cls.depuis_points(Point.from_dict(data) for data in donnees)
+    
+    def en_dicts(self) -> List[Dict]:
+        """Liste de dictionnaires au format Point.to_dict"""
+        return [point.to_dict() for point in self]
+    
+    def _reserver(self, taille: int):
+        """Agrandit les colonnes (doublement) pour contenir taille points"""
+        capacite = len(self._latitudes)
+        if taille <= capacite:
+            return
+        while capacite < taille:
+            capacite *= 2
+        for nom in ("_latitudes", "_longitudes", "_codes_noms", "_codes_types", "_codes_communes"):
+            ancien = getattr(self, nom)
+            nouveau = np.empty(capacite, dtype=ancien.dtype)
+            nouveau[:self._taille] = ancien[:self._taille]
+            setattr(self, nom, nouveau)
+    
+    def ajouter(self, point: Point):
+        """Ajoute un point en fin de collection"""
+        self._reserver(self._taille + 1)
+        i = self._taille
+        self._latitudes[i] = point.latitude
+        self._longitudes[i] = point.longitude
+        self._codes_noms[i] = self._noms.coder(point.nom)
+        self._codes_types[i] = self._types.coder(point.type_point)
+        self._codes_communes[i] = self.SANS_COMMUNE if point.commune is None else self._communes.coder(point.commune)
+        self._taille += 1
+    
+    def etendre(self, points: Iterable[Point]):
+        """Ajoute plusieurs points en fin de collection"""
+        for point in points:
+            self.ajouter(point)
+    
+    append = ajouter
+    extend = etendre
+    
+    @property
+    def latitudes(self) -> "np.ndarray":
+        """Vue (sans copie, lecture seule) des latitudes"""
+        vue = self._latitudes[:self._taille]
+        vue.flags.writeable = False
+        return vue
+    
+    @property
+    def longitudes(self) -> "np.ndarray":
+        """Vue (sans copie, lecture seule) des longitudes"""
+        vue = self._longitudes[:self._taille]
+        vue.flags.writeable = False
+        return vue
+    
+    @property
+    def nbytes(self) -> int:
+        """Mémoire occupée par les colonnes numériques (capacité comprise)"""
+        return sum(colonne.nbytes for colonne in (
+            self._latitudes, self._longitudes, self._codes_noms, self._codes_types, self._codes_communes
+        ))
+    
+    def __len__(self) -> int:
+        return self._taille
+    
+    def _point(self, i: int) -> Point:
+        code_commune = int(self._codes_communes[i])
+        return Point(
+            self._noms.valeurs[self._codes_noms[i]],
+            float(self._latitudes[i]),
+            float(self._longitudes[i]),
+            self._types.valeurs[self._codes_types[i]],
+            None if code_commune == self.SANS_COMMUNE else self._communes.valeurs[code_commune]
         )
+    
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return PointStore.depuis_points(self._point(i) for i in range(*indice.indices(self._taille)))
+        if indice < 0:
+            indice += self._taille
+        if not 0 <= indice < self._taille:
+            raise IndexError("indice de point hors limites")
+        return self._point(indice)
+    
+    def __iter__(self) -> Iterator[Point]:
+        for i in range(self._taille):
+            yield self._point(i)
+    
+    def __repr__(self) -> str:
+        return f"PointStore({self._taille} points)"
 
 @dataclass
 class Trajet:
@@ -48,7 +248,7 @@ class Trajet:
     arrivee: Point
     distance_km: float
     duree_estimee_min: float
-    points_intermediaires: List[Point] = field(default_factory=list)
+    points_intermediaires: Sequence[Point] = field(default_factory=list)  # liste ou PointStore
     
     def to_dict(self) -> Dict:
         """Convertit le trajet en dictionnaire"""
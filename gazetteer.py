@@ -0,0 +1,226 @@
+"""
+Index toponymique local (gazetteer) pour Kinshasa - VERSION KINSHASA
+
+Construit à partir des points prédéfinis, des points d'intérêt, des arrêts
+de bus et de la table d'alias, il résout localement les noms de lieux, même
+mal orthographiés ou partiels, sans passer par Nominatim. Il est reconstruit
+à la première recherche qui suit une modification des points du gestionnaire
+de données (ajout, import, suppression).
+"""
+import threading
+import unicodedata
+import weakref
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Imports absolus
+from core.etat import Point
+from utils.config import config
+from utils.paresseux import reel
+
+# Points connus avec certitude : nom de référence → (latitude, longitude, type)
+POINTS_PREDEFINIS_KINSHASA = {
+    "Place de la Victoire": (-4.33787, 15.30553, "depart"),
+    "Gare Centrale": (-4.31600, 15.31300, "arrivee"),
+    "Marché Central": (-4.32500, 15.31000, "intermediaire"),
+    "Stade des Martyrs": (-4.33200, 15.30800, "intermediaire"),
+    "Université de Kinshasa": (-4.41500, 15.30300, "intermediaire"),
+    "Hôpital Général de Kinshasa": (-4.32200, 15.31100, "intermediaire"),
+    "Palais du Peuple": (-4.31800, 15.31200, "intermediaire"),
+    "Tour de l'Échangeur": (-4.33500, 15.30600, "intermediaire"),
+    "Avenue de la Justice": (-4.32000, 15.31100, "intermediaire"),
+    "Boulevard du 30 Juin": (-4.32800, 15.30900, "intermediaire"),
+    "Avenue des Aviateurs": (-4.32200, 15.30800, "intermediaire"),
+    "Place du Marché": (-4.32600, 15.31000, "intermediaire"),
+    "Carrefour Forescom": (-4.33000, 15.30700, "intermediaire"),
+    "Avenue de la Libération": (-4.31900, 15.31200, "intermediaire"),
+    "Immeuble Sozacom": (-4.31700, 15.31300, "intermediaire")
+}
+
+# Noms alternatifs : nom de référence → alias
+ALIAS_KINSHASA = {
+    "Place de la Victoire": ["victoire", "rond point victoire", "rond-point victoire"],
+    "Gare Centrale": ["gare", "station centrale", "gare routière"],
+    "Marché Central": ["grand marché", "marché", "central market"],
+    "Stade des Martyrs": ["stade", "martyrs stadium", "stade martyrs"]
+}
+
+def normaliser_nom(texte: str) -> str:
+    """
+    Normalise un nom de lieu : minuscules, sans accents ni ponctuation
+    
+    Exemple: "Tour de l'Échangeur" → "tour de l echangeur"
+    """
+    decompose = unicodedata.normalize("NFKD", str(texte))
+    sans_accents = "".join(c for c in decompose if not unicodedata.combining(c))
+    nettoye = "".join(c if c.isalnum() else " " for c in sans_accents.lower())
+    return " ".join(nettoye.split())
+
+def trigrammes(nom_normalise: str) -> set:
+    """Trigrammes d'un nom normalisé, bordé d'espaces pour marquer les débuts de mots"""
+    texte = f"  {nom_normalise} "
+    return {texte[i:i + 3] for i in range(len(texte) - 2)}
+
+class Gazetteer:
+    """
+    Index des noms de lieux de Kinshasa
+    
+    - correspondance exacte sur le nom normalisé (dictionnaire)
+    - sinon index inversé de trigrammes : score de Dice entre trigrammes,
+      bonus lorsque chaque mot de la requête préfixe un mot du lieu
+    """
+    
+    def __init__(self, seuil: float = None):
+        self.seuil = config.GAZETTEER_SEUIL if seuil is None else seuil
+        self._points: List[Point] = []
+        self._noms: List[str] = []
+        self._trigrammes: List[set] = []
+        self._exacts: Dict[str, int] = {}
+        self._index: Dict[str, List[int]] = defaultdict(list)
+    
+    def ajouter(self, nom: str, point: Point):
+        """
+        Indexe un nom (ou alias) pointant vers un point
+        
+        Le premier point enregistré pour un nom normalisé est conservé.
+        """
+        nom_normalise = normaliser_nom(nom)
+        if not nom_normalise or nom_normalise in self._exacts:
+            return
+            
+        identifiant = len(self._points)
+        self._points.append(point)
+        self._noms.append(nom_normalise)
+        grammes = trigrammes(nom_normalise)
+        self._trigrammes.append(grammes)
+        self._exacts[nom_normalise] = identifiant
+        for gramme in grammes:
+            self._index[gramme].append(identifiant)
+    
+    def ajouter_points(self, points: Iterable[Point]):
+        """Indexe une collection de points sous leur propre nom"""
+        for point in points:
+            self.ajouter(point.nom, point)
+    
+    def __len__(self) -> int:
+        return len(self._points)
+    
+    def rechercher(self, requete: str, limite: int = 5) -> List[Tuple[Point, float]]:
+        """
+        Recherche les lieux les plus proches d'une requête
+        
+        Args:
+            requete: Nom saisi (accents, casse et fautes tolérés)
+            limite: Nombre maximal de résultats
+            
+        Returns:
+            Liste (point, score entre 0 et 1) triée par score décroissant,
+            limitée aux scores au-dessus du seuil
+        """
+        requete_normalisee = normaliser_nom(requete)
+        if not requete_normalisee:
+            return []
+            
+        identifiant = self._exacts.get(requete_normalisee)
+        if identifiant is not None:
+            return [(self._copier(identifiant), 1.0)]
+            
+        # Requêtes trop courtes : trop ambiguës hors correspondance exacte
+        if len(requete_normalisee) < 4:
+            return []
+            
+        grammes = trigrammes(requete_normalisee)
+        communs: Dict[int, int] = defaultdict(int)
+        for gramme in grammes:
+            for candidat in self._index.get(gramme, ()):
+                communs[candidat] += 1
+                
+        mots_requete = requete_normalisee.split()
+        scores: Dict[int, float] = {}
+        for candidat, nb_communs in communs.items():
+            score = 2.0 * nb_communs / (len(grammes) + len(self._trigrammes[candidat]))
+            mots_lieu = self._noms[candidat].split()
+            if all(any(mot_lieu.startswith(mot) for mot_lieu in mots_lieu) for mot in mots_requete):
+                score = max(score, 0.5 + 0.5 * score)
+            if score >= self.seuil:
+                scores[candidat] = score
+                
+        meilleurs = sorted(scores.items(), key=lambda item: (-item[1], self._noms[item[0]]))
+        resultats = []
+        deja_vus = set()
+        for candidat, score in meilleurs:
+            # Plusieurs alias peuvent désigner le même point
+            point = self._points[candidat]
+            if id(point) in deja_vus:
+                continue
+            deja_vus.add(id(point))
+            resultats.append((self._copier(candidat), round(score, 3)))
+            if len(resultats) >= limite:
+                break
+        return resultats
+    
+    def resoudre(self, requete: str) -> Optional[Point]:
+        """Retourne le meilleur point pour une requête, ou None"""
+        resultats = self.rechercher(requete, limite=1)
+        return resultats[0][0] if resultats else None
+    
+    def _copier(self, identifiant: int) -> Point:
+        """Copie du point indexé : l'appelant peut modifier son type_point"""
+        point = self._points[identifiant]
+        return Point(point.nom, point.latitude, point.longitude, point.type_point)
+
+def construire_gazetteer_kinshasa(gestionnaire=None) -> Gazetteer:
+    """
+    Construit le gazetteer à partir des points prédéfinis, des alias,
+    des points d'intérêt et des arrêts de bus
+    
+    Args:
+        gestionnaire: GestionnaireDonnees (défaut: gestionnaire global)
+    
+    Returns:
+        Gazetteer prêt à l'emploi
+    """
+    if gestionnaire is None:
+        from services.data_manager import gestionnaire_donnees as gestionnaire
+    
+    gazetteer = Gazetteer()
+    predefinis = {}
+    for nom, (latitude, longitude, type_point) in POINTS_PREDEFINIS_KINSHASA.items():
+        predefinis[nom] = Point(nom, latitude, longitude, type_point)
+        gazetteer.ajouter(nom, predefinis[nom])
+        
+    for nom_principal, alias_liste in ALIAS_KINSHASA.items():
+        for alias in alias_liste:
+            gazetteer.ajouter(alias, predefinis[nom_principal])
+            
+    gazetteer.ajouter_points(gestionnaire.obtenir_points_interet())
+    gazetteer.ajouter_points(gestionnaire.obtenir_arrets_bus())
+    return gazetteer
+
+# Gestionnaire de données → (versions de ses points à la construction, gazetteer)
+_gazetteers = weakref.WeakKeyDictionary()
+_verrou_gazetteer = threading.Lock()
+
+def obtenir_gazetteer(gestionnaire=None) -> Gazetteer:
+    """
+    Retourne le gazetteer partagé d'un gestionnaire de données, construit au
+    premier appel puis reconstruit lorsque ses points ont changé
+    (GestionnaireDonnees.versions)
+    
+    Args:
+        gestionnaire: GestionnaireDonnees (défaut: gestionnaire global)
+    """
+    if gestionnaire is None:
+        from services.data_manager import gestionnaire_donnees as gestionnaire
+    gestionnaire = reel(gestionnaire)
+    versions = tuple(sorted(gestionnaire.versions.items()))
+    entree = _gazetteers.get(gestionnaire)
+    if entree is None or entree[0] != versions:
+        with _verrou_gazetteer:
+            entree = _gazetteers.get(gestionnaire)
+            if entree is None or entree[0] != versions:
+                # Versions relues avant la construction : une modification
+                # concurrente provoquera une nouvelle reconstruction
+                entree = (versions, construire_gazetteer_kinshasa(gestionnaire))
+                _gazetteers[gestionnaire] = entree
+    return entree[1]
@@ -1,16 +1,65 @@
 """
 Service de géocodage utilisant l'API Nominatim d'OpenStreetMap - VERSION KINSHASA RÉELLE
 """
-import requests
 import time
-import json
-import os
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 
 # Imports absolus
 from core.etat import Point
 from utils.config import config
 from utils.helpers import calculer_distance_haversine
+from utils.limiteur import LimiteurJetons
+from utils.coalescence import VolUnique
+from utils.telemetrie import Telemetrie
+from utils.paresseux import SingletonParesseux
+from services.geocoding_cache import creer_cache_geocoding
+from services.client_nominatim import ClientNominatim
+from services.gazetteer import obtenir_gazetteer
+from services.instantane_geocoding import InstantaneGeocodage, ouvrir_instantane
+from services.data_manager import gestionnaire_donnees
+
+# En-têtes communs à toutes les requêtes Nominatim
+EN_TETES_HTTP = {
+    'User-Agent': 'AgentVehicule/1.0 (projet_agent_vehicule)',
+    'Accept-Language': 'fr'
+}
+
+def url_nominatim(point_acces: str) -> str:
+    """
+    URL d'un point d'accès Nominatim ("search" ou "reverse"), dérivée de
+    config.NOMINATIM_URL pour pouvoir cibler un serveur local
+    """
+    base = config.NOMINATIM_URL.rstrip('/')
+    if base.endswith('/search'):
+        base = base[:-len('/search')]
+    return f"{base}/{point_acces}"
+
+# Valeur mise en cache pour un lieu que Nominatim ne connaît pas
+RESULTAT_NEGATIF = {'introuvable': True}
+
+# Requête minimale utilisée pour tester la connectivité
+PARAMETRES_CONNECTIVITE = {
+    'q': 'Kinshasa',
+    'format': 'json',
+    'limit': 1
+}
+
+@dataclass
+class ResultatGeocodage:
+    """Résultat individuel d'un géocodage par lot"""
+    lieu: str
+    point: Optional[Point]
+    statut: str  # "instantane", "predefini", "cache", "api", "negatif", "introuvable", "invalide"
+    
+    @property
+    def trouve(self) -> bool:
+        return self.point is not None
+
+def normaliser_lieu(lieu: str) -> str:
+    """Nettoie un nom de lieu (espaces superflus) avant géocodage"""
+    return " ".join(str(lieu).split())
 
 class ServiceGeocoding:
     """
@@ -18,84 +67,142 @@ class ServiceGeocoding:
     """
     
     def __init__(self):
-        self.cache_file = config.FICHIER_CACHE_GEOCODING
-        self.cache = self._charger_cache()
-        self.derniere_requete = 0
+        self.cache = creer_cache_geocoding()
+        self.instantane: Optional[InstantaneGeocodage] = ouvrir_instantane(config.FICHIER_INSTANTANE_GEOCODING)
         self.delai_requete = config.NOMINATIM_DELAY
+        self.limiteur = LimiteurJetons(1.0 / self.delai_requete, config.NOMINATIM_RAFALE)
+        self.session = self._creer_session()
+        self.telemetrie = Telemetrie()
+        self._decrire_metriques()
+        self.client = ClientNominatim(self.session, self._respecter_delai_api, telemetrie=self.telemetrie)
+        self._vol_unique = VolUnique()
     
-    def _charger_cache(self) -> Dict:
-        """Charge le cache de géocodage depuis le fichier"""
-        try:
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception as e:
-            print(f"⚠️  Erreur chargement cache: {e}")
-        return {}
+    def charger_instantane(self, fichier: str = None) -> bool:
+        """
+        (Re)charge l'instantané compilé du géocodage
+        
+        Args:
+            fichier: Chemin de l'instantané (défaut: configuration)
+            
+        Returns:
+            True si un instantané est chargé
+        """
+        # L'ancien mappage est libéré par le ramasse-miettes, une fois les
+        # lectures en cours terminées
+        self.instantane = ouvrir_instantane(fichier or config.FICHIER_INSTANTANE_GEOCODING)
+        return self.instantane is not None
     
-    def _sauvegarder_cache(self):
-        """Sauvegarde le cache dans le fichier"""
-        try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"⚠️  Erreur sauvegarde cache: {e}")
+    def _decrire_metriques(self):
+        """Textes d'aide des métriques exportées"""
+        self.telemetrie.decrire("geocodage_resolutions_total",
+                                "Géocodages par niveau de résolution (instantane, predefini, cache, negatif, api, introuvable)")
+        self.telemetrie.decrire("geocodage_duree_secondes", "Durée d'un géocodage par niveau de résolution")
+        self.telemetrie.decrire("geocodage_inverse_total", "Géocodages inverses par niveau (local, api, echec)")
+        self.telemetrie.decrire("geocodage_points_proches_total", "Recherches de points proches par niveau (local, api, echec)")
+        self.telemetrie.decrire("geocodage_cache_entrees", "Entrées du cache de géocodage")
+        self.telemetrie.decrire("nominatim_requetes_total", "Réponses HTTP de Nominatim par point d'accès et code")
+        self.telemetrie.decrire("nominatim_erreurs_total", "Erreurs d'appel à Nominatim (timeout, connexion, autre, disjoncteur)")
+        self.telemetrie.decrire("nominatim_reprises_total", "Nouvelles tentatives après une erreur temporaire")
+        self.telemetrie.decrire("nominatim_duree_secondes", "Durée des requêtes HTTP vers Nominatim")
+        self.telemetrie.decrire("nominatim_attente_debit_secondes", "Attente imposée par le seau à jetons avant une requête")
+        self.telemetrie.decrire("nominatim_disjoncteur_ouvert", "1 si le disjoncteur bloque les appels")
+    
+    def obtenir_metriques(self) -> Dict[str, Any]:
+        """
+        Métriques courantes du service (compteurs, jauges, histogrammes)
+        
+        Returns:
+            Dictionnaire décrit par Telemetrie.instantane
+        """
+        self._actualiser_jauges()
+        return self.telemetrie.instantane()
+    
+    def exporter_metriques(self, format_sortie: str = "json") -> str:
+        """
+        Exporte les métriques du service
+        
+        Args:
+            format_sortie: "json" ou "prometheus"
+            
+        Returns:
+            Texte exporté
+        """
+        self._actualiser_jauges()
+        if format_sortie == "prometheus":
+            return self.telemetrie.exporter_prometheus()
+        return self.telemetrie.exporter_json()
+    
+    def _actualiser_jauges(self):
+        self.telemetrie.definir("geocodage_cache_entrees", len(self.cache))
+        self.telemetrie.definir("nominatim_disjoncteur_ouvert",
+                                int(self.client.disjoncteur.etat != self.client.disjoncteur.FERME))
+    
+    def _mesurer_resolution(self, niveau: str, debut: float):
+        """Comptabilise un géocodage résolu au niveau donné"""
+        self.telemetrie.incrementer("geocodage_resolutions_total", niveau=niveau)
+        self.telemetrie.observer("geocodage_duree_secondes", time.perf_counter() - debut, niveau=niveau)
+    
+    def _creer_session(self) -> "requests.Session":
+        """Crée une session HTTP keep-alive avec un pool de connexions"""
+        # Import différé : requests n'est chargé qu'à la construction du service
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        session = requests.Session()
+        adaptateur = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=config.GEOCODAGE_LOT_WORKERS
+        )
+        session.mount("https://", adaptateur)
+        session.mount("http://", adaptateur)
+        return session
     
     def _respecter_delai_api(self):
-        """Respecte le délai entre les requêtes API"""
-        temps_actuel = time.time()
-        temps_ecoule = temps_actuel - self.derniere_requete
-        if temps_ecoule < self.delai_requete:
-            time.sleep(self.delai_requete - temps_ecoule)
-        self.derniere_requete = time.time()
+        """Respecte le débit autorisé par l'API (seau à jetons partagé)"""
+        attente = self.limiteur.acquerir()
+        self.telemetrie.observer("nominatim_attente_debit_secondes", attente)
+    
+    def _parametres_recherche(self, lieu: str, ville: str, pays: str) -> Dict[str, Any]:
+        """Construit les paramètres d'une requête /search Nominatim"""
+        return {
+            'q': f"{lieu}, {ville}, {pays}",
+            'format': 'json',
+            'limit': 1,
+            'addressdetails': 1
+        }
+    
+    def _traiter_resultat_recherche(self, data: List[Dict], lieu: str, ville: str, pays: str) -> Optional[Point]:
+        """Convertit la réponse /search en Point et la met en cache"""
+        if not data:
+            print(f"   ❌ Lieu non trouvé: {lieu}, {ville}, {pays}")
+            # Mémoriser l'échec pour ne pas répéter la requête à chaque exécution
+            self.cache.enregistrer(
+                f"{lieu}, {ville}, {pays}", RESULTAT_NEGATIF, ttl=config.CACHE_GEOCODING_TTL_NEGATIF
+            )
+            return None
+        
+        resultat = data[0]
+        point = Point(
+            nom=lieu,
+            latitude=float(resultat['lat']),
+            longitude=float(resultat['lon']),
+            type_point="geocode"
+        )
+        
+        # Mettre en cache
+        self.cache.enregistrer(f"{lieu}, {ville}, {pays}", point.to_dict())
+        
+        print(f"   ✅ Trouvé: {point.latitude:.4f}, {point.longitude:.4f}")
+        return point
     
     def _geocoder_requete_standard(self, lieu: str, ville: str, pays: str) -> Optional[Point]:
         """Effectue une requête de géocodage standard"""
         try:
-            self._respecter_delai_api()
-            
-            query = f"{lieu}, {ville}, {pays}"
-            headers = {
-                'User-Agent': 'AgentVehicule/1.0 (projet_agent_vehicule)',
-                'Accept-Language': 'fr'
-            }
-            
-            params = {
-                'q': query,
-                'format': 'json',
-                'limit': 1,
-                'addressdetails': 1
-            }
-            
-            print(f"🔍 Géocodage: {query}")
-            response = requests.get(
-                config.NOMINATIM_URL,
-                params=params,
-                headers=headers,
-                timeout=10
-            )
-            response.raise_for_status()
-            
-            data = response.json()
+            params = self._parametres_recherche(lieu, ville, pays)
+            print(f"🔍 Géocodage: {params['q']}")
+            data = self.client.obtenir_json(config.NOMINATIM_URL, params, EN_TETES_HTTP)
             
-            if data:
-                resultat = data[0]
-                point = Point(
-                    nom=lieu,
-                    latitude=float(resultat['lat']),
-                    longitude=float(resultat['lon']),
-                    type_point="geocode"
-                )
-                
-                # Mettre en cache
-                self.cache[f"{lieu}, {ville}, {pays}"] = point.to_dict()
-                self._sauvegarder_cache()
-                
-                print(f"   ✅ Trouvé: {point.latitude:.4f}, {point.longitude:.4f}")
-                return point
-            else:
-                print(f"   ❌ Lieu non trouvé: {query}")
-                return None
+            return self._traiter_resultat_recherche(data, lieu, ville, pays)
                 
         except Exception as e:
             print(f"   ❌ Erreur géocodage: {e}")
@@ -119,74 +226,186 @@ class ServiceGeocoding:
         if pays is None:
             pays = config.PAYS_DEFAUT
         
-        # Vérifier d'abord les points prédéfinis de Kinshasa
+        point, statut = self._resoudre_localement(lieu, ville, pays)
+        if point or statut == "negatif":
+            return point
+        
+        # Les alias sont résolus localement par le gazetteer : seule la
+        # recherche Nominatim reste à faire
+        return self._geocoder_distant(lieu, ville, pays)
+    
+    def _cle_vol(self, lieu: str, ville: str, pays: str) -> str:
+        """Clé normalisée regroupant les requêtes identiques simultanées"""
+        return normaliser_lieu(f"{lieu}, {ville}, {pays}").lower()
+    
+    def _lire_cache(self, lieu: str, ville: str, pays: str) -> Tuple[bool, Optional[Point]]:
+        """
+        Lit le cache sans journaliser
+        
+        Returns:
+            Tuple (entrée présente, point ou None si résultat négatif)
+        """
+        cache_data = self.cache.obtenir(f"{lieu}, {ville}, {pays}")
+        if cache_data is None:
+            return False, None
+        if cache_data.get('introuvable'):
+            return True, None
+        return True, Point.from_dict(cache_data)
+    
+    def _geocoder_distant(self, lieu: str, ville: str, pays: str) -> Optional[Point]:
+        """
+        Requête Nominatim avec regroupement : une seule requête en vol par
+        clé normalisée, dont le résultat est partagé par tous les appelants
+        """
+        def requete_partagee() -> Optional[Point]:
+            # Un vol précédent a pu remplir le cache entre-temps
+            present, point = self._lire_cache(lieu, ville, pays)
+            if present:
+                return point
+            return self._geocoder_requete_standard(lieu, ville, pays)
+        
+        debut = time.perf_counter()
+        point = self._vol_unique.executer(self._cle_vol(lieu, ville, pays), requete_partagee)
+        self._mesurer_resolution("api" if point else "introuvable", debut)
+        # Chaque appelant reçoit sa copie (type_point peut être modifié)
+        return Point.from_dict(point.to_dict()) if point else None
+    
+    def _resoudre_localement(self, lieu: str, ville: str, pays: str) -> Tuple[Optional[Point], str]:
+        """
+        Résout un lieu sans appel réseau (instantané, gazetteer puis cache)
+        
+        Returns:
+            Tuple (point ou None, statut "instantane" / "predefini" / "cache" / "negatif" / "absent")
+        """
+        debut = time.perf_counter()
+        
+        # Instantané compilé : recherche exacte dans le fichier mappé
+        if self.instantane is not None:
+            point = self.instantane.obtenir(self._cle_vol(lieu, ville, pays))
+            if point:
+                print(f"📂 Utilisation instantané: {lieu}")
+                self._mesurer_resolution("instantane", debut)
+                return point, "instantane"
+        
+        # Vérifier d'abord les points connus de Kinshasa
         point_predefini = self._verifier_points_predefinis_kinshasa(lieu)
         if point_predefini:
             print(f"📂 Utilisation point prédéfini: {lieu}")
-            return point_predefini
+            self._mesurer_resolution("predefini", debut)
+            return point_predefini, "predefini"
         
-        # Vérifier le cache d'abord
-        cle_cache = f"{lieu}, {ville}, {pays}"
-        if cle_cache in self.cache:
-            cache_data = self.cache[cle_cache]
+        # Vérifier le cache ensuite
+        present, point = self._lire_cache(lieu, ville, pays)
+        if present:
+            if point is None:
+                print(f"📂 Lieu déjà introuvable (cache): {lieu}")
+                self._mesurer_resolution("negatif", debut)
+                return None, "negatif"
             print(f"📂 Utilisation cache: {lieu}")
-            return Point.from_dict(cache_data)
-        
-        # ESSAI 1: Recherche normale
-        point = self._geocoder_requete_standard(lieu, ville, pays)
-        if point:
-            return point
+            self._mesurer_resolution("cache", debut)
+            return point, "cache"
         
-        # ESSAI 2: Recherche avec alias pour Kinshasa
-        point_alias = self._recherche_alias_kinshasa(lieu, ville, pays)
-        if point_alias:
-            return point_alias
-        
-        return None
+        return None, "absent"
     
     def _verifier_points_predefinis_kinshasa(self, lieu: str) -> Optional[Point]:
-        """Vérifie si le lieu fait partie des points prédéfinis de Kinshasa"""
-        points_kinshasa = {
-            "place de la victoire": Point("Place de la Victoire", -4.33787, 15.30553, "depart"),
-            "victoire": Point("Place de la Victoire", -4.33787, 15.30553, "depart"),
-            "rond point victoire": Point("Place de la Victoire", -4.33787, 15.30553, "depart"),
-            "gare centrale": Point("Gare Centrale", -4.31600, 15.31300, "arrivee"),
-            "gare": Point("Gare Centrale", -4.31600, 15.31300, "arrivee"),
-            "marché central": Point("Marché Central", -4.32500, 15.31000, "intermediaire"),
-            "stade des martyrs": Point("Stade des Martyrs", -4.33200, 15.30800, "intermediaire"),
-            "université de kinshasa": Point("Université de Kinshasa", -4.41500, 15.30300, "intermediaire"),
-            "hôpital général de kinshasa": Point("Hôpital Général de Kinshasa", -4.32200, 15.31100, "intermediaire"),
-            "palais du peuple": Point("Palais du Peuple", -4.31800, 15.31200, "intermediaire"),
-            "tour de l'échangeur": Point("Tour de l'Échangeur", -4.33500, 15.30600, "intermediaire"),
-            "avenue de la justice": Point("Avenue de la Justice", -4.32000, 15.31100, "intermediaire"),
-            "boulevard du 30 juin": Point("Boulevard du 30 Juin", -4.32800, 15.30900, "intermediaire"),
-            "avenue des aviateurs": Point("Avenue des Aviateurs", -4.32200, 15.30800, "intermediaire"),
-            "place du marché": Point("Place du Marché", -4.32600, 15.31000, "intermediaire"),
-            "carrefour forescom": Point("Carrefour Forescom", -4.33000, 15.30700, "intermediaire"),
-            "avenue de la libération": Point("Avenue de la Libération", -4.31900, 15.31200, "intermediaire"),
-            "immeuble sozacom": Point("Immeuble Sozacom", -4.31700, 15.31300, "intermediaire")
-        }
+        """
+        Vérifie si le lieu est connu du gazetteer local de Kinshasa
+        (points prédéfinis, alias, points d'intérêt, arrêts de bus),
+        avec tolérance aux accents, fautes de frappe et noms partiels
+        """
+        return obtenir_gazetteer().resoudre(lieu)
+    
+    def geocoder_lots(self, lieux: List[str], ville: str = None, pays: str = None,
+                      max_workers: int = None) -> List[ResultatGeocodage]:
+        """
+        Géocode une liste de lieux en limitant les appels réseau
         
-        lieu_min = lieu.lower().strip()
-        return points_kinshasa.get(lieu_min)
-
-    def _recherche_alias_kinshasa(self, lieu: str, ville: str, pays: str) -> Optional[Point]:
-        """Recherche avec des alias spécifiques à Kinshasa"""
-        alias_kinshasa = {
-            "place de la victoire": ["victoire", "rond point victoire", "rond-point victoire"],
-            "gare centrale": ["gare", "station centrale", "gare routière"],
-            "marché central": ["grand marché", "marché", "central market"],
-            "stade des martyrs": ["stade", "martyrs stadium", "stade martyrs"]
-        }
+        Les lieux sont normalisés et dédoublonnés ; les points prédéfinis et
+        le cache sont résolus immédiatement, seuls les vrais manques partent
+        vers Nominatim, en parallèle derrière le seau à jetons partagé.
         
-        lieu_min = lieu.lower().strip()
+        Args:
+            lieux: Liste des noms de lieux à géocoder
+            ville: Ville commune à tous les lieux (défaut: Kinshasa)
+            pays: Pays commun à tous les lieux (défaut: RDC)
+            max_workers: Nombre de requêtes simultanées (défaut: configuration)
+            
+        Returns:
+            Un résultat par lieu, dans l'ordre d'entrée
+        """
+        if ville is None:
+            ville = config.VILLE_DEFAUT
+        if pays is None:
+            pays = config.PAYS_DEFAUT
+        if max_workers is None:
+            max_workers = config.GEOCODAGE_LOT_WORKERS
         
-        for point_principal, alias_list in alias_kinshasa.items():
-            if lieu_min in alias_list:
-                print(f"   🔄 Utilisation alias: {point_principal} pour {lieu}")
-                return self.geocoder_lieu(point_principal, ville, pays)
+        uniques, cles_entree = self._preparer_lot(lieux)
+        resolus, manquants = self._resoudre_lot_localement(uniques, ville, pays)
         
-        return None
+        # Requêtes réseau pour les seuls manques
+        if manquants:
+            print(f"🔍 Géocodage par lot: {len(manquants)} lieux à interroger "
+                  f"({len(uniques) - len(manquants)} résolus localement)")
+            
+            def geocoder_manquant(cle: str) -> Tuple[Optional[Point], str]:
+                point = self._geocoder_distant(uniques[cle], ville, pays)
+                return (point, "api") if point else (None, "introuvable")
+            
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executeur:
+                for cle, resultat in zip(manquants, executeur.map(geocoder_manquant, manquants)):
+                    resolus[cle] = resultat
+        
+        return self._assembler_lot(lieux, cles_entree, resolus)
+    
+    def _preparer_lot(self, lieux: List[str]) -> Tuple[Dict[str, str], List[Optional[str]]]:
+        """
+        Normalise et dédoublonne (sans tenir compte de la casse) une liste de lieux
+        
+        Returns:
+            Tuple (clé → lieu normalisé, clé de chaque entrée ou None si vide)
+        """
+        uniques: Dict[str, str] = {}
+        cles_entree: List[Optional[str]] = []
+        for lieu in lieux:
+            lieu_normalise = normaliser_lieu(lieu) if lieu is not None else ""
+            if not lieu_normalise:
+                cles_entree.append(None)
+                continue
+            cle = lieu_normalise.lower()
+            uniques.setdefault(cle, lieu_normalise)
+            cles_entree.append(cle)
+        return uniques, cles_entree
+    
+    def _resoudre_lot_localement(self, uniques: Dict[str, str], ville: str,
+                                 pays: str) -> Tuple[Dict[str, Tuple[Optional[Point], str]], List[str]]:
+        """
+        Résout sans réseau tout ce qui peut l'être dans un lot
+        
+        Returns:
+            Tuple (clé → (point, statut) résolus, clés restant à interroger)
+        """
+        resolus: Dict[str, Tuple[Optional[Point], str]] = {}
+        manquants: List[str] = []
+        for cle, lieu in uniques.items():
+            point, statut = self._resoudre_localement(lieu, ville, pays)
+            if point or statut == "negatif":
+                resolus[cle] = (point, statut)
+            else:
+                manquants.append(cle)
+        return resolus, manquants
+    
+    def _assembler_lot(self, lieux: List[str], cles_entree: List[Optional[str]],
+                       resolus: Dict[str, Tuple[Optional[Point], str]]) -> List[ResultatGeocodage]:
+        """Construit les résultats dans l'ordre d'entrée"""
+        resultats = []
+        for lieu, cle in zip(lieux, cles_entree):
+            if cle is None:
+                resultats.append(ResultatGeocodage(lieu, None, "invalide"))
+            else:
+                point, statut = resolus[cle]
+                resultats.append(ResultatGeocodage(lieu, point, statut))
+        return resultats
     
     def geocoder_plusieurs_lieux(self, lieux: List[str]) -> List[Point]:
         """
@@ -198,19 +417,98 @@ class ServiceGeocoding:
         Returns:
             Liste des points géocodés
         """
-        points = []
-        for lieu in lieux:
-            point = self.geocoder_lieu(lieu)
-            if point:
-                points.append(point)
-            time.sleep(0.5)  # Délai supplémentaire entre les géocodages
+        return [resultat.point for resultat in self.geocoder_lots(lieux) if resultat.trouve]
+    
+    def _parametres_points_proches(self, point_reference: Point, rayon_km: float) -> Dict[str, Any]:
+        """Construit les paramètres de la recherche de points proches"""
+        return {
+            'format': 'json',
+            'lat': point_reference.latitude,
+            'lon': point_reference.longitude,
+            'radius': rayon_km * 1000,  # Conversion en mètres
+            'limit': 10,
+            'q': '[amenity=bus_station]|[amenity=taxi]|[public_transport=stop_position]'
+        }
+    
+    def _traiter_points_proches(self, data: List[Dict]) -> List[Point]:
+        """Convertit la réponse de recherche de points proches en Points"""
+        points_trouves = []
+        
+        for item in data:
+            point = Point(
+                nom=item.get('display_name', 'Point inconnu').split(',')[0],
+                latitude=float(item['lat']),
+                longitude=float(item['lon']),
+                type_point=item.get('type', 'inconnu')
+            )
+            points_trouves.append(point)
+        
+        print(f"   ✅ {len(points_trouves)} points trouvés")
+        return points_trouves
+    
+    def _parametres_inverse(self, latitude: float, longitude: float) -> Dict[str, Any]:
+        """Construit les paramètres d'une requête /reverse Nominatim"""
+        return {
+            'format': 'json',
+            'lat': latitude,
+            'lon': longitude,
+            'zoom': 18,
+            'addressdetails': 1
+        }
+    
+    def _rechercher_points_proches_locaux(self, point_reference: Point, rayon_km: float) -> List[Point]:
+        """Points connus dans le rayon, du plus proche au plus éloigné (10 au plus)"""
+        trouves = gestionnaire_donnees.points_dans_rayon(
+            point_reference.latitude, point_reference.longitude, rayon_km
+        )
+        return [
+            Point(point.nom, point.latitude, point.longitude, point.type_point)
+            for point, _ in trouves
+            if point.nom != point_reference.nom
+        ][:10]
+    
+    def _adresse_inverse_locale(self, latitude: float, longitude: float) -> Optional[str]:
+        """Nom du point connu le plus proche s'il est à moins de RAYON_INVERSE_LOCAL_KM"""
+        trouves = gestionnaire_donnees.points_proches(
+            latitude, longitude, k=1, rayon_max_km=config.RAYON_INVERSE_LOCAL_KM
+        )
+        if not trouves:
+            return None
+        point, _ = trouves[0]
+        return f"{point.nom}, {config.VILLE_DEFAUT}, {config.PAYS_DEFAUT}"
+    
+    def _cle_cache_inverse(self, latitude: float, longitude: float) -> str:
+        """Clé de cache du géocodage inverse, coordonnées arrondies"""
+        precision = config.PRECISION_CACHE_INVERSE
+        return f"inverse:{round(latitude, precision):.{precision}f},{round(longitude, precision):.{precision}f}"
+    
+    def _resoudre_inverse_localement(self, latitude: float, longitude: float) -> Optional[str]:
+        """Géocodage inverse sans réseau : points connus puis cache quantifié"""
+        adresse = self._adresse_inverse_locale(latitude, longitude)
+        if adresse:
+            return adresse
+        
+        cache_data = self.cache.obtenir(self._cle_cache_inverse(latitude, longitude))
+        if cache_data is not None:
+            return cache_data.get('display_name')
         
-        return points
+        return None
+    
+    def _enregistrer_inverse(self, latitude: float, longitude: float, adresse: Optional[str]):
+        """Met en cache une adresse obtenue par géocodage inverse distant"""
+        if adresse:
+            self.cache.enregistrer(
+                self._cle_cache_inverse(latitude, longitude),
+                {'display_name': adresse}
+            )
     
     def rechercher_points_proches(self, point_reference: Point, rayon_km: float = 2.0) -> List[Point]:
         """
         Recherche des points d'intérêt près d'un point de référence
         
+        Les points d'intérêt et arrêts de bus connus sont cherchés localement ;
+        Nominatim n'est interrogé que si aucun n'est dans le rayon.
+        
         Args:
             point_reference: Point central de recherche
             rayon_km: Rayon de recherche en kilomètres
@@ -218,55 +516,35 @@ class ServiceGeocoding:
         Returns:
             Liste des points d'intérêt trouvés
         """
+        points_locaux = self._rechercher_points_proches_locaux(point_reference, rayon_km)
+        if points_locaux:
+            print(f"📂 {len(points_locaux)} points locaux près de {point_reference.nom}")
+            self.telemetrie.incrementer("geocodage_points_proches_total", niveau="local")
+            return points_locaux
+        
         try:
-            self._respecter_delai_api()
-            
-            headers = {
-                'User-Agent': 'AgentVehicule/1.0 (projet_agent_vehicule)',
-                'Accept-Language': 'fr'
-            }
-            
-            params = {
-                'format': 'json',
-                'lat': point_reference.latitude,
-                'lon': point_reference.longitude,
-                'radius': rayon_km * 1000,  # Conversion en mètres
-                'limit': 10,
-                'q': '[amenity=bus_station]|[amenity=taxi]|[public_transport=stop_position]'
-            }
-            
             print(f"🔍 Recherche points proches de {point_reference.nom}")
-            response = requests.get(
-                "https://nominatim.openstreetmap.org/search",
-                params=params,
-                headers=headers,
-                timeout=10
+            data = self.client.obtenir_json(
+                url_nominatim('search'),
+                self._parametres_points_proches(point_reference, rayon_km),
+                EN_TETES_HTTP
             )
-            response.raise_for_status()
-            
-            data = response.json()
-            points_trouves = []
             
-            for item in data:
-                point = Point(
-                    nom=item.get('display_name', 'Point inconnu').split(',')[0],
-                    latitude=float(item['lat']),
-                    longitude=float(item['lon']),
-                    type_point=item.get('type', 'inconnu')
-                )
-                points_trouves.append(point)
-            
-            print(f"   ✅ {len(points_trouves)} points trouvés")
-            return points_trouves
+            self.telemetrie.incrementer("geocodage_points_proches_total", niveau="api")
+            return self._traiter_points_proches(data)
             
         except Exception as e:
             print(f"   ❌ Erreur recherche points proches: {e}")
+            self.telemetrie.incrementer("geocodage_points_proches_total", niveau="echec")
             return []
     
     def obtenir_adresse_inverse(self, latitude: float, longitude: float) -> Optional[str]:
         """
         Géocodage inverse : coordonnées → adresse
         
+        Un point connu à proximité ou une réponse déjà en cache pour la même
+        position arrondie évite l'appel à Nominatim.
+        
         Args:
             latitude: Latitude du point
             longitude: Longitude du point
@@ -274,35 +552,26 @@ class ServiceGeocoding:
         Returns:
             Adresse formatée ou None
         """
+        adresse = self._resoudre_inverse_localement(latitude, longitude)
+        if adresse:
+            self.telemetrie.incrementer("geocodage_inverse_total", niveau="local")
+            return adresse
+        
         try:
-            self._respecter_delai_api()
-            
-            headers = {
-                'User-Agent': 'AgentVehicule/1.0 (projet_agent_vehicule)',
-                'Accept-Language': 'fr'
-            }
-            
-            params = {
-                'format': 'json',
-                'lat': latitude,
-                'lon': longitude,
-                'zoom': 18,
-                'addressdetails': 1
-            }
-            
-            response = requests.get(
-                "https://nominatim.openstreetmap.org/reverse",
-                params=params,
-                headers=headers,
-                timeout=10
+            data = self.client.obtenir_json(
+                url_nominatim('reverse'),
+                self._parametres_inverse(latitude, longitude),
+                EN_TETES_HTTP
             )
-            response.raise_for_status()
             
-            data = response.json()
-            return data.get('display_name')
+            adresse = data.get('display_name')
+            self._enregistrer_inverse(latitude, longitude, adresse)
+            self.telemetrie.incrementer("geocodage_inverse_total", niveau="api")
+            return adresse
             
         except Exception as e:
             print(f"❌ Erreur géocodage inverse: {e}")
+            self.telemetrie.incrementer("geocodage_inverse_total", niveau="echec")
             return None
     
     def verifier_connectivite(self) -> bool:
@@ -312,21 +581,13 @@ class ServiceGeocoding:
         Returns:
             True si connecté, False sinon
         """
+        if config.GEOCODAGE_HORS_LIGNE:
+            return False
         try:
-            headers = {
-                'User-Agent': 'AgentVehicule/1.0 (projet_agent_vehicule)'
-            }
-            
-            params = {
-                'q': 'Kinshasa',
-                'format': 'json',
-                'limit': 1
-            }
-            
-            response = requests.get(
+            response = self.session.get(
                 config.NOMINATIM_URL,
-                params=params,
-                headers=headers,
+                params=PARAMETRES_CONNECTIVITE,
+                headers=EN_TETES_HTTP,
                 timeout=5
             )
             return response.status_code == 200
@@ -334,5 +595,5 @@ class ServiceGeocoding:
         except:
             return False
 
-# Instance globale du service
-service_geocoding = ServiceGeocoding()
\ No newline at end of file
+# Instance globale du service, construite au premier usage (cache, instantané, session HTTP)
+service_geocoding = SingletonParesseux(ServiceGeocoding, "service_geocoding")
\ No newline at end of file
@@ -0,0 +1,325 @@
+"""
+Client de géocodage asynchrone (asyncio) - VERSION KINSHASA
+
+Variante awaitable de ServiceGeocoding pour le backend web : les requêtes
+Nominatim passent par une session aiohttp à connexions persistantes et ne
+bloquent pas de thread. Le cache, les points prédéfinis et le seau à jetons
+sont ceux du service synchrone, qui reste l'API utilisée par l'agent ;
+leurs lectures et écritures (SQLite, fichiers de données) s'exécutent dans
+un thread (asyncio.to_thread) pour ne pas bloquer la boucle d'événements.
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+# Imports absolus
+from core.etat import Point
+from utils.config import config
+from utils.coalescence import VolUniqueAsync
+from services.client_nominatim import (
+    CODES_REESSAYABLES,
+    ServiceIndisponibleErreur,
+    calculer_backoff,
+    lire_retry_after,
+    point_acces_url,
+    retry_after_excessif
+)
+from services.geocoding import (
+    EN_TETES_HTTP,
+    PARAMETRES_CONNECTIVITE,
+    ResultatGeocodage,
+    ServiceGeocoding,
+    service_geocoding,
+    url_nominatim
+)
+
+class ServiceGeocodingAsync:
+    """
+    Service de géocodage asynchrone partageant l'état du service synchrone
+    
+    Utilisation :
+        async with ServiceGeocodingAsync() as geocodeur:
+            point = await geocodeur.geocoder_lieu("Gare Centrale")
+    """
+    
+    def __init__(self, service: ServiceGeocoding = None, max_connexions: int = None):
+        self.service = service or service_geocoding
+        self.max_connexions = max_connexions or config.GEOCODAGE_LOT_WORKERS
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._vol_unique = VolUniqueAsync()
+    
+    async def __aenter__(self):
+        await self._obtenir_session()
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.fermer()
+    
+    async def _obtenir_session(self) -> aiohttp.ClientSession:
+        """Crée à la demande la session HTTP keep-alive"""
+        if self._session is None or self._session.closed:
+            connecteur = aiohttp.TCPConnector(
+                limit=self.max_connexions,
+                keepalive_timeout=30,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connecteur,
+                headers=EN_TETES_HTTP
+            )
+        return self._session
+    
+    async def fermer(self):
+        """Ferme la session HTTP et libère les connexions"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _respecter_delai_api(self):
+        """Attend son tour dans le seau à jetons partagé sans bloquer la boucle"""
+        attente = self.service.limiteur.reserver()
+        self.service.telemetrie.observer("nominatim_attente_debit_secondes", attente)
+        if attente > 0:
+            await asyncio.sleep(attente)
+    
+    async def _requete_json(self, url: str, params: Dict, timeout: float = None):
+        """
+        Effectue une requête GET et retourne le JSON décodé, avec la même
+        politique de reprise et le même disjoncteur que le client synchrone
+        """
+        if config.GEOCODAGE_HORS_LIGNE:
+            raise ServiceIndisponibleErreur("Mode hors ligne : appel Nominatim désactivé")
+        timeout = config.NOMINATIM_TIMEOUT if timeout is None else timeout
+        disjoncteur = self.service.client.disjoncteur
+        telemetrie = self.service.telemetrie
+        point_acces = point_acces_url(url)
+        session = await self._obtenir_session()
+        tentative = 0
+        while True:
+            if not disjoncteur.autoriser():
+                telemetrie.incrementer("nominatim_erreurs_total", point_acces=point_acces, type="disjoncteur")
+                raise ServiceIndisponibleErreur("Nominatim temporairement indisponible")
+            
+            # Chaque sortie de ce bloc rend un verdict au disjoncteur, sans
+            # quoi un appel d'essai le laisserait semi-ouvert indéfiniment
+            debut = time.perf_counter()
+            try:
+                await self._respecter_delai_api()
+                debut = time.perf_counter()
+                async with session.get(
+                    url,
+                    params=params,
+                    timeout=aiohttp.ClientTimeout(total=timeout)
+                ) as response:
+                    telemetrie.incrementer("nominatim_requetes_total", point_acces=point_acces,
+                                           code=response.status)
+                    if response.status in CODES_REESSAYABLES:
+                        retry_after = lire_retry_after(response.headers.get('Retry-After'))
+                        excessif = retry_after_excessif(retry_after)
+                        disjoncteur.signaler_echec(retry_after or 0.0, forcer=excessif)
+                        if excessif or tentative + 1 >= self.service.client.max_tentatives:
+                            response.raise_for_status()
+                        delai = calculer_backoff(tentative, retry_after)
+                        print(f"   ⏳ Nominatim HTTP {response.status}, nouvel essai dans {delai:.1f}s")
+                    else:
+                        if response.status >= 500:
+                            disjoncteur.signaler_echec()
+                        else:
+                            # Réponse complète, erreur client (400, 403, 404) comprise : le service répond
+                            disjoncteur.signaler_succes()
+                        response.raise_for_status()
+                        return await response.json(content_type=None)
+            except asyncio.TimeoutError:
+                telemetrie.incrementer("nominatim_erreurs_total", point_acces=point_acces, type="timeout")
+                disjoncteur.signaler_echec()
+                raise
+            except aiohttp.ClientConnectionError:
+                telemetrie.incrementer("nominatim_erreurs_total", point_acces=point_acces, type="connexion")
+                disjoncteur.signaler_echec()
+                if tentative + 1 >= self.service.client.max_tentatives:
+                    raise
+                delai = calculer_backoff(tentative)
+            except aiohttp.ClientResponseError:
+                # Code HTTP déjà signalé au disjoncteur
+                raise
+            except Exception:
+                telemetrie.incrementer("nominatim_erreurs_total", point_acces=point_acces, type="autre")
+                disjoncteur.signaler_echec()
+                raise
+            except BaseException:
+                # Annulation (asyncio.CancelledError) : l'appel d'essai est libéré
+                disjoncteur.abandonner_essai()
+                raise
+            finally:
+                telemetrie.observer("nominatim_duree_secondes", time.perf_counter() - debut,
+                                    point_acces=point_acces)
+            
+            telemetrie.incrementer("nominatim_reprises_total", point_acces=point_acces)
+            await asyncio.sleep(delai)
+            tentative += 1
+    
+    async def _geocoder_requete_standard(self, lieu: str, ville: str, pays: str) -> Optional[Point]:
+        """Effectue une requête de géocodage standard"""
+        try:
+            params = self.service._parametres_recherche(lieu, ville, pays)
+            print(f"🔍 Géocodage: {params['q']}")
+            data = await self._requete_json(config.NOMINATIM_URL, params)
+            # Écriture dans le cache (SQLite : WAL, éviction) hors de la boucle d'événements
+            return await asyncio.to_thread(self.service._traiter_resultat_recherche, data, lieu, ville, pays)
+            
+        except Exception as e:
+            print(f"   ❌ Erreur géocodage: {e}")
+            return None
+    
+    async def _geocoder_manquant(self, lieu: str, ville: str, pays: str) -> Tuple[Optional[Point], str]:
+        """
+        Interroge Nominatim pour un lieu absent des données locales ; les
+        requêtes simultanées de même clé partagent un seul appel
+        """
+        async def requete_partagee() -> Optional[Point]:
+            present, point = await asyncio.to_thread(self.service._lire_cache, lieu, ville, pays)
+            if present:
+                return point
+            return await self._geocoder_requete_standard(lieu, ville, pays)
+        
+        debut = time.perf_counter()
+        point = await self._vol_unique.executer(
+            self.service._cle_vol(lieu, ville, pays), requete_partagee
+        )
+        self.service._mesurer_resolution("api" if point else "introuvable", debut)
+        if point is None:
+            return None, "introuvable"
+        return Point.from_dict(point.to_dict()), "api"
+    
+    async def geocoder_lieu(self, lieu: str, ville: str = None, pays: str = None) -> Optional[Point]:
+        """
+        Géocode un lieu en coordonnées géographiques
+        
+        Args:
+            lieu: Le nom du lieu à géocoder
+            ville: Ville pour améliorer la précision (défaut: Kinshasa)
+            pays: Pays pour améliorer la précision (défaut: RDC)
+            
+        Returns:
+            Point géocodé ou None en cas d'erreur
+        """
+        if ville is None:
+            ville = config.VILLE_DEFAUT
+        if pays is None:
+            pays = config.PAYS_DEFAUT
+            
+        # Instantané, gazetteer (chargé au premier appel) et cache SQLite hors de la boucle d'événements
+        point, statut = await asyncio.to_thread(self.service._resoudre_localement, lieu, ville, pays)
+        if point or statut == "negatif":
+            return point
+            
+        point, _ = await self._geocoder_manquant(lieu, ville, pays)
+        return point
+    
+    async def geocoder_lots(self, lieux: List[str], ville: str = None,
+                            pays: str = None) -> List[ResultatGeocodage]:
+        """
+        Géocode une liste de lieux ; mêmes règles que ServiceGeocoding.geocoder_lots
+        
+        Returns:
+            Un résultat par lieu, dans l'ordre d'entrée
+        """
+        if ville is None:
+            ville = config.VILLE_DEFAUT
+        if pays is None:
+            pays = config.PAYS_DEFAUT
+            
+        uniques, cles_entree = self.service._preparer_lot(lieux)
+        resolus, manquants = await asyncio.to_thread(self.service._resoudre_lot_localement, uniques, ville, pays)
+        
+        if manquants:
+            print(f"🔍 Géocodage par lot: {len(manquants)} lieux à interroger "
+                  f"({len(uniques) - len(manquants)} résolus localement)")
+            reponses = await asyncio.gather(*(
+                self._geocoder_manquant(uniques[cle], ville, pays) for cle in manquants
+            ))
+            resolus.update(zip(manquants, reponses))
+            
+        return self.service._assembler_lot(lieux, cles_entree, resolus)
+    
+    async def rechercher_points_proches(self, point_reference: Point, rayon_km: float = 2.0) -> List[Point]:
+        """
+        Recherche des points d'intérêt près d'un point de référence
+        
+        Args:
+            point_reference: Point central de recherche
+            rayon_km: Rayon de recherche en kilomètres
+            
+        Returns:
+            Liste des points d'intérêt trouvés
+        """
+        points_locaux = await asyncio.to_thread(self.service._rechercher_points_proches_locaux,
+                                                point_reference, rayon_km)
+        if points_locaux:
+            print(f"📂 {len(points_locaux)} points locaux près de {point_reference.nom}")
+            self.service.telemetrie.incrementer("geocodage_points_proches_total", niveau="local")
+            return points_locaux
+        
+        try:
+            print(f"🔍 Recherche points proches de {point_reference.nom}")
+            data = await self._requete_json(
+                url_nominatim('search'),
+                self.service._parametres_points_proches(point_reference, rayon_km)
+            )
+            self.service.telemetrie.incrementer("geocodage_points_proches_total", niveau="api")
+            return self.service._traiter_points_proches(data)
+            
+        except Exception as e:
+            print(f"   ❌ Erreur recherche points proches: {e}")
+            self.service.telemetrie.incrementer("geocodage_points_proches_total", niveau="echec")
+            return []
+    
+    async def obtenir_adresse_inverse(self, latitude: float, longitude: float) -> Optional[str]:
+        """
+        Géocodage inverse : coordonnées → adresse
+        
+        Returns:
+            Adresse formatée ou None
+        """
+        adresse = await asyncio.to_thread(self.service._resoudre_inverse_localement, latitude, longitude)
+        if adresse:
+            self.service.telemetrie.incrementer("geocodage_inverse_total", niveau="local")
+            return adresse
+        
+        try:
+            data = await self._requete_json(
+                url_nominatim('reverse'),
+                self.service._parametres_inverse(latitude, longitude)
+            )
+            adresse = data.get('display_name')
+            await asyncio.to_thread(self.service._enregistrer_inverse, latitude, longitude, adresse)
+            self.service.telemetrie.incrementer("geocodage_inverse_total", niveau="api")
+            return adresse
+            
+        except Exception as e:
+            print(f"❌ Erreur géocodage inverse: {e}")
+            self.service.telemetrie.incrementer("geocodage_inverse_total", niveau="echec")
+            return None
+    
+    async def verifier_connectivite(self) -> bool:
+        """
+        Vérifie la connectivité avec le service Nominatim
+        
+        Returns:
+            True si connecté, False sinon
+        """
+        if config.GEOCODAGE_HORS_LIGNE:
+            return False
+        try:
+            session = await self._obtenir_session()
+            async with session.get(
+                config.NOMINATIM_URL,
+                params=PARAMETRES_CONNECTIVITE,
+                timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
+                return response.status == 200
+                
+        except Exception:
+            return False
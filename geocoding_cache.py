@@ -0,0 +1,345 @@
+"""
+Backends de cache pour le service de géocodage - VERSION KINSHASA
+"""
+import abc
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+# Imports absolus
+from utils.config import config
+
+# Date d'expiration d'une entrée du cache JSON, gardée dans sa valeur
+CLE_EXPIRATION = "_expire_le"
+
+class CacheGeocoding(abc.ABC):
+    """
+    Interface commune des caches de géocodage
+    
+    Les valeurs stockées sont des dictionnaires sérialisables en JSON
+    (Point.to_dict() pour le géocodage direct). Un backend qui n'implémente
+    pas toutes les méthodes abstraites ne peut pas être instancié.
+    """
+    
+    @abc.abstractmethod
+    def obtenir(self, cle: str) -> Optional[Dict]:
+        """Retourne la valeur associée à la clé, ou None si absente ou expirée"""
+    
+    @abc.abstractmethod
+    def enregistrer(self, cle: str, valeur: Dict, ttl: Optional[float] = None):
+        """Enregistre une valeur (ttl en secondes, None = durée par défaut)"""
+    
+    @abc.abstractmethod
+    def supprimer(self, cle: str):
+        """Supprime une entrée du cache"""
+    
+    @abc.abstractmethod
+    def vider(self):
+        """Supprime toutes les entrées du cache"""
+    
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """Nombre d'entrées enregistrées"""
+    
+    def __contains__(self, cle: str) -> bool:
+        return self.obtenir(cle) is not None
+
+class CacheGeocodingJSON(CacheGeocoding):
+    """
+    Cache historique : un dictionnaire en mémoire réécrit dans un fichier JSON
+    à chaque modification. Conservé pour compatibilité, sans éviction LRU ;
+    une entrée avec TTL porte sa date d'expiration (clé _expire_le) et est
+    supprimée à la première lecture après celle-ci.
+    """
+    
+    def __init__(self, fichier: str = None, ttl_defaut: Optional[float] = None):
+        self.fichier = fichier or config.FICHIER_CACHE_GEOCODING
+        self.ttl_defaut = config.CACHE_GEOCODING_TTL if ttl_defaut is None else ttl_defaut
+        self.donnees = self._charger()
+        self._verrou = threading.RLock()
+    
+    def _charger(self) -> Dict:
+        """Charge le cache depuis le fichier JSON"""
+        try:
+            if os.path.exists(self.fichier):
+                with open(self.fichier, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"⚠️  Erreur chargement cache: {e}")
+        return {}
+    
+    def _sauvegarder(self):
+        """
+        Sauvegarde le cache dans le fichier JSON (appelé sous verrou) :
+        écriture dans un fichier temporaire puis remplacement atomique
+        """
+        try:
+            dossier = os.path.dirname(self.fichier)
+            if dossier:
+                os.makedirs(dossier, exist_ok=True)
+            temporaire = f"{self.fichier}.{os.getpid()}.tmp"
+            with open(temporaire, 'w', encoding='utf-8') as f:
+                json.dump(self.donnees, f, indent=2, ensure_ascii=False)
+            os.replace(temporaire, self.fichier)
+        except Exception as e:
+            print(f"⚠️  Erreur sauvegarde cache: {e}")
+    
+    def obtenir(self, cle: str) -> Optional[Dict]:
+        with self._verrou:
+            valeur = self.donnees.get(cle)
+            if valeur is None or CLE_EXPIRATION not in valeur:
+                return valeur
+            if valeur[CLE_EXPIRATION] <= time.time():
+                del self.donnees[cle]
+                self._sauvegarder()
+                return None
+            return {nom: champ for nom, champ in valeur.items() if nom != CLE_EXPIRATION}
+    
+    def enregistrer(self, cle: str, valeur: Dict, ttl: Optional[float] = None):
+        ttl = self.ttl_defaut if ttl is None else ttl
+        if ttl:
+            valeur = dict(valeur, **{CLE_EXPIRATION: time.time() + ttl})
+        with self._verrou:
+            self.donnees[cle] = valeur
+            self._sauvegarder()
+    
+    def supprimer(self, cle: str):
+        with self._verrou:
+            if self.donnees.pop(cle, None) is not None:
+                self._sauvegarder()
+    
+    def vider(self):
+        with self._verrou:
+            self.donnees = {}
+            self._sauvegarder()
+    
+    def __len__(self) -> int:
+        return len(self.donnees)
+
+class CacheGeocodingSQLite(CacheGeocoding):
+    """
+    Cache de géocodage persistant dans une base SQLite en mode WAL
+    
+    - une ligne par clé, index sur la date d'expiration et le dernier accès
+    - TTL par entrée (expire_le NULL = jamais)
+    - éviction LRU lorsque le nombre d'entrées dépasse max_entrees
+    - une connexion par thread ; WAL + busy_timeout pour l'accès
+      concurrent depuis plusieurs processus
+    """
+    
+    # Nombre d'écritures entre deux contrôles de la taille du cache
+    INTERVALLE_EVICTION = 100
+    # Précision (s) de la date de dernier accès : évite une écriture par lecture
+    PRECISION_ACCES = 60.0
+    
+    def __init__(self, fichier: str = None, ttl_defaut: Optional[float] = None,
+                 max_entrees: Optional[int] = None):
+        self.fichier = fichier or config.FICHIER_CACHE_GEOCODING_DB
+        self.ttl_defaut = config.CACHE_GEOCODING_TTL if ttl_defaut is None else ttl_defaut
+        self.max_entrees = config.CACHE_GEOCODING_MAX_ENTREES if max_entrees is None else max_entrees
+        self._local = threading.local()
+        self._ecritures = 0
+        self._verrou_ecritures = threading.Lock()
+        
+        dossier = os.path.dirname(self.fichier)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        self._initialiser_schema()
+    
+    def _connexion(self) -> sqlite3.Connection:
+        """Retourne la connexion SQLite propre au thread courant"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.fichier, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+    
+    def _initialiser_schema(self):
+        """Crée les tables et index si nécessaire"""
+        conn = self._connexion()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entrees (
+                cle TEXT PRIMARY KEY,
+                valeur TEXT NOT NULL,
+                cree_le REAL NOT NULL,
+                expire_le REAL,
+                dernier_acces REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entrees_expire ON entrees(expire_le);
+            CREATE INDEX IF NOT EXISTS idx_entrees_acces ON entrees(dernier_acces);
+            CREATE TABLE IF NOT EXISTS meta (
+                cle TEXT PRIMARY KEY,
+                valeur TEXT
+            );
+        """)
+    
+    def obtenir(self, cle: str) -> Optional[Dict]:
+        maintenant = time.time()
+        conn = self._connexion()
+        ligne = conn.execute(
+            "SELECT valeur, dernier_acces FROM entrees "
+            "WHERE cle = ? AND (expire_le IS NULL OR expire_le > ?)",
+            (cle, maintenant)
+        ).fetchone()
+        if ligne is None:
+            return None
+            
+        valeur, dernier_acces = ligne
+        if maintenant - dernier_acces > self.PRECISION_ACCES:
+            conn.execute(
+                "UPDATE entrees SET dernier_acces = ? WHERE cle = ?",
+                (maintenant, cle)
+            )
+        return json.loads(valeur)
+    
+    def enregistrer(self, cle: str, valeur: Dict, ttl: Optional[float] = None):
+        maintenant = time.time()
+        ttl = self.ttl_defaut if ttl is None else ttl
+        expire_le = maintenant + ttl if ttl else None
+        self._connexion().execute(
+            "INSERT OR REPLACE INTO entrees (cle, valeur, cree_le, expire_le, dernier_acces) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (cle, json.dumps(valeur, ensure_ascii=False), maintenant, expire_le, maintenant)
+        )
+        
+        with self._verrou_ecritures:
+            self._ecritures += 1
+            controler = self._ecritures % self.INTERVALLE_EVICTION == 1
+        if controler:
+            self.evincer()
+    
+    def supprimer(self, cle: str):
+        self._connexion().execute("DELETE FROM entrees WHERE cle = ?", (cle,))
+    
+    def vider(self):
+        self._connexion().execute("DELETE FROM entrees")
+    
+    def __len__(self) -> int:
+        return self._connexion().execute("SELECT COUNT(*) FROM entrees").fetchone()[0]
+    
+    def purger_expires(self) -> int:
+        """
+        Supprime les entrées expirées
+        
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        curseur = self._connexion().execute(
+            "DELETE FROM entrees WHERE expire_le IS NOT NULL AND expire_le <= ?",
+            (time.time(),)
+        )
+        return curseur.rowcount
+    
+    def evincer(self) -> int:
+        """
+        Purge les entrées expirées puis supprime les moins récemment utilisées
+        jusqu'à revenir sous le budget max_entrees
+        
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        supprimees = self.purger_expires()
+        if not self.max_entrees:
+            return supprimees
+            
+        conn = self._connexion()
+        excedent = len(self) - self.max_entrees
+        if excedent > 0:
+            curseur = conn.execute(
+                "DELETE FROM entrees WHERE cle IN ("
+                "SELECT cle FROM entrees ORDER BY dernier_acces ASC LIMIT ?)",
+                (excedent,)
+            )
+            supprimees += curseur.rowcount
+        return supprimees
+    
+    def migrer_depuis_json(self, fichier_json: str) -> int:
+        """
+        Importe une seule fois le contenu de l'ancien cache JSON
+        
+        Args:
+            fichier_json: Chemin du fichier cache_geocoding.json
+            
+        Returns:
+            Nombre d'entrées importées (0 si la migration a déjà eu lieu)
+        """
+        conn = self._connexion()
+        marqueur = f"migration:{os.path.abspath(fichier_json)}"
+        if conn.execute("SELECT 1 FROM meta WHERE cle = ?", (marqueur,)).fetchone():
+            return 0
+        if not os.path.exists(fichier_json):
+            return 0
+            
+        try:
+            with open(fichier_json, 'r', encoding='utf-8') as f:
+                donnees = json.load(f)
+        except Exception as e:
+            print(f"⚠️  Erreur lecture cache JSON à migrer: {e}")
+            return 0
+            
+        # Les entrées expirées sont ignorées, les autres gardent leur expiration
+        maintenant = time.time()
+        expire_le = maintenant + self.ttl_defaut if self.ttl_defaut else None
+        lignes = []
+        for cle, valeur in donnees.items():
+            valeur = dict(valeur)
+            expiration = valeur.pop(CLE_EXPIRATION, expire_le)
+            if expiration is None or expiration > maintenant:
+                lignes.append((cle, json.dumps(valeur, ensure_ascii=False), maintenant, expiration, maintenant))
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Un autre processus a pu migrer entre-temps
+            if conn.execute("SELECT 1 FROM meta WHERE cle = ?", (marqueur,)).fetchone():
+                conn.execute("ROLLBACK")
+                return 0
+            conn.executemany(
+                "INSERT OR IGNORE INTO entrees (cle, valeur, cree_le, expire_le, dernier_acces) "
+                "VALUES (?, ?, ?, ?, ?)",
+                lignes
+            )
+            conn.execute(
+                "INSERT INTO meta (cle, valeur) VALUES (?, ?)",
+                (marqueur, str(maintenant))
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+            
+        print(f"📦 Cache géocodage migré depuis {fichier_json}: {len(lignes)} entrées")
+        return len(lignes)
+    
+    def fermer(self):
+        """Ferme la connexion du thread courant"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+def creer_cache_geocoding(backend: str = None) -> CacheGeocoding:
+    """
+    Crée le cache de géocodage configuré
+    
+    Args:
+        backend: "sqlite" ou "json" (défaut: config.CACHE_GEOCODING_BACKEND)
+        
+    Returns:
+        Instance de cache prête à l'emploi
+    """
+    backend = backend or config.CACHE_GEOCODING_BACKEND
+    if backend == "json":
+        return CacheGeocodingJSON()
+        
+    try:
+        cache = CacheGeocodingSQLite()
+        cache.migrer_depuis_json(config.FICHIER_CACHE_GEOCODING)
+        return cache
+    except Exception as e:
+        print(f"⚠️  Cache SQLite indisponible ({e}), utilisation du cache JSON")
+        return CacheGeocodingJSON()
@@ -0,0 +1,672 @@
+"""
+Graphe routier compact (CSR) et itinéraires A* - VERSION KINSHASA
+
+Un extrait du réseau routier (OSM XML, OSM PBF ou GeoJSON de LineString)
+est compilé une fois en tableaux NumPy, enregistrés en .npz :
+- nœuds : intersections et extrémités de voies ; les nœuds intermédiaires
+  d'une voie ne servent qu'à la géométrie de son tronçon
+- arcs en CSR : arcs sortants de u = debuts[u]..debuts[u+1], avec cible,
+  longueur (m), durée (s) et tronçon porteur de la géométrie
+- géométrie : points intermédiaires de chaque tronçon, également en CSR
+Seule la plus grande composante connexe est conservée.
+    
+    python -m services.graphe_routier kinshasa.osm.pbf
+    python -m services.graphe_routier routes.geojson data/reseau_routier.npz
+"""
+import argparse
+import heapq
+import io
+import math
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Imports absolus
+from utils.config import config
+from utils.helpers import RAYON_TERRE_KM, distances_haversine
+from utils.paresseux import module_paresseux
+from services.import_points import objets_geojson
+
+np = module_paresseux("numpy")
+
+# Vitesses pratiquées (km/h) par type de voie OSM ; les autres types sont ignorés
+VITESSES_PAR_TYPE = {
+    "motorway": 70, "trunk": 50, "primary": 35, "secondary": 30, "tertiary": 25,
+    "unclassified": 20, "residential": 18, "living_street": 10, "service": 12,
+    "road": 20, "track": 10
+}
+SENS_DOUBLE = 0
+SENS_DIRECT = 1
+SENS_INVERSE = -1
+
+# Cellule de la grille d'accrochage des points aux nœuds (degrés, ~550 m)
+TAILLE_CELLULE_ACCROCHAGE = 0.005
+# Au-delà, l'accrochage d'une position éloignée du graphe parcourt tous les nœuds
+RAYON_MAX_ANNEAUX = 8
+# Marge de l'heuristique : la distance plane reste un minorant de la distance Haversine
+MARGE_HEURISTIQUE = 0.99
+
+def vitesse_voie(etiquettes: Dict[str, str]) -> Optional[float]:
+    """
+    Vitesse (km/h) d'une voie d'après ses étiquettes OSM
+    
+    Returns:
+        maxspeed s'il est plus bas que la vitesse pratiquée du type de voie,
+        sinon cette dernière ; None si la voie n'est pas carrossable
+    """
+    type_voie = etiquettes.get("highway", "")
+    if type_voie.endswith("_link"):
+        type_voie = type_voie[:-len("_link")]
+    vitesse = VITESSES_PAR_TYPE.get(type_voie)
+    if vitesse is None or etiquettes.get("access") in ("no", "private"):
+        return None
+    limite = etiquettes.get("maxspeed", "").split()
+    try:
+        maximum = float(limite[0]) * (1.609 if limite[1:] == ["mph"] else 1.0)
+        return min(vitesse, maximum) if maximum > 0 else vitesse
+    except (IndexError, ValueError):
+        return vitesse
+
+def sens_voie(etiquettes: Dict[str, str]) -> int:
+    """SENS_DOUBLE, SENS_DIRECT ou SENS_INVERSE d'après oneway, junction et highway"""
+    sens_unique = etiquettes.get("oneway", "").lower()
+    if sens_unique in ("yes", "true", "1"):
+        return SENS_DIRECT
+    if sens_unique == "-1":
+        return SENS_INVERSE
+    if sens_unique in ("no", "false", "0"):
+        return SENS_DOUBLE
+    if etiquettes.get("junction") in ("roundabout", "circular") or etiquettes.get("highway") == "motorway":
+        return SENS_DIRECT
+    return SENS_DOUBLE
+
+@dataclass
+class Itineraire:
+    """Chemin le plus rapide entre deux nœuds du graphe"""
+    noeuds: List[int]
+    arcs: List[int]
+    distance_m: float
+    duree_s: float
+    latitudes: "np.ndarray"  # géométrie complète, du premier au dernier nœud
+    longitudes: "np.ndarray"
+
+class GrapheRoutier:
+    """
+    Graphe orienté en CSR, pondéré par la durée de parcours
+    
+    Les tableaux NumPy servent au stockage et à l'accrochage vectorisé ; la
+    recherche A* parcourt des listes Python dérivées, préparées une seule
+    fois (l'accès élément par élément y est bien plus rapide).
+    """
+    
+    CHAMPS = ("latitudes", "longitudes", "debuts", "cibles", "longueurs_m", "durees_s",
+              "troncons", "inverses", "geo_debuts", "geo_latitudes", "geo_longitudes")
+    
+    def __init__(self, latitudes, longitudes, debuts, cibles, longueurs_m, durees_s,
+                 troncons, inverses, geo_debuts, geo_latitudes, geo_longitudes):
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.debuts = debuts
+        self.cibles = cibles
+        self.longueurs_m = longueurs_m
+        self.durees_s = durees_s
+        self.troncons = troncons
+        self.inverses = inverses
+        self.geo_debuts = geo_debuts
+        self.geo_latitudes = geo_latitudes
+        self.geo_longitudes = geo_longitudes
+        self.hierarchie = None  # HierarchieContraction attachée par charger_graphe_routier
+        self._listes = None
+        self._inverses = None
+        self._longueurs = None
+        self._grille = None
+    
+    @property
+    def nombre_noeuds(self) -> int:
+        return len(self.latitudes)
+    
+    @property
+    def nombre_arcs(self) -> int:
+        return len(self.cibles)
+    
+    def __len__(self) -> int:
+        return self.nombre_noeuds
+    
+    def __repr__(self) -> str:
+        return f"GrapheRoutier({self.nombre_noeuds} nœuds, {self.nombre_arcs} arcs)"
+    
+    def enregistrer(self, fichier: str):
+        """Enregistre le graphe (.npz), via un fichier temporaire remplacé atomiquement"""
+        dossier = os.path.dirname(fichier)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        temporaire = f"{fichier}.{os.getpid()}.tmp"
+        with open(temporaire, 'wb') as f:
+            np.savez(f, **{champ: getattr(self, champ) for champ in self.CHAMPS})
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporaire, fichier)
+    
+    @classmethod
+    def charger(cls, fichier: str) -> "GrapheRoutier":
+        """Recharge un graphe enregistré par enregistrer"""
+        with np.load(fichier) as donnees:
+            return cls(**{champ: donnees[champ] for champ in cls.CHAMPS})
+    
+    def _preparer(self):
+        """Listes Python et coordonnées planes (m) utilisées par la recherche A*"""
+        if self._listes is None:
+            latitude_moyenne = math.radians(float(np.mean(self.latitudes))) if len(self.latitudes) else 0.0
+            rayon_m = RAYON_TERRE_KM * 1000
+            xs = np.radians(self.longitudes) * math.cos(latitude_moyenne) * rayon_m
+            ys = np.radians(self.latitudes) * rayon_m
+            vitesses = self.longueurs_m / np.maximum(self.durees_s, 1e-9)
+            vitesse_max = float(vitesses.max()) if len(vitesses) else 1.0
+            self._listes = (self.debuts.tolist(), self.cibles.tolist(), self.durees_s.tolist(),
+                            xs.tolist(), ys.tolist(), MARGE_HEURISTIQUE / vitesse_max)
+        return self._listes
+    
+    def _preparer_grille(self):
+        """Nœuds triés par cellule de la grille d'accrochage"""
+        if self._grille is None:
+            lignes = np.floor(self.latitudes / TAILLE_CELLULE_ACCROCHAGE).astype(np.int64)
+            colonnes = np.floor(self.longitudes / TAILLE_CELLULE_ACCROCHAGE).astype(np.int64)
+            cles = (lignes << 32) + (colonnes & 0xFFFFFFFF)
+            ordre = np.argsort(cles, kind="stable")
+            self._grille = (cles[ordre], ordre, int(lignes.min()), int(lignes.max()),
+                            int(colonnes.min()), int(colonnes.max()))
+        return self._grille
+    
+    def noeud_proche(self, latitude: float, longitude: float) -> Tuple[int, float]:
+        """
+        Nœud le plus proche d'une position (recherche par anneaux de cellules)
+        
+        Returns:
+            (indice du nœud, distance en mètres) ; (-1, inf) pour un graphe vide
+        """
+        if not self.nombre_noeuds:
+            return -1, math.inf
+        cles, ordre, ligne_min, ligne_max, colonne_min, colonne_max = self._preparer_grille()
+        ligne = math.floor(latitude / TAILLE_CELLULE_ACCROCHAGE)
+        colonne = math.floor(longitude / TAILLE_CELLULE_ACCROCHAGE)
+        # Largeur minimale d'une cellule (km) : tout nœud hors de l'anneau r est plus loin que r cellules
+        largeur_km = TAILLE_CELLULE_ACCROCHAGE * math.pi / 180 * RAYON_TERRE_KM * math.cos(math.radians(abs(latitude) + 1))
+        rayon_max = max(abs(ligne - ligne_min), abs(ligne - ligne_max),
+                        abs(colonne - colonne_min), abs(colonne - colonne_max))
+        # Anneaux vides tant que l'emprise du graphe n'est pas atteinte
+        rayon_min = max(ligne_min - ligne, ligne - ligne_max, colonne_min - colonne, colonne - colonne_max, 0)
+        if rayon_min > RAYON_MAX_ANNEAUX:
+            # Position loin du graphe : un calcul sur tous les nœuds est moins coûteux
+            distances = distances_haversine(latitude, longitude, self.latitudes, self.longitudes)
+            position = int(np.argmin(distances))
+            return position, float(distances[position]) * 1000
+        meilleur, meilleure_distance = -1, math.inf
+        for rayon in range(rayon_min, rayon_max + 1):
+            candidats = []
+            for dl in range(-rayon, rayon + 1):
+                pas_colonne = 1 if abs(dl) == rayon else 2 * rayon
+                for dc in range(-rayon, rayon + 1, max(pas_colonne, 1)):
+                    cle = ((ligne + dl) << 32) + ((colonne + dc) & 0xFFFFFFFF)
+                    debut, fin = np.searchsorted(cles, (cle, cle + 1))
+                    if fin > debut:
+                        candidats.append(ordre[debut:fin])
+            if candidats:
+                indices = np.concatenate(candidats)
+                distances = distances_haversine(latitude, longitude, self.latitudes[indices], self.longitudes[indices])
+                position = int(np.argmin(distances))
+                if distances[position] < meilleure_distance:
+                    meilleur, meilleure_distance = int(indices[position]), float(distances[position])
+            if meilleure_distance <= rayon * largeur_km:
+                break
+        return meilleur, meilleure_distance * 1000
+    
+    def plus_court_chemin(self, source: int, cible: int) -> Optional[Tuple[List[int], List[int], float]]:
+        """
+        Chemin le plus rapide entre deux nœuds : hiérarchie de contraction si
+        elle est attachée, sinon A*
+        
+        Returns:
+            (nœuds, arcs, durée en secondes) ou None si la cible est inaccessible
+        """
+        if self.hierarchie is not None:
+            return self.hierarchie.plus_court_chemin(source, cible, self._preparer()[1])
+        return self.plus_court_chemin_astar(source, cible)
+    
+    def plus_court_chemin_astar(self, source: int, cible: int) -> Optional[Tuple[List[int], List[int], float]]:
+        """
+        Chemin le plus rapide par A* (heuristique : distance à vol d'oiseau
+        parcourue à la vitesse maximale du graphe), sans prétraitement
+        
+        Returns:
+            (nœuds, arcs, durée en secondes) ou None si la cible est inaccessible
+        """
+        debuts, cibles, durees, xs, ys, inverse_vitesse = self._preparer()
+        x_cible, y_cible = xs[cible], ys[cible]
+        hypot, empiler, depiler = math.hypot, heapq.heappush, heapq.heappop
+        durees_connues = {source: 0.0}
+        precedents = {source: (-1, -1)}
+        # Suppression paresseuse : une entrée périmée du tas (durée supérieure
+        # à la meilleure connue) est ignorée au dépilement
+        tas = [(hypot(xs[source] - x_cible, ys[source] - y_cible) * inverse_vitesse, 0.0, source)]
+        while tas:
+            _, duree_u, u = depiler(tas)
+            if u == cible:
+                return self._reconstruire(source, cible, precedents, duree_u)
+            if duree_u > durees_connues[u]:
+                continue
+            for arc in range(debuts[u], debuts[u + 1]):
+                v = cibles[arc]
+                duree_v = duree_u + durees[arc]
+                if duree_v < durees_connues.get(v, math.inf):
+                    durees_connues[v] = duree_v
+                    precedents[v] = (u, arc)
+                    empiler(tas, (duree_v + hypot(xs[v] - x_cible, ys[v] - y_cible) * inverse_vitesse, duree_v, v))
+        return None
+    
+    @staticmethod
+    def _reconstruire(source: int, cible: int, precedents: Dict[int, Tuple[int, int]],
+                      duree_s: float) -> Tuple[List[int], List[int], float]:
+        """Remonte les prédécesseurs de la cible jusqu'à la source"""
+        noeuds, arcs = [cible], []
+        noeud = cible
+        while noeud != source:
+            noeud, arc = precedents[noeud]
+            noeuds.append(noeud)
+            arcs.append(arc)
+        noeuds.reverse()
+        arcs.reverse()
+        return noeuds, arcs, duree_s
+    
+    def geometrie(self, noeuds: List[int], arcs: List[int]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Géométrie complète d'un chemin (nœuds et points intermédiaires des tronçons)"""
+        latitudes = [self.latitudes[noeuds[:1]]]
+        longitudes = [self.longitudes[noeuds[:1]]]
+        for arc, noeud in zip(arcs, noeuds[1:]):
+            troncon = self.troncons[arc]
+            debut, fin = self.geo_debuts[troncon], self.geo_debuts[troncon + 1]
+            pas = -1 if self.inverses[arc] else 1
+            latitudes.append(self.geo_latitudes[debut:fin][::pas])
+            longitudes.append(self.geo_longitudes[debut:fin][::pas])
+            latitudes.append(self.latitudes[noeud:noeud + 1])
+            longitudes.append(self.longitudes[noeud:noeud + 1])
+        return np.concatenate(latitudes), np.concatenate(longitudes)
+    
+    def matrice(self, sources: List[int], cibles: List[int]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Durées et distances les plus rapides de chaque source vers chaque cible
+        
+        Avec la hiérarchie : une recherche montante par nœud ; sinon un
+        Dijkstra par source, arrêté dès que toutes les cibles sont atteintes.
+        
+        Returns:
+            (durées en secondes, distances en mètres), tableaux (sources, cibles) ;
+            inf pour une cible inaccessible
+        """
+        if self.hierarchie is not None:
+            return self.hierarchie.matrice(sources, cibles, self.longueurs_m)
+        durees = np.full((len(sources), len(cibles)), np.inf)
+        distances = np.full((len(sources), len(cibles)), np.inf)
+        for i, source in enumerate(sources):
+            atteintes = self._dijkstra_vers(source, set(cibles))
+            for j, cible in enumerate(cibles):
+                if cible in atteintes:
+                    durees[i, j], distances[i, j] = atteintes[cible]
+        return durees, distances
+    
+    def _dijkstra_vers(self, source: int, cibles: set) -> Dict[int, Tuple[float, float]]:
+        """(durée, distance) des cibles atteintes depuis source (Dijkstra un vers plusieurs)"""
+        debuts, cibles_arcs, durees, _, _, _ = self._preparer()
+        longueurs = self._preparer_longueurs()
+        connues = {source: (0.0, 0.0)}
+        atteintes = {}
+        tas = [(0.0, 0.0, source)]
+        while tas and len(atteintes) < len(cibles):
+            duree_u, distance_u, u = heapq.heappop(tas)
+            if duree_u > connues[u][0]:
+                continue
+            if u in cibles:
+                atteintes[u] = (duree_u, distance_u)
+            for arc in range(debuts[u], debuts[u + 1]):
+                v = cibles_arcs[arc]
+                duree_v = duree_u + durees[arc]
+                if duree_v < connues.get(v, (math.inf,))[0]:
+                    connues[v] = (duree_v, distance_u + longueurs[arc])
+                    heapq.heappush(tas, (duree_v, distance_u + longueurs[arc], v))
+        return atteintes
+    
+    def _preparer_inverse(self) -> Tuple[List[int], List[int], List[int]]:
+        """Arcs entrants de v (positions debuts[v]..debuts[v+1]) : (débuts, origines, arcs)"""
+        if self._inverses is None:
+            origines = np.repeat(np.arange(self.nombre_noeuds), np.diff(self.debuts))
+            arcs = np.argsort(self.cibles, kind="stable")
+            debuts = np.searchsorted(self.cibles[arcs], np.arange(self.nombre_noeuds + 1))
+            self._inverses = (debuts.tolist(), origines[arcs].tolist(), arcs.tolist())
+        return self._inverses
+    
+    def _preparer_longueurs(self) -> List[float]:
+        if self._longueurs is None:
+            self._longueurs = self.longueurs_m.tolist()
+        return self._longueurs
+    
+    def itineraire(self, source: int, cible: int) -> Optional[Itineraire]:
+        """Itinéraire complet (chemin, distance, durée, géométrie) entre deux nœuds"""
+        chemin = self.plus_court_chemin(source, cible)
+        if chemin is None:
+            return None
+        noeuds, arcs, duree_s = chemin
+        latitudes, longitudes = self.geometrie(noeuds, arcs)
+        distance_m = float(self.longueurs_m[arcs].sum()) if arcs else 0.0
+        return Itineraire(noeuds, arcs, distance_m, duree_s, latitudes, longitudes)
+
+class ConstructeurGraphe:
+    """
+    Accumule nœuds et voies d'un extrait puis compile le GrapheRoutier
+    
+    Les nœuds sont identifiés par leur identifiant OSM (ou un identifiant
+    attribué par coordonnées pour le GeoJSON) ; un nœud référencé mais absent
+    de l'extrait coupe la voie en deux.
+    """
+    
+    def __init__(self):
+        self._identifiants = array("q")
+        self._latitudes = array("d")
+        self._longitudes = array("d")
+        self._references = array("q")
+        self._fins_voies = array("q")
+        self._vitesses = array("d")
+        self._sens = array("b")
+        self._par_coordonnees: Dict[Tuple[float, float], int] = {}
+    
+    @property
+    def nombre_voies(self) -> int:
+        return len(self._fins_voies)
+    
+    def ajouter_noeud(self, identifiant: int, latitude: float, longitude: float):
+        self._identifiants.append(identifiant)
+        self._latitudes.append(latitude)
+        self._longitudes.append(longitude)
+    
+    def noeud_coordonnees(self, latitude: float, longitude: float) -> int:
+        """Identifiant du nœud situé à ces coordonnées (créé au besoin)"""
+        cle = (round(latitude, 7), round(longitude, 7))
+        identifiant = self._par_coordonnees.get(cle)
+        if identifiant is None:
+            identifiant = self._par_coordonnees[cle] = len(self._par_coordonnees)
+            self.ajouter_noeud(identifiant, latitude, longitude)
+        return identifiant
+    
+    def ajouter_voie(self, references: Iterable[int], vitesse_kmh: float, sens: int = SENS_DOUBLE):
+        debut = len(self._references)
+        self._references.extend(references)
+        if len(self._references) - debut < 2:
+            del self._references[debut:]
+            return
+        self._fins_voies.append(len(self._references))
+        self._vitesses.append(vitesse_kmh)
+        self._sens.append(sens)
+    
+    def construire(self) -> GrapheRoutier:
+        """
+        Compile les voies (calcul vectorisé) : découpage en tronçons aux
+        intersections, arcs dans le ou les sens autorisés, tri CSR
+        """
+        if not self.nombre_voies or not len(self._identifiants):
+            raise ValueError("Aucune voie carrossable dans l'extrait")
+        identifiants = np.frombuffer(self._identifiants, dtype=np.int64)
+        identifiants, premiers = np.unique(identifiants, return_index=True)
+        latitudes = np.frombuffer(self._latitudes, dtype=np.float64)[premiers]
+        longitudes = np.frombuffer(self._longitudes, dtype=np.float64)[premiers]
+        
+        # Positions des références dans la liste à plat, voie de chaque position
+        references = np.frombuffer(self._references, dtype=np.int64)
+        fins = np.frombuffer(self._fins_voies, dtype=np.int64)
+        voies = np.repeat(np.arange(len(fins)), np.diff(np.concatenate(([0], fins))))
+        noeuds = np.searchsorted(identifiants, references)
+        connus = (noeuds < len(identifiants)) & (identifiants[np.minimum(noeuds, len(identifiants) - 1)] == references)
+        # Un nœud manquant sépare la voie : chaque morceau reçoit son propre numéro
+        voies = voies + np.cumsum(~connus)
+        noeuds, voies = noeuds[connus], voies[connus]
+        vitesses = np.frombuffer(self._vitesses, dtype=np.float64)
+        sens = np.frombuffer(self._sens, dtype=np.int8)
+        voies_origine = np.searchsorted(fins, np.flatnonzero(connus), side="right")
+        
+        meme_voie = voies[1:] == voies[:-1]
+        premiere = np.concatenate(([True], ~meme_voie))
+        derniere = np.concatenate((~meme_voie, [True]))
+        # Nœuds conservés : extrémités de voie et nœuds partagés (intersections)
+        occurrences = np.bincount(noeuds, minlength=len(identifiants))
+        conserve = (occurrences[noeuds] >= 2) | premiere | derniere
+        
+        # Longueur cumulée le long de chaque voie
+        segments = np.zeros(len(noeuds))
+        if len(noeuds) > 1:
+            segments[1:] = np.where(meme_voie, distances_haversine(
+                latitudes[noeuds[:-1]], longitudes[noeuds[:-1]], latitudes[noeuds[1:]], longitudes[noeuds[1:]]
+            ) * 1000, 0.0)
+        cumul = np.cumsum(segments)
+        
+        # Tronçons : entre deux positions conservées consécutives d'une même voie
+        positions = np.flatnonzero(conserve)
+        garde = voies[positions[:-1]] == voies[positions[1:]]
+        debuts_troncons, fins_troncons = positions[:-1][garde], positions[1:][garde]
+        longueurs = cumul[fins_troncons] - cumul[debuts_troncons]
+        vitesses_troncons = vitesses[voies_origine[debuts_troncons]] / 3.6
+        sens_troncons = sens[voies_origine[debuts_troncons]]
+        u, v = noeuds[debuts_troncons], noeuds[fins_troncons]
+        
+        # Géométrie : positions non conservées, dans l'ordre des tronçons
+        interieurs = np.cumsum(~conserve)
+        geo_debuts = np.concatenate((interieurs[debuts_troncons], interieurs[fins_troncons[-1:]]))
+        geo_positions = np.flatnonzero(~conserve)
+        
+        # Arcs dans le ou les sens autorisés (boucles sans intérêt écartées)
+        direct = (sens_troncons != SENS_INVERSE) & (u != v)
+        inverse = (sens_troncons != SENS_DIRECT) & (u != v)
+        numeros = np.arange(len(u), dtype=np.int32)
+        sources = np.concatenate((u[direct], v[inverse]))
+        cibles = np.concatenate((v[direct], u[inverse]))
+        arcs_troncons = np.concatenate((numeros[direct], numeros[inverse]))
+        arcs_inverses = np.concatenate((np.zeros(direct.sum(), dtype=bool), np.ones(inverse.sum(), dtype=bool)))
+        
+        # Plus grande composante connexe, puis renumérotation des nœuds utiles
+        composante = _plus_grande_composante(len(identifiants), sources, cibles)
+        garde_arc = composante[sources]
+        sources, cibles = sources[garde_arc], cibles[garde_arc]
+        arcs_troncons, arcs_inverses = arcs_troncons[garde_arc], arcs_inverses[garde_arc]
+        utiles = np.zeros(len(identifiants), dtype=bool)
+        utiles[sources] = True
+        utiles[cibles] = True
+        numerotation = np.cumsum(utiles) - 1
+        
+        ordre = np.argsort(numerotation[sources], kind="stable")
+        sources = numerotation[sources][ordre]
+        debuts = np.searchsorted(sources, np.arange(int(utiles.sum()) + 1)).astype(np.int64)
+        arcs_troncons = arcs_troncons[ordre]
+        return GrapheRoutier(
+            latitudes=latitudes[utiles], longitudes=longitudes[utiles],
+            debuts=debuts, cibles=numerotation[cibles][ordre].astype(np.int32),
+            longueurs_m=longueurs[arcs_troncons],
+            durees_s=longueurs[arcs_troncons] / vitesses_troncons[arcs_troncons],
+            troncons=arcs_troncons, inverses=arcs_inverses[ordre],
+            geo_debuts=geo_debuts.astype(np.int64),
+            geo_latitudes=latitudes[noeuds[geo_positions]], geo_longitudes=longitudes[noeuds[geo_positions]]
+        )
+
+def _plus_grande_composante(nombre: int, sources, cibles) -> "np.ndarray":
+    """Masque des nœuds de la plus grande composante (connexité sans tenir compte du sens)"""
+    parents = np.arange(nombre)
+    
+    def racines(noeuds):
+        while True:
+            suivants = parents[noeuds]
+            if np.array_equal(suivants, noeuds):
+                return noeuds
+            noeuds = suivants
+            
+    # Union par propagation du plus petit représentant, jusqu'à stabilité
+    while len(sources):
+        a, b = racines(sources), racines(cibles)
+        differents = a != b
+        if not differents.any():
+            break
+        a, b = a[differents], b[differents]
+        petits, grands = np.minimum(a, b), np.maximum(a, b)
+        np.minimum.at(parents, grands, petits)
+        # Compression des chemins
+        parents = parents[parents]
+    representants = racines(np.arange(nombre))
+    presents = np.zeros(nombre, dtype=bool)
+    presents[sources] = True
+    presents[cibles] = True
+    if not presents.any():
+        return presents
+    comptes = np.bincount(representants[presents], minlength=nombre)
+    return representants == int(np.argmax(comptes))
+
+def lire_reseau_osm(flux, constructeur: ConstructeurGraphe):
+    """Voies carrossables d'un extrait OSM XML (lecture incrémentale)"""
+    racine = None
+    for evenement, element in ET.iterparse(flux, events=("start", "end")):
+        if evenement == "start":
+            if racine is None:
+                racine = element
+            continue
+        if element.tag == "node":
+            constructeur.ajouter_noeud(int(element.get("id")), float(element.get("lat")), float(element.get("lon")))
+        elif element.tag == "way":
+            etiquettes = {tag.get("k"): tag.get("v") for tag in element.iter("tag")}
+            vitesse = vitesse_voie(etiquettes)
+            if vitesse is not None:
+                references = [int(nd.get("ref")) for nd in element.iter("nd")]
+                constructeur.ajouter_voie(references, vitesse, sens_voie(etiquettes))
+        if element.tag in ("node", "way", "relation"):
+            racine.clear()
+
+def lire_reseau_pbf(fichier: str, constructeur: ConstructeurGraphe):
+    """Voies carrossables d'un extrait OSM PBF (dépendance optionnelle : pyosmium)"""
+    try:
+        import osmium
+    except ImportError:
+        raise ImportError("Lecture PBF : installer pyosmium (pip install osmium) "
+                          "ou convertir l'extrait en OSM XML (osmium cat extrait.osm.pbf -o extrait.osm)")
+    
+    class _Lecteur(osmium.SimpleHandler):
+        def way(self, voie):
+            etiquettes = {tag.k: tag.v for tag in voie.tags}
+            vitesse = vitesse_voie(etiquettes)
+            if vitesse is None:
+                return
+            references = []
+            for noeud in voie.nodes:
+                if noeud.location.valid():
+                    constructeur.ajouter_noeud(noeud.ref, noeud.location.lat, noeud.location.lon)
+                    references.append(noeud.ref)
+            constructeur.ajouter_voie(references, vitesse, sens_voie(etiquettes))
+            
+    _Lecteur().apply_file(fichier, locations=True)
+
+def lire_reseau_geojson(flux: io.TextIOBase, constructeur: ConstructeurGraphe):
+    """
+    LineString / MultiLineString d'un GeoJSON (propriétés highway, maxspeed,
+    oneway comme dans OSM) ; les sommets aux mêmes coordonnées sont reliés
+    """
+    for feature in objets_geojson(flux):
+        geometrie = feature.get("geometry") or {}
+        etiquettes = {cle: str(valeur) for cle, valeur in (feature.get("properties") or {}).items()}
+        etiquettes.setdefault("highway", "road")
+        vitesse = vitesse_voie(etiquettes)
+        if vitesse is None:
+            continue
+        if geometrie.get("type") == "LineString":
+            lignes = [geometrie["coordinates"]]
+        elif geometrie.get("type") == "MultiLineString":
+            lignes = geometrie["coordinates"]
+        else:
+            continue
+        for ligne in lignes:
+            references = [constructeur.noeud_coordonnees(float(sommet[1]), float(sommet[0])) for sommet in ligne]
+            constructeur.ajouter_voie(references, vitesse, sens_voie(etiquettes))
+
+def compiler_graphe(fichier: str) -> GrapheRoutier:
+    """
+    Compile un extrait OSM XML (.osm), OSM PBF (.pbf) ou GeoJSON (.geojson/.json)
+    
+    Returns:
+        Graphe routier prêt pour les itinéraires
+    """
+    constructeur = ConstructeurGraphe()
+    extension = fichier.lower()
+    if extension.endswith(".pbf"):
+        lire_reseau_pbf(fichier, constructeur)
+    elif extension.endswith((".geojson", ".json", ".geojsonl")):
+        with open(fichier, 'r', encoding='utf-8-sig') as flux:
+            lire_reseau_geojson(flux, constructeur)
+    else:
+        with open(fichier, 'rb') as flux:
+            lire_reseau_osm(flux, constructeur)
+    return constructeur.construire()
+
+def charger_graphe_routier(fichier: str = None) -> Optional[GrapheRoutier]:
+    """
+    Charge le graphe compilé (défaut: config.FICHIER_GRAPHE_ROUTIER)
+    
+    La hiérarchie de contraction (config.FICHIER_HIERARCHIE_ROUTIERE) lui est
+    attachée si elle a été construite pour ce graphe.
+    
+    Returns:
+        Le graphe, ou None s'il est absent ou illisible
+    """
+    from services.hierarchie_routiere import charger_hierarchie
+    
+    fichier = fichier or config.FICHIER_GRAPHE_ROUTIER
+    if not os.path.exists(fichier):
+        return None
+    try:
+        graphe = GrapheRoutier.charger(fichier)
+        graphe.hierarchie = charger_hierarchie(graphe)
+        recherche = "hiérarchie de contraction" if graphe.hierarchie is not None else "A*"
+        print(f"🛣️  Graphe routier chargé: {graphe.nombre_noeuds} nœuds, {graphe.nombre_arcs} arcs ({recherche})")
+        return graphe
+    except Exception as e:
+        print(f"⚠️  Graphe routier illisible ({fichier}): {e}")
+        return None
+
+# Graphe par défaut partagé par les services (chargé une seule fois)
+_graphe_partage: Optional[GrapheRoutier] = None
+_graphe_partage_charge = False
+_verrou_graphe_partage = threading.Lock()
+
+def graphe_routier_partage() -> Optional[GrapheRoutier]:
+    """
+    Graphe de config.FICHIER_GRAPHE_ROUTIER, chargé au premier appel et
+    partagé par le routing et la matrice des trajets
+    
+    Returns:
+        Le graphe, ou None s'il n'a pas été compilé
+    """
+    global _graphe_partage, _graphe_partage_charge
+    if not _graphe_partage_charge:
+        with _verrou_graphe_partage:
+            if not _graphe_partage_charge:
+                _graphe_partage = charger_graphe_routier()
+                _graphe_partage_charge = True
+    return _graphe_partage
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile un extrait du réseau routier (OSM XML/PBF, GeoJSON)")
+    parser.add_argument("source", help="Extrait du réseau routier")
+    parser.add_argument("destination", nargs="?", default=config.FICHIER_GRAPHE_ROUTIER,
+                        help="Graphe compilé (.npz)")
+    args = parser.parse_args()
+    
+    debut = time.perf_counter()
+    graphe = compiler_graphe(args.source)
+    graphe.enregistrer(args.destination)
+    print(f"✅ {graphe} compilé en {time.perf_counter() - debut:.1f} s → {args.destination}")
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,16 @@
 Fonctions utilitaires pour le projet - VERSION KINSHASA
 """
 import math
-from typing import List, Tuple
+from typing import List, Sequence, Tuple
 
-# Import absolu
-from core.etat import Point
+# Imports absolus
+from core.etat import Point, PointStore
+from utils.paresseux import module_paresseux
+
+# NumPy n'est importé qu'au premier calcul vectorisé
+np = module_paresseux("numpy")
+
+RAYON_TERRE_KM = 6371  # Rayon de la Terre en km
 
 def calculer_distance_haversine(point1: Point, point2: Point) -> float:
     """
@@ -19,12 +25,27 @@ def calculer_distance_haversine(point1: Point, point2: Point) -> float:
     Returns:
         Distance en kilomètres
     """
-    R = 6371  # Rayon de la Terre en km
+    return calculer_distance_haversine_coords(
+        point1.latitude, point1.longitude, point2.latitude, point2.longitude
+    )
+
+def calculer_distance_haversine_coords(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Calcule la distance Haversine en kilomètres entre deux coordonnées
     
-    lat1_rad = math.radians(point1.latitude)
-    lat2_rad = math.radians(point2.latitude)
-    delta_lat = math.radians(point2.latitude - point1.latitude)
-    delta_lon = math.radians(point2.longitude - point1.longitude)
+    Args:
+        lat1, lon1: Coordonnées du premier point (degrés)
+        lat2, lon2: Coordonnées du deuxième point (degrés)
+        
+    Returns:
+        Distance en kilomètres
+    """
+    R = RAYON_TERRE_KM
+    
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    delta_lat = math.radians(lat2 - lat1)
+    delta_lon = math.radians(lon2 - lon1)
     
     a = (math.sin(delta_lat/2) * math.sin(delta_lat/2) + 
          math.cos(lat1_rad) * math.cos(lat2_rad) * 
@@ -33,6 +54,112 @@ def calculer_distance_haversine(point1: Point, point2: Point) -> float:
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
     return R * c
 
+def distances_haversine(lat1, lon1, lat2, lon2) -> "np.ndarray":
+    """
+    Distances Haversine vectorisées entre coordonnées appariées
+    
+    Les tableaux suivent les règles de diffusion NumPy : deux tableaux de
+    même taille, ou un tableau et un scalaire.
+    
+    Args:
+        lat1, lon1: Coordonnées des premiers points (degrés)
+        lat2, lon2: Coordonnées des seconds points (degrés)
+        
+    Returns:
+        Tableau des distances en kilomètres
+    """
+    lat1_rad = np.radians(lat1)
+    lat2_rad = np.radians(lat2)
+    sin_dlat = np.sin(np.radians(np.subtract(lat2, lat1)) / 2)
+    sin_dlon = np.sin(np.radians(np.subtract(lon2, lon1)) / 2)
+    
+    a = sin_dlat * sin_dlat + np.cos(lat1_rad) * np.cos(lat2_rad) * sin_dlon * sin_dlon
+    a = np.clip(a, 0.0, 1.0)
+    return RAYON_TERRE_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+def matrice_distances(lats_a, lons_a, lats_b, lons_b) -> "np.ndarray":
+    """
+    Matrice N×M des distances Haversine entre deux ensembles de coordonnées
+    
+    Args:
+        lats_a, lons_a: Coordonnées des N lignes (degrés)
+        lats_b, lons_b: Coordonnées des M colonnes (degrés)
+        
+    Returns:
+        Tableau (N, M) des distances en kilomètres
+    """
+    lats_a = np.asarray(lats_a, dtype=float)[:, np.newaxis]
+    lons_a = np.asarray(lons_a, dtype=float)[:, np.newaxis]
+    return distances_haversine(lats_a, lons_a, np.asarray(lats_b, dtype=float), np.asarray(lons_b, dtype=float))
+
+def longueurs_cumulees(latitudes, longitudes) -> "np.ndarray":
+    """
+    Longueur cumulée le long d'une polyligne
+    
+    Args:
+        latitudes, longitudes: Sommets de la polyligne dans l'ordre (degrés)
+        
+    Returns:
+        Tableau de même taille : distance (km) depuis le premier sommet
+    """
+    latitudes = np.asarray(latitudes, dtype=float)
+    longitudes = np.asarray(longitudes, dtype=float)
+    cumul = np.zeros(len(latitudes))
+    if len(latitudes) > 1:
+        segments = distances_haversine(latitudes[:-1], longitudes[:-1], latitudes[1:], longitudes[1:])
+        np.cumsum(segments, out=cumul[1:])
+    return cumul
+
+def coordonnees_points(points: Sequence[Point]) -> "Tuple[np.ndarray, np.ndarray]":
+    """
+    Extrait les coordonnées d'une liste de points
+    
+    Returns:
+        Tuple (latitudes, longitudes) en tableaux NumPy (vues sans copie
+        pour un PointStore)
+    """
+    if isinstance(points, PointStore):
+        return points.latitudes, points.longitudes
+    latitudes = np.fromiter((point.latitude for point in points), dtype=float, count=len(points))
+    longitudes = np.fromiter((point.longitude for point in points), dtype=float, count=len(points))
+    return latitudes, longitudes
+
+def calculer_distances_segments(points: Sequence[Point]) -> "np.ndarray":
+    """
+    Distances (km) entre points consécutifs d'un itinéraire
+    
+    Returns:
+        Tableau de len(points) - 1 distances
+    """
+    if len(points) < 2:
+        return np.zeros(0)
+    latitudes, longitudes = coordonnees_points(points)
+    return distances_haversine(latitudes[:-1], longitudes[:-1], latitudes[1:], longitudes[1:])
+
+def calculer_distance_totale(points: Sequence[Point]) -> float:
+    """
+    Longueur totale (km) d'un itinéraire passant par les points dans l'ordre
+    """
+    return float(calculer_distances_segments(points).sum())
+
+def calculer_matrice_distances(points_a: Sequence[Point], points_b: Sequence[Point] = None) -> "np.ndarray":
+    """
+    Matrice des distances (km) entre deux listes de points
+    
+    Args:
+        points_a: Points des lignes
+        points_b: Points des colonnes (défaut: points_a)
+        
+    Returns:
+        Tableau (len(points_a), len(points_b))
+    """
+    lats_a, lons_a = coordonnees_points(points_a)
+    if points_b is None:
+        lats_b, lons_b = lats_a, lons_a
+    else:
+        lats_b, lons_b = coordonnees_points(points_b)
+    return matrice_distances(lats_a, lons_a, lats_b, lons_b)
+
 def calculer_duree_estimee(distance_km: float, vitesse_moyenne_kmh: float = 25.0) -> float:
     """
     Calcule la durée estimée en minutes pour parcourir une distance
@@ -59,28 +186,16 @@ def generer_points_intermediaires(depart: Point, arrivee: Point, nb_points: int
     Returns:
         Liste des points intermédiaires
     """
-    points = []
+    ratios = np.arange(1, nb_points + 1) / (nb_points + 1)
     
-    for i in range(1, nb_points + 1):
-        ratio = i / (nb_points + 1)
-        
-        # Interpolation linéaire
-        lat = depart.latitude + (arrivee.latitude - depart.latitude) * ratio
-        lon = depart.longitude + (arrivee.longitude - depart.longitude) * ratio
-        
-        # Ajouter une variation sinusoïdale pour simuler des routes
-        variation_lat = math.sin(ratio * math.pi) * 0.002
-        variation_lon = math.cos(ratio * math.pi) * 0.002
-        
-        point_intermediaire = Point(
-            nom=f"Étape {i}",
-            latitude=lat + variation_lat,
-            longitude=lon + variation_lon,
-            type_point="intermediaire"
-        )
-        points.append(point_intermediaire)
-    
-    return points
+    # Interpolation linéaire et variation sinusoïdale pour simuler des routes
+    latitudes = depart.latitude + (arrivee.latitude - depart.latitude) * ratios + np.sin(ratios * math.pi) * 0.002
+    longitudes = depart.longitude + (arrivee.longitude - depart.longitude) * ratios + np.cos(ratios * math.pi) * 0.002
+    
+    return [
+        Point(f"Étape {i}", lat, lon, "intermediaire")
+        for i, (lat, lon) in enumerate(zip(latitudes.tolist(), longitudes.tolist()), start=1)
+    ]
 
 def formater_duree(minutes: float) -> str:
     """
@@ -0,0 +1,511 @@
+"""
+Hiérarchie de contraction du graphe routier - VERSION KINSHASA
+
+Prétraitement hors ligne du GrapheRoutier : les nœuds sont contractés un à
+un (du moins important au plus important) en ajoutant des raccourcis qui
+préservent les plus courts chemins entre les nœuds restants. Une requête
+est ensuite une recherche bidirectionnelle qui ne monte que vers des nœuds
+de rang supérieur : quelques centaines de nœuds visités au lieu de
+plusieurs dizaines de milliers pour A*.
+    
+    python -m services.hierarchie_routiere
+    python -m services.hierarchie_routiere data/reseau_routier.npz --banc 500
+"""
+import argparse
+import heapq
+import math
+import os
+import random
+import statistics
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+# Imports absolus
+from utils.config import config
+from services.graphe_routier import GrapheRoutier
+from utils.paresseux import module_paresseux
+
+np = module_paresseux("numpy")
+
+# Nœuds visités au plus par recherche de témoin : au-delà, le raccourci est
+# ajouté par prudence (correct, seulement un peu plus de raccourcis)
+LIMITE_TEMOINS = 100
+
+def signature_graphe(graphe: GrapheRoutier) -> "np.ndarray":
+    """Identifie le graphe (taille et durées des arcs) auquel une hiérarchie correspond"""
+    durees = np.ascontiguousarray(graphe.durees_s, dtype=np.float64)
+    cibles = np.ascontiguousarray(graphe.cibles, dtype=np.int64)
+    controle = zlib.crc32(cibles.tobytes(), zlib.crc32(durees.tobytes()))
+    return np.array([graphe.nombre_noeuds, graphe.nombre_arcs, controle], dtype=np.int64)
+
+class HierarchieContraction:
+    """
+    Graphes montants d'une hiérarchie de contraction
+    
+    - av_* : arcs u → v avec rang(v) > rang(u), parcourus depuis la source
+    - ar_* : arcs v → u du graphe d'origine avec rang(v) > rang(u), rangés
+      sous u et parcourus depuis la cible
+    Chaque arête porte un identifiant : arc du graphe d'origine
+    (aretes_arcs >= 0) ou raccourci formé de deux arêtes (aretes_enfants).
+    """
+    
+    CHAMPS = ("signature", "rangs", "av_debuts", "av_cibles", "av_poids", "av_aretes",
+              "ar_debuts", "ar_cibles", "ar_poids", "ar_aretes",
+              "aretes_arcs", "aretes_enfants1", "aretes_enfants2")
+    
+    def __init__(self, signature, rangs, av_debuts, av_cibles, av_poids, av_aretes,
+                 ar_debuts, ar_cibles, ar_poids, ar_aretes,
+                 aretes_arcs, aretes_enfants1, aretes_enfants2):
+        self.signature = signature
+        self.rangs = rangs
+        self.av_debuts = av_debuts
+        self.av_cibles = av_cibles
+        self.av_poids = av_poids
+        self.av_aretes = av_aretes
+        self.ar_debuts = ar_debuts
+        self.ar_cibles = ar_cibles
+        self.ar_poids = ar_poids
+        self.ar_aretes = ar_aretes
+        self.aretes_arcs = aretes_arcs
+        self.aretes_enfants1 = aretes_enfants1
+        self.aretes_enfants2 = aretes_enfants2
+        self._listes = None
+        self._longueurs = None
+    
+    @property
+    def nombre_raccourcis(self) -> int:
+        return int(np.count_nonzero(self.aretes_arcs < 0))
+    
+    def __repr__(self) -> str:
+        return f"HierarchieContraction({len(self.rangs)} nœuds, {self.nombre_raccourcis} raccourcis)"
+    
+    def correspond(self, graphe: GrapheRoutier) -> bool:
+        """True si la hiérarchie a été construite pour ce graphe"""
+        return bool(np.array_equal(self.signature, signature_graphe(graphe)))
+    
+    def enregistrer(self, fichier: str):
+        """Enregistre la hiérarchie (.npz), via un fichier temporaire remplacé atomiquement"""
+        dossier = os.path.dirname(fichier)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        temporaire = f"{fichier}.{os.getpid()}.tmp"
+        with open(temporaire, 'wb') as f:
+            np.savez(f, **{champ: getattr(self, champ) for champ in self.CHAMPS})
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporaire, fichier)
+    
+    @classmethod
+    def charger(cls, fichier: str) -> "HierarchieContraction":
+        """Recharge une hiérarchie enregistrée par enregistrer"""
+        with np.load(fichier) as donnees:
+            return cls(**{champ: donnees[champ] for champ in cls.CHAMPS})
+    
+    def _preparer(self):
+        """
+        Adjacences des deux graphes montants en listes Python de tuples
+        (voisin, poids, arête) par nœud, et arêtes dépliables
+        
+        La préparation (une fois, au premier itinéraire) coûte environ deux
+        secondes pour 100 000 nœuds ; le parcours de tuples est ensuite bien
+        plus rapide que l'indexation de tableaux.
+        """
+        if self._listes is None:
+            self._listes = (
+                self._adjacences(self.av_debuts, self.av_cibles, self.av_poids, self.av_aretes),
+                self._adjacences(self.ar_debuts, self.ar_cibles, self.ar_poids, self.ar_aretes),
+                self.aretes_arcs.tolist(), self.aretes_enfants1.tolist(), self.aretes_enfants2.tolist()
+            )
+        return self._listes
+    
+    @staticmethod
+    def _adjacences(debuts, cibles, poids, aretes) -> List[List[Tuple[int, float, int]]]:
+        tuples = list(zip(cibles.tolist(), poids.tolist(), aretes.tolist()))
+        debuts = debuts.tolist()
+        return [tuples[debut:fin] for debut, fin in zip(debuts, debuts[1:])]
+    
+    def plus_court_chemin(self, source: int, cible: int,
+                          cibles_arcs: List[int]) -> Optional[Tuple[List[int], List[int], float]]:
+        """
+        Chemin le plus rapide entre deux nœuds (Dijkstra bidirectionnel
+        montant ; un nœud atteint plus vite depuis un nœud de rang supérieur
+        n'est pas développé)
+        
+        Args:
+            source: Nœud de départ
+            cible: Nœud d'arrivée
+            cibles_arcs: Nœud d'arrivée de chaque arc du graphe d'origine
+            
+        Returns:
+            (nœuds, arcs, durée en secondes) comme GrapheRoutier.plus_court_chemin,
+            ou None si la cible est inaccessible
+        """
+        montants_av, montants_ar, _, _, _ = self._preparer()
+        infini = math.inf
+        empiler, depiler = heapq.heappush, heapq.heappop
+        distances = ({source: 0.0}, {cible: 0.0})
+        precedents = ({source: (-1, -1)}, {cible: (-1, -1)})
+        tas = ([(0.0, source)], [(0.0, cible)])
+        # Les arcs montants d'une recherche sont les arcs « descendants » de l'autre
+        adjacences = (montants_av, montants_ar)
+        meilleure, milieu = infini, -1
+        sens = 0
+        while True:
+            # Alternance des deux recherches ; chacune s'arrête dès que son
+            # prochain nœud ne peut plus améliorer le meilleur chemin
+            file = tas[sens]
+            if not (file and file[0][0] < meilleure):
+                sens ^= 1
+                file = tas[sens]
+                if not (file and file[0][0] < meilleure):
+                    break
+            duree_u, u = depiler(file)
+            connues = distances[sens]
+            if duree_u > connues[u]:
+                continue
+            opposees = distances[sens ^ 1]
+            if u in opposees and duree_u + opposees[u] < meilleure:
+                meilleure, milieu = duree_u + opposees[u], u
+                
+            # Nœud atteint plus vite depuis un nœud de rang supérieur : non développé
+            duree_connue = connues.get
+            for x, poids, _ in adjacences[sens ^ 1][u]:
+                if duree_connue(x, infini) + poids < duree_u:
+                    break
+            else:
+                precedents_sens = precedents[sens]
+                for v, poids, arete in adjacences[sens][u]:
+                    duree_v = duree_u + poids
+                    if duree_v < duree_connue(v, infini):
+                        connues[v] = duree_v
+                        precedents_sens[v] = (u, arete)
+                        empiler(file, (duree_v, v))
+            sens ^= 1
+            
+        if milieu < 0:
+            return None
+        arcs = self._deplier(self._aretes_chemin(precedents[0], milieu)[::-1] +
+                             self._aretes_chemin(precedents[1], milieu))
+        return [source] + [cibles_arcs[arc] for arc in arcs], arcs, meilleure
+    
+    def matrice(self, sources: List[int], cibles: List[int],
+                longueurs_m: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Durées et distances de chaque source vers chaque cible (plusieurs
+        vers plusieurs) : une recherche montante par cible dépose ses nœuds
+        dans des seaux, puis la recherche montante de chaque source les relève
+        
+        Args:
+            sources: Nœuds de départ
+            cibles: Nœuds d'arrivée
+            longueurs_m: Longueur de chaque arc du graphe d'origine
+            
+        Returns:
+            (durées en secondes, distances en mètres), tableaux (sources, cibles) ;
+            inf pour une cible inaccessible
+        """
+        montants_av, montants_ar, _, _, _ = self._preparer()
+        longueurs = self._longueurs_aretes(longueurs_m)
+        seaux: Dict[int, List[Tuple[int, float, float]]] = {}
+        for j, cible in enumerate(cibles):
+            for u, duree, distance in self._recherche_montante(cible, montants_ar, montants_av, longueurs):
+                seaux.setdefault(u, []).append((j, duree, distance))
+                
+        durees = np.full((len(sources), len(cibles)), np.inf)
+        distances = np.full((len(sources), len(cibles)), np.inf)
+        for i, source in enumerate(sources):
+            ligne_durees, ligne_distances = durees[i].tolist(), distances[i].tolist()
+            for u, duree, distance in self._recherche_montante(source, montants_av, montants_ar, longueurs):
+                for j, duree_j, distance_j in seaux.get(u, ()):
+                    if duree + duree_j < ligne_durees[j]:
+                        ligne_durees[j] = duree + duree_j
+                        ligne_distances[j] = distance + distance_j
+            durees[i], distances[i] = ligne_durees, ligne_distances
+        return durees, distances
+    
+    @staticmethod
+    def _recherche_montante(origine: int, montants, descendants,
+                            longueurs: List[float]) -> List[Tuple[int, float, float]]:
+        """Espace de recherche montant complet : (nœud, durée, distance) des nœuds non arrêtés"""
+        infini = math.inf
+        connues = {origine: (0.0, 0.0)}
+        tas = [(0.0, origine)]
+        espace = []
+        while tas:
+            duree_u, u = heapq.heappop(tas)
+            duree_connue, distance_u = connues[u]
+            if duree_u > duree_connue:
+                continue
+            if any(connues.get(x, (infini,))[0] + poids < duree_u for x, poids, _ in descendants[u]):
+                continue
+            espace.append((u, duree_u, distance_u))
+            for v, poids, arete in montants[u]:
+                duree_v = duree_u + poids
+                if duree_v < connues.get(v, (infini,))[0]:
+                    connues[v] = (duree_v, distance_u + longueurs[arete])
+                    heapq.heappush(tas, (duree_v, v))
+        return espace
+    
+    def _longueurs_aretes(self, longueurs_m: "np.ndarray") -> List[float]:
+        """Longueur (m) de chaque arête : arc d'origine, ou somme des deux arêtes d'un raccourci"""
+        if self._longueurs is None:
+            _, _, _, enfants1, enfants2 = self._preparer()
+            longueurs = np.where(self.aretes_arcs >= 0, longueurs_m[np.maximum(self.aretes_arcs, 0)], 0.0).tolist()
+            # Un raccourci est toujours créé après ses deux arêtes (indices inférieurs)
+            for arete in np.flatnonzero(self.aretes_arcs < 0).tolist():
+                longueurs[arete] = longueurs[enfants1[arete]] + longueurs[enfants2[arete]]
+            self._longueurs = longueurs
+        return self._longueurs
+    
+    @staticmethod
+    def _aretes_chemin(precedents: Dict[int, Tuple[int, int]], noeud: int) -> List[int]:
+        """Arêtes remontées depuis noeud jusqu'à l'origine d'une des deux recherches"""
+        aretes = []
+        noeud, arete = precedents[noeud]
+        while arete >= 0:
+            aretes.append(arete)
+            noeud, arete = precedents[noeud]
+        return aretes
+    
+    def _deplier(self, aretes: List[int]) -> List[int]:
+        """Remplace récursivement chaque raccourci par ses deux arêtes, jusqu'aux arcs d'origine"""
+        *_, aretes_arcs, enfants1, enfants2 = self._preparer()
+        arcs = []
+        pile = aretes[::-1]
+        while pile:
+            arete = pile.pop()
+            arc = aretes_arcs[arete]
+            if arc >= 0:
+                arcs.append(arc)
+            else:
+                pile.append(enfants2[arete])
+                pile.append(enfants1[arete])
+        return arcs
+
+class _Contraction:
+    """État de la contraction : graphe restant (dictionnaires d'adjacence) et arêtes créées"""
+    
+    def __init__(self, graphe: GrapheRoutier, limite_temoins: int):
+        n = graphe.nombre_noeuds
+        self.limite_temoins = limite_temoins
+        self.sortants: List[Dict[int, int]] = [{} for _ in range(n)]
+        self.entrants: List[Dict[int, int]] = [{} for _ in range(n)]
+        self.poids: List[float] = []
+        self.arcs: List[int] = []
+        self.enfants1: List[int] = []
+        self.enfants2: List[int] = []
+        self.supprimes = [0] * n
+        self.niveaux = [0] * n
+        
+        debuts, cibles, durees = graphe.debuts.tolist(), graphe.cibles.tolist(), graphe.durees_s.tolist()
+        for u in range(n):
+            for arc in range(debuts[u], debuts[u + 1]):
+                self.relier(u, cibles[arc], durees[arc], arc, -1, -1)
+    
+    def relier(self, u: int, v: int, poids: float, arc: int, enfant1: int, enfant2: int):
+        """Arête u → v, sauf si une arête au moins aussi courte existe déjà"""
+        existante = self.sortants[u].get(v)
+        if existante is not None and self.poids[existante] <= poids:
+            return
+        arete = len(self.poids)
+        self.poids.append(poids)
+        self.arcs.append(arc)
+        self.enfants1.append(enfant1)
+        self.enfants2.append(enfant2)
+        self.sortants[u][v] = arete
+        self.entrants[v][u] = arete
+    
+    def _temoins(self, u: int, exclu: int, maximum: float, cibles: set) -> Dict[int, float]:
+        """Dijkstra limité depuis u sans passer par exclu (arrêt : cibles atteintes, maximum ou limite)"""
+        sortants, poids = self.sortants, self.poids
+        distances = {u: 0.0}
+        tas = [(0.0, u)]
+        restantes = len(cibles)
+        visites = 0
+        while tas and restantes and visites < self.limite_temoins:
+            duree, x = heapq.heappop(tas)
+            if duree > distances[x]:
+                continue
+            if duree > maximum:
+                break
+            visites += 1
+            if x in cibles:
+                restantes -= 1
+            for y, arete in sortants[x].items():
+                if y == exclu:
+                    continue
+                duree_y = duree + poids[arete]
+                if duree_y < distances.get(y, math.inf):
+                    distances[y] = duree_y
+                    heapq.heappush(tas, (duree_y, y))
+        return distances
+    
+    def raccourcis(self, v: int) -> List[Tuple[int, int, float, int, int]]:
+        """Raccourcis (u, w, poids, arête u→v, arête v→w) nécessaires pour contracter v"""
+        poids = self.poids
+        sortants_v = self.sortants[v]
+        raccourcis = []
+        for u, arete_entree in self.entrants[v].items():
+            poids_entree = poids[arete_entree]
+            via = {w: poids_entree + poids[arete_sortie] for w, arete_sortie in sortants_v.items() if w != u}
+            if not via:
+                continue
+            distances = self._temoins(u, v, max(via.values()), set(via))
+            for w, poids_via in via.items():
+                if distances.get(w, math.inf) > poids_via:
+                    raccourcis.append((u, w, poids_via, arete_entree, sortants_v[w]))
+        return raccourcis
+    
+    def priorite(self, v: int, raccourcis: list) -> int:
+        """Différence d'arêtes, voisins déjà contractés et niveau : les nœuds peu utiles d'abord"""
+        difference = len(raccourcis) - len(self.entrants[v]) - len(self.sortants[v])
+        return 2 * difference + self.supprimes[v] + self.niveaux[v]
+    
+    def contracter(self, v: int, raccourcis: list) -> Tuple[Dict[int, int], Dict[int, int]]:
+        """Retire v du graphe restant ; retourne ses arêtes sortantes et entrantes (toutes montantes)"""
+        for u, w, poids, arete_entree, arete_sortie in raccourcis:
+            self.relier(u, w, poids, -1, arete_entree, arete_sortie)
+        sortants, entrants = self.sortants[v], self.entrants[v]
+        niveau = self.niveaux[v] + 1
+        for voisin in set(sortants) | set(entrants):
+            self.sortants[voisin].pop(v, None)
+            self.entrants[voisin].pop(v, None)
+            self.supprimes[voisin] += 1
+            self.niveaux[voisin] = max(self.niveaux[voisin], niveau)
+        self.sortants[v], self.entrants[v] = {}, {}
+        return sortants, entrants
+
+def construire_hierarchie(graphe: GrapheRoutier, limite_temoins: int = LIMITE_TEMOINS,
+                          afficher: bool = False) -> HierarchieContraction:
+    """
+    Contracte tous les nœuds du graphe (ordre par priorité, mise à jour paresseuse)
+    
+    Args:
+        graphe: Graphe routier compilé
+        limite_temoins: Nœuds visités au plus par recherche de témoin
+        afficher: Afficher l'avancement
+        
+    Returns:
+        Hiérarchie prête pour les requêtes
+    """
+    n = graphe.nombre_noeuds
+    contraction = _Contraction(graphe, limite_temoins)
+    tas = [(contraction.priorite(v, contraction.raccourcis(v)), v) for v in range(n)]
+    heapq.heapify(tas)
+    
+    rangs = [0] * n
+    montants_av = [None] * n
+    montants_ar = [None] * n
+    rang = 0
+    debut = time.perf_counter()
+    while tas:
+        _, v = heapq.heappop(tas)
+        # Priorité recalculée au dépilement : si elle a augmenté au-delà du
+        # prochain candidat, le nœud est remis dans le tas
+        raccourcis = contraction.raccourcis(v)
+        priorite = contraction.priorite(v, raccourcis)
+        if tas and priorite > tas[0][0]:
+            heapq.heappush(tas, (priorite, v))
+            continue
+        montants_av[v], montants_ar[v] = contraction.contracter(v, raccourcis)
+        rangs[v] = rang
+        rang += 1
+        if afficher and rang % 20000 == 0:
+            print(f"   {rang}/{n} nœuds contractés ({time.perf_counter() - debut:.0f} s)")
+            
+    av = _csr(montants_av, contraction.poids)
+    ar = _csr(montants_ar, contraction.poids)
+    return HierarchieContraction(
+        signature_graphe(graphe), np.array(rangs, dtype=np.int64), *av, *ar,
+        np.array(contraction.arcs, dtype=np.int64),
+        np.array(contraction.enfants1, dtype=np.int64),
+        np.array(contraction.enfants2, dtype=np.int64)
+    )
+
+def _csr(adjacences: List[Dict[int, int]], poids: List[float]):
+    """(debuts, cibles, poids, aretes) des listes d'adjacence {voisin: arête}"""
+    debuts = np.zeros(len(adjacences) + 1, dtype=np.int64)
+    debuts[1:] = np.cumsum([len(adjacence) for adjacence in adjacences])
+    cibles = np.fromiter((v for adjacence in adjacences for v in adjacence), dtype=np.int64, count=int(debuts[-1]))
+    aretes = np.fromiter((a for adjacence in adjacences for a in adjacence.values()), dtype=np.int64,
+                         count=int(debuts[-1]))
+    return debuts, cibles, np.asarray(poids, dtype=np.float64)[aretes], aretes
+
+def charger_hierarchie(graphe: GrapheRoutier, fichier: str = None) -> Optional[HierarchieContraction]:
+    """
+    Charge la hiérarchie du graphe (défaut: config.FICHIER_HIERARCHIE_ROUTIERE)
+    
+    Returns:
+        La hiérarchie, ou None si elle est absente, illisible ou construite
+        pour un autre graphe
+    """
+    fichier = fichier or config.FICHIER_HIERARCHIE_ROUTIERE
+    if not os.path.exists(fichier):
+        return None
+    try:
+        hierarchie = HierarchieContraction.charger(fichier)
+    except Exception as e:
+        print(f"⚠️  Hiérarchie routière illisible ({fichier}): {e}")
+        return None
+    if not hierarchie.correspond(graphe):
+        print(f"⚠️  Hiérarchie routière périmée ({fichier}), recherche A* utilisée")
+        return None
+    return hierarchie
+
+def comparer(graphe: GrapheRoutier, hierarchie: HierarchieContraction, nombre: int = 200,
+             graine: int = 0) -> Dict[str, float]:
+    """
+    Banc d'essai : mêmes paires de nœuds aléatoires avec A* puis avec la
+    hiérarchie (attachée au graphe)
+    
+    Returns:
+        Temps médians et 95e centiles (ms), et nombre de durées différentes
+    """
+    tirage = random.Random(graine)
+    paires = [(tirage.randrange(graphe.nombre_noeuds), tirage.randrange(graphe.nombre_noeuds)) for _ in range(nombre)]
+    graphe.hierarchie = hierarchie
+    graphe.plus_court_chemin(0, 0)  # préparation des listes hors chronométrage
+    temps = {"astar": [], "hierarchie": []}
+    chemins = {"astar": [], "hierarchie": []}
+    for methode, recherche in (("astar", graphe.plus_court_chemin_astar), ("hierarchie", graphe.plus_court_chemin)):
+        for source, cible in paires:
+            debut = time.perf_counter()
+            chemins[methode].append(recherche(source, cible))
+            temps[methode].append((time.perf_counter() - debut) * 1000)
+    differences = sum(
+        (reference is None) != (resultat is None) or (reference is not None and abs(reference[2] - resultat[2]) > 1e-6)
+        for reference, resultat in zip(chemins["astar"], chemins["hierarchie"])
+    )
+    
+    resume = {"differences": differences}
+    for methode, valeurs in temps.items():
+        valeurs.sort()
+        resume[f"{methode}_median_ms"] = statistics.median(valeurs)
+        resume[f"{methode}_p95_ms"] = valeurs[min(len(valeurs) - 1, int(0.95 * len(valeurs)))]
+    return resume
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit la hiérarchie de contraction du graphe routier")
+    parser.add_argument("graphe", nargs="?", default=config.FICHIER_GRAPHE_ROUTIER, help="Graphe compilé (.npz)")
+    parser.add_argument("destination", nargs="?", default=config.FICHIER_HIERARCHIE_ROUTIERE,
+                        help="Hiérarchie (.npz)")
+    parser.add_argument("--banc", type=int, default=0, metavar="N",
+                        help="Comparer ensuite N requêtes aléatoires avec A*")
+    args = parser.parse_args()
+    
+    graphe = GrapheRoutier.charger(args.graphe)
+    debut = time.perf_counter()
+    hierarchie = construire_hierarchie(graphe, afficher=True)
+    hierarchie.enregistrer(args.destination)
+    print(f"✅ {hierarchie} construite en {time.perf_counter() - debut:.1f} s → {args.destination}")
+    
+    if args.banc:
+        resume = comparer(graphe, hierarchie, args.banc)
+        print(f"⏱️  A*: médiane {resume['astar_median_ms']:.2f} ms, 95e centile {resume['astar_p95_ms']:.2f} ms")
+        print(f"⏱️  Hiérarchie: médiane {resume['hierarchie_median_ms']:.3f} ms, "
+              f"95e centile {resume['hierarchie_p95_ms']:.3f} ms")
+        print(f"{'✅' if not resume['differences'] else '❌'} {resume['differences']} durée(s) différente(s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,543 @@
+"""
+Import en flux de points d'intérêt et d'arrêts de bus (GeoJSON, CSV, OSM XML) - VERSION KINSHASA
+
+Les fichiers sont lus enregistrement par enregistrement, jamais chargés en
+entier ; les points sont dédoublonnés par nom et proximité, classés d'après
+leurs étiquettes puis écrits par lots dans le gestionnaire de données.
+
+    python -m services.import_points kinshasa.osm
+    python -m services.import_points arrets.csv --rayon-doublon 30
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Imports absolus
+from core.etat import Point
+from utils.config import config
+from utils.helpers import calculer_distance_haversine_coords
+from services.gazetteer import normaliser_nom
+
+# Enregistrement lu : (nom, latitude, longitude, étiquettes)
+Enregistrement = Tuple[str, float, float, Dict[str, str]]
+
+TYPE_ARRET_BUS = "arret_bus"
+TYPE_PAR_DEFAUT = "poi"
+
+# (clé, valeur ou None pour toute valeur, type_point) : la première correspondance l'emporte
+CORRESPONDANCES_TYPES = (
+    ("highway", "bus_stop", TYPE_ARRET_BUS),
+    ("amenity", "bus_station", TYPE_ARRET_BUS),
+    ("public_transport", "platform", TYPE_ARRET_BUS),
+    ("public_transport", "stop_position", TYPE_ARRET_BUS),
+    ("railway", "station", "gare"),
+    ("amenity", "marketplace", "marche"),
+    ("amenity", "hospital", "hopital"),
+    ("amenity", "clinic", "hopital"),
+    ("amenity", "university", "universite"),
+    ("amenity", "college", "universite"),
+    ("amenity", "school", "ecole"),
+    ("amenity", "place_of_worship", "lieu_de_culte"),
+    ("amenity", "bank", "banque"),
+    ("amenity", "fuel", "station_service"),
+    ("amenity", "police", "police"),
+    ("amenity", "townhall", "administration"),
+    ("office", "government", "administration"),
+    ("leisure", "stadium", "stade"),
+    ("tourism", "museum", "musee"),
+    ("tourism", "hotel", "hotel"),
+    ("historic", None, "monument"),
+    ("shop", None, "commerce"),
+    ("amenity", None, "service"),
+    ("tourism", None, "tourisme"),
+    ("leisure", None, "loisirs"),
+    ("place", None, "localite"),
+)
+
+# Étiquettes donnant la commune, par ordre de préférence
+ETIQUETTES_COMMUNE = ("commune", "addr:commune", "is_in:commune", "addr:district", "addr:suburb")
+ETIQUETTES_NOM = ("nom", "name:fr", "name")
+COLONNES_LATITUDE = ("latitude", "lat", "y")
+COLONNES_LONGITUDE = ("longitude", "lon", "lng", "x")
+
+# Premier objet d'un GeoJSON examiné en entier au-delà duquel on le lit en flux
+TAILLE_MAX_OBJET_UNIQUE = 1 << 20
+
+@dataclass
+class ProgressionImport:
+    """Compteurs d'un import en cours ou terminé"""
+    fichier: str
+    taille_octets: int
+    octets_lus: int = 0
+    lus: int = 0
+    importes: int = 0
+    arrets_bus: int = 0
+    doublons: int = 0
+    ignores: int = 0
+    debut: float = 0.0
+    duree_s: float = 0.0
+    
+    @property
+    def debit(self) -> float:
+        """Enregistrements lus par seconde"""
+        return self.lus / self.duree_s if self.duree_s > 0 else 0.0
+    
+    @property
+    def pourcentage(self) -> float:
+        """Part du fichier lue"""
+        return 100.0 * self.octets_lus / self.taille_octets if self.taille_octets else 100.0
+    
+    def __str__(self) -> str:
+        return (f"📥 {self.pourcentage:5.1f}% - {self.lus} lus, {self.importes} importés "
+                f"(dont {self.arrets_bus} arrêts), {self.doublons} doublons, {self.ignores} ignorés "
+                f"- {self.debit:.0f} enr/s")
+
+class _FluxCompte(io.RawIOBase):
+    """Fichier binaire comptant les octets lus (pour la progression)"""
+    
+    def __init__(self, fichier):
+        self._fichier = fichier
+        self.octets_lus = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, tampon) -> int:
+        lus = self._fichier.readinto(tampon)
+        self.octets_lus += lus or 0
+        return lus
+
+def _etiquette(etiquettes: Dict[str, str], cles: Tuple[str, ...]) -> Optional[str]:
+    for cle in cles:
+        valeur = etiquettes.get(cle)
+        if valeur:
+            return str(valeur).strip()
+    return None
+
+def classer(etiquettes: Dict[str, str], defaut: Optional[str] = TYPE_PAR_DEFAUT) -> Optional[str]:
+    """
+    Détermine le type_point d'après les étiquettes (OSM ou colonnes)
+    
+    Args:
+        etiquettes: Étiquettes de l'enregistrement ("type_point" est prioritaire)
+        defaut: Type si aucune correspondance (None = enregistrement ignoré)
+        
+    Returns:
+        Type de point ou None
+    """
+    if etiquettes.get("type_point"):
+        return etiquettes["type_point"]
+    for cle, valeur, type_point in CORRESPONDANCES_TYPES:
+        trouvee = etiquettes.get(cle)
+        if trouvee and (valeur is None or trouvee == valeur):
+            return type_point
+    return defaut
+
+def _centre_geometrie(geometrie: Dict) -> Optional[Tuple[float, float]]:
+    """(latitude, longitude) d'un point, ou moyenne des sommets d'une autre géométrie"""
+    if not geometrie or "coordinates" not in geometrie:
+        return None
+    if geometrie.get("type") == "Point":
+        longitude, latitude = geometrie["coordinates"][:2]
+        return float(latitude), float(longitude)
+        
+    sommets = []
+    pile = [geometrie["coordinates"]]
+    while pile:
+        element = pile.pop()
+        if element and isinstance(element[0], (int, float)):
+            sommets.append(element)
+        else:
+            pile.extend(element)
+    if not sommets:
+        return None
+    return (sum(sommet[1] for sommet in sommets) / len(sommets),
+            sum(sommet[0] for sommet in sommets) / len(sommets))
+
+def objets_geojson(flux: io.TextIOBase, taille_bloc: int = 1 << 16) -> Iterator[Dict]:
+    """
+    Features d'un GeoJSON lues une à une
+    
+    Accepte une FeatureCollection (tableau "features" lu en flux) ou une
+    suite de Features (GeoJSON Lines / séquence RFC 8142).
+    """
+    decodeur = json.JSONDecoder()
+    tampon = ""
+    position = 0
+    termine = False
+    
+    def completer(taille: int = taille_bloc):
+        nonlocal tampon, position, termine
+        tampon = tampon[position:]
+        position = 0
+        bloc = flux.read(taille)
+        if not bloc:
+            termine = True
+        tampon += bloc
+    
+    def valeur_suivante() -> Optional[Dict]:
+        """Décode la valeur JSON suivante (None en fin de flux ou de tableau)"""
+        nonlocal position
+        while True:
+            while position < len(tampon) and tampon[position] in " \t\r\n,\x1e":
+                position += 1
+            if position >= len(tampon):
+                if termine:
+                    return None
+                completer()
+                continue
+            if tampon[position] == "]":
+                position += 1
+                return None
+            try:
+                valeur, position = decodeur.raw_decode(tampon, position)
+                return valeur
+            except json.JSONDecodeError:
+                if termine:
+                    raise
+                # Objet incomplet : lire au moins autant que ce qui est en tampon
+                completer(max(taille_bloc, len(tampon)))
+    
+    # Lecture dans le premier objet sans rien retirer du tampon avant lui
+    # (position reste au début de l'objet ; les indices suivent ses décalages)
+    def caractere(indice: int) -> Tuple[str, int]:
+        """Premier caractère significatif à partir d'indice ("" en fin de flux)"""
+        while True:
+            while indice < len(tampon) and tampon[indice] in " \t\r\n\x1e":
+                indice += 1
+            if indice < len(tampon):
+                return tampon[indice], indice
+            if termine:
+                return "", indice
+            decalage = position
+            completer()
+            indice -= decalage
+    
+    def decoder(indice: int) -> Tuple[object, int]:
+        """Valeur JSON commençant à indice, tampon complété jusqu'à la lire en entier"""
+        while True:
+            try:
+                return decodeur.raw_decode(tampon, indice)
+            except json.JSONDecodeError:
+                if termine:
+                    raise
+                decalage = position
+                completer(max(taille_bloc, len(tampon)))
+                indice -= decalage
+    
+    def ouvrir_features() -> bool:
+        """
+        Parcourt les clés de premier niveau du premier objet : True (position
+        au début du tableau) s'il a un tableau "features", False sinon
+        """
+        nonlocal position
+        signe, position = caractere(position)
+        if signe != "{":
+            return False
+        indice = position + 1
+        while True:
+            signe, indice = caractere(indice)
+            if signe != '"':
+                return False
+            cle, indice = decoder(indice)
+            signe, indice = caractere(indice)
+            if signe != ":":
+                return False
+            signe, indice = caractere(indice + 1)
+            if cle == "features" and signe == "[":
+                position = indice + 1
+                return True
+            _, indice = decoder(indice)
+            signe, indice = caractere(indice)
+            if signe != ",":
+                return False
+            indice += 1
+                
+    # Premier objet décodé en entier s'il est de taille raisonnable
+    premier = None
+    completer()
+    while True:
+        while position < len(tampon) and tampon[position] in " \t\r\n\x1e":
+            position += 1
+        try:
+            premier, fin = decodeur.raw_decode(tampon, position)
+            break
+        except json.JSONDecodeError:
+            if termine or len(tampon) >= TAILLE_MAX_OBJET_UNIQUE:
+                break
+            completer(len(tampon))
+            
+    if isinstance(premier, dict) and premier.get("type") == "FeatureCollection":
+        yield from premier.get("features", [])
+        return
+    if premier is None:
+        if position >= len(tampon) and termine:
+            return
+        if ouvrir_features():
+            # Grande FeatureCollection : tableau "features" lu en flux
+            while True:
+                objet = valeur_suivante()
+                if objet is None:
+                    return
+                yield objet
+        # Grande Feature en tête d'une suite de Features : lue en entier
+        premier, fin = decoder(position)
+        
+    # Suite de Features indépendantes
+    position = fin
+    while premier is not None:
+        yield premier
+        premier = valeur_suivante()
+
+def lire_geojson(flux: io.TextIOBase) -> Iterator[Optional[Enregistrement]]:
+    """Enregistrements d'un GeoJSON (None pour une feature inexploitable)"""
+    for feature in objets_geojson(flux):
+        proprietes = feature.get("properties") or {}
+        centre = _centre_geometrie(feature.get("geometry"))
+        nom = _etiquette(proprietes, ETIQUETTES_NOM)
+        if centre is None or not nom:
+            yield None
+            continue
+        etiquettes = {cle: str(valeur) for cle, valeur in proprietes.items() if valeur is not None}
+        yield nom, centre[0], centre[1], etiquettes
+
+def lire_csv(flux: io.TextIOBase) -> Iterator[Optional[Enregistrement]]:
+    """Enregistrements d'un CSV (séparateur , ou ; ; colonnes lat/lon/nom au choix)"""
+    entete = flux.readline()
+    separateur = ";" if entete.count(";") > entete.count(",") else ","
+    colonnes = next(csv.reader([entete], delimiter=separateur))
+    minuscules = [colonne.strip().lower() for colonne in colonnes]
+    
+    def colonne(candidats: Tuple[str, ...]) -> Optional[int]:
+        for candidat in candidats:
+            if candidat in minuscules:
+                return minuscules.index(candidat)
+        return None
+        
+    indice_lat = colonne(COLONNES_LATITUDE)
+    indice_lon = colonne(COLONNES_LONGITUDE)
+    if indice_lat is None or indice_lon is None:
+        raise ValueError(f"Colonnes latitude/longitude introuvables: {colonnes}")
+        
+    for ligne in csv.reader(flux, delimiter=separateur):
+        etiquettes = {minuscules[i]: valeur for i, valeur in enumerate(ligne[:len(minuscules)]) if valeur}
+        nom = _etiquette(etiquettes, ETIQUETTES_NOM)
+        try:
+            latitude = float(ligne[indice_lat].replace(",", "."))
+            longitude = float(ligne[indice_lon].replace(",", "."))
+        except (IndexError, ValueError):
+            yield None
+            continue
+        yield (nom, latitude, longitude, etiquettes) if nom else None
+
+def lire_osm(flux) -> Iterator[Optional[Enregistrement]]:
+    """
+    Nœuds nommés d'un extrait OSM XML (lecture incrémentale)
+    
+    Les chemins et relations sont ignorés : convertir au préalable les
+    bâtiments en nœuds (ex. osmium / osmconvert --all-to-nodes).
+    """
+    racine = None
+    for evenement, element in ET.iterparse(flux, events=("start", "end")):
+        if evenement == "start":
+            if racine is None:
+                racine = element
+            continue
+        if element.tag == "node":
+            etiquettes = {tag.get("k"): tag.get("v") for tag in element.iter("tag")}
+            if etiquettes:
+                nom = _etiquette(etiquettes, ETIQUETTES_NOM)
+                yield (nom, float(element.get("lat")), float(element.get("lon")), etiquettes) if nom else None
+        if element.tag in ("node", "way", "relation"):
+            # Libérer les éléments déjà traités
+            racine.clear()
+
+LECTEURS = {"geojson": lire_geojson, "csv": lire_csv, "osm": lire_osm}
+
+def detecter_format(fichier: str) -> str:
+    """Format d'après l'extension (.geojson/.json/.geojsonl, .csv, .osm/.xml)"""
+    extension = os.path.splitext(fichier)[1].lower()
+    if extension in (".geojson", ".json", ".geojsonl", ".geojsons"):
+        return "geojson"
+    if extension in (".csv", ".txt"):
+        return "csv"
+    if extension in (".osm", ".xml"):
+        return "osm"
+    raise ValueError(f"Format d'import non reconnu: {fichier}")
+
+class ImportateurPoints:
+    """
+    Importe des enregistrements dans un GestionnaireDonnees, par lots
+    
+    Un enregistrement est un doublon s'il existe déjà (dans les données ou
+    dans le fichier en cours d'import) un point de même nom normalisé à moins
+    de rayon_doublon_m mètres. Les positions sont regroupées par nom : seuls
+    les homonymes sont comparés.
+    """
+    
+    def __init__(self, gestionnaire=None, rayon_doublon_m: Optional[float] = None,
+                 taille_lot: Optional[int] = None):
+        if gestionnaire is None:
+            from services.data_manager import gestionnaire_donnees
+            gestionnaire = gestionnaire_donnees
+        self.gestionnaire = gestionnaire
+        self.rayon_doublon_km = (rayon_doublon_m if rayon_doublon_m is not None
+                                 else config.IMPORT_RAYON_DOUBLON_M) / 1000
+        self.taille_lot = taille_lot or config.IMPORT_TAILLE_LOT
+        self._lots: Dict[str, Dict[str, Point]] = {}
+        self.taille_en_attente = 0
+        
+        self._positions: Dict[str, List[Tuple[float, float]]] = {}
+        for points in (gestionnaire.points_interet, gestionnaire.arrets_bus):
+            for point in points.values():
+                self._memoriser(point)
+    
+    def _memoriser(self, point: Point):
+        self._positions.setdefault(normaliser_nom(point.nom), []).append((point.latitude, point.longitude))
+    
+    def _collection(self, categorie: str) -> Dict[str, Point]:
+        from services.data_manager import CATEGORIE_ARRETS_BUS
+        if categorie == CATEGORIE_ARRETS_BUS:
+            return self.gestionnaire.arrets_bus
+        return self.gestionnaire.points_interet
+    
+    def _est_doublon(self, point: Point) -> bool:
+        return any(
+            calculer_distance_haversine_coords(point.latitude, point.longitude, latitude, longitude)
+            <= self.rayon_doublon_km
+            for latitude, longitude in self._positions.get(normaliser_nom(point.nom), ())
+        )
+    
+    def _cle_libre(self, categorie: str, point: Point) -> str:
+        """Nom unique dans la catégorie (homonymes éloignés : commune puis numéro)"""
+        existants = self._collection(categorie)
+        lot = self._lots.get(categorie, {})
+        candidats = [point.nom]
+        if point.commune:
+            candidats.append(f"{point.nom} ({point.commune})")
+        for cle in candidats:
+            if cle not in existants and cle not in lot:
+                return cle
+        numero = 2
+        while f"{point.nom} ({numero})" in existants or f"{point.nom} ({numero})" in lot:
+            numero += 1
+        return f"{point.nom} ({numero})"
+    
+    def ajouter(self, enregistrement: Optional[Enregistrement], progression: ProgressionImport,
+                type_defaut: Optional[str] = TYPE_PAR_DEFAUT) -> bool:
+        """
+        Ajoute un enregistrement au lot en cours
+        
+        Returns:
+            True s'il sera importé (ni ignoré ni doublon)
+        """
+        from services.data_manager import CATEGORIE_ARRETS_BUS, CATEGORIE_POINTS_INTERET
+        
+        progression.lus += 1
+        type_point = classer(enregistrement[3], type_defaut) if enregistrement else None
+        if type_point is None:
+            progression.ignores += 1
+            return False
+            
+        nom, latitude, longitude, etiquettes = enregistrement
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            progression.ignores += 1
+            return False
+        point = Point(nom, latitude, longitude, type_point, _etiquette(etiquettes, ETIQUETTES_COMMUNE))
+        if self._est_doublon(point):
+            progression.doublons += 1
+            return False
+            
+        categorie = CATEGORIE_ARRETS_BUS if type_point == TYPE_ARRET_BUS else CATEGORIE_POINTS_INTERET
+        self._lots.setdefault(categorie, {})[self._cle_libre(categorie, point)] = point
+        self._memoriser(point)
+        self.taille_en_attente += 1
+        progression.importes += 1
+        if categorie == CATEGORIE_ARRETS_BUS:
+            progression.arrets_bus += 1
+        return True
+    
+    def vider(self):
+        """Écrit les lots en attente dans le gestionnaire (une transaction)"""
+        if not self._lots:
+            return
+        with self.gestionnaire.transaction():
+            for categorie, lot in self._lots.items():
+                self.gestionnaire.ajouter_points_en_masse(lot, categorie)
+        self._lots = {}
+        self.taille_en_attente = 0
+
+def importer_fichier(fichier: str, format_fichier: Optional[str] = None, gestionnaire=None,
+                     rayon_doublon_m: Optional[float] = None, taille_lot: Optional[int] = None,
+                     rappel: Optional[Callable[[ProgressionImport], None]] = print) -> ProgressionImport:
+    """
+    Importe un fichier GeoJSON, CSV ou OSM XML dans les données locales
+    
+    Args:
+        fichier: Chemin du fichier
+        format_fichier: "geojson", "csv" ou "osm" (défaut: d'après l'extension)
+        gestionnaire: Gestionnaire de données (défaut: instance globale)
+        rayon_doublon_m: Distance sous laquelle deux lieux homonymes sont fusionnés
+        taille_lot: Nombre de points écrits par lot
+        rappel: Appelé avec la progression après chaque lot (None = silencieux)
+        
+    Returns:
+        Progression finale (compteurs, durée, débit)
+    """
+    format_fichier = format_fichier or detecter_format(fichier)
+    if format_fichier not in LECTEURS:
+        raise ValueError(f"Format d'import inconnu: {format_fichier}")
+    importateur = ImportateurPoints(gestionnaire, rayon_doublon_m, taille_lot)
+    progression = ProgressionImport(fichier, os.path.getsize(fichier), debut=time.perf_counter())
+    # Les nœuds OSM non reconnus (arbres, lampadaires...) sont ignorés
+    type_defaut = None if format_fichier == "osm" else TYPE_PAR_DEFAUT
+    
+    with open(fichier, "rb", buffering=0) as brut:
+        flux_compte = _FluxCompte(brut)
+        flux = io.BufferedReader(flux_compte)
+        if format_fichier != "osm":
+            flux = io.TextIOWrapper(flux, encoding="utf-8-sig", newline="")
+        
+        def publier():
+            progression.octets_lus = flux_compte.octets_lus
+            progression.duree_s = time.perf_counter() - progression.debut
+            if rappel is not None:
+                rappel(progression)
+                
+        for enregistrement in LECTEURS[format_fichier](flux):
+            importateur.ajouter(enregistrement, progression, type_defaut)
+            if importateur.taille_en_attente >= importateur.taille_lot:
+                importateur.vider()
+                publier()
+        importateur.vider()
+        publier()
+    return progression
+
+def main():
+    parser = argparse.ArgumentParser(description="Importe des points (GeoJSON, CSV, OSM XML) dans les données locales")
+    parser.add_argument("fichiers", nargs="+", help="Fichiers à importer")
+    parser.add_argument("--format", choices=sorted(LECTEURS), help="Format (défaut: d'après l'extension)")
+    parser.add_argument("--rayon-doublon", type=float, default=config.IMPORT_RAYON_DOUBLON_M,
+                        help="Distance (m) sous laquelle deux homonymes sont un doublon")
+    parser.add_argument("--taille-lot", type=int, default=config.IMPORT_TAILLE_LOT,
+                        help="Nombre de points écrits par lot")
+    parser.add_argument("--compacter", action="store_true",
+                        help="Réécrire les fichiers de données après l'import")
+    args = parser.parse_args()
+    
+    from services.data_manager import gestionnaire_donnees
+    for fichier in args.fichiers:
+        progression = importer_fichier(fichier, args.format, gestionnaire_donnees,
+                                       args.rayon_doublon, args.taille_lot)
+        print(f"✅ {fichier} importé en {progression.duree_s:.1f} s")
+    if args.compacter:
+        gestionnaire_donnees.compacter()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Index des noms de lieux : recherche par préfixe et autocomplétion - VERSION KINSHASA
+"""
+import bisect
+import heapq
+import threading
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+# Imports absolus
+from core.etat import Point
+from services.gazetteer import normaliser_nom
+
+# Nombre maximal d'entrées examinées pour un préfixe très court (ex. une lettre)
+MAX_CANDIDATS = 1000
+
+# Rang de pertinence d'une correspondance (plus petit = meilleur)
+RANG_EXACT = 0
+RANG_PREFIXE_NOM = 1
+RANG_MOTS_ENTIERS = 2
+RANG_PREFIXE_MOTS = 3
+RANG_SOUS_CHAINE = 4
+
+class _Entree:
+    __slots__ = ("cle", "point", "nom", "mots", "priorite")
+    
+    def __init__(self, cle: Hashable, point: Point, nom: str, priorite: int):
+        self.cle = cle
+        self.point = point
+        self.nom = nom
+        self.mots = nom.split()
+        self.priorite = priorite
+
+class IndexNoms:
+    """
+    Index des noms normalisés (minuscules, sans accents ni ponctuation)
+    
+    - liste triée des noms complets : préfixe du nom par dichotomie
+    - liste triée des mots : préfixe de n'importe quel mot par dichotomie
+    Chaque mot de la requête doit préfixer un mot du nom, le dernier pouvant
+    être incomplet (saisie en cours). Les résultats sont classés : nom exact,
+    préfixe du nom entier, mots entiers, préfixes de mots, puis nom le plus court.
+    """
+    
+    def __init__(self):
+        self._entrees: Dict[Hashable, _Entree] = {}
+        self._noms: List[Tuple[str, Hashable]] = []
+        self._mots: List[Tuple[str, Hashable]] = []
+        self._verrou = threading.RLock()
+    
+    def __len__(self) -> int:
+        return len(self._entrees)
+    
+    def ajouter(self, cle: Hashable, nom: str, point: Point, priorite: int = 0):
+        """
+        Indexe (ou remplace) un point sous un nom
+        
+        Args:
+            cle: Identifiant unique de l'entrée (ex. ("poi", nom))
+            nom: Nom affiché du lieu
+            point: Point associé
+            priorite: Départage les noms identiques (plus petit = prioritaire)
+        """
+        entree = _Entree(cle, point, normaliser_nom(nom), priorite)
+        with self._verrou:
+            self.retirer(cle)
+            if not entree.nom:
+                return
+            self._entrees[cle] = entree
+            bisect.insort(self._noms, (entree.nom, cle))
+            for mot in set(entree.mots):
+                bisect.insort(self._mots, (mot, cle))
+    
+    def ajouter_lot(self, entrees: Iterable[Tuple[Hashable, str, Point, int]]):
+        """
+        Indexe un grand nombre d'entrées (cle, nom, point, priorite) avec un
+        seul tri final, au lieu d'une insertion triée par entrée
+        
+        Un petit lot dans un grand index reste inséré entrée par entrée :
+        retrier tout l'index coûterait plus cher.
+        """
+        entrees = list(entrees)
+        with self._verrou:
+            if len(entrees) * 64 < len(self._entrees):
+                for cle, nom, point, priorite in entrees:
+                    self.ajouter(cle, nom, point, priorite)
+                return
+            for cle, nom, point, priorite in entrees:
+                self.retirer(cle)
+                entree = _Entree(cle, point, normaliser_nom(nom), priorite)
+                if not entree.nom:
+                    continue
+                self._entrees[cle] = entree
+                self._noms.append((entree.nom, cle))
+                self._mots.extend((mot, cle) for mot in set(entree.mots))
+            self._noms.sort()
+            self._mots.sort()
+    
+    def retirer(self, cle: Hashable) -> bool:
+        """Retire une entrée ; retourne True si elle existait"""
+        with self._verrou:
+            entree = self._entrees.pop(cle, None)
+            if entree is None:
+                return False
+            self._supprimer_trie(self._noms, (entree.nom, cle))
+            for mot in set(entree.mots):
+                self._supprimer_trie(self._mots, (mot, cle))
+            return True
+    
+    @staticmethod
+    def _supprimer_trie(liste: List[Tuple[str, Hashable]], element: Tuple[str, Hashable]):
+        position = bisect.bisect_left(liste, (element[0],))
+        while position < len(liste) and liste[position][0] == element[0]:
+            if liste[position][1] == element[1]:
+                del liste[position]
+                return
+            position += 1
+    
+    @staticmethod
+    def _plage_prefixe(liste: List[Tuple[str, Hashable]], prefixe: str) -> Tuple[int, int]:
+        """Indices [debut, fin) des éléments dont la chaîne commence par prefixe"""
+        debut = bisect.bisect_left(liste, (prefixe,))
+        fin = bisect.bisect_left(liste, (prefixe + "\uffff",))
+        return debut, fin
+    
+    def _rang(self, entree: _Entree, requete: str, mots_requete: List[str]) -> Optional[int]:
+        if entree.nom == requete:
+            return RANG_EXACT
+        if entree.nom.startswith(requete):
+            return RANG_PREFIXE_NOM
+        if all(any(mot_nom.startswith(mot) for mot_nom in entree.mots) for mot in mots_requete):
+            if all(mot in entree.mots for mot in mots_requete):
+                return RANG_MOTS_ENTIERS
+            return RANG_PREFIXE_MOTS
+        return None
+    
+    def rechercher(self, requete: str, limite: int = 10,
+                   sous_chaine: bool = False) -> List[Tuple[Point, int]]:
+        """
+        Recherche les lieux correspondant à une requête
+        
+        Args:
+            requete: Texte saisi (accents, casse et ponctuation ignorés)
+            limite: Nombre maximal de résultats
+            sous_chaine: Si aucun préfixe ne correspond, chercher la requête
+                n'importe où dans les noms (parcours complet)
+                
+        Returns:
+            Liste (point, rang) du plus pertinent au moins pertinent
+        """
+        requete = normaliser_nom(requete)
+        if not requete or limite <= 0:
+            return []
+        mots_requete = requete.split()
+        
+        with self._verrou:
+            # Préfixe du nom complet (inclut les requêtes contenant des espaces)
+            debut, fin = self._plage_prefixe(self._noms, requete)
+            cles = {cle for _, cle in self._noms[debut:min(fin, debut + MAX_CANDIDATS)]}
+            
+            # Assez de noms commençant par la requête : ils priment sur les
+            # correspondances par mots, inutile de les examiner
+            if len(cles) < limite:
+                # Le mot le plus sélectif (plage la plus courte) fournit les candidats
+                plages = [self._plage_prefixe(self._mots, mot) for mot in mots_requete]
+                debut, fin = min(plages, key=lambda plage: plage[1] - plage[0])
+                cles.update(cle for _, cle in self._mots[debut:min(fin, debut + MAX_CANDIDATS)])
+            
+            classes = []
+            for cle in cles:
+                entree = self._entrees[cle]
+                rang = self._rang(entree, requete, mots_requete)
+                if rang is not None:
+                    classes.append((rang, len(entree.nom), entree.nom, entree.priorite, entree))
+                    
+            if not classes and sous_chaine:
+                classes = [
+                    (RANG_SOUS_CHAINE, len(entree.nom), entree.nom, entree.priorite, entree)
+                    for entree in self._entrees.values() if requete in entree.nom
+                ]
+                
+            meilleurs = heapq.nsmallest(limite, classes, key=lambda classe: classe[:4])
+        return [(classe[4].point, classe[0]) for classe in meilleurs]
+    
+    def autocompleter(self, saisie: str, limite: int = 8) -> List[Point]:
+        """
+        Suggestions pour une saisie en cours, à appeler à chaque frappe
+        
+        Returns:
+            Jusqu'à limite points, du plus pertinent au moins pertinent
+        """
+        return [point for point, _ in self.rechercher(saisie, limite)]
@@ -0,0 +1,391 @@
+"""
+Index spatial en grille pour les requêtes de proximité - VERSION KINSHASA
+"""
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Imports absolus
+from core.etat import Point
+from utils.helpers import coordonnees_points, distances_haversine, matrice_distances
+from utils.paresseux import module_paresseux
+
+# NumPy n'est importé qu'au premier calcul vectorisé
+np = module_paresseux("numpy")
+
+KM_PAR_DEGRE = 111.32
+TAILLE_CELLULE_DEFAUT = 0.01  # degrés (~1,1 km)
+# Nombre maximal de distances calculées à la fois par une requête par lot
+DISTANCES_PAR_BLOC = 1 << 21
+# Côté (en cellules) des carrés de positions traités ensemble par une requête par lot
+CELLULES_PAR_GROUPE = 4
+
+FiltrePoint = Callable[[Point], bool]
+
+class _Cellule:
+    """
+    Points d'une cellule et leurs coordonnées en tableaux (reconstruits à la demande)
+    
+    Une cellule peut provenir d'une grille précalculée : ses coordonnées sont
+    alors des vues sur des colonnes existantes et ses points ne sont créés
+    qu'au premier accès.
+    """
+    
+    __slots__ = ("_points", "_latitudes", "_longitudes", "_source")
+    
+    def __init__(self):
+        self._points: Optional[List[Point]] = []
+        self._latitudes = None
+        self._longitudes = None
+        self._source = None
+    
+    @classmethod
+    def precalculee(cls, latitudes: "np.ndarray", longitudes: "np.ndarray",
+                    fournisseur: Callable[[int], Point], debut: int, fin: int) -> "_Cellule":
+        cellule = cls()
+        cellule._points = None
+        cellule._latitudes = latitudes[debut:fin]
+        cellule._longitudes = longitudes[debut:fin]
+        cellule._source = (fournisseur, debut, fin)
+        return cellule
+    
+    @property
+    def points(self) -> List[Point]:
+        if self._points is None:
+            fournisseur, debut, fin = self._source
+            self._points = [fournisseur(i) for i in range(debut, fin)]
+            self._source = None
+        return self._points
+    
+    def modifier(self):
+        self._latitudes = self._longitudes = None
+    
+    def coordonnees(self) -> "Tuple[np.ndarray, np.ndarray]":
+        if self._latitudes is None:
+            self._latitudes, self._longitudes = coordonnees_points(self.points)
+        return self._latitudes, self._longitudes
+
+class IndexSpatialGrille:
+    """
+    Index spatial par grille régulière en degrés
+    
+    Chaque point est rangé dans la cellule (floor(lat/taille), floor(lon/taille)).
+    Une requête ne parcourt que les cellules recouvrant la zone recherchée et
+    calcule les distances de leurs points en un seul appel vectorisé.
+    """
+    
+    def __init__(self, taille_cellule_deg: float = TAILLE_CELLULE_DEFAUT):
+        self.taille_cellule = taille_cellule_deg
+        self._cellules: Dict[Tuple[int, int], _Cellule] = {}
+        self._nombre = 0
+        self._verrou = threading.RLock()
+    
+    def _cellule(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return (math.floor(latitude / self.taille_cellule),
+                math.floor(longitude / self.taille_cellule))
+    
+    def inserer(self, point: Point):
+        """Ajoute un point à l'index"""
+        with self._verrou:
+            cle = self._cellule(point.latitude, point.longitude)
+            cellule = self._cellules.get(cle)
+            if cellule is None:
+                cellule = self._cellules[cle] = _Cellule()
+            cellule.points.append(point)
+            cellule.modifier()
+            self._nombre += 1
+    
+    def inserer_points(self, points: Iterable[Point]):
+        """Ajoute une collection de points à l'index"""
+        with self._verrou:
+            for point in points:
+                self.inserer(point)
+    
+    def inserer_grille(self, cellules: Iterable[Tuple[Tuple[int, int], int, int]],
+                       latitudes: "np.ndarray", longitudes: "np.ndarray",
+                       fournisseur: Callable[[int], Point]):
+        """
+        Ajoute des points déjà rangés par cellule (même taille de cellule)
+        
+        Args:
+            cellules: ((ligne, colonne), debut, fin) ; les points de la cellule
+                occupent les indices [debut, fin) des colonnes
+            latitudes: Colonne des latitudes (non copiée)
+            longitudes: Colonne des longitudes (non copiée)
+            fournisseur: Crée le point d'indice donné, au premier accès à sa cellule
+        """
+        with self._verrou:
+            for cle, debut, fin in cellules:
+                if fin <= debut:
+                    continue
+                cellule = _Cellule.precalculee(latitudes, longitudes, fournisseur, debut, fin)
+                existante = self._cellules.get(cle)
+                if existante is None:
+                    self._cellules[cle] = cellule
+                else:
+                    existante.points.extend(cellule.points)
+                    existante.modifier()
+                self._nombre += fin - debut
+    
+    def retirer(self, point: Point) -> bool:
+        """
+        Retire un point (comparé par identité) de l'index
+        
+        Returns:
+            True si le point était indexé
+        """
+        with self._verrou:
+            cle = self._cellule(point.latitude, point.longitude)
+            cellule = self._cellules.get(cle)
+            if cellule is None:
+                return False
+            for i, candidat in enumerate(cellule.points):
+                if candidat is point:
+                    del cellule.points[i]
+                    cellule.modifier()
+                    if not cellule.points:
+                        del self._cellules[cle]
+                    self._nombre -= 1
+                    return True
+            return False
+    
+    def __len__(self) -> int:
+        return self._nombre
+    
+    def _cellules_rectangle(self, lat_min: float, lon_min: float,
+                            lat_max: float, lon_max: float) -> List[_Cellule]:
+        """Cellules non vides recouvrant un rectangle de coordonnées"""
+        ligne_min, colonne_min = self._cellule(lat_min, lon_min)
+        ligne_max, colonne_max = self._cellule(lat_max, lon_max)
+        
+        # Zone plus vaste que la grille occupée : parcourir les cellules non vides
+        nombre_cellules = (ligne_max - ligne_min + 1) * (colonne_max - colonne_min + 1)
+        if nombre_cellules > len(self._cellules):
+            return [
+                cellule for (ligne, colonne), cellule in self._cellules.items()
+                if ligne_min <= ligne <= ligne_max and colonne_min <= colonne <= colonne_max
+            ]
+            
+        cellules = []
+        for ligne in range(ligne_min, ligne_max + 1):
+            for colonne in range(colonne_min, colonne_max + 1):
+                cellule = self._cellules.get((ligne, colonne))
+                if cellule is not None:
+                    cellules.append(cellule)
+        return cellules
+    
+    def _cellules_autour(self, latitude: float, longitude: float, rayon_km: float) -> List[_Cellule]:
+        """Cellules recouvrant le carré englobant le cercle de recherche"""
+        delta_lat = rayon_km / KM_PAR_DEGRE
+        cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+        delta_lon = rayon_km / (KM_PAR_DEGRE * cos_lat)
+        return self._cellules_rectangle(latitude - delta_lat, longitude - delta_lon,
+                                        latitude + delta_lat, longitude + delta_lon)
+    
+    def _candidats(self, cellules: List[_Cellule]) -> "Tuple[List[Point], np.ndarray, np.ndarray]":
+        """Points et coordonnées concaténés d'une liste de cellules"""
+        if not cellules:
+            return [], np.zeros(0), np.zeros(0)
+        points = [point for cellule in cellules for point in cellule.points]
+        coordonnees = [cellule.coordonnees() for cellule in cellules]
+        latitudes = np.concatenate([latitudes for latitudes, _ in coordonnees])
+        longitudes = np.concatenate([longitudes for _, longitudes in coordonnees])
+        return points, latitudes, longitudes
+    
+    def _rechercher_rayon(self, latitude: float, longitude: float, rayon_km: float,
+                          filtre: Optional[FiltrePoint]) -> Tuple[List[Tuple[Point, float]], int]:
+        """
+        Recherche dans un rayon
+        
+        Returns:
+            Tuple (résultats triés, nombre de points examinés)
+        """
+        with self._verrou:
+            points, latitudes, longitudes = self._candidats(self._cellules_autour(latitude, longitude, rayon_km))
+        if not points:
+            return [], 0
+            
+        distances = distances_haversine(latitude, longitude, latitudes, longitudes)
+        retenus = np.flatnonzero(distances <= rayon_km)
+        retenus = retenus[np.argsort(distances[retenus], kind="stable")]
+        resultats = [(points[i], float(distances[i])) for i in retenus]
+        if filtre is not None:
+            resultats = [(point, distance) for point, distance in resultats if filtre(point)]
+        return resultats, len(points)
+    
+    def rechercher_rayon(self, latitude: float, longitude: float, rayon_km: float,
+                         filtre: Optional[FiltrePoint] = None) -> List[Tuple[Point, float]]:
+        """
+        Recherche les points situés dans un rayon donné
+        
+        Args:
+            latitude: Latitude du centre
+            longitude: Longitude du centre
+            rayon_km: Rayon de recherche en kilomètres
+            filtre: Prédicat optionnel sur les points
+            
+        Returns:
+            Liste (point, distance_km) triée par distance croissante
+        """
+        return self._rechercher_rayon(latitude, longitude, rayon_km, filtre)[0]
+    
+    def rechercher_rectangle(self, lat_min: float, lon_min: float, lat_max: float, lon_max: float,
+                             filtre: Optional[FiltrePoint] = None) -> List[Point]:
+        """
+        Recherche les points situés dans un rectangle de coordonnées (bornes incluses)
+        
+        Returns:
+            Liste des points, sans ordre particulier
+        """
+        with self._verrou:
+            points, latitudes, longitudes = self._candidats(
+                self._cellules_rectangle(lat_min, lon_min, lat_max, lon_max)
+            )
+        dedans = np.flatnonzero(
+            (latitudes >= lat_min) & (latitudes <= lat_max) &
+            (longitudes >= lon_min) & (longitudes <= lon_max)
+        )
+        return [points[i] for i in dedans if filtre is None or filtre(points[i])]
+    
+    def _rayon_initial(self, k: int) -> float:
+        """Rayon (km) contenant en moyenne k points, d'après la densité des cellules occupées"""
+        cote_km = self.taille_cellule * KM_PAR_DEGRE
+        densite = self._nombre / (len(self._cellules) * cote_km * cote_km)
+        return 1.5 * math.sqrt(k / (math.pi * densite))
+    
+    def plus_proches(self, latitude: float, longitude: float, k: int = 1,
+                     rayon_max_km: Optional[float] = None,
+                     filtre: Optional[FiltrePoint] = None) -> List[Tuple[Point, float]]:
+        """
+        Recherche les k points les plus proches
+        
+        Le rayon de recherche double jusqu'à contenir k points (ou atteindre
+        rayon_max_km) : le résultat est exact dès que k points sont trouvés.
+        
+        Returns:
+            Liste (point, distance_km) triée par distance croissante
+        """
+        if self._nombre == 0 or k <= 0:
+            return []
+            
+        rayon = self._rayon_initial(k)
+        limite = rayon_max_km if rayon_max_km is not None else 2 * math.pi * 6371
+        while True:
+            rayon = min(rayon, limite)
+            resultats, examines = self._rechercher_rayon(latitude, longitude, rayon, filtre)
+            if len(resultats) >= k or rayon >= limite:
+                return resultats[:k]
+            # Tous les points sont déjà couverts : un dernier passage à la limite suffit
+            rayon = limite if examines >= self._nombre else rayon * 2
+    
+    def plus_proches_lot(self, latitudes, longitudes, k: int = 1, rayon_max_km: Optional[float] = None,
+                         filtre: Optional[FiltrePoint] = None) -> "Tuple[List[Point], np.ndarray, np.ndarray]":
+        """
+        Les k points les plus proches de chaque position d'un lot
+        
+        Les positions sont regroupées par carré de cellules : pour chaque
+        groupe, les cellules recouvrant le carré élargi du rayon sont lues une
+        fois et les distances calculées en un seul appel vectorisé ; le rayon double
+        pour les seules positions qui n'ont pas encore k points (comme
+        plus_proches, le résultat est exact).
+        
+        Args:
+            latitudes: Latitudes des positions (tableau ou séquence)
+            longitudes: Longitudes des positions
+            k: Nombre de points par position
+            rayon_max_km: Distance maximale (défaut: sans limite)
+            filtre: Prédicat optionnel sur les points
+            
+        Returns:
+            Tuple (points trouvés, indices (n, k) dans cette liste, distances
+            km (n, k)) ; une case sans point a l'indice -1 et une distance infinie
+        """
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        k = max(k, 0)
+        trouves: List[Point] = []
+        indices = np.full((len(latitudes), k), -1, dtype=np.int64)
+        distances = np.full((len(latitudes), k), np.inf)
+        if self._nombre == 0 or k == 0 or not len(latitudes):
+            return trouves, indices, distances
+            
+        positions: Dict[int, int] = {}  # id(point) → indice dans trouves
+        limite = rayon_max_km if rayon_max_km is not None else 2 * math.pi * 6371
+        # Positions regroupées par carré de CELLULES_PAR_GROUPE × CELLULES_PAR_GROUPE cellules
+        cote = self.taille_cellule * CELLULES_PAR_GROUPE
+        lignes = np.floor(latitudes / cote).astype(np.int64)
+        colonnes = np.floor(longitudes / cote).astype(np.int64)
+        groupes, groupe = np.unique(np.stack([lignes, colonnes], axis=1), axis=0, return_inverse=True)
+        ordre = np.argsort(groupe.ravel(), kind="stable")
+        bornes = np.searchsorted(groupe.ravel()[ordre], np.arange(len(groupes) + 1))
+        
+        for numero, (ligne, colonne) in enumerate(groupes.tolist()):
+            restants = ordre[bornes[numero]:bornes[numero + 1]]
+            rayon = self._rayon_initial(k)
+            while len(restants):
+                rayon = min(rayon, limite)
+                lat_min, lat_max = ligne * cote, (ligne + 1) * cote
+                delta_lat = rayon / KM_PAR_DEGRE
+                cos_lat = max(math.cos(math.radians(min(90.0, max(abs(lat_min), abs(lat_max)) + delta_lat))), 1e-6)
+                delta_lon = rayon / (KM_PAR_DEGRE * cos_lat)
+                with self._verrou:
+                    candidats, lats_candidats, lons_candidats = self._candidats(self._cellules_rectangle(
+                        lat_min - delta_lat, colonne * cote - delta_lon,
+                        lat_max + delta_lat, (colonne + 1) * cote + delta_lon
+                    ))
+                examines = len(candidats)
+                if filtre is not None and candidats:
+                    gardes = np.fromiter((filtre(point) for point in candidats), dtype=bool, count=len(candidats))
+                    candidats = [point for point, garde in zip(candidats, gardes.tolist()) if garde]
+                    lats_candidats, lons_candidats = lats_candidats[gardes], lons_candidats[gardes]
+                # Tous les points examinés : le résultat est exact quelle que soit la distance
+                seuil = limite if examines >= self._nombre else rayon
+                complets = self._remplir_lot(latitudes, longitudes, restants, candidats, lats_candidats,
+                                             lons_candidats, seuil, trouves, positions, indices, distances)
+                if seuil >= limite:
+                    break
+                restants = restants[~complets]
+                rayon *= 2
+        return trouves, indices, distances
+    
+    @staticmethod
+    def _remplir_lot(latitudes, longitudes, lignes, candidats: List[Point], lats_candidats, lons_candidats,
+                     seuil_km: float, trouves: List[Point], positions: Dict[int, int],
+                     indices, distances) -> "np.ndarray":
+        """
+        Remplit les lignes données de indices et distances avec les candidats
+        à moins de seuil_km (par blocs de DISTANCES_PAR_BLOC distances)
+        
+        Returns:
+            Masque des lignes qui ont reçu k points
+        """
+        k = indices.shape[1]
+        m = min(k, len(candidats))
+        if m == 0:
+            return np.zeros(len(lignes), dtype=bool)
+        pas = max(1, DISTANCES_PAR_BLOC // len(candidats))
+        for debut in range(0, len(lignes), pas):
+            bloc = lignes[debut:debut + pas]
+            matrice = matrice_distances(latitudes[bloc], longitudes[bloc], lats_candidats, lons_candidats)
+            matrice[matrice > seuil_km] = np.inf
+            if m < len(candidats):
+                choisis = np.argpartition(matrice, m - 1, axis=1)[:, :m]
+            else:
+                choisis = np.broadcast_to(np.arange(m), (len(bloc), m))
+            valeurs = np.take_along_axis(matrice, choisis, axis=1)
+            rang = np.argsort(valeurs, axis=1, kind="stable")
+            choisis, valeurs = np.take_along_axis(choisis, rang, axis=1), np.take_along_axis(valeurs, rang, axis=1)
+            
+            # Les points retenus rejoignent la liste commune (une entrée par point)
+            utiles = np.unique(choisis[np.isfinite(valeurs)])
+            correspondance = np.full(len(candidats), -1, dtype=np.int64)
+            for i in utiles.tolist():
+                point = candidats[i]
+                position = positions.get(id(point))
+                if position is None:
+                    position = positions[id(point)] = len(trouves)
+                    trouves.append(point)
+                correspondance[i] = position
+            indices[bloc, :m] = np.where(np.isfinite(valeurs), correspondance[choisis], -1)
+            distances[bloc, :m] = valeurs
+        return np.isfinite(distances[lignes, k - 1])
@@ -0,0 +1,133 @@
+"""
+Instantané compilé du géocodage (fichier binaire immuable, mmap) - VERSION KINSHASA
+
+Format (petit-boutiste) :
+    en-tête   : magic b"GEOSNAP1", version u32, nombre u32, offset des chaînes u64
+    entrées   : triées par empreinte, 36 octets chacune
+                empreinte u64, latitude f64, longitude f64,
+                offset clé u32, longueur clé u16, offset nom u32, longueur nom u16
+    chaînes   : clés normalisées et "nom\\x1ftype_point" en UTF-8
+
+L'ouverture ne lit que l'en-tête ; une recherche est une dichotomie sur les
+empreintes directement dans les pages mappées, partagées entre processus.
+"""
+import hashlib
+import mmap
+import os
+import struct
+from typing import Dict, Optional
+
+# Imports absolus
+from core.etat import Point
+
+MAGIC = b"GEOSNAP1"
+VERSION = 1
+FORMAT_ENTETE = struct.Struct("<8sIIQ")
+FORMAT_ENTREE = struct.Struct("<QddIHIH")
+SEPARATEUR_TYPE = "\x1f"
+
+def empreinte_cle(cle: str) -> int:
+    """Empreinte 64 bits stable d'une clé normalisée"""
+    return int.from_bytes(hashlib.blake2b(cle.encode("utf-8"), digest_size=8).digest(), "little")
+
+def compiler_instantane(entrees: Dict[str, Point], fichier: str) -> int:
+    """
+    Écrit un instantané à partir de clés normalisées et de leurs points
+    
+    Args:
+        entrees: Clé normalisée → Point
+        fichier: Chemin du fichier à produire (remplacé atomiquement)
+        
+    Returns:
+        Nombre d'entrées écrites
+    """
+    chaines = bytearray()
+    enregistrements = []
+    for cle, point in entrees.items():
+        cle_octets = cle.encode("utf-8")
+        nom_octets = f"{point.nom}{SEPARATEUR_TYPE}{point.type_point}".encode("utf-8")
+        offset_cle = len(chaines)
+        chaines += cle_octets
+        offset_nom = len(chaines)
+        chaines += nom_octets
+        enregistrements.append((
+            empreinte_cle(cle), point.latitude, point.longitude,
+            offset_cle, len(cle_octets), offset_nom, len(nom_octets)
+        ))
+    enregistrements.sort(key=lambda enregistrement: enregistrement[0])
+    
+    offset_chaines = FORMAT_ENTETE.size + FORMAT_ENTREE.size * len(enregistrements)
+    dossier = os.path.dirname(fichier)
+    if dossier:
+        os.makedirs(dossier, exist_ok=True)
+    temporaire = f"{fichier}.{os.getpid()}.tmp"
+    with open(temporaire, "wb") as f:
+        f.write(FORMAT_ENTETE.pack(MAGIC, VERSION, len(enregistrements), offset_chaines))
+        for enregistrement in enregistrements:
+            f.write(FORMAT_ENTREE.pack(*enregistrement))
+        f.write(bytes(chaines))
+    os.replace(temporaire, fichier)
+    return len(enregistrements)
+
+class InstantaneGeocodage:
+    """Lecture d'un instantané compilé par mappage mémoire"""
+    
+    def __init__(self, fichier: str):
+        self.fichier = fichier
+        with open(fichier, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._nombre, self._offset_chaines = FORMAT_ENTETE.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"Instantané de géocodage invalide: {fichier}")
+    
+    def __len__(self) -> int:
+        return self._nombre
+    
+    def _entree(self, indice: int):
+        return FORMAT_ENTREE.unpack_from(self._mmap, FORMAT_ENTETE.size + indice * FORMAT_ENTREE.size)
+    
+    def _chaine(self, offset: int, longueur: int) -> str:
+        debut = self._offset_chaines + offset
+        return self._mmap[debut:debut + longueur].decode("utf-8")
+    
+    def obtenir(self, cle: str) -> Optional[Point]:
+        """
+        Recherche une clé normalisée
+        
+        Returns:
+            Point trouvé ou None
+        """
+        empreinte = empreinte_cle(cle)
+        bas, haut = 0, self._nombre
+        while bas < haut:
+            milieu = (bas + haut) // 2
+            if self._entree(milieu)[0] < empreinte:
+                bas = milieu + 1
+            else:
+                haut = milieu
+                
+        # Parcours des éventuelles collisions d'empreinte
+        while bas < self._nombre:
+            valeur, latitude, longitude, offset_cle, longueur_cle, offset_nom, longueur_nom = self._entree(bas)
+            if valeur != empreinte:
+                return None
+            if self._chaine(offset_cle, longueur_cle) == cle:
+                nom, _, type_point = self._chaine(offset_nom, longueur_nom).partition(SEPARATEUR_TYPE)
+                return Point(nom, latitude, longitude, type_point or "inconnu")
+            bas += 1
+        return None
+    
+    def fermer(self):
+        """Libère le mappage mémoire"""
+        self._mmap.close()
+
+def ouvrir_instantane(fichier: str) -> Optional[InstantaneGeocodage]:
+    """Ouvre l'instantané s'il existe ; None s'il est absent ou illisible"""
+    if not fichier or not os.path.exists(fichier):
+        return None
+    try:
+        return InstantaneGeocodage(fichier)
+    except Exception as e:
+        print(f"⚠️  Instantané de géocodage ignoré: {e}")
+        return None
@@ -0,0 +1,387 @@
+"""
+Jeu de points binaire (points d'intérêt, arrêts de bus) lu par mmap - VERSION KINSHASA
+
+Format (petit-boutiste, sections alignées sur 8 octets) :
+    en-tête   : magic b"KINPTS01", version u32, nombre de points u32,
+                nombre de chaînes u32, nombre de cellules u32,
+                taille de cellule f64 (0 = sans index spatial),
+                offsets u64 des chaînes, de l'ordre des clés et de la grille
+    colonnes  : latitudes f64[n], longitudes f64[n], codes clé u32[n],
+                codes nom u32[n], codes commune i32[n] (-1 = aucune),
+                codes type u32[n]
+    chaînes   : offsets u64[m + 1] puis textes UTF-8 concaténés
+    clés      : indices u32[n] des points triés par clé (recherche par dichotomie)
+    grille    : cellules (ligne, colonne) i32[c, 2] triées, débuts u32[c + 1] ;
+                les points sont alors rangés cellule par cellule
+
+L'ouverture ne lit que l'en-tête : les colonnes sont des vues NumPy sur les
+pages mappées (partagées entre processus) et les Point ne sont créés qu'à
+la demande.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+from collections import abc
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+# Imports absolus
+from core.etat import Point
+from utils.index_spatial import TAILLE_CELLULE_DEFAUT
+from utils.paresseux import module_paresseux
+
+# NumPy n'est importé qu'au premier calcul vectorisé
+np = module_paresseux("numpy")
+
+MAGIC = b"KINPTS01"
+VERSION = 1
+FORMAT_ENTETE = struct.Struct("<8sIIIIdQQQ")
+SANS_COMMUNE = -1
+
+def _aligner(taille: int) -> int:
+    return (taille + 7) & ~7
+
+def _ecrire_aligne(f, donnees: bytes):
+    f.write(donnees)
+    f.write(b"\0" * (_aligner(len(donnees)) - len(donnees)))
+
+def ecrire_jeu_points(points: Mapping[str, Point], fichier: str,
+                      taille_cellule: Optional[float] = TAILLE_CELLULE_DEFAUT) -> int:
+    """
+    Écrit un jeu de points au format binaire
+    
+    Args:
+        points: Clé (nom) → Point
+        fichier: Chemin du fichier à produire (remplacé atomiquement)
+        taille_cellule: Taille des cellules de l'index spatial précalculé
+            (None = pas d'index, les points gardent leur ordre)
+            
+    Returns:
+        Nombre de points écrits
+    """
+    cles = list(points.keys())
+    valeurs = [points[cle] for cle in cles]
+    nombre = len(valeurs)
+    latitudes = np.fromiter((point.latitude for point in valeurs), dtype="<f8", count=nombre)
+    longitudes = np.fromiter((point.longitude for point in valeurs), dtype="<f8", count=nombre)
+    
+    # Index spatial : points rangés par cellule (mêmes cellules que IndexSpatialGrille)
+    cellules = np.zeros((0, 2), dtype="<i4")
+    debuts = np.zeros(1, dtype="<u4")
+    ordre = np.arange(nombre)
+    if taille_cellule and nombre:
+        lignes = np.floor(latitudes / taille_cellule).astype(np.int64)
+        colonnes = np.floor(longitudes / taille_cellule).astype(np.int64)
+        ordre = np.lexsort((colonnes, lignes))
+        paires = np.stack([lignes[ordre], colonnes[ordre]], axis=1)
+        nouvelles = np.ones(nombre, dtype=bool)
+        nouvelles[1:] = np.any(paires[1:] != paires[:-1], axis=1)
+        positions = np.flatnonzero(nouvelles)
+        cellules = paires[positions].astype("<i4")
+        debuts = np.append(positions, nombre).astype("<u4")
+    else:
+        taille_cellule = 0.0
+        
+    cles = [cles[i] for i in ordre]
+    valeurs = [valeurs[i] for i in ordre]
+    latitudes = latitudes[ordre]
+    longitudes = longitudes[ordre]
+    
+    # Table de chaînes commune aux clés, noms, types et communes
+    chaines: List[str] = []
+    codes: Dict[str, int] = {}
+    
+    def coder(valeur: str) -> int:
+        code = codes.get(valeur)
+        if code is None:
+            code = codes[valeur] = len(chaines)
+            chaines.append(valeur)
+        return code
+        
+    codes_cles = np.array([coder(cle) for cle in cles], dtype="<u4")
+    codes_noms = np.array([coder(point.nom) for point in valeurs], dtype="<u4")
+    codes_communes = np.array([
+        SANS_COMMUNE if point.commune is None else coder(point.commune) for point in valeurs
+    ], dtype="<i4")
+    codes_types = np.array([coder(point.type_point) for point in valeurs], dtype="<u4")
+    
+    textes = [chaine.encode("utf-8") for chaine in chaines]
+    offsets_textes = np.zeros(len(textes) + 1, dtype="<u8")
+    offsets_textes[1:] = np.cumsum([len(texte) for texte in textes])
+    ordre_cles = np.array(sorted(range(nombre), key=cles.__getitem__), dtype="<u4")
+    
+    sections_colonnes = [latitudes, longitudes, codes_cles, codes_noms, codes_communes, codes_types]
+    offset_chaines = FORMAT_ENTETE.size + sum(_aligner(colonne.nbytes) for colonne in sections_colonnes)
+    offset_cles = offset_chaines + offsets_textes.nbytes + _aligner(int(offsets_textes[-1]))
+    offset_grille = offset_cles + _aligner(ordre_cles.nbytes) if taille_cellule else 0
+    
+    dossier = os.path.dirname(fichier)
+    if dossier:
+        os.makedirs(dossier, exist_ok=True)
+    temporaire = f"{fichier}.{os.getpid()}.tmp"
+    with open(temporaire, "wb") as f:
+        f.write(FORMAT_ENTETE.pack(
+            MAGIC, VERSION, nombre, len(chaines), len(cellules), taille_cellule,
+            offset_chaines, offset_cles, offset_grille
+        ))
+        for colonne in sections_colonnes:
+            _ecrire_aligne(f, colonne.tobytes())
+        f.write(offsets_textes.tobytes())
+        _ecrire_aligne(f, b"".join(textes))
+        _ecrire_aligne(f, ordre_cles.tobytes())
+        if taille_cellule:
+            f.write(cellules.tobytes())
+            f.write(debuts.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporaire, fichier)
+    return nombre
+
+class JeuPointsBinaire(abc.Mapping):
+    """
+    Jeu de points binaire ouvert par mappage mémoire, en lecture seule
+    
+    Se comporte comme un dictionnaire clé → Point ; chaque Point est créé à
+    la première consultation puis conservé (même objet aux accès suivants).
+    """
+    
+    def __init__(self, fichier: str):
+        self.fichier = fichier
+        with open(fichier, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, self._nombre, nombre_chaines, nombre_cellules, self.taille_cellule,
+             offset_chaines, offset_cles, offset_grille) = FORMAT_ENTETE.unpack_from(self._mmap, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Jeu de points binaire invalide: {fichier}")
+                
+            n = self._nombre
+            position = FORMAT_ENTETE.size
+            colonnes = []
+            for dtype in ("<f8", "<f8", "<u4", "<u4", "<i4", "<u4"):
+                colonnes.append(np.frombuffer(self._mmap, dtype=dtype, count=n, offset=position))
+                position += _aligner(colonnes[-1].nbytes)
+            (self.latitudes, self.longitudes, self._codes_cles,
+             self._codes_noms, self._codes_communes, self._codes_types) = colonnes
+             
+            self._offsets_textes = np.frombuffer(self._mmap, dtype="<u8", count=nombre_chaines + 1,
+                                                 offset=offset_chaines)
+            self._debut_textes = offset_chaines + self._offsets_textes.nbytes
+            self._ordre_cles = np.frombuffer(self._mmap, dtype="<u4", count=n, offset=offset_cles)
+            
+            self._cellules = self._debuts_cellules = None
+            if offset_grille:
+                self._cellules = np.frombuffer(self._mmap, dtype="<i4", count=2 * nombre_cellules,
+                                               offset=offset_grille).reshape(-1, 2)
+                self._debuts_cellules = np.frombuffer(self._mmap, dtype="<u4", count=nombre_cellules + 1,
+                                                      offset=offset_grille + self._cellules.nbytes)
+        except Exception:
+            self.fermer()
+            raise
+        self._chaines: Dict[int, str] = {}
+        self._points: Dict[int, Point] = {}
+    
+    def _chaine(self, code: int) -> str:
+        chaine = self._chaines.get(code)
+        if chaine is None:
+            debut = self._debut_textes + int(self._offsets_textes[code])
+            fin = self._debut_textes + int(self._offsets_textes[code + 1])
+            chaine = self._chaines[code] = self._mmap[debut:fin].decode("utf-8")
+        return chaine
+    
+    def cle(self, indice: int) -> str:
+        """Clé du point rangé à l'indice donné"""
+        return self._chaine(int(self._codes_cles[indice]))
+    
+    def point(self, indice: int) -> Point:
+        """Point rangé à l'indice donné (créé au premier accès)"""
+        point = self._points.get(indice)
+        if point is None:
+            code_commune = int(self._codes_communes[indice])
+            point = self._points[indice] = Point(
+                self._chaine(int(self._codes_noms[indice])),
+                float(self.latitudes[indice]),
+                float(self.longitudes[indice]),
+                self._chaine(int(self._codes_types[indice])),
+                None if code_commune == SANS_COMMUNE else self._chaine(code_commune)
+            )
+        return point
+    
+    def indice(self, cle: str) -> Optional[int]:
+        """Indice du point de clé donnée (dichotomie sur l'ordre des clés), ou None"""
+        bas, haut = 0, self._nombre
+        while bas < haut:
+            milieu = (bas + haut) // 2
+            if self.cle(int(self._ordre_cles[milieu])) < cle:
+                bas = milieu + 1
+            else:
+                haut = milieu
+        if bas < self._nombre:
+            indice = int(self._ordre_cles[bas])
+            if self.cle(indice) == cle:
+                return indice
+        return None
+    
+    def __getitem__(self, cle: str) -> Point:
+        indice = self.indice(cle)
+        if indice is None:
+            raise KeyError(cle)
+        return self.point(indice)
+    
+    def __contains__(self, cle) -> bool:
+        return isinstance(cle, str) and self.indice(cle) is not None
+    
+    def __len__(self) -> int:
+        return self._nombre
+    
+    def __iter__(self) -> Iterator[str]:
+        for indice in range(self._nombre):
+            yield self.cle(indice)
+    
+    def grille(self) -> Iterator[Tuple[Tuple[int, int], int, int]]:
+        """
+        Cellules de l'index spatial précalculé
+        
+        Returns:
+            Itérateur de ((ligne, colonne), debut, fin), les points de la
+            cellule occupant les indices [debut, fin) ; vide sans index
+        """
+        if self._cellules is None:
+            return
+        for i, (ligne, colonne) in enumerate(self._cellules.tolist()):
+            yield (ligne, colonne), int(self._debuts_cellules[i]), int(self._debuts_cellules[i + 1])
+    
+    def fermer(self):
+        """Libère le mappage mémoire (différé si des vues sont encore utilisées)"""
+        self.latitudes = self.longitudes = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+class PointsModifiables(abc.MutableMapping):
+    """
+    Dictionnaire de points adossé à un jeu binaire en lecture seule
+    
+    Les ajouts, remplacements et suppressions sont conservés en mémoire
+    par-dessus le fichier mappé, qui n'est jamais modifié.
+    """
+    
+    def __init__(self, jeu: JeuPointsBinaire):
+        self.jeu = jeu
+        self._modifies: Dict[str, Point] = {}
+        self._supprimes = set()
+        self._taille = len(jeu)
+    
+    @property
+    def modifie(self) -> bool:
+        """True si le contenu diffère du fichier mappé"""
+        return bool(self._modifies or self._supprimes)
+    
+    def __contains__(self, cle) -> bool:
+        if cle in self._modifies:
+            return True
+        return cle not in self._supprimes and cle in self.jeu
+    
+    def __getitem__(self, cle: str) -> Point:
+        if cle in self._modifies:
+            return self._modifies[cle]
+        if cle in self._supprimes:
+            raise KeyError(cle)
+        return self.jeu[cle]
+    
+    def __setitem__(self, cle: str, point: Point):
+        if cle not in self:
+            self._taille += 1
+        self._supprimes.discard(cle)
+        self._modifies[cle] = point
+    
+    def __delitem__(self, cle: str):
+        if cle not in self:
+            raise KeyError(cle)
+        self._modifies.pop(cle, None)
+        if cle in self.jeu:
+            self._supprimes.add(cle)
+        self._taille -= 1
+    
+    def __len__(self) -> int:
+        return self._taille
+    
+    def __iter__(self) -> Iterator[str]:
+        for cle in self.jeu:
+            if cle not in self._supprimes:
+                yield cle
+        for cle in self._modifies:
+            if cle not in self.jeu:
+                yield cle
+
+def ouvrir_jeu_points(fichier_binaire: str, fichier_json: Optional[str] = None) -> Optional[PointsModifiables]:
+    """
+    Ouvre un jeu binaire s'il existe et n'est pas plus ancien que le JSON
+    
+    Returns:
+        Points adossés au fichier mappé, ou None (fichier absent, périmé ou illisible)
+    """
+    if not fichier_binaire or not os.path.exists(fichier_binaire):
+        return None
+    if fichier_json and os.path.exists(fichier_json) and \
+            os.path.getmtime(fichier_json) > os.path.getmtime(fichier_binaire):
+        print(f"⚠️  {fichier_binaire} plus ancien que {fichier_json}: JSON utilisé")
+        return None
+    try:
+        return PointsModifiables(JeuPointsBinaire(fichier_binaire))
+    except Exception as e:
+        print(f"⚠️  Jeu de points binaire ignoré: {e}")
+        return None
+
+def convertir_json_vers_binaire(fichier_json: str, fichier_binaire: str,
+                                taille_cellule: Optional[float] = TAILLE_CELLULE_DEFAUT) -> int:
+    """Convertit un fichier JSON {nom: point} au format binaire"""
+    with open(fichier_json, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    points = {nom: Point.from_dict(point_data) for nom, point_data in data.items()}
+    return ecrire_jeu_points(points, fichier_binaire, taille_cellule)
+
+def convertir_binaire_vers_json(fichier_binaire: str, fichier_json: str) -> int:
+    """Convertit un jeu binaire en fichier JSON {nom: point}"""
+    jeu = JeuPointsBinaire(fichier_binaire)
+    try:
+        data = {cle: jeu.point(indice).to_dict() for indice, cle in enumerate(jeu)}
+    finally:
+        jeu.fermer()
+    with open(fichier_json, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return len(data)
+
+def main():
+    from utils.config import config
+    
+    parser = argparse.ArgumentParser(description="Convertit les jeux de points entre JSON et binaire")
+    parser.add_argument("sens", choices=["binaire", "json"], help="Format à produire")
+    parser.add_argument("source", nargs="?", help="Fichier source (défaut: points d'intérêt et arrêts de bus)")
+    parser.add_argument("destination", nargs="?", help="Fichier produit")
+    parser.add_argument("--sans-index", action="store_true", help="Ne pas précalculer l'index spatial")
+    args = parser.parse_args()
+    
+    if args.source:
+        if not args.destination:
+            parser.error("destination requise avec une source")
+        paires = [(args.source, args.destination)]
+    else:
+        paires = [
+            (config.FICHIER_POINTS_INTERET, config.FICHIER_POINTS_INTERET_BINAIRE),
+            (config.FICHIER_ARRETS_BUS, config.FICHIER_ARRETS_BUS_BINAIRE)
+        ]
+        if args.sens == "json":
+            paires = [(binaire, fichier_json) for fichier_json, binaire in paires]
+            
+    for source, destination in paires:
+        if args.sens == "binaire":
+            nombre = convertir_json_vers_binaire(source, destination, None if args.sans_index else TAILLE_CELLULE_DEFAUT)
+        else:
+            nombre = convertir_binaire_vers_json(source, destination)
+        print(f"✅ {source} → {destination}: {nombre} points")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Journal des modifications de points (ajout seul, rejoué au démarrage) - VERSION KINSHASA
+
+Chaque ligne du fichier est un lot validé : {"operations": [...]} avec
+    {"op": "ajouter", "cle": nom, "point": {...}}  ou  {"op": "retirer", "cle": nom}
+Un lot est écrit en une seule ligne : une ligne incomplète (arrêt brutal
+pendant l'écriture) est ignorée et tronquée à la relecture, le lot est perdu
+en entier mais jamais appliqué à moitié.
+"""
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+# Imports absolus
+from core.etat import Point
+
+OP_AJOUTER = "ajouter"
+OP_RETIRER = "retirer"
+
+def operation_ajout(cle: str, point: Point) -> Dict:
+    """Opération d'ajout (ou de remplacement) d'un point"""
+    return {"op": OP_AJOUTER, "cle": cle, "point": point.to_dict()}
+
+def operation_retrait(cle: str) -> Dict:
+    """Opération de retrait d'un point"""
+    return {"op": OP_RETIRER, "cle": cle}
+
+def etat_final(operations: List[Dict]) -> Dict[str, Optional[Point]]:
+    """
+    Réduit une suite d'opérations à leur effet : la dernière opération
+    sur une clé l'emporte
+    
+    Returns:
+        Clé → Point (ajout ou remplacement) ou None (retrait)
+    """
+    resultat = {}
+    for operation in operations:
+        if operation["op"] == OP_AJOUTER:
+            resultat[operation["cle"]] = Point.from_dict(operation["point"])
+        else:
+            resultat[operation["cle"]] = None
+    return resultat
+
+class JournalPoints:
+    """Fichier journal en ajout seul (JSON Lines, un lot validé par ligne)"""
+    
+    def __init__(self, fichier: str, synchroniser: bool = True):
+        self.fichier = fichier
+        self.synchroniser = synchroniser
+        self.nombre_operations = 0
+        self._verrou = threading.Lock()
+    
+    def relire(self) -> List[Dict]:
+        """
+        Relit toutes les opérations validées, dans l'ordre d'écriture
+        
+        Une fin de fichier illisible (lot interrompu) est tronquée.
+        
+        Returns:
+            Liste des opérations
+        """
+        operations = []
+        with self._verrou:
+            if not os.path.exists(self.fichier):
+                self.nombre_operations = 0
+                return operations
+                
+            valide = 0
+            with open(self.fichier, 'rb') as f:
+                for ligne in f:
+                    if not ligne.endswith(b"\n"):
+                        break
+                    try:
+                        lot = json.loads(ligne.decode("utf-8"))["operations"]
+                    except (ValueError, KeyError, TypeError):
+                        break
+                    operations.extend(lot)
+                    valide += len(ligne)
+                    
+            taille = os.path.getsize(self.fichier)
+            if valide < taille:
+                print(f"⚠️  Journal {self.fichier}: {taille - valide} octets incomplets ignorés")
+                with open(self.fichier, 'r+b') as f:
+                    f.truncate(valide)
+                    
+            self.nombre_operations = len(operations)
+        return operations
+    
+    def ajouter(self, operations: List[Dict]):
+        """Ajoute un lot d'opérations en une seule écriture (synchronisée sur disque)"""
+        if not operations:
+            return
+        ligne = json.dumps({"operations": operations}, ensure_ascii=False) + "\n"
+        with self._verrou:
+            dossier = os.path.dirname(self.fichier)
+            if dossier:
+                os.makedirs(dossier, exist_ok=True)
+            with open(self.fichier, 'a', encoding='utf-8') as f:
+                f.write(ligne)
+                f.flush()
+                if self.synchroniser:
+                    os.fsync(f.fileno())
+            self.nombre_operations += len(operations)
+    
+    def vider(self):
+        """Vide le journal (après compaction dans le fichier principal)"""
+        with self._verrou:
+            if os.path.exists(self.fichier):
+                with open(self.fichier, 'r+b') as f:
+                    f.truncate(0)
+                    if self.synchroniser:
+                        os.fsync(f.fileno())
+            self.nombre_operations = 0
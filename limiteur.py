@@ -0,0 +1,76 @@
+"""
+Limitation de débit par seau à jetons - VERSION KINSHASA
+"""
+import threading
+import time
+
+class LimiteurJetons:
+    """
+    Seau à jetons partagé entre threads
+    
+    Le seau se remplit à `debit` jetons par seconde jusqu'à `capacite`.
+    Chaque appel à acquerir() réserve ses jetons immédiatement (le solde
+    peut devenir négatif) puis attend hors verrou : les appelants
+    concurrents sont donc servis dans l'ordre, espacés de 1/debit.
+    """
+    
+    def __init__(self, debit: float, capacite: float = 1.0):
+        if debit <= 0:
+            raise ValueError("Le débit doit être strictement positif")
+        self.debit = debit
+        self.capacite = capacite
+        self._jetons = capacite
+        self._dernier_remplissage = time.monotonic()
+        self._verrou = threading.Lock()
+    
+    def _remplir(self, maintenant: float):
+        """Ajoute les jetons accumulés depuis le dernier remplissage"""
+        ecoule = maintenant - self._dernier_remplissage
+        self._jetons = min(self.capacite, self._jetons + ecoule * self.debit)
+        self._dernier_remplissage = maintenant
+    
+    def reserver(self, jetons: float = 1.0) -> float:
+        """
+        Réserve des jetons sans attendre
+        
+        Args:
+            jetons: Nombre de jetons à consommer
+            
+        Returns:
+            Délai en secondes avant de pouvoir utiliser la réservation
+        """
+        with self._verrou:
+            self._remplir(time.monotonic())
+            self._jetons -= jetons
+            if self._jetons >= 0:
+                return 0.0
+            return -self._jetons / self.debit
+    
+    def acquerir(self, jetons: float = 1.0) -> float:
+        """
+        Consomme des jetons en attendant si nécessaire
+        
+        Args:
+            jetons: Nombre de jetons à consommer
+            
+        Returns:
+            Temps d'attente effectif en secondes
+        """
+        attente = self.reserver(jetons)
+        if attente > 0:
+            time.sleep(attente)
+        return attente
+    
+    def essayer_acquerir(self, jetons: float = 1.0) -> bool:
+        """
+        Consomme des jetons seulement s'ils sont disponibles immédiatement
+        
+        Returns:
+            True si les jetons ont été consommés, False sinon
+        """
+        with self._verrou:
+            self._remplir(time.monotonic())
+            if self._jetons >= jetons:
+                self._jetons -= jetons
+                return True
+            return False
@@ -0,0 +1,304 @@
+"""
+Matrice des distances et durées de trajet entre points connus - VERSION KINSHASA
+
+Les coûts de tous les couples de points déjà rencontrés sont gardés dans une
+matrice carrée (indexée par une clé nom + coordonnées) et enregistrés dans
+config.FICHIER_MATRICE_TRAJETS. Une demande N origines × M destinations ne
+calcule, en un seul lot, que les lignes et colonnes des points nouveaux ;
+un couple de points connus se lit ensuite en O(1).
+
+Les tableaux sont alloués par capacité doublée et les points nouveaux
+marquent la matrice comme modifiée : elle n'est réécrite qu'après
+config.MATRICE_LOT_SAUVEGARDE points nouveaux, sur enregistrer() ou à la
+sortie du programme. Au-delà de config.MATRICE_MAX_POINTS, les points les
+moins récemment utilisés sont évincés.
+
+La matrice enregistrée porte la version du jeu de données qui l'a produite
+(graphe routier et vitesse moyenne) : elle est ignorée si celui-ci change.
+"""
+import atexit
+import os
+import threading
+import weakref
+from typing import Dict, List, Sequence, Tuple
+
+# Imports absolus
+from core.etat import Point
+from utils.config import config
+from utils.helpers import coordonnees_points, matrice_distances
+from utils.paresseux import SingletonParesseux, module_paresseux
+
+np = module_paresseux("numpy")
+
+# Matrices modifiées depuis leur dernier enregistrement, écrites à la sortie
+_matrices_modifiees = weakref.WeakSet()
+
+@atexit.register
+def _enregistrer_matrices_modifiees():
+    for matrice in list(_matrices_modifiees):
+        matrice.enregistrer()
+
+def cle_point(point: Point) -> str:
+    """Clé d'un point dans la matrice (un point déplacé est un nouveau point)"""
+    return f"{point.nom}|{point.latitude:.6f}|{point.longitude:.6f}"
+
+class ServiceMatrice:
+    """
+    Coûts de trajet (km, minutes) entre points, calculés par lots et mis en cache
+    
+    Avec le graphe routier : plus rapide chemin entre les nœuds d'accrochage,
+    raccords parcourus à la vitesse moyenne ; sans graphe, ou sans chemin :
+    distance à vol d'oiseau à la vitesse moyenne (comme ServiceRouting).
+    """
+    
+    def __init__(self, graphe=None, fichier: str = None, charger_graphe: bool = True):
+        """
+        Args:
+            graphe: GrapheRoutier (défaut: graphe partagé, chargé au premier calcul)
+            fichier: Matrice enregistrée (défaut: config.FICHIER_MATRICE_TRAJETS)
+            charger_graphe: False pour travailler sans graphe routier quand graphe est None
+        """
+        self._graphe = graphe
+        self._graphe_charge = graphe is not None or not charger_graphe
+        self.fichier = fichier or config.FICHIER_MATRICE_TRAJETS
+        self._index: Dict[str, int] = {}
+        self._cles: List[str] = []
+        self._distances = None
+        self._durees = None
+        self._utilisations = None  # horloge du dernier usage de chaque point
+        self._horloge = 0
+        self._ajouts = 0  # points nouveaux depuis le dernier enregistrement
+        self._charge = False
+        self._version = None
+        self._verrou = threading.RLock()
+    
+    @property
+    def graphe(self):
+        """Graphe routier, ou None s'il n'a pas été compilé"""
+        if not self._graphe_charge:
+            from services.graphe_routier import graphe_routier_partage
+            self._graphe = graphe_routier_partage()
+            self._graphe_charge = True
+        return self._graphe
+    
+    def __len__(self) -> int:
+        with self._verrou:
+            self._charger()
+            return len(self._cles)
+    
+    def version(self) -> str:
+        """Version du jeu de données qui détermine les coûts"""
+        graphe = self.graphe
+        if graphe is None:
+            reseau = "vol_oiseau"
+        else:
+            from services.hierarchie_routiere import signature_graphe
+            reseau = "graphe:" + "-".join(str(valeur) for valeur in signature_graphe(graphe).tolist())
+        return f"{reseau}|{config.VITESSE_MOYENNE_KMH}"
+    
+    def _charger(self):
+        """Recharge la matrice enregistrée si elle correspond à la version courante"""
+        if self._charge:
+            return
+        self._charge = True
+        self._version = self.version()
+        self._vider()
+        if not os.path.exists(self.fichier):
+            return
+        try:
+            with np.load(self.fichier) as donnees:
+                if str(donnees["version"]) != self._version:
+                    print("🔄 Matrice des trajets périmée (graphe ou vitesse modifiés), recalcul à la demande")
+                    return
+                self._cles = donnees["cles"].tolist()
+                self._distances, self._durees = donnees["distances_km"], donnees["durees_min"]
+            self._index = {cle: i for i, cle in enumerate(self._cles)}
+            self._utilisations = np.zeros(len(self._cles), dtype=np.int64)
+            print(f"📂 Matrice des trajets chargée: {len(self._cles)} points")
+        except Exception as e:
+            print(f"⚠️  Matrice des trajets illisible ({self.fichier}): {e}")
+            self._vider()
+    
+    def _vider(self):
+        self._cles, self._index = [], {}
+        self._distances, self._durees = np.zeros((0, 0)), np.zeros((0, 0))
+        self._utilisations = np.zeros(0, dtype=np.int64)
+    
+    @property
+    def modifiee(self) -> bool:
+        """Vrai si des points ont été ajoutés ou évincés depuis le dernier enregistrement"""
+        return self in _matrices_modifiees
+    
+    def enregistrer(self) -> bool:
+        """Enregistre la matrice (fichier temporaire remplacé atomiquement)"""
+        with self._verrou:
+            self._charger()
+            n = len(self._cles)
+            try:
+                dossier = os.path.dirname(self.fichier)
+                if dossier:
+                    os.makedirs(dossier, exist_ok=True)
+                temporaire = f"{self.fichier}.{os.getpid()}.tmp"
+                with open(temporaire, 'wb') as f:
+                    np.savez(f, version=np.array(self._version), cles=np.array(self._cles, dtype=str),
+                             distances_km=self._distances[:n, :n], durees_min=self._durees[:n, :n])
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temporaire, self.fichier)
+                self._ajouts = 0
+                _matrices_modifiees.discard(self)
+                return True
+            except Exception as e:
+                print(f"❌ Erreur sauvegarde matrice des trajets: {e}")
+                return False
+    
+    def _indices(self, points: Sequence[Point]) -> List[int]:
+        """Indices des points dans la matrice, après calcul en un lot des points nouveaux"""
+        cles = [cle_point(point) for point in points]
+        nouveaux = {}
+        for cle, point in zip(cles, points):
+            if cle not in self._index and cle not in nouveaux:
+                nouveaux[cle] = point
+        self._horloge += 1
+        connus = [self._index[cle] for cle in cles if cle in self._index]
+        self._utilisations[connus] = self._horloge
+        if nouveaux:
+            if len(self._cles) + len(nouveaux) > config.MATRICE_MAX_POINTS:
+                self._evincer(len(nouveaux), len(set(connus)))
+            self._etendre(list(nouveaux.values()), list(nouveaux))
+            self._utilisations[[self._index[cle] for cle in nouveaux]] = self._horloge
+            self._ajouts += len(nouveaux)
+            _matrices_modifiees.add(self)
+            if self._ajouts >= config.MATRICE_LOT_SAUVEGARDE:
+                self.enregistrer()
+        return [self._index[cle] for cle in cles]
+    
+    def _evincer(self, places: int, demandes: int):
+        """
+        Évince les points les moins récemment utilisés pour faire de la place
+        
+        Un quart de la capacité est libéré en plus, pour ne pas évincer à
+        chaque point nouveau ; les points de la demande en cours sont gardés.
+        
+        Args:
+            places: Nombre de points à ajouter
+            demandes: Nombre de points connus de la demande en cours
+        """
+        limite = config.MATRICE_MAX_POINTS
+        garder = max(limite - places - limite // 4, demandes, 0)
+        n = len(self._cles)
+        gardes = np.sort(np.argsort(-self._utilisations[:n], kind="stable")[:garder])
+        selection = np.ix_(gardes, gardes)
+        m = len(gardes)
+        self._distances[:m, :m], self._durees[:m, :m] = self._distances[selection], self._durees[selection]
+        self._utilisations[:m] = self._utilisations[gardes]
+        self._cles = [self._cles[i] for i in gardes.tolist()]
+        self._index = {cle: i for i, cle in enumerate(self._cles)}
+        print(f"♻️  Matrice des trajets pleine: {n - m} points évincés (moins récemment utilisés)")
+    
+    def _reserver(self, taille: int):
+        """Garantit une capacité d'au moins taille points (doublée si nécessaire)"""
+        capacite = self._distances.shape[0]
+        if taille <= capacite:
+            return
+        capacite = max(taille, 2 * capacite, 16)
+        n = len(self._cles)
+        distances, durees = np.zeros((capacite, capacite)), np.zeros((capacite, capacite))
+        distances[:n, :n], durees[:n, :n] = self._distances[:n, :n], self._durees[:n, :n]
+        utilisations = np.zeros(capacite, dtype=np.int64)
+        utilisations[:n] = self._utilisations[:n]
+        self._distances, self._durees, self._utilisations = distances, durees, utilisations
+    
+    def _etendre(self, points: List[Point], cles: List[str]):
+        """Ajoute des points : lignes nouveaux × tous, colonnes connus × nouveaux"""
+        connus = [self._point(cle) for cle in self._cles]
+        n, total = len(connus), len(connus) + len(points)
+        self._reserver(total)
+        self._distances[n:total, :total], self._durees[n:total, :total] = self.calculer(points, connus + points)
+        if n:
+            self._distances[:n, n:total], self._durees[:n, n:total] = self.calculer(connus, points)
+        for cle in cles:
+            self._index[cle] = len(self._cles)
+            self._cles.append(cle)
+    
+    @staticmethod
+    def _point(cle: str) -> Point:
+        nom, latitude, longitude = cle.rsplit("|", 2)
+        return Point(nom, float(latitude), float(longitude))
+    
+    def calculer(self, origines: Sequence[Point],
+                 destinations: Sequence[Point]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Distances (km) et durées (minutes) origines × destinations, sans cache
+        
+        Returns:
+            Deux tableaux (len(origines), len(destinations))
+        """
+        lats_o, lons_o = coordonnees_points(origines)
+        lats_d, lons_d = coordonnees_points(destinations)
+        distances = matrice_distances(lats_o, lons_o, lats_d, lons_d)
+        durees = distances / config.VITESSE_MOYENNE_KMH * 60
+        graphe = self.graphe
+        if graphe is None or not graphe.nombre_noeuds:
+            return distances, durees
+            
+        # Accrochage de chaque point, puis un seul calcul entre nœuds distincts
+        accroches_o = [graphe.noeud_proche(lat, lon) for lat, lon in zip(lats_o.tolist(), lons_o.tolist())]
+        accroches_d = [graphe.noeud_proche(lat, lon) for lat, lon in zip(lats_d.tolist(), lons_d.tolist())]
+        noeuds_o, positions_o = np.unique([noeud for noeud, _ in accroches_o], return_inverse=True)
+        noeuds_d, positions_d = np.unique([noeud for noeud, _ in accroches_d], return_inverse=True)
+        durees_s, distances_m = graphe.matrice(noeuds_o.tolist(), noeuds_d.tolist())
+        durees_s, distances_m = durees_s[np.ix_(positions_o, positions_d)], distances_m[np.ix_(positions_o, positions_d)]
+        
+        raccords_km = (np.array([raccord for _, raccord in accroches_o])[:, np.newaxis] +
+                       np.array([raccord for _, raccord in accroches_d])[np.newaxis, :]) / 1000
+        routiers = np.isfinite(durees_s) & (distances > 0)
+        distances = np.where(routiers, distances_m / 1000 + raccords_km, distances)
+        durees = np.where(routiers, durees_s / 60 + raccords_km / config.VITESSE_MOYENNE_KMH * 60, durees)
+        return distances, durees
+    
+    def matrice(self, origines: Sequence[Point],
+                destinations: Sequence[Point]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Distances (km) et durées (minutes) origines × destinations, les points
+        nouveaux étant calculés en un seul lot puis mis en cache
+        
+        Returns:
+            Deux tableaux (len(origines), len(destinations))
+        """
+        with self._verrou:
+            self._charger()
+            indices = self._indices(list(origines) + list(destinations))
+            selection = np.ix_(indices[:len(origines)], indices[len(origines):])
+            return self._distances[selection], self._durees[selection]
+    
+    def cout(self, depart: Point, arrivee: Point) -> Tuple[float, float]:
+        """(distance km, durée minutes) d'un trajet, lu dans la matrice si les deux points sont connus"""
+        with self._verrou:
+            self._charger()
+            i, j = self._index.get(cle_point(depart)), self._index.get(cle_point(arrivee))
+            if i is None or j is None:
+                i, j = self._indices([depart, arrivee])
+            else:
+                self._horloge += 1
+                self._utilisations[[i, j]] = self._horloge
+            return float(self._distances[i, j]), float(self._durees[i, j])
+    
+    def couts_segments(self, points: Sequence[Point]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Distances et durées des segments consécutifs d'un itinéraire
+        
+        Returns:
+            Deux tableaux de len(points) - 1 valeurs
+        """
+        with self._verrou:
+            self._charger()
+            indices = np.array(self._indices(points), dtype=np.int64)
+            return self._distances[indices[:-1], indices[1:]], self._durees[indices[:-1], indices[1:]]
+    
+    def distance_totale(self, points: Sequence[Point]) -> float:
+        """Distance totale d'un itinéraire en km"""
+        return float(self.couts_segments(points)[0].sum())
+
+# Instance globale, construite au premier usage
+service_matrice = SingletonParesseux(ServiceMatrice, "service_matrice")
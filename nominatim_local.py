@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Serveur Nominatim local (bouchon) pour les tests et mesures de performance
+
+Implémente les points d'accès /search et /reverse utilisés par ServiceGeocoding
+à partir de réponses enregistrées (fixtures JSON). Latence et taux d'erreur
+sont configurables ; le mode enregistrement interroge une seule fois le vrai
+service pour chaque requête inconnue et mémorise sa réponse.
+
+Utilisation :
+    python nominatim_local.py --fixtures data/fixtures_nominatim.json --port 8088
+    python nominatim_local.py --enregistrer https://nominatim.openstreetmap.org
+    python nominatim_local.py --depuis-cache data/cache_geocoding.json
+
+puis dans la configuration :
+    config.NOMINATIM_URL = "http://127.0.0.1:8088/search"
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+# Paramètres sans effet sur le contenu de la réponse, ignorés dans les clés
+PARAMETRES_IGNORES = {'format', 'addressdetails', 'accept-language'}
+
+REPONSE_INVERSE_INCONNUE = {'error': 'Unable to geocode'}
+
+def cle_requete(point_acces: str, params: Dict[str, str]) -> str:
+    """
+    Clé canonique d'une requête : paramètres triés, recherche en minuscules,
+    coordonnées du géocodage inverse arrondies à 4 décimales
+    """
+    canon = {}
+    for nom, valeur in params.items():
+        if nom in PARAMETRES_IGNORES:
+            continue
+        if nom == 'q':
+            valeur = " ".join(valeur.lower().split())
+        elif point_acces == 'reverse' and nom in ('lat', 'lon'):
+            valeur = f"{float(valeur):.4f}"
+        canon[nom] = valeur
+    return urllib.parse.urlencode(sorted(canon.items()))
+
+class FixturesNominatim:
+    """Réponses enregistrées par point d'accès, avec sauvegarde atomique"""
+    
+    def __init__(self, fichier: Optional[str] = None):
+        self.fichier = fichier
+        self.reponses: Dict[str, Dict[str, object]] = {'search': {}, 'reverse': {}}
+        self._verrou = threading.Lock()
+        if fichier and os.path.exists(fichier):
+            with open(fichier, 'r', encoding='utf-8') as f:
+                donnees = json.load(f)
+            for point_acces in self.reponses:
+                self.reponses[point_acces].update(donnees.get(point_acces, {}))
+    
+    def obtenir(self, point_acces: str, cle: str):
+        return self.reponses[point_acces].get(cle)
+    
+    def enregistrer(self, point_acces: str, cle: str, reponse):
+        with self._verrou:
+            self.reponses[point_acces][cle] = reponse
+            self.sauvegarder()
+    
+    def sauvegarder(self):
+        """Écrit les fixtures dans un fichier temporaire puis le renomme"""
+        if not self.fichier:
+            return
+        dossier = os.path.dirname(self.fichier)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        temporaire = f"{self.fichier}.tmp"
+        with open(temporaire, 'w', encoding='utf-8') as f:
+            json.dump(self.reponses, f, indent=2, ensure_ascii=False)
+        os.replace(temporaire, self.fichier)
+    
+    def importer_cache_geocoding(self, fichier_cache: str) -> int:
+        """
+        Crée des réponses /search à partir d'un cache_geocoding.json existant
+        
+        Returns:
+            Nombre de réponses ajoutées
+        """
+        with open(fichier_cache, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+            
+        ajoutees = 0
+        for requete, point in cache.items():
+            if not isinstance(point, dict) or 'latitude' not in point:
+                continue
+            cle = cle_requete('search', {'q': requete, 'limit': '1'})
+            self.reponses['search'][cle] = [{
+                'lat': str(point['latitude']),
+                'lon': str(point['longitude']),
+                'display_name': requete,
+                'type': point.get('type_point', 'inconnu')
+            }]
+            ajoutees += 1
+        self.sauvegarder()
+        return ajoutees
+
+class ServeurNominatimLocal(ThreadingHTTPServer):
+    """Serveur HTTP multi-thread portant la configuration du bouchon"""
+    
+    daemon_threads = True
+    
+    def __init__(self, adresse: Tuple[str, int], fixtures: FixturesNominatim,
+                 latence: float = 0.0, gigue: float = 0.0, taux_erreur: float = 0.0,
+                 taux_limitation: float = 0.0, url_amont: Optional[str] = None):
+        super().__init__(adresse, GestionnaireRequetes)
+        self.fixtures = fixtures
+        self.latence = latence
+        self.gigue = gigue
+        self.taux_erreur = taux_erreur
+        self.taux_limitation = taux_limitation
+        self.url_amont = url_amont.rstrip('/') if url_amont else None
+        self.nombre_requetes = 0
+        self._verrou = threading.Lock()
+        self._verrou_amont = threading.Lock()
+    
+    @property
+    def url(self) -> str:
+        """URL de base à utiliser pour config.NOMINATIM_URL (sans /search)"""
+        hote, port = self.server_address[:2]
+        return f"http://{hote}:{port}"
+    
+    def interroger_amont(self, point_acces: str, params: Dict[str, str]):
+        """Mode enregistrement : interroge le vrai Nominatim (1 requête/s au plus)"""
+        with self._verrou_amont:
+            time.sleep(1.0)
+            url = f"{self.url_amont}/{point_acces}?{urllib.parse.urlencode(params)}"
+            requete = urllib.request.Request(url, headers={
+                'User-Agent': 'AgentVehicule/1.0 (projet_agent_vehicule; enregistrement)'
+            })
+            with urllib.request.urlopen(requete, timeout=10) as reponse:
+                return json.loads(reponse.read().decode('utf-8'))
+
+class GestionnaireRequetes(BaseHTTPRequestHandler):
+    """Traite /search et /reverse"""
+    
+    server: ServeurNominatimLocal
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _envoyer_json(self, code: int, donnees, en_tetes: Dict[str, str] = None):
+        corps = json.dumps(donnees, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corps)))
+        for nom, valeur in (en_tetes or {}).items():
+            self.send_header(nom, valeur)
+        self.end_headers()
+        self.wfile.write(corps)
+    
+    def do_GET(self):
+        serveur = self.server
+        with serveur._verrou:
+            serveur.nombre_requetes += 1
+            
+        url = urllib.parse.urlsplit(self.path)
+        point_acces = url.path.strip('/').split('/')[-1]
+        if point_acces not in ('search', 'reverse'):
+            self._envoyer_json(404, {'error': 'Point d\'accès inconnu'})
+            return
+            
+        attente = serveur.latence + random.uniform(0, serveur.gigue)
+        if attente > 0:
+            time.sleep(attente)
+            
+        tirage = random.random()
+        if tirage < serveur.taux_limitation:
+            self._envoyer_json(429, {'error': 'Too Many Requests'}, {'Retry-After': '1'})
+            return
+        if tirage < serveur.taux_limitation + serveur.taux_erreur:
+            self._envoyer_json(503, {'error': 'Service Unavailable'})
+            return
+            
+        params = dict(urllib.parse.parse_qsl(url.query))
+        cle = cle_requete(point_acces, params)
+        reponse = serveur.fixtures.obtenir(point_acces, cle)
+        
+        if reponse is None and serveur.url_amont:
+            try:
+                reponse = serveur.interroger_amont(point_acces, params)
+                serveur.fixtures.enregistrer(point_acces, cle, reponse)
+            except Exception as e:
+                self._envoyer_json(502, {'error': f"Amont indisponible: {e}"})
+                return
+                
+        if reponse is None:
+            reponse = [] if point_acces == 'search' else REPONSE_INVERSE_INCONNUE
+        self._envoyer_json(200, reponse)
+
+def demarrer_serveur_local(fixtures: FixturesNominatim = None, hote: str = "127.0.0.1",
+                           port: int = 0, **options) -> ServeurNominatimLocal:
+    """
+    Démarre le serveur dans un thread d'arrière-plan
+    
+    Args:
+        fixtures: Réponses enregistrées (vides par défaut)
+        port: Port d'écoute (0 = port libre choisi par le système)
+        options: latence, gigue, taux_erreur, taux_limitation, url_amont
+        
+    Returns:
+        Serveur démarré ; appeler shutdown() pour l'arrêter
+    """
+    serveur = ServeurNominatimLocal((hote, port), fixtures or FixturesNominatim(), **options)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    return serveur
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur Nominatim local pour tests et benchmarks")
+    parser.add_argument("--fixtures", default="data/fixtures_nominatim.json",
+                        help="Fichier JSON des réponses enregistrées")
+    parser.add_argument("--hote", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--latence", type=float, default=0.0, help="Latence fixe (s)")
+    parser.add_argument("--gigue", type=float, default=0.0, help="Latence aléatoire supplémentaire max. (s)")
+    parser.add_argument("--taux-erreur", type=float, default=0.0, help="Proportion de réponses 503")
+    parser.add_argument("--taux-limitation", type=float, default=0.0, help="Proportion de réponses 429")
+    parser.add_argument("--enregistrer", metavar="URL_AMONT",
+                        help="Mode enregistrement : URL du vrai Nominatim")
+    parser.add_argument("--depuis-cache", metavar="FICHIER",
+                        help="Importe un cache_geocoding.json dans les fixtures puis quitte")
+    args = parser.parse_args()
+    
+    fixtures = FixturesNominatim(args.fixtures)
+    if args.depuis_cache:
+        ajoutees = fixtures.importer_cache_geocoding(args.depuis_cache)
+        print(f"✅ {ajoutees} réponses importées dans {args.fixtures}")
+        return
+        
+    serveur = ServeurNominatimLocal(
+        (args.hote, args.port), fixtures,
+        latence=args.latence, gigue=args.gigue,
+        taux_erreur=args.taux_erreur, taux_limitation=args.taux_limitation,
+        url_amont=args.enregistrer
+    )
+    print(f"🚀 Nominatim local sur {serveur.url}")
+    print(f"   config.NOMINATIM_URL = \"{serveur.url}/search\"")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        print("🛑 Serveur arrêté")
+
+if __name__ == "__main__":
+    main()
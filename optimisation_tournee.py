@@ -0,0 +1,147 @@
+"""
+Ordre de visite d'une tournée multi-arrêts - VERSION KINSHASA
+
+Travaille sur une matrice de coûts déjà calculée (durées ou distances, non
+forcément symétrique : sens uniques) :
+1. construction par le plus proche voisin
+2. amélioration locale 2-opt (inversion d'une portion) et Or-opt
+   (déplacement d'une portion de 1 à 3 arrêts), jusqu'à ce qu'aucun
+   mouvement n'améliore le coût ou que le budget de temps soit épuisé
+Pour un arrêt donné, tous les mouvements candidats sont évalués en un seul
+calcul NumPy (sommes cumulées le long du chemin).
+"""
+import time
+from typing import List
+
+from utils.paresseux import module_paresseux
+
+np = module_paresseux("numpy")
+
+# Longueurs de portion essayées par Or-opt
+LONGUEURS_OR_OPT = (1, 2, 3)
+# Gain minimal d'un mouvement (évite de boucler sur des erreurs d'arrondi)
+GAIN_MINIMAL = 1e-9
+
+def cout_chemin(couts: "np.ndarray", ordre: List[int]) -> float:
+    """Coût total du chemin ordre[0] → ordre[1] → ... → ordre[-1]"""
+    ordre = np.asarray(ordre, dtype=np.int64)
+    return float(np.asarray(couts, dtype=float)[ordre[:-1], ordre[1:]].sum())
+
+def optimiser_ordre(couts: "np.ndarray", fixer_depart: bool = True, fixer_arrivee: bool = True,
+                    budget_s: float = 1.0) -> List[int]:
+    """
+    Ordre de visite de moindre coût des n points d'une matrice de coûts
+    
+    Args:
+        couts: Matrice (n, n), couts[i, j] = coût du trajet i → j
+        fixer_depart: Le point 0 reste le premier
+        fixer_arrivee: Le point n-1 reste le dernier (pour une tournée qui
+            revient au dépôt, le dépôt est aussi le dernier point)
+        budget_s: Temps maximal de l'amélioration locale (secondes)
+        
+    Returns:
+        Permutation des indices 0..n-1
+    """
+    couts = np.asarray(couts, dtype=float)
+    n = len(couts)
+    if n <= 2:
+        return list(range(n))
+    echeance = time.perf_counter() + budget_s
+    
+    # Extrémités libres : un point fictif de coût nul sert d'extrémité fixe
+    libres = [i for i in range(n)
+              if not (fixer_depart and i == 0) and not (fixer_arrivee and i == n - 1)]
+    etendus = np.zeros((n + 1, n + 1))
+    etendus[:n, :n] = couts
+    fictif = n
+    depart = 0 if fixer_depart else fictif
+    arrivee = n - 1 if fixer_arrivee else fictif
+    
+    chemin = _plus_proche_voisin(etendus, depart, arrivee, libres)
+    while time.perf_counter() < echeance:
+        ameliore = _deux_opt(etendus, chemin, echeance)
+        ameliore = _or_opt(etendus, chemin, echeance) or ameliore
+        if not ameliore:
+            break
+    return [point for point in chemin if point != fictif]
+
+def _plus_proche_voisin(couts: "np.ndarray", depart: int, arrivee: int, libres: List[int]) -> List[int]:
+    """Chemin depart → (libres, du plus proche au plus proche) → arrivee"""
+    restants = np.array(libres, dtype=np.int64)
+    disponibles = np.ones(len(restants), dtype=bool)
+    chemin = [depart]
+    courant = depart
+    for _ in range(len(restants)):
+        candidats = np.where(disponibles, couts[courant, restants], np.inf)
+        position = int(np.argmin(candidats))
+        disponibles[position] = False
+        courant = int(restants[position])
+        chemin.append(courant)
+    chemin.append(arrivee)
+    return chemin
+
+def _deux_opt(couts: "np.ndarray", chemin: List[int], echeance: float) -> bool:
+    """
+    Une passe 2-opt : pour chaque i, meilleure inversion de chemin[i..j]
+    
+    Le coût d'une portion parcourue à l'envers est tiré des sommes cumulées
+    des coûts inverses (matrice asymétrique).
+    """
+    ameliore = False
+    m = len(chemin)
+    i = 1
+    while i < m - 2:
+        if time.perf_counter() > echeance:
+            break
+        points = np.asarray(chemin, dtype=np.int64)
+        avant = np.concatenate(([0.0], np.cumsum(couts[points[:-1], points[1:]])))
+        arriere = np.concatenate(([0.0], np.cumsum(couts[points[1:], points[:-1]])))
+        j = np.arange(i + 1, m - 1)
+        precedent, premier = points[i - 1], points[i]
+        derniers, suivants = points[j], points[j + 1]
+        gains = (couts[precedent, premier] + couts[derniers, suivants] + (avant[j] - avant[i])
+                 - couts[precedent, derniers] - couts[premier, suivants] - (arriere[j] - arriere[i]))
+        meilleur = int(np.argmax(gains))
+        if gains[meilleur] > GAIN_MINIMAL:
+            fin = int(j[meilleur])
+            chemin[i:fin + 1] = chemin[i:fin + 1][::-1]
+            ameliore = True
+        else:
+            i += 1
+    return ameliore
+
+def _or_opt(couts: "np.ndarray", chemin: List[int], echeance: float) -> bool:
+    """Une passe Or-opt : déplace une portion de 1 à 3 points vers sa meilleure position"""
+    ameliore = False
+    i = 1
+    while i < len(chemin) - 1:
+        if time.perf_counter() > echeance:
+            break
+        deplace = False
+        for longueur in LONGUEURS_OR_OPT:
+            m = len(chemin)
+            if i + longueur > m - 1:
+                break
+            points = np.asarray(chemin, dtype=np.int64)
+            premier, dernier = points[i], points[i + longueur - 1]
+            precedent, suivant = points[i - 1], points[i + longueur]
+            retrait = couts[precedent, premier] + couts[dernier, suivant] - couts[precedent, suivant]
+            # Insertion entre points[k] et points[k + 1], hors de la portion et de ses voisins
+            k = np.concatenate((np.arange(0, i - 1), np.arange(i + longueur, m - 1)))
+            if not len(k):
+                continue
+            a, b = points[k], points[k + 1]
+            gains = retrait - (couts[a, premier] + couts[dernier, b] - couts[a, b])
+            meilleur = int(np.argmax(gains))
+            if gains[meilleur] > GAIN_MINIMAL:
+                position = int(k[meilleur])
+                portion = chemin[i:i + longueur]
+                del chemin[i:i + longueur]
+                if position > i:
+                    position -= longueur
+                chemin[position + 1:position + 1] = portion
+                ameliore = deplace = True
+                break
+        if not deplace:
+            i += 1
+    return ameliore
@@ -0,0 +1,95 @@
+"""
+Initialisation paresseuse des singletons et des modules lourds - VERSION KINSHASA
+
+Importer un module du projet ne doit coûter que la définition de ses classes :
+les instances globales (gestionnaire de données, service de géocodage,
+générateurs de carte et de rapport) et les dépendances lourdes (numpy,
+requests, folium) ne sont construites ou importées qu'au premier usage.
+"""
+import importlib
+import threading
+from typing import Any, Callable
+
+# Marqueur d'une instance pas encore construite (None est une valeur légitime)
+_NON_CHARGE = object()
+
+class SingletonParesseux:
+    """
+    Mandataire d'un objet construit au premier accès à l'un de ses attributs
+    
+    La construction est protégée par un verrou à double vérification : un
+    seul thread appelle la fabrique, les autres attendent puis partagent le
+    même objet. Si la fabrique échoue, l'erreur est propagée et le prochain
+    accès retente la construction. Lectures, affectations et suppressions
+    d'attributs sont transmises à l'objet construit.
+    """
+    
+    # Noms préfixés pour ne jamais masquer un attribut de l'objet enveloppé
+    __slots__ = ("_paresseux_fabrique", "_paresseux_nom", "_paresseux_objet", "_paresseux_verrou")
+    
+    def __init__(self, fabrique: Callable[[], Any], nom: str = None):
+        """
+        Args:
+            fabrique: Fonction sans argument qui construit l'objet
+            nom: Nom affiché tant que l'objet n'est pas construit
+        """
+        object.__setattr__(self, "_paresseux_fabrique", fabrique)
+        object.__setattr__(self, "_paresseux_nom", nom or getattr(fabrique, "__name__", "objet"))
+        object.__setattr__(self, "_paresseux_objet", _NON_CHARGE)
+        object.__setattr__(self, "_paresseux_verrou", threading.Lock())
+    
+    def _paresseux_obtenir(self) -> Any:
+        objet = self._paresseux_objet
+        if objet is _NON_CHARGE:
+            with self._paresseux_verrou:
+                objet = self._paresseux_objet
+                if objet is _NON_CHARGE:
+                    objet = self._paresseux_fabrique()
+                    object.__setattr__(self, "_paresseux_objet", objet)
+        return objet
+    
+    def __getattr__(self, nom: str) -> Any:
+        return getattr(self._paresseux_obtenir(), nom)
+    
+    def __setattr__(self, nom: str, valeur: Any):
+        setattr(self._paresseux_obtenir(), nom, valeur)
+    
+    def __delattr__(self, nom: str):
+        delattr(self._paresseux_obtenir(), nom)
+    
+    def __dir__(self):
+        return dir(self._paresseux_obtenir())
+    
+    def __repr__(self) -> str:
+        objet = self._paresseux_objet
+        if objet is _NON_CHARGE:
+            return f"<{self._paresseux_nom} (non initialisé)>"
+        return repr(objet)
+
+def module_paresseux(nom: str) -> Any:
+    """
+    Module importé au premier accès à l'un de ses attributs
+    
+    À réserver aux dépendances lourdes utilisées dans le corps des fonctions :
+    une annotation évaluée à la définition (ex. -> np.ndarray) déclencherait
+    l'import, elle doit être écrite entre guillemets.
+    
+    Args:
+        nom: Nom complet du module (ex. "numpy", "folium")
+        
+    Returns:
+        Mandataire utilisable comme le module lui-même
+    """
+    return SingletonParesseux(lambda: importlib.import_module(nom), nom)
+
+def est_charge(objet: Any) -> bool:
+    """True si l'objet n'est pas un mandataire paresseux, ou s'il est déjà construit"""
+    if isinstance(objet, SingletonParesseux):
+        return object.__getattribute__(objet, "_paresseux_objet") is not _NON_CHARGE
+    return True
+
+def reel(objet: Any) -> Any:
+    """Objet enveloppé par un mandataire paresseux (construit si besoin), sinon l'objet lui-même"""
+    if isinstance(objet, SingletonParesseux):
+        return objet._paresseux_obtenir()
+    return objet
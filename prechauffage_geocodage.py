@@ -0,0 +1,103 @@
+"""
+Préchauffage du géocodage et compilation de l'instantané - VERSION KINSHASA
+
+Rassemble tous les noms de lieux connus de l'application (extrémités de la
+configuration, points d'intérêt, arrêts de bus), les géocode par lot puis
+compile un instantané immuable que ServiceGeocoding charge au démarrage.
+
+Utilisation :
+    python -m services.prechauffage_geocodage
+    python -m services.prechauffage_geocodage --hors-ligne --sortie data/instantane_geocoding.bin
+"""
+import argparse
+import time
+from typing import Dict, List
+
+# Imports absolus
+from core.etat import Point
+from utils.config import config
+from services.data_manager import gestionnaire_donnees
+from services.geocoding import service_geocoding
+from services.instantane_geocoding import compiler_instantane
+
+def collecter_lieux() -> List[str]:
+    """
+    Liste dédoublonnée des lieux utilisés par le planificateur
+    
+    Returns:
+        Noms de lieux dans l'ordre de première apparition
+    """
+    lieux = [
+        config.ETAT_INITIAL.split(',')[0].strip(),
+        config.ETAT_FINAL.split(',')[0].strip()
+    ]
+    lieux.extend(config.POINTS_INTERET_KINSHASA.keys())
+    lieux.extend(gestionnaire_donnees.points_interet.keys())
+    lieux.extend(gestionnaire_donnees.arrets_bus.keys())
+    return list(dict.fromkeys(lieux))
+
+def prechauffer(lieux: List[str], ville: str = None, pays: str = None) -> Dict[str, Point]:
+    """
+    Géocode les lieux (gazetteer, cache puis Nominatim) et remplit le cache
+    
+    Returns:
+        Clé normalisée de l'instantané → Point, pour les lieux trouvés
+    """
+    if ville is None:
+        ville = config.VILLE_DEFAUT
+    if pays is None:
+        pays = config.PAYS_DEFAUT
+        
+    entrees = {}
+    for resultat in service_geocoding.geocoder_lots(lieux, ville, pays):
+        if resultat.trouve:
+            entrees[service_geocoding._cle_vol(resultat.lieu, ville, pays)] = resultat.point
+    return entrees
+
+def compiler(fichier: str = None, lieux_supplementaires: List[str] = None) -> int:
+    """
+    Préchauffe puis compile l'instantané et le recharge dans le service
+    
+    Args:
+        fichier: Instantané à produire (défaut: configuration)
+        lieux_supplementaires: Lieux à inclure en plus de ceux collectés
+        
+    Returns:
+        Nombre d'entrées compilées
+    """
+    fichier = fichier or config.FICHIER_INSTANTANE_GEOCODING
+    lieux = collecter_lieux() + list(lieux_supplementaires or [])
+    
+    # Recompiler depuis les sources, sans relire l'instantané précédent
+    service_geocoding.instantane = None
+    debut = time.perf_counter()
+    entrees = prechauffer(lieux)
+    nombre = compiler_instantane(entrees, fichier)
+    service_geocoding.charger_instantane(fichier)
+    
+    print(f"✅ Instantané compilé: {nombre}/{len(lieux)} lieux → {fichier} "
+          f"({time.perf_counter() - debut:.1f}s)")
+    return nombre
+
+def main():
+    parser = argparse.ArgumentParser(description="Préchauffe le géocodage et compile l'instantané")
+    parser.add_argument("--sortie", default=config.FICHIER_INSTANTANE_GEOCODING,
+                        help="Fichier instantané à produire")
+    parser.add_argument("--lieux", metavar="FICHIER",
+                        help="Fichier texte de lieux supplémentaires (un par ligne)")
+    parser.add_argument("--hors-ligne", action="store_true",
+                        help="Ne compile que ce qui est résolu sans appel réseau")
+    args = parser.parse_args()
+    
+    if args.hors_ligne:
+        config.GEOCODAGE_HORS_LIGNE = True
+        
+    supplementaires = []
+    if args.lieux:
+        with open(args.lieux, 'r', encoding='utf-8') as f:
+            supplementaires = [ligne.strip() for ligne in f if ligne.strip()]
+            
+    compiler(args.sortie, supplementaires)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Profils de trafic selon l'heure et le jour - VERSION KINSHASA
+
+Chaque profil est une table de 168 créneaux (heures de la semaine, lundi
+0 h en premier) donnant la vitesse pratiquée en pourcentage de la vitesse
+nominale (celle du graphe routier, ou config.VITESSE_MOYENNE_KMH) : un
+octet par créneau, interpolé linéairement d'une heure à la suivante.
+
+Un segment reçoit un profil selon sa classe (artère ou voie locale, d'après
+sa vitesse nominale) et sa zone (centre, autour de la Gare Centrale, ou
+périphérie). Les profils par défaut reproduisent les pointes de Kinshasa
+(matin vers la Gombe, soir en sens inverse, marchés du samedi, dimanche
+matin fluide) ; une table mesurée peut les remplacer
+(config.FICHIER_PROFILS_TRAFIC).
+
+La durée d'un itinéraire complet se calcule en un appel vectorisé : chaque
+segment est parcouru à la vitesse du créneau où il commence, les instants
+d'entrée étant affinés par quelques passes de sommes cumulées.
+    
+    python -m services.profils_trafic data/profils_trafic.npz
+"""
+import argparse
+import os
+from datetime import datetime, timedelta
+from typing import List, Sequence
+
+# Imports absolus
+from core.etat import Point
+from utils.config import config
+from utils.helpers import coordonnees_points, distances_haversine
+from utils.paresseux import SingletonParesseux, module_paresseux
+
+np = module_paresseux("numpy")
+
+CRENEAUX = 7 * 24
+SECONDES_SEMAINE = CRENEAUX * 3600
+# Vitesse nominale (km/h) à partir de laquelle un segment compte comme artère
+VITESSE_ARTERE_KMH = 30.0
+# Passes d'affinage des instants d'entrée dans les segments
+ITERATIONS_ETA = 4
+
+# Encombrement (0 = fluide, 1 = pointe la plus forte) heure par heure
+ENCOMBREMENT_SEMAINE = [0.0, 0.0, 0.0, 0.0, 0.0, 0.1, 0.5, 0.9, 1.0, 0.7, 0.4, 0.4,
+                        0.5, 0.5, 0.4, 0.5, 0.8, 1.0, 0.9, 0.6, 0.3, 0.2, 0.1, 0.0]
+ENCOMBREMENT_SAMEDI = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.1, 0.2, 0.3, 0.5, 0.6, 0.6,
+                       0.6, 0.6, 0.5, 0.5, 0.5, 0.5, 0.4, 0.3, 0.2, 0.2, 0.1, 0.0]
+ENCOMBREMENT_DIMANCHE = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.1, 0.15, 0.15, 0.15, 0.2,
+                         0.25, 0.25, 0.25, 0.25, 0.25, 0.2, 0.15, 0.1, 0.1, 0.0, 0.0, 0.0]
+# Profil : (vitesse fluide en % de la nominale, part de la vitesse perdue à l'encombrement maximal)
+PROFILS_PAR_DEFAUT = {
+    "locale_peripherie": (105, 0.30),
+    "locale_centre": (110, 0.45),
+    "artere_peripherie": (120, 0.55),
+    "artere_centre": (125, 0.70)
+}
+
+def heure_semaine(instant: datetime) -> float:
+    """Secondes écoulées depuis le lundi 0 h de la semaine de l'instant"""
+    return instant.weekday() * 86400 + instant.hour * 3600 + instant.minute * 60 + instant.second
+
+class ProfilsTrafic:
+    """Tables de vitesse par créneau horaire, une ligne par profil"""
+    
+    def __init__(self, noms: Sequence[str], pourcentages):
+        """
+        Args:
+            noms: Nom de chaque profil (doit contenir ceux de PROFILS_PAR_DEFAUT)
+            pourcentages: Tableau (profils, 168) d'entiers 1-255, vitesse en %
+                de la vitesse nominale
+        """
+        self.noms = list(noms)
+        self.pourcentages = np.asarray(pourcentages, dtype=np.uint8)
+        if self.pourcentages.shape != (len(self.noms), CRENEAUX) or not self.pourcentages.all():
+            raise ValueError(f"Table de profils invalide: {self.pourcentages.shape}, attendu ({len(self.noms)}, {CRENEAUX})")
+        manquants = set(PROFILS_PAR_DEFAUT) - set(self.noms)
+        if manquants:
+            raise ValueError(f"Profils manquants: {', '.join(sorted(manquants))}")
+        self._facteurs = self.pourcentages.astype(np.float64) / 100
+        indice = {nom: i for i, nom in enumerate(self.noms)}
+        # Profil d'un segment : [artère][centre]
+        self._par_classe = np.array([[indice["locale_peripherie"], indice["locale_centre"]],
+                                     [indice["artere_peripherie"], indice["artere_centre"]]])
+    
+    def __len__(self) -> int:
+        return len(self.noms)
+    
+    def __repr__(self) -> str:
+        return f"ProfilsTrafic({', '.join(self.noms)})"
+    
+    @classmethod
+    def par_defaut(cls) -> "ProfilsTrafic":
+        """Profils de Kinshasa construits à partir des courbes d'encombrement"""
+        encombrement = np.array(ENCOMBREMENT_SEMAINE * 5 + ENCOMBREMENT_SAMEDI + ENCOMBREMENT_DIMANCHE)
+        pourcentages = [np.round(fluide * (1 - perte * encombrement))
+                        for fluide, perte in PROFILS_PAR_DEFAUT.values()]
+        return cls(list(PROFILS_PAR_DEFAUT), np.array(pourcentages))
+    
+    def enregistrer(self, fichier: str):
+        """Enregistre les tables (.npz)"""
+        dossier = os.path.dirname(fichier)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        with open(fichier, 'wb') as f:
+            np.savez(f, noms=np.array(self.noms, dtype=str), pourcentages=self.pourcentages)
+    
+    @classmethod
+    def charger(cls, fichier: str) -> "ProfilsTrafic":
+        """Recharge des tables enregistrées par enregistrer"""
+        with np.load(fichier) as donnees:
+            return cls(donnees["noms"].tolist(), donnees["pourcentages"])
+    
+    def facteurs(self, profils, instants_s) -> "np.ndarray":
+        """
+        Vitesse relative (1 = nominale) de chaque profil à chaque instant
+        
+        Args:
+            profils: Indices de profils (tableau)
+            instants_s: Secondes depuis le lundi 0 h, même forme ou diffusable
+        """
+        heures = np.mod(np.asarray(instants_s, dtype=np.float64) / 3600, CRENEAUX)
+        bas = np.floor(heures).astype(np.int64)
+        fraction = heures - bas
+        haut = (bas + 1) % CRENEAUX
+        return self._facteurs[profils, bas] * (1 - fraction) + self._facteurs[profils, haut] * fraction
+    
+    def profils_segments(self, latitudes, longitudes, vitesses_kmh) -> "np.ndarray":
+        """Profil de segments (point milieu, vitesse nominale) : classe × zone"""
+        centre = distances_haversine(config.LATITUDE_GARE, config.LONGITUDE_GARE,
+                                     latitudes, longitudes) <= config.TRAFIC_RAYON_CENTRE_KM
+        artere = np.asarray(vitesses_kmh) >= VITESSE_ARTERE_KMH
+        return self._par_classe[artere.astype(np.int64), centre.astype(np.int64)]
+    
+    def durees_trafic(self, durees_s, profils, depart_s) -> "np.ndarray":
+        """
+        Durées des segments consécutifs d'un itinéraire selon l'heure de départ
+        
+        Args:
+            durees_s: Durées nominales des n segments (secondes)
+            profils: Profil de chaque segment (n,)
+            depart_s: Heure de départ (secondes depuis le lundi 0 h), ou
+                tableau (m,) de départs évalués ensemble
+                
+        Returns:
+            Durées (n,) ou (m, n) ; les heures d'arrivée aux points sont le
+            départ plus les sommes cumulées
+        """
+        durees = np.asarray(durees_s, dtype=np.float64)
+        profils = np.asarray(profils, dtype=np.int64)
+        departs = np.asarray(depart_s, dtype=np.float64)[..., np.newaxis]
+        entrees = np.broadcast_to(departs, departs.shape[:-1] + durees.shape)
+        for _ in range(ITERATIONS_ETA):
+            reelles = durees / self.facteurs(profils, entrees)
+            entrees = departs + np.cumsum(reelles, axis=-1) - reelles
+        return durees / self.facteurs(profils, entrees)
+    
+    def durees_segments(self, latitudes, longitudes, distances_km, durees_min,
+                        heure_depart: datetime) -> "np.ndarray":
+        """
+        Durées (minutes) de segments consécutifs, à partir de leur point milieu
+        et de leurs coûts nominaux, pour un départ à heure_depart
+        """
+        durees_min = np.asarray(durees_min, dtype=np.float64)
+        if not len(durees_min):
+            return durees_min
+        vitesses = np.asarray(distances_km, dtype=np.float64) / np.maximum(durees_min / 60, 1e-9)
+        profils = self.profils_segments(latitudes, longitudes, vitesses)
+        return self.durees_trafic(durees_min * 60, profils, heure_semaine(heure_depart)) / 60
+    
+    def durees_points(self, points: Sequence[Point], distances_km, durees_min,
+                      heure_depart: datetime) -> "np.ndarray":
+        """
+        Durées (minutes) des segments consécutifs de points, à partir de leurs
+        coûts nominaux (matrice des trajets), pour un départ à heure_depart
+        """
+        latitudes, longitudes = coordonnees_points(points)
+        return self.durees_segments((latitudes[:-1] + latitudes[1:]) / 2, (longitudes[:-1] + longitudes[1:]) / 2,
+                                    distances_km, durees_min, heure_depart)
+    
+    def arrivees(self, heure_depart: datetime, durees_min) -> List[datetime]:
+        """Heures de passage aux points (départ compris) d'après les durées des segments"""
+        cumul = np.concatenate(([0.0], np.cumsum(durees_min)))
+        return [heure_depart + timedelta(minutes=minutes) for minutes in cumul.tolist()]
+
+def charger_profils(fichier: str = None) -> ProfilsTrafic:
+    """
+    Profils de config.FICHIER_PROFILS_TRAFIC s'il existe, sinon profils par défaut
+    """
+    fichier = fichier or config.FICHIER_PROFILS_TRAFIC
+    if os.path.exists(fichier):
+        try:
+            profils = ProfilsTrafic.charger(fichier)
+            print(f"🚦 Profils de trafic chargés: {len(profils)} profils ({fichier})")
+            return profils
+        except Exception as e:
+            print(f"⚠️  Profils de trafic illisibles ({fichier}), profils par défaut: {e}")
+    return ProfilsTrafic.par_defaut()
+
+# Instance globale, construite au premier usage
+profils_trafic = SingletonParesseux(charger_profils, "profils_trafic")
+
+def main():
+    parser = argparse.ArgumentParser(description="Écrit les profils de trafic par défaut (à ajuster)")
+    parser.add_argument("destination", nargs="?", default=config.FICHIER_PROFILS_TRAFIC,
+                        help="Tables de profils (.npz)")
+    args = parser.parse_args()
+    
+    profils = ProfilsTrafic.par_defaut()
+    profils.enregistrer(args.destination)
+    for nom, ligne in zip(profils.noms, profils.pourcentages.tolist()):
+        print(f"   {nom:18s} lundi 8 h: {ligne[8]:3d} %   dimanche 9 h: {ligne[6 * 24 + 9]:3d} %")
+    print(f"✅ {profils} → {args.destination}")
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ import os
 # Imports absolus
 from utils.config import config
 from utils.helpers import formater_duree, formater_distance
+from utils.paresseux import SingletonParesseux
 
 class GenerateurRapport:
     """
@@ -931,4 +932,4 @@ class GenerateurRapport:
         """
 
 # Instance globale
-generateur_rapport = GenerateurRapport()
\ No newline at end of file
+generateur_rapport = SingletonParesseux(GenerateurRapport, "generateur_rapport")
\ No newline at end of file
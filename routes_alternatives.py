@@ -0,0 +1,473 @@
+"""
+Itinéraires alternatifs diversifiés - VERSION KINSHASA
+
+Les alternatives d'un couple départ → arrivée sont calculées à la demande
+par la méthode des pénalités :
+1. chemin le plus rapide (hiérarchie de contraction si elle est attachée),
+   qui fixe la durée maximale d'une alternative (config.ALTERNATIVES_ETIREMENT_MAX)
+2. une recherche arrière depuis l'arrivée donne la durée exacte restante de
+   chaque nœud pouvant appartenir à une alternative ; les autres sont écartés
+3. la durée des arcs du dernier chemin trouvé est multipliée par
+   config.ALTERNATIVES_PENALITE, puis A* (heuristique : durée restante
+   exacte, qui minore toute durée pénalisée) cherche le chemin le plus
+   rapide pour ces durées pénalisées
+4. ce chemin est retenu si la part de sa longueur qu'il ne partage avec
+   aucun chemin déjà retenu atteint le seuil de diversité
+jusqu'à k chemins, ou jusqu'à épuisement du budget de temps de la requête.
+
+Sans graphe routier compilé, la même recherche parcourt un graphe des lieux
+connus (points d'intérêt et arrêts de bus compris entre le départ et
+l'arrivée, chacun relié à ses plus proches voisins à la vitesse moyenne).
+Ses arcs n'ont pas de classe de voie : la part de grand axe d'un arc est
+celle de ses deux lieux qui en sont (arrêt de bus, ou nom de boulevard,
+avenue, carrefour...).
+Chaque alternative garde les coûts nominaux des arcs qu'elle parcourt, sur
+lesquels s'appliquent les profils de trafic de l'heure de départ.
+"""
+import heapq
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# Imports absolus
+from core.etat import Point
+from utils.config import config
+from utils.helpers import RAYON_TERRE_KM, coordonnees_points, distances_haversine, matrice_distances
+from utils.paresseux import module_paresseux
+from services.graphe_routier import ConstructeurGraphe, GrapheRoutier
+from services.profils_trafic import VITESSE_ARTERE_KMH
+
+np = module_paresseux("numpy")
+
+# Recherches pénalisées tentées par alternative demandée
+ESSAIS_PAR_ALTERNATIVE = 3
+# Détour minimal autorisé pour choisir les lieux connus d'un trajet court (km)
+DETOUR_MIN_KM = 0.5
+# Écart relatif de durée en deçà duquel une alternative double un chemin retenu
+ECART_DUREE_MIN = 1e-3
+# Lieux situés sur un grand axe (graphe des lieux connus)
+MOTS_GRANDS_AXES = ("boulevard", "avenue", "chaussée", "route", "carrefour", "rond-point", "échangeur", "place")
+
+@dataclass
+class CheminAlternatif:
+    """Chemin du graphe retenu comme alternative"""
+    noeuds: List[int]
+    arcs: List[int]
+    duree_s: float
+    distance_m: float
+    part_grands_axes: float  # part de la longueur parcourue sur les grands axes
+
+class SegmentsItineraire(NamedTuple):
+    """Coûts nominaux de chaque arc parcouru par un itinéraire, dans l'ordre"""
+    distances_km: "np.ndarray"
+    durees_min: "np.ndarray"
+    latitudes: "np.ndarray"  # point milieu de chaque arc
+    longitudes: "np.ndarray"
+
+@dataclass
+class ItineraireAlternatif:
+    """Alternative prête pour le DecisionMaker : points à suivre et poids de la route"""
+    nom: str
+    points: List[Point]
+    duree_s: float
+    distance_m: float
+    poids: Dict[str, float] = field(default_factory=dict)
+    # Arcs du chemin (None pour la route directe : coûts lus dans la matrice des trajets)
+    segments: Optional[SegmentsItineraire] = None
+
+def _chemin(graphe: GrapheRoutier, noeuds: List[int], arcs: List[int],
+            grands_axes: "np.ndarray" = None) -> CheminAlternatif:
+    """
+    Durée, distance et part de grands axes d'un chemin (durées non pénalisées)
+    
+    Args:
+        grands_axes: Part (0-1) de chaque arc du graphe sur un grand axe
+            (défaut: selon leur vitesse)
+    """
+    if not arcs:
+        return CheminAlternatif(noeuds, arcs, 0.0, 0.0, 0.0)
+    longueurs = graphe.longueurs_m[arcs]
+    durees = graphe.durees_s[arcs]
+    distance_m = float(longueurs.sum())
+    if grands_axes is None:
+        grands_axes = longueurs / np.maximum(durees, 1e-9) * 3.6 >= VITESSE_ARTERE_KMH
+    else:
+        grands_axes = grands_axes[arcs]
+    part = float((longueurs * grands_axes).sum()) / distance_m if distance_m else 0.0
+    return CheminAlternatif(noeuds, arcs, float(durees.sum()), distance_m, part)
+
+def segments_chemin(graphe: GrapheRoutier, chemin: CheminAlternatif,
+                    depart: Point = None, arrivee: Point = None) -> SegmentsItineraire:
+    """
+    Arcs d'un chemin du graphe, avec les raccords depart → premier nœud et
+    dernier nœud → arrivee (s'ils sont donnés) parcourus à la vitesse moyenne
+    """
+    noeuds = np.asarray(chemin.noeuds, dtype=np.int64)
+    arcs = np.asarray(chemin.arcs, dtype=np.int64)
+    latitudes = graphe.latitudes[noeuds].astype(np.float64)
+    longitudes = graphe.longitudes[noeuds].astype(np.float64)
+    distances = graphe.longueurs_m[arcs] / 1000
+    durees = graphe.durees_s[arcs] / 60
+    if depart is not None:
+        latitudes = np.concatenate(([depart.latitude], latitudes))
+        longitudes = np.concatenate(([depart.longitude], longitudes))
+        distances = np.concatenate(([distances_haversine(depart.latitude, depart.longitude,
+                                                         latitudes[1], longitudes[1])], distances))
+        durees = np.concatenate(([distances[0] / config.VITESSE_MOYENNE_KMH * 60], durees))
+    if arrivee is not None:
+        latitudes = np.concatenate((latitudes, [arrivee.latitude]))
+        longitudes = np.concatenate((longitudes, [arrivee.longitude]))
+        distances = np.concatenate((distances, [distances_haversine(latitudes[-2], longitudes[-2],
+                                                                    arrivee.latitude, arrivee.longitude)]))
+        durees = np.concatenate((durees, [distances[-1] / config.VITESSE_MOYENNE_KMH * 60]))
+    # Raccords de longueur nulle (point confondu avec son nœud) retirés
+    utiles = np.ones(len(distances), dtype=bool)
+    if depart is not None:
+        utiles[0] = distances[0] > 0
+    if arrivee is not None:
+        utiles[-1] = distances[-1] > 0
+    milieux_lat = (latitudes[:-1] + latitudes[1:]) / 2
+    milieux_lon = (longitudes[:-1] + longitudes[1:]) / 2
+    return SegmentsItineraire(distances[utiles], durees[utiles], milieux_lat[utiles], milieux_lon[utiles])
+
+def durees_restantes(graphe: GrapheRoutier, source: int, cible: int, limite_s: float,
+                     echeance: float = math.inf) -> Optional[Dict[int, float]]:
+    """
+    Durée exacte de chaque nœud v vers la cible, pour les nœuds dont un
+    chemin source → v → cible peut durer au plus limite_s (A* arrière
+    depuis la cible, heuristique vers la source)
+    
+    Returns:
+        {nœud: durée restante en secondes}, ou None si l'échéance est dépassée
+    """
+    debuts, origines, arcs_entrants = graphe._preparer_inverse()
+    _, _, durees, xs, ys, inverse_vitesse = graphe._preparer()
+    x_source, y_source = xs[source], ys[source]
+    hypot, empiler, depiler = math.hypot, heapq.heappush, heapq.heappop
+    restantes = {}
+    durees_connues = {cible: 0.0}
+    tas = [(hypot(xs[cible] - x_source, ys[cible] - y_source) * inverse_vitesse, 0.0, cible)]
+    while tas:
+        estimation, duree_v, v = depiler(tas)
+        if estimation > limite_s:
+            break
+        if duree_v > durees_connues[v]:
+            continue
+        restantes[v] = duree_v
+        if not len(restantes) & 1023 and time.perf_counter() > echeance:
+            return None
+        for position in range(debuts[v], debuts[v + 1]):
+            u = origines[position]
+            duree_u = duree_v + durees[arcs_entrants[position]]
+            if duree_u < durees_connues.get(u, math.inf):
+                durees_connues[u] = duree_u
+                empiler(tas, (duree_u + hypot(xs[u] - x_source, ys[u] - y_source) * inverse_vitesse, duree_u, u))
+    return restantes
+
+def _chemin_penalise(graphe: GrapheRoutier, source: int, cible: int, durees: List[float],
+                     restantes: Dict[int, float],
+                     echeance: float = math.inf) -> Optional[Tuple[List[int], List[int], float]]:
+    """
+    A* sur les durées pénalisées, limité aux nœuds de restantes (dont la
+    durée restante sert d'heuristique) ; None si l'échéance est dépassée
+    """
+    debuts, cibles, _, _, _, _ = graphe._preparer()
+    empiler, depiler = heapq.heappush, heapq.heappop
+    durees_connues = {source: 0.0}
+    precedents = {source: (-1, -1)}
+    tas = [(restantes[source], 0.0, source)]
+    depiles = 0
+    while tas:
+        _, duree_u, u = depiler(tas)
+        if u == cible:
+            return graphe._reconstruire(source, cible, precedents, duree_u)
+        if duree_u > durees_connues[u]:
+            continue
+        depiles += 1
+        if not depiles & 1023 and time.perf_counter() > echeance:
+            return None
+        for arc in range(debuts[u], debuts[u + 1]):
+            v = cibles[arc]
+            restante = restantes.get(v)
+            if restante is None:
+                continue
+            duree_v = duree_u + durees[arc]
+            if duree_v < durees_connues.get(v, math.inf):
+                durees_connues[v] = duree_v
+                precedents[v] = (u, arc)
+                empiler(tas, (duree_v + restante, duree_v, v))
+    return None
+
+def chemins_diversifies(graphe: GrapheRoutier, source: int, cible: int, k: int,
+                        seuil_diversite: float, etirement_max: float, penalite: float,
+                        echeance: float, grands_axes: "np.ndarray" = None) -> List[CheminAlternatif]:
+    """
+    Jusqu'à k chemins de source à cible, le plus rapide en premier
+    
+    Args:
+        graphe: Graphe parcouru
+        source: Nœud de départ
+        cible: Nœud d'arrivée
+        k: Nombre maximal de chemins
+        seuil_diversite: Part minimale (0-1) de la longueur d'un chemin non
+            partagée avec les chemins déjà retenus
+        etirement_max: Durée maximale = (1 + etirement_max) × durée du plus rapide
+        penalite: Facteur appliqué à la durée des arcs de chaque chemin trouvé
+        echeance: Instant (time.perf_counter) au-delà duquel la recherche s'arrête
+        grands_axes: Part de chaque arc sur un grand axe (défaut: selon leur vitesse)
+        
+    Returns:
+        Chemins retenus ; liste vide si la cible est inaccessible
+    """
+    premier = graphe.plus_court_chemin(source, cible)
+    if premier is None:
+        return []
+    retenus = [_chemin(graphe, premier[0], premier[1], grands_axes)]
+    if not premier[1] or k <= 1:
+        return retenus
+    limite_s = (1 + etirement_max) * retenus[0].duree_s * (1 + 1e-9)
+    restantes = durees_restantes(graphe, source, cible, limite_s, echeance)
+    if restantes is None:
+        return retenus
+    longueurs = graphe._preparer_longueurs()
+    durees = list(graphe._preparer()[2])
+    arcs_retenus = [set(premier[1])]
+    dernier = premier[1]
+    for _ in range(k * ESSAIS_PAR_ALTERNATIVE):
+        if len(retenus) >= k or time.perf_counter() > echeance:
+            break
+        for arc in dernier:
+            durees[arc] *= penalite
+        candidat = _chemin_penalise(graphe, source, cible, durees, restantes, echeance)
+        if candidat is None:
+            break
+        noeuds, dernier, _ = candidat
+        chemin = _chemin(graphe, noeuds, dernier, grands_axes)
+        if chemin.duree_s > limite_s:
+            continue
+        if any(abs(chemin.duree_s - retenu.duree_s) <= ECART_DUREE_MIN * retenu.duree_s for retenu in retenus):
+            continue
+        partage = max(sum(longueurs[arc] for arc in dernier if arc in ensemble) for ensemble in arcs_retenus)
+        if 1 - partage / max(chemin.distance_m, 1e-9) >= seuil_diversite:
+            retenus.append(chemin)
+            arcs_retenus.append(set(dernier))
+    return retenus
+
+def graphe_lieux(depart: Point, arrivee: Point, lieux: Sequence[Point],
+                 connexions: int) -> Optional[Tuple[GrapheRoutier, List[Optional[Point]], int, int]]:
+    """
+    Graphe reliant départ, arrivée et lieux connus à leurs plus proches voisins
+    
+    Args:
+        depart: Point de départ
+        arrivee: Point d'arrivée
+        lieux: Lieux intermédiaires possibles (coordonnées distinctes)
+        connexions: Nombre de voisins reliés à chaque point
+        
+    Returns:
+        (graphe, lieu de chaque nœud (None pour départ et arrivée), nœud de
+        départ, nœud d'arrivée), ou None si départ et arrivée ne sont pas reliés
+    """
+    points = [depart, arrivee] + list(lieux)
+    latitudes, longitudes = coordonnees_points(points)
+    distances = matrice_distances(latitudes, longitudes, latitudes, longitudes)
+    voisins = np.argsort(distances, axis=1)[:, 1:connexions + 1]
+    constructeur = ConstructeurGraphe()
+    for i, (latitude, longitude) in enumerate(zip(latitudes.tolist(), longitudes.tolist())):
+        constructeur.ajouter_noeud(i, latitude, longitude)
+    aretes = {(min(i, j), max(i, j)) for i, ligne in enumerate(voisins.tolist()) for j in ligne}
+    for i, j in sorted(aretes):
+        constructeur.ajouter_voie((i, j), config.VITESSE_MOYENNE_KMH)
+    graphe = constructeur.construire()
+    
+    # Les nœuds gardent les coordonnées de leur point (renumérotés par construire)
+    positions = {(lat, lon): i for i, (lat, lon) in enumerate(zip(latitudes.tolist(), longitudes.tolist()))}
+    indices = [positions[cle] for cle in zip(graphe.latitudes.tolist(), graphe.longitudes.tolist())]
+    if 0 not in indices or 1 not in indices:
+        return None
+    lieux_noeuds = [points[i] if i > 1 else None for i in indices]
+    return graphe, lieux_noeuds, indices.index(0), indices.index(1)
+
+def sur_grand_axe(point: Point) -> bool:
+    """Vrai si un lieu connu est réputé situé sur un grand axe (arrêt de bus, boulevard...)"""
+    nom = point.nom.lower()
+    return point.type_point == "arret_bus" or any(mot in nom for mot in MOTS_GRANDS_AXES)
+
+def grands_axes_lieux(graphe: GrapheRoutier, points_noeuds: Sequence[Point]) -> "np.ndarray":
+    """
+    Part de chaque arc du graphe des lieux connus sur un grand axe : celle
+    de ses deux extrémités qui en sont
+    
+    Args:
+        graphe: Graphe des lieux connus
+        points_noeuds: Point de chaque nœud
+        
+    Returns:
+        Tableau de parts (0, 0.5 ou 1), une valeur par arc
+    """
+    axes = np.array([sur_grand_axe(point) for point in points_noeuds], dtype=np.float64)
+    origines = np.repeat(np.arange(graphe.nombre_noeuds), np.diff(graphe.debuts))
+    return (axes[origines] + axes[graphe.cibles]) / 2
+
+class GenerateurAlternatives:
+    """
+    Alternatives d'un trajet calculées à la demande sur le graphe routier
+    (ou, à défaut, sur le graphe des lieux connus)
+    """
+    
+    def __init__(self, graphe=None, gestionnaire=None, charger_graphe: bool = True):
+        """
+        Args:
+            graphe: GrapheRoutier (défaut: graphe partagé, chargé au premier calcul)
+            gestionnaire: GestionnaireDonnees des lieux connus (défaut: instance globale)
+            charger_graphe: False pour travailler sans graphe routier quand graphe est None
+        """
+        self._graphe = graphe
+        self._graphe_charge = graphe is not None or not charger_graphe
+        self._gestionnaire = gestionnaire
+    
+    @property
+    def graphe(self):
+        """Graphe routier, ou None s'il n'a pas été compilé"""
+        if not self._graphe_charge:
+            from services.graphe_routier import graphe_routier_partage
+            self._graphe = graphe_routier_partage()
+            self._graphe_charge = True
+        return self._graphe
+    
+    @property
+    def gestionnaire(self):
+        if self._gestionnaire is None:
+            from services.data_manager import gestionnaire_donnees
+            self._gestionnaire = gestionnaire_donnees
+        return self._gestionnaire
+    
+    def generer(self, depart: Point, arrivee: Point, k: int = None, seuil_diversite: float = None,
+                budget_s: float = None) -> List[ItineraireAlternatif]:
+        """
+        Itinéraires alternatifs diversifiés entre deux points
+        
+        Args:
+            depart: Point de départ
+            arrivee: Point d'arrivée
+            k: Nombre maximal d'alternatives (défaut: config.ALTERNATIVES_K)
+            seuil_diversite: Part minimale d'une alternative non partagée avec
+                les précédentes (défaut: config.ALTERNATIVES_SEUIL_DIVERSITE)
+            budget_s: Temps de calcul maximal (défaut: config.ALTERNATIVES_BUDGET_S)
+            
+        Returns:
+            Alternatives, la plus rapide en premier ; au moins la route directe
+        """
+        k = k or config.ALTERNATIVES_K
+        seuil_diversite = config.ALTERNATIVES_SEUIL_DIVERSITE if seuil_diversite is None else seuil_diversite
+        echeance = time.perf_counter() + (config.ALTERNATIVES_BUDGET_S if budget_s is None else budget_s)
+        parametres = (k, seuil_diversite, config.ALTERNATIVES_ETIREMENT_MAX, config.ALTERNATIVES_PENALITE, echeance)
+        try:
+            graphe = self.graphe
+            if graphe is not None and graphe.nombre_noeuds:
+                source, _ = graphe.noeud_proche(depart.latitude, depart.longitude)
+                cible, _ = graphe.noeud_proche(arrivee.latitude, arrivee.longitude)
+                chemins = chemins_diversifies(graphe, source, cible, *parametres)
+                etapes = [self._etapes_routieres(graphe, chemin) for chemin in chemins]
+            else:
+                reseau = graphe_lieux(depart, arrivee, self._lieux_candidats(depart, arrivee),
+                                      config.ALTERNATIVES_CONNEXIONS)
+                chemins, etapes = [], []
+                if reseau is not None:
+                    graphe, lieux_noeuds, source, cible = reseau
+                    points_noeuds = [depart if noeud == source else arrivee if noeud == cible else lieu
+                                     for noeud, lieu in enumerate(lieux_noeuds)]
+                    chemins = chemins_diversifies(graphe, source, cible, *parametres,
+                                                  grands_axes_lieux(graphe, points_noeuds))
+                    etapes = [[lieux_noeuds[noeud] for noeud in chemin.noeuds[1:-1]] for chemin in chemins]
+            segments = [segments_chemin(graphe, chemin, depart, arrivee) for chemin in chemins]
+        except Exception as e:
+            print(f"⚠️  Calcul des alternatives impossible: {e}")
+            chemins = []
+        if not chemins:
+            return [ItineraireAlternatif("Route directe", [depart, arrivee], math.nan, math.nan,
+                                         {"temps": 1.0, "cout": 1.0, "securite": 0.6, "confort": 0.5})]
+        return self._itineraires(depart, arrivee, chemins, etapes, segments)
+    
+    def _lieux_candidats(self, depart: Point, arrivee: Point) -> List[Point]:
+        """
+        Lieux connus dont le détour depart → lieu → arrivee reste dans
+        l'étirement autorisé (ellipse de foyers départ et arrivée), les plus
+        proches de la ligne directe d'abord
+        """
+        direct_km = float(distances_haversine(depart.latitude, depart.longitude,
+                                              arrivee.latitude, arrivee.longitude))
+        limite_km = (1 + config.ALTERNATIVES_ETIREMENT_MAX) * direct_km + DETOUR_MIN_KM
+        marge_km = (limite_km - direct_km) / 2
+        marge_lat = math.degrees(marge_km / RAYON_TERRE_KM)
+        marge_lon = marge_lat / max(math.cos(math.radians(depart.latitude)), 1e-6)
+        candidats = self.gestionnaire.points_dans_rectangle(
+            min(depart.latitude, arrivee.latitude) - marge_lat, min(depart.longitude, arrivee.longitude) - marge_lon,
+            max(depart.latitude, arrivee.latitude) + marge_lat, max(depart.longitude, arrivee.longitude) + marge_lon
+        )
+        # Un seul lieu par position, distinct des extrémités
+        exclues = {(round(point.latitude, 6), round(point.longitude, 6)) for point in (depart, arrivee)}
+        uniques = {}
+        for point in candidats:
+            cle = (round(point.latitude, 6), round(point.longitude, 6))
+            if cle not in exclues:
+                uniques.setdefault(cle, point)
+        candidats = list(uniques.values())
+        if not candidats:
+            return []
+        latitudes, longitudes = coordonnees_points(candidats)
+        detours = (distances_haversine(depart.latitude, depart.longitude, latitudes, longitudes) +
+                   distances_haversine(latitudes, longitudes, arrivee.latitude, arrivee.longitude))
+        ordre = np.argsort(detours, kind="stable")[:config.ALTERNATIVES_MAX_LIEUX]
+        return [candidats[i] for i in ordre.tolist() if detours[i] <= limite_km]
+    
+    def _etapes_routieres(self, graphe: GrapheRoutier, chemin: CheminAlternatif) -> List[Point]:
+        """
+        Points intermédiaires régulièrement espacés le long d'un chemin du
+        graphe routier, nommés d'après le lieu connu le plus proche s'il y en a un
+        """
+        if len(chemin.noeuds) < 3:
+            return []
+        cumul = np.concatenate(([0.0], np.cumsum(graphe.longueurs_m[chemin.arcs])))
+        fractions = np.arange(1, config.ALTERNATIVES_ETAPES + 1) / (config.ALTERNATIVES_ETAPES + 1)
+        positions = np.unique(np.clip(np.searchsorted(cumul, fractions * cumul[-1]), 1, len(chemin.noeuds) - 2))
+        etapes = []
+        for numero, position in enumerate(positions.tolist(), 1):
+            noeud = chemin.noeuds[position]
+            latitude, longitude = float(graphe.latitudes[noeud]), float(graphe.longitudes[noeud])
+            proches = self.gestionnaire.points_proches(latitude, longitude, 1,
+                                                       rayon_max_km=config.RAYON_INVERSE_LOCAL_KM)
+            nom = proches[0][0].nom if proches else f"Étape {numero}"
+            etapes.append(Point(nom, latitude, longitude, "intermediaire"))
+        return etapes
+    
+    @staticmethod
+    def _itineraires(depart: Point, arrivee: Point, chemins: List[CheminAlternatif],
+                     etapes: List[List[Point]], segments: List[SegmentsItineraire]) -> List[ItineraireAlternatif]:
+        """Nomme les chemins et calcule les poids de chaque route"""
+        plus_rapide = chemins[0]
+        noms_plus_rapide = {point.nom for point in etapes[0]}
+        itineraires = []
+        for numero, (chemin, points, arcs) in enumerate(zip(chemins, etapes, segments)):
+            points = [Point(point.nom, point.latitude, point.longitude, "intermediaire", point.commune)
+                      for point in points]
+            if numero == 0:
+                nom = "Route la plus rapide"
+            else:
+                nouveaux = [point.nom for point in points
+                            if point.nom not in noms_plus_rapide and not point.nom.startswith("Étape")]
+                nom = f"Alternative {numero}" + (f" via {nouveaux[0]}" if nouveaux else "")
+                ecart_min = (chemin.duree_s - plus_rapide.duree_s) / 60
+                if ecart_min >= 0.5:
+                    nom += f" (+{ecart_min:.0f} min)"
+            # Les grands axes sont réputés mieux éclairés et revêtus
+            poids = {
+                "temps": round(plus_rapide.duree_s / chemin.duree_s, 3) if chemin.duree_s else 1.0,
+                "cout": round(plus_rapide.distance_m / chemin.distance_m, 3) if chemin.distance_m else 1.0,
+                "securite": round(0.6 + 0.3 * chemin.part_grands_axes, 3),
+                "confort": round(0.5 + 0.4 * chemin.part_grands_axes, 3)
+            }
+            itineraires.append(ItineraireAlternatif(nom, [depart] + points + [arrivee],
+                                                    chemin.duree_s, chemin.distance_m, poids, arcs))
+        return itineraires
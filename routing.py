@@ -1,21 +1,66 @@
 """
 Service de calcul d'itinéraires - VERSION KINSHASA
+
+Les trajets suivent le réseau routier lorsque le graphe compilé
+(config.FICHIER_GRAPHE_ROUTIER) est disponible ; sinon, ou si aucun chemin
+n'existe, la distance à vol d'oiseau est utilisée.
 """
+import time
+from datetime import datetime
 from typing import List, Optional, Dict, Any
 
 # Imports absolus
-from core.etat import Point, Trajet
+from core.etat import Point, PointStore, Trajet
 from utils.config import config
 from utils.helpers import calculer_distance_haversine, calculer_duree_estimee
 
+# Conditions fixes de l'ancienne estimation (multiplicateur de la durée nominale)
+FACTEURS_CONDITIONS_TRAFIC = {"fluid": 0.8, "normal": 1.0, "dense": 1.3}
+
 class ServiceRouting:
     """
     Service responsable du calcul des itinéraires à Kinshasa
     """
     
-    def __init__(self):
+    def __init__(self, graphe=None, service_matrice=None, profils_trafic=None):
+        """
+        Args:
+            graphe: GrapheRoutier (défaut: chargé au premier trajet depuis
+                config.FICHIER_GRAPHE_ROUTIER)
+            service_matrice: ServiceMatrice des coûts de segments (défaut:
+                instance globale)
+            profils_trafic: ProfilsTrafic selon l'heure de départ (défaut:
+                instance globale)
+        """
+        self._graphe = graphe
+        self._graphe_charge = graphe is not None
+        self._service_matrice = service_matrice
+        self._profils_trafic = profils_trafic
         print("🛣️  Service de routing initialisé pour Kinshasa")
     
+    @property
+    def graphe(self):
+        """Graphe routier, ou None s'il n'a pas été compilé"""
+        if not self._graphe_charge:
+            from services.graphe_routier import graphe_routier_partage
+            self._graphe = graphe_routier_partage()
+            self._graphe_charge = True
+        return self._graphe
+    
+    @property
+    def service_matrice(self):
+        if self._service_matrice is None:
+            from services.matrice_trajets import service_matrice
+            self._service_matrice = service_matrice
+        return self._service_matrice
+    
+    @property
+    def profils_trafic(self):
+        if self._profils_trafic is None:
+            from services.profils_trafic import profils_trafic
+            self._profils_trafic = profils_trafic
+        return self._profils_trafic
+    
     def calculer_itineraire_direct(self, points: List[Point]) -> List[Trajet]:
         """
         Calcule un itinéraire direct entre une série de points
@@ -28,13 +73,22 @@ class ServiceRouting:
         """
         trajets = []
         
-        for i in range(len(points) - 1):
-            depart = points[i]
-            arrivee = points[i + 1]
+        if self.graphe is not None:
+            for depart, arrivee in zip(points, points[1:]):
+                trajet = self.calculer_trajet(depart, arrivee)
+                if trajet:
+                    trajets.append(trajet)
+            return trajets
             
-            trajet = self.calculer_trajet(depart, arrivee)
-            if trajet:
-                trajets.append(trajet)
+        # Coûts de tous les segments lus dans la matrice des trajets
+        distances, durees = self.service_matrice.couts_segments(points)
+        for i, (distance_km, duree_min) in enumerate(zip(distances.tolist(), durees.tolist())):
+            trajets.append(Trajet(
+                depart=points[i],
+                arrivee=points[i + 1],
+                distance_km=distance_km,
+                duree_estimee_min=duree_min
+            ))
         
         return trajets
     
@@ -49,9 +103,56 @@ class ServiceRouting:
         Returns:
             Trajet calculé ou None en cas d'erreur
         """
+        if self.graphe is not None:
+            trajet = self._creer_trajet_routier(depart, arrivee)
+            if trajet:
+                return trajet
+        return self._creer_trajet(depart, arrivee)
+    
+    def _creer_trajet_routier(self, depart: Point, arrivee: Point) -> Optional[Trajet]:
+        """
+        Trajet le long du réseau routier : chaque extrémité est accrochée au
+        nœud le plus proche, et les raccords sont parcourus à la vitesse moyenne
+        
+        Returns:
+            Trajet dont les points intermédiaires suivent les voies, ou None
+            si aucun chemin ne relie les deux nœuds
+        """
+        try:
+            graphe = self.graphe
+            source, raccord_depart_m = graphe.noeud_proche(depart.latitude, depart.longitude)
+            cible, raccord_arrivee_m = graphe.noeud_proche(arrivee.latitude, arrivee.longitude)
+            itineraire = graphe.itineraire(source, cible)
+            if itineraire is None:
+                print(f"⚠️  Aucun chemin routier {depart.nom} → {arrivee.nom}, trajet à vol d'oiseau")
+                return None
+                
+            raccords_km = (raccord_depart_m + raccord_arrivee_m) / 1000
+            distance_km = itineraire.distance_m / 1000 + raccords_km
+            duree_min = itineraire.duree_s / 60 + calculer_duree_estimee(raccords_km, config.VITESSE_MOYENNE_KMH)
+            
+            nombre = len(itineraire.latitudes)
+            return Trajet(
+                depart=depart,
+                arrivee=arrivee,
+                distance_km=distance_km,
+                duree_estimee_min=duree_min,
+                points_intermediaires=PointStore.depuis_colonnes(
+                    ["Tracé"] * nombre, itineraire.latitudes, itineraire.longitudes, type_point="trace"
+                )
+            )
+            
+        except Exception as e:
+            print(f"❌ Erreur calcul trajet routier {depart.nom} → {arrivee.nom}: {e}")
+            return None
+    
+    def _creer_trajet(self, depart: Point, arrivee: Point,
+                      distance_km: Optional[float] = None) -> Optional[Trajet]:
+        """Crée un trajet, en calculant la distance si elle n'est pas fournie"""
         try:
             # Calcul de distance utilisant la formule Haversine
-            distance_km = calculer_distance_haversine(depart, arrivee)
+            if distance_km is None:
+                distance_km = calculer_distance_haversine(depart, arrivee)
             
             # Calcul de durée basé sur la vitesse moyenne à Kinshasa
             duree_min = calculer_duree_estimee(distance_km, config.VITESSE_MOYENNE_KMH)
@@ -70,13 +171,20 @@ class ServiceRouting:
             print(f"❌ Erreur calcul trajet {depart.nom} → {arrivee.nom}: {e}")
             return None
     
-    def optimiser_ordre_points(self, points: List[Point]) -> List[Point]:
+    def optimiser_ordre_points(self, points: List[Point], fixer_depart: bool = True,
+                               fixer_arrivee: bool = True, budget_s: float = None,
+                               critere: str = "duree") -> List[Point]:
         """
-        Optimise l'ordre des points pour minimiser la distance totale
-        Algorithme simple: garde l'ordre mais peut être amélioré
+        Optimise l'ordre des points pour minimiser le coût total
+        (plus proche voisin puis 2-opt / Or-opt sur la matrice des trajets)
         
         Args:
             points: Liste des points à ordonner
+            fixer_depart: Le premier point reste le premier
+            fixer_arrivee: Le dernier point reste le dernier (pour une tournée
+                qui revient au dépôt, répéter le dépôt en dernier)
+            budget_s: Temps maximal de l'amélioration (défaut: config.OPTIMISATION_BUDGET_S)
+            critere: "duree" ou "distance"
             
         Returns:
             Liste des points ordonnés
@@ -84,29 +192,74 @@ class ServiceRouting:
         if len(points) <= 2:
             return points
         
-        # Pour l'instant, on garde l'ordre donné
-        # On pourrait implémenter un algorithme de voyageur de commerce simple
-        print("🔧 Optimisation de l'ordre des points (ordre conservé)")
-        return points
+        try:
+            from services.optimisation_tournee import cout_chemin, optimiser_ordre
+            
+            debut = time.perf_counter()
+            budget_s = config.OPTIMISATION_BUDGET_S if budget_s is None else budget_s
+            distances, durees = self.service_matrice.matrice(points, points)
+            couts = durees if critere == "duree" else distances
+            ordre = optimiser_ordre(couts, fixer_depart, fixer_arrivee, budget_s)
+            
+            avant, apres = cout_chemin(couts, list(range(len(points)))), cout_chemin(couts, ordre)
+            unite = "min" if critere == "duree" else "km"
+            gain = (1 - apres / avant) * 100 if avant > 0 else 0.0
+            print(f"🔧 Ordre de {len(points)} points optimisé: {avant:.1f} → {apres:.1f} {unite} "
+                  f"(-{gain:.1f}%) en {time.perf_counter() - debut:.2f} s")
+            return [points[i] for i in ordre]
+            
+        except Exception as e:
+            print(f"❌ Erreur optimisation de l'ordre des points (ordre conservé): {e}")
+            return points
     
-    def obtenir_temps_trajet_estime(self, distance_km: float, conditions_trafic: str = "normal") -> float:
+    def obtenir_temps_trajet_estime(self, distance_km: float, conditions_trafic: str = None, *,
+                                    heure_depart: datetime = None, position: Point = None) -> float:
         """
-        Estime le temps de trajet en fonction des conditions
+        Estime le temps de trajet en fonction des conditions, ou à défaut
+        selon le trafic à l'heure de départ
         
         Args:
-            distance_km: Distance à parcourir
-            conditions_trafic: "fluid", "normal", "dense"
+            distance_km: Distance à parcourir (voie locale, vitesse moyenne)
+            conditions_trafic: "fluid", "normal", "dense" pour un facteur fixe
+                (facteur 1 pour une valeur inconnue) ; défaut: profils de trafic
+            heure_depart: Heure de départ (défaut: maintenant)
+            position: Point du trajet qui en fixe la zone (défaut: voie
+                locale en périphérie)
             
         Returns:
             Temps estimé en minutes
         """
-        facteurs_trafic = {
-            "fluid": 0.8,      # -20%
-            "normal": 1.0,     # temps normal
-            "dense": 1.3       # +30%
-        }
+        from services.profils_trafic import heure_semaine
         
-        facteur = facteurs_trafic.get(conditions_trafic, 1.0)
         temps_normal = calculer_duree_estimee(distance_km, config.VITESSE_MOYENNE_KMH)
+        if conditions_trafic is not None:
+            return temps_normal * FACTEURS_CONDITIONS_TRAFIC.get(conditions_trafic, 1.0)
+        
+        if position is None:
+            profil = [self.profils_trafic.noms.index("locale_peripherie")]
+        else:
+            profil = self.profils_trafic.profils_segments([position.latitude], [position.longitude],
+                                                          [config.VITESSE_MOYENNE_KMH])
+        facteur = self.profils_trafic.facteurs(profil, heure_semaine(heure_depart or datetime.now()))
+        
+        return temps_normal / float(facteur[0])
+    
+    def estimer_arrivees(self, points: List[Point], heure_depart: datetime = None) -> List[datetime]:
+        """
+        Heures de passage à chaque point d'un itinéraire selon le trafic
+        (coûts nominaux de la matrice des trajets, puis un calcul vectorisé
+        sur tous les segments)
         
-        return temps_normal * facteur
+        Args:
+            points: Points de l'itinéraire, dans l'ordre
+            heure_depart: Heure de départ du premier point (défaut: maintenant)
+            
+        Returns:
+            Heure de passage à chaque point (la première est heure_depart)
+        """
+        heure_depart = heure_depart or datetime.now()
+        if len(points) < 2:
+            return [heure_depart] * len(points)
+        distances, durees = self.service_matrice.couts_segments(points)
+        durees_trafic = self.profils_trafic.durees_points(points, distances, durees, heure_depart)
+        return self.profils_trafic.arrivees(heure_depart, durees_trafic)
@@ -0,0 +1,203 @@
+"""
+Métriques en mémoire : compteurs, jauges et histogrammes - VERSION KINSHASA
+
+Consultables dans le processus et exportables en JSON ou au format texte
+Prometheus (exposition 0.0.4).
+"""
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Tuple
+
+# Bornes (secondes) des histogrammes de latence : de 0,1 ms à 30 s
+BORNES_LATENCE = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Etiquettes = Tuple[Tuple[str, str], ...]
+
+def _cle_etiquettes(etiquettes: Dict[str, Any]) -> Etiquettes:
+    return tuple(sorted((nom, str(valeur)) for nom, valeur in etiquettes.items()))
+
+def _echapper(valeur: str) -> str:
+    return valeur.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _formater_etiquettes(etiquettes: Etiquettes, supplementaires: Etiquettes = ()) -> str:
+    paires = etiquettes + supplementaires
+    if not paires:
+        return ""
+    contenu = ",".join(f'{nom}="{_echapper(valeur)}"' for nom, valeur in paires)
+    return "{" + contenu + "}"
+
+def _formater_nombre(valeur: float) -> str:
+    if valeur == float("inf"):
+        return "+Inf"
+    if valeur == int(valeur):
+        return str(int(valeur))
+    return repr(float(valeur))
+
+class _Histogramme:
+    """Répartition d'observations dans des intervalles cumulés"""
+    
+    def __init__(self, bornes: Tuple[float, ...]):
+        self.bornes = bornes
+        self.comptes = [0] * (len(bornes) + 1)
+        self.somme = 0.0
+        self.nombre = 0
+    
+    def observer(self, valeur: float):
+        self.comptes[bisect.bisect_left(self.bornes, valeur)] += 1
+        self.somme += valeur
+        self.nombre += 1
+    
+    def cumules(self) -> List[Tuple[float, int]]:
+        total = 0
+        resultat = []
+        for borne, compte in zip(self.bornes + (float("inf"),), self.comptes):
+            total += compte
+            resultat.append((borne, total))
+        return resultat
+
+class Telemetrie:
+    """
+    Registre de métriques partagé entre threads
+    
+    Les métriques sont créées au premier usage ; chaque combinaison
+    d'étiquettes forme une série distincte.
+    """
+    
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self._compteurs: Dict[str, Dict[Etiquettes, float]] = {}
+        self._jauges: Dict[str, Dict[Etiquettes, float]] = {}
+        self._histogrammes: Dict[str, Dict[Etiquettes, _Histogramme]] = {}
+        self._bornes: Dict[str, Tuple[float, ...]] = {}
+        self._aides: Dict[str, str] = {}
+    
+    def decrire(self, nom: str, aide: str, bornes: Tuple[float, ...] = None):
+        """Associe un texte d'aide (et des bornes d'histogramme) à une métrique"""
+        with self._verrou:
+            self._aides[nom] = aide
+            if bornes is not None:
+                self._bornes[nom] = tuple(sorted(bornes))
+    
+    def incrementer(self, nom: str, valeur: float = 1.0, **etiquettes):
+        """Augmente un compteur"""
+        cle = _cle_etiquettes(etiquettes)
+        with self._verrou:
+            series = self._compteurs.setdefault(nom, {})
+            series[cle] = series.get(cle, 0.0) + valeur
+    
+    def definir(self, nom: str, valeur: float, **etiquettes):
+        """Fixe la valeur d'une jauge"""
+        with self._verrou:
+            self._jauges.setdefault(nom, {})[_cle_etiquettes(etiquettes)] = float(valeur)
+    
+    def observer(self, nom: str, valeur: float, **etiquettes):
+        """Ajoute une observation à un histogramme"""
+        cle = _cle_etiquettes(etiquettes)
+        with self._verrou:
+            series = self._histogrammes.setdefault(nom, {})
+            histogramme = series.get(cle)
+            if histogramme is None:
+                histogramme = series[cle] = _Histogramme(self._bornes.get(nom, BORNES_LATENCE))
+            histogramme.observer(valeur)
+    
+    @contextmanager
+    def chronometrer(self, nom: str, **etiquettes):
+        """Observe la durée (secondes) du bloc dans l'histogramme nom"""
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observer(nom, time.perf_counter() - debut, **etiquettes)
+    
+    def valeur(self, nom: str, **etiquettes) -> float:
+        """
+        Valeur d'un compteur ou d'une jauge ; sans étiquettes, somme des séries
+        
+        Returns:
+            Valeur courante (0 si la métrique n'existe pas)
+        """
+        with self._verrou:
+            series = self._compteurs.get(nom) or self._jauges.get(nom) or {}
+            if not etiquettes:
+                return sum(series.values())
+            return series.get(_cle_etiquettes(etiquettes), 0.0)
+    
+    def nombre_observations(self, nom: str, **etiquettes) -> int:
+        """Nombre d'observations d'un histogramme ; sans étiquettes, toutes séries"""
+        with self._verrou:
+            series = self._histogrammes.get(nom, {})
+            if not etiquettes:
+                return sum(histogramme.nombre for histogramme in series.values())
+            histogramme = series.get(_cle_etiquettes(etiquettes))
+            return histogramme.nombre if histogramme else 0
+    
+    def reinitialiser(self):
+        """Efface toutes les séries (les descriptions sont conservées)"""
+        with self._verrou:
+            self._compteurs.clear()
+            self._jauges.clear()
+            self._histogrammes.clear()
+    
+    def instantane(self) -> Dict[str, Any]:
+        """
+        Copie de toutes les métriques sous forme de dictionnaire
+        
+        Returns:
+            {"compteurs": ..., "jauges": ..., "histogrammes": ...}, chaque
+            métrique étant une liste de séries {"etiquettes", "valeur"} ou
+            {"etiquettes", "nombre", "somme", "intervalles"}
+        """
+        with self._verrou:
+            return {
+                "compteurs": {
+                    nom: [{"etiquettes": dict(cle), "valeur": valeur} for cle, valeur in series.items()]
+                    for nom, series in self._compteurs.items()
+                },
+                "jauges": {
+                    nom: [{"etiquettes": dict(cle), "valeur": valeur} for cle, valeur in series.items()]
+                    for nom, series in self._jauges.items()
+                },
+                "histogrammes": {
+                    nom: [{
+                        "etiquettes": dict(cle),
+                        "nombre": histogramme.nombre,
+                        "somme": histogramme.somme,
+                        "intervalles": {
+                            _formater_nombre(borne): cumul for borne, cumul in histogramme.cumules()
+                        }
+                    } for cle, histogramme in series.items()]
+                    for nom, series in self._histogrammes.items()
+                }
+            }
+    
+    def exporter_json(self, indent: int = 2) -> str:
+        """Exporte les métriques en JSON"""
+        return json.dumps(self.instantane(), indent=indent, ensure_ascii=False)
+    
+    def exporter_prometheus(self) -> str:
+        """Exporte les métriques au format texte Prometheus"""
+        lignes = []
+        with self._verrou:
+            for type_metrique, metriques in (("counter", self._compteurs), ("gauge", self._jauges)):
+                for nom in sorted(metriques):
+                    self._entete_prometheus(lignes, nom, type_metrique)
+                    for cle, valeur in sorted(metriques[nom].items()):
+                        lignes.append(f"{nom}{_formater_etiquettes(cle)} {_formater_nombre(valeur)}")
+                        
+            for nom in sorted(self._histogrammes):
+                self._entete_prometheus(lignes, nom, "histogram")
+                for cle, histogramme in sorted(self._histogrammes[nom].items()):
+                    for borne, cumul in histogramme.cumules():
+                        le = (("le", _formater_nombre(borne)),)
+                        lignes.append(f"{nom}_bucket{_formater_etiquettes(cle, le)} {cumul}")
+                    lignes.append(f"{nom}_sum{_formater_etiquettes(cle)} {_formater_nombre(histogramme.somme)}")
+                    lignes.append(f"{nom}_count{_formater_etiquettes(cle)} {histogramme.nombre}")
+        return "\n".join(lignes) + "\n"
+    
+    def _entete_prometheus(self, lignes: List[str], nom: str, type_metrique: str):
+        if nom in self._aides:
+            lignes.append(f"# HELP {nom} {self._aides[nom]}")
+        lignes.append(f"# TYPE {nom} {type_metrique}")
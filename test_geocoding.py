@@ -2,12 +2,46 @@
 """
 Tests pour le service de géocodage
 """
+import asyncio
+import io
+import json
+import random
+import subprocess
 import sys
 import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.services.geocoding import service_geocoding
-from src.services.data_manager import gestionnaire_donnees
+from src.services.geocoding import ServiceGeocoding, service_geocoding, config
+from src.services.data_manager import GestionnaireDonnees, gestionnaire_donnees
+from src.services.client_nominatim import Disjoncteur
+from src.services.geocoding_async import ServiceGeocodingAsync
+from src.services.geocoding_cache import CacheGeocoding, CacheGeocodingJSON, CacheGeocodingSQLite
+from src.services.gazetteer import obtenir_gazetteer
+from src.services.instantane_geocoding import compiler_instantane
+from src.services import import_points
+from src.services.import_points import importer_fichier, objets_geojson
+from src.services.jeu_points_binaire import JeuPointsBinaire, ecrire_jeu_points
+from src.services.arrets_transport import ServiceArrets
+from src.services.graphe_routier import SENS_DIRECT, SENS_DOUBLE, ConstructeurGraphe, GrapheRoutier, compiler_graphe
+from src.services.hierarchie_routiere import HierarchieContraction, charger_hierarchie, construire_hierarchie
+from src.services.matrice_trajets import ServiceMatrice
+from src.services.optimisation_tournee import cout_chemin, optimiser_ordre
+from src.services.profils_trafic import CRENEAUX, ProfilsTrafic, heure_semaine
+from src.services.routes_alternatives import GenerateurAlternatives, chemins_diversifies
+from src.services.routing import ServiceRouting
+from src.core.decision_maker import DecisionMaker
+from src.core.etat import Point, PointStore
+from src.utils.helpers import (calculer_distance_haversine, calculer_distance_haversine_coords,
+                               calculer_distance_totale, calculer_distances_segments,
+                               calculer_matrice_distances, coordonnees_points, distances_haversine,
+                               generer_points_intermediaires, longueurs_cumulees, matrice_distances)
+from src.utils.paresseux import SingletonParesseux, est_charge
+from nominatim_local import FixturesNominatim, cle_requete, demarrer_serveur_local
 
 def test_geocoding_basique():
     """Test de géocodage basique"""
@@ -35,6 +69,1025 @@ def test_points_interet():
     for point in points[:3]:  # Afficher les 3 premiers
         print(f"   📍 {point.nom}: {point.latitude}, {point.longitude}")
 
+def test_index_spatial_donnees():
+    """Test des requêtes spatiales du gestionnaire de données"""
+    print("\n🧪 Test de l'index spatial des données...")
+    
+    gare = gestionnaire_donnees.points_interet["Gare Centrale"]
+    proches = gestionnaire_donnees.points_proches(gare.latitude, gare.longitude, k=3)
+    assert proches[0][0] is gare and proches[0][1] == 0.0
+    assert [d for _, d in proches] == sorted(d for _, d in proches)
+    
+    arrets = gestionnaire_donnees.points_proches(gare.latitude, gare.longitude, k=2, type_point="arret_bus")
+    assert all(point.type_point == "arret_bus" for point, _ in arrets)
+    
+    gombe = gestionnaire_donnees.points_dans_rectangle(-4.34, 15.30, -4.31, 15.32, commune="gombe")
+    assert gare in gombe and all(point.commune == "Gombe" for point in gombe)
+    
+    # Requête par lot : mêmes résultats que point par point
+    generateur = random.Random(5)
+    positions = [(-4.46 + generateur.random() * 0.16, 15.24 + generateur.random() * 0.2) for _ in range(60)]
+    latitudes, longitudes = [lat for lat, _ in positions], [lon for _, lon in positions]
+    total = len(gestionnaire_donnees.index_spatial)
+    for k, rayon, type_point in ((4, None, None), (2, 1.5, "arret_bus"), (total + 3, None, None)):
+        points, indices, distances = gestionnaire_donnees.points_proches_lot(
+            latitudes, longitudes, k, rayon, type_point=type_point
+        )
+        for i, (lat, lon) in enumerate(positions):
+            attendus = gestionnaire_donnees.points_proches(lat, lon, k, rayon, type_point=type_point)
+            trouves = [(points[j], d) for j, d in zip(indices[i].tolist(), distances[i].tolist()) if j >= 0]
+            assert len(trouves) == len(attendus)
+            assert all(abs(d - attendu) < 1e-9 for (_, d), (_, attendu) in zip(trouves, attendus))
+            assert {id(p) for p, _ in trouves} == {id(p) for p, _ in attendus}
+            assert all(d == float("inf") for d in distances[i][len(attendus):].tolist())
+    
+    print(f"✅ {len(gestionnaire_donnees.index_spatial)} points indexés, "
+          f"{len(gombe)} dans la zone de Gombe")
+
+def test_recherche_noms():
+    """Test de la recherche par nom et de l'autocomplétion"""
+    print("\n🧪 Test de la recherche par nom...")
+    
+    assert gestionnaire_donnees.rechercher_point_par_nom("GARE centrale").nom == "Gare Centrale"
+    assert gestionnaire_donnees.rechercher_point_par_nom("central").nom == "Marché Central"
+    assert gestionnaire_donnees.rechercher_point_par_nom("hopital general").nom == "Hôpital Général de Kinshasa"
+    
+    suggestions = gestionnaire_donnees.autocompleter("arret ma")
+    assert [point.nom for point in suggestions] == ["Arrêt Marché"]
+    assert gestionnaire_donnees.autocompleter("zzz") == []
+    
+    print(f"✅ {len(gestionnaire_donnees.index_noms)} noms indexés")
+
+def test_point_store():
+    """Test du stockage des points en colonnes"""
+    print("\n🧪 Test du PointStore...")
+    
+    points = [Point(f"Arrêt {i}", -4.3 - i * 0.001, 15.3, "arret", "Gombe" if i % 2 else None) for i in range(100)]
+    store = PointStore.depuis_points(points)
+    assert len(store) == 100 and list(store) == points
+    assert store[-1] == points[-1] and list(store[10:13]) == points[10:13]
+    assert store.en_dicts() == [point.to_dict() for point in points]
+    assert Point.from_dict(store[3].to_dict()) == points[3]
+    
+    latitudes, longitudes = coordonnees_points(store)
+    assert latitudes[5] == points[5].latitude and longitudes[5] == points[5].longitude
+    assert not store.latitudes.flags.writeable
+    
+    # Les points intermédiaires restent une liste modifiable
+    etapes = generer_points_intermediaires(points[0], points[-1], nb_points=3)
+    assert isinstance(etapes, list) and [p.nom for p in etapes] == ["Étape 1", "Étape 2", "Étape 3"]
+    etapes[0].nom = "Pont"
+    etapes.append(points[1])
+    assert etapes[0].nom == "Pont" and len(etapes) == 4
+    
+    print(f"✅ {len(store)} points sur {store.nbytes} octets")
+
+def test_distances_vectorisees():
+    """Test des distances Haversine vectorisées contre la version scalaire"""
+    print("\n🧪 Test des distances vectorisées...")
+    
+    tirage = random.Random(11)
+    def point_aleatoire(i: int) -> Point:
+        return Point(f"P{i}", tirage.uniform(-90, 90), tirage.uniform(-180, 180))
+    points = [point_aleatoire(i) for i in range(200)]
+    # Cas limites : points confondus, antipodes, autour de Kinshasa
+    points += [Point("Gare", -4.316, 15.313), Point("Gare bis", -4.316, 15.313),
+               Point("Nord", 90.0, 0.0), Point("Sud", -90.0, 0.0), Point("Ngaliema", -4.33, 15.25)]
+    def proche(a: float, b: float) -> bool:
+        return abs(a - b) <= 1e-9 * max(1.0, abs(b))
+    
+    # Couples appariés
+    latitudes, longitudes = coordonnees_points(points)
+    distances = distances_haversine(latitudes[:-1], longitudes[:-1], latitudes[1:], longitudes[1:])
+    attendues = [calculer_distance_haversine(a, b) for a, b in zip(points[:-1], points[1:])]
+    assert all(proche(d, a) for d, a in zip(distances.tolist(), attendues))
+    assert float(distances_haversine(-4.316, 15.313, -4.316, 15.313)) == 0.0
+    
+    # Matrice N × M
+    lignes, colonnes = points[:30], points[150:]
+    matrice = calculer_matrice_distances(lignes, colonnes)
+    assert matrice.shape == (30, len(colonnes))
+    for i, a in enumerate(lignes):
+        for j, b in enumerate(colonnes):
+            assert proche(float(matrice[i, j]), calculer_distance_haversine(a, b))
+    lats_a, lons_a = coordonnees_points(lignes)
+    assert (matrice_distances(lats_a, lons_a, lats_a, lons_a).diagonal() == 0).all()
+    
+    # Polyligne : segments, longueurs cumulées et longueur totale
+    cumul = longueurs_cumulees(latitudes, longitudes)
+    somme = 0.0
+    for i in range(1, len(points)):
+        somme += calculer_distance_haversine_coords(latitudes[i - 1], longitudes[i - 1], latitudes[i], longitudes[i])
+        assert abs(cumul[i] - somme) <= 1e-9 * somme
+    assert cumul[0] == 0.0 and proche(calculer_distance_totale(points), somme)
+    assert calculer_distances_segments(points).shape == (len(points) - 1,)
+    
+    # Itinéraires de 0 ou 1 point
+    assert longueurs_cumulees([], []).shape == (0,) and longueurs_cumulees([-4.3], [15.3]).tolist() == [0.0]
+    assert calculer_distances_segments([]).shape == (0,) and calculer_distances_segments(points[:1]).shape == (0,)
+    assert calculer_distance_totale([]) == 0.0 and calculer_distance_totale(points[:1]) == 0.0
+    
+    print(f"✅ {len(attendues)} couples, matrice {matrice.shape[0]}×{matrice.shape[1]} et polyligne identiques")
+
+def test_jeu_points_binaire():
+    """Test du format binaire des points d'intérêt"""
+    print("\n🧪 Test du jeu de points binaire...")
+    
+    points = gestionnaire_donnees.points_interet
+    with tempfile.TemporaryDirectory() as dossier:
+        fichier = os.path.join(dossier, "points_interet.bin")
+        assert ecrire_jeu_points(points, fichier) == len(points)
+        jeu = JeuPointsBinaire(fichier)
+        assert dict(jeu) == dict(points)
+        assert jeu["Gare Centrale"] is jeu["Gare Centrale"]
+        assert "Lieu inexistant" not in jeu
+        assert sum(fin - debut for _, debut, fin in jeu.grille()) == len(points)
+        jeu.fermer()
+    
+    print(f"✅ {len(points)} points relus depuis le fichier mappé")
+
+@contextmanager
+def donnees_temporaires():
+    """Redirige les fichiers de données vers un dossier temporaire"""
+    fichiers = ("FICHIER_POINTS_INTERET", "FICHIER_ARRETS_BUS", "FICHIER_POINTS_INTERET_BINAIRE",
+                "FICHIER_ARRETS_BUS_BINAIRE", "FICHIER_JOURNAL_POINTS_INTERET", "FICHIER_JOURNAL_ARRETS_BUS")
+    origines = {nom: getattr(config, nom) for nom in fichiers}
+    with tempfile.TemporaryDirectory() as dossier:
+        for nom in fichiers:
+            setattr(config, nom, os.path.join(dossier, os.path.basename(origines[nom])))
+        try:
+            yield dossier
+        finally:
+            for nom, valeur in origines.items():
+                setattr(config, nom, valeur)
+
+@contextmanager
+def geocodage_local(fixtures: FixturesNominatim = None, **options):
+    """
+    Service de géocodage relié au serveur Nominatim local, avec son propre
+    cache dans un dossier temporaire (le cache réel n'est pas modifié)
+    
+    Args:
+        fixtures: Réponses du serveur local
+        options: Options du serveur (latence, taux_erreur, taux_limitation...)
+        
+    Yields:
+        Tuple (service, serveur)
+    """
+    serveur = demarrer_serveur_local(fixtures, **options)
+    with tempfile.TemporaryDirectory() as dossier:
+        reglages = {
+            "NOMINATIM_URL": f"{serveur.url}/search",
+            "NOMINATIM_DELAY": 0.01,
+            "NOMINATIM_BACKOFF_BASE": 0.01,
+            "FICHIER_CACHE_GEOCODING": os.path.join(dossier, "cache_geocoding.json"),
+            "FICHIER_CACHE_GEOCODING_DB": os.path.join(dossier, "cache_geocoding.db"),
+            "FICHIER_INSTANTANE_GEOCODING": os.path.join(dossier, "instantane_geocoding.bin")
+        }
+        origines = {nom: getattr(config, nom) for nom in reglages}
+        for nom, valeur in reglages.items():
+            setattr(config, nom, valeur)
+        try:
+            service = ServiceGeocoding()
+            yield service, serveur
+        finally:
+            for nom, valeur in origines.items():
+                setattr(config, nom, valeur)
+            serveur.shutdown()
+
+def fixtures_recherche(lieux: dict) -> FixturesNominatim:
+    """Réponses /search du serveur local : nom du lieu → (latitude, longitude)"""
+    fixtures = FixturesNominatim()
+    for lieu, (latitude, longitude) in lieux.items():
+        requete = f"{lieu}, {config.VILLE_DEFAUT}, {config.PAYS_DEFAUT}"
+        fixtures.reponses['search'][cle_requete('search', {'q': requete, 'limit': '1'})] = [
+            {'lat': str(latitude), 'lon': str(longitude), 'display_name': lieu}
+        ]
+    return fixtures
+
+def test_journal_points():
+    """Test du journal des modifications et de la compaction"""
+    print("\n🧪 Test du journal des points...")
+    
+    with donnees_temporaires():
+        gestionnaire = GestionnaireDonnees()
+        lot = {f"Lieu {i}": Point(f"Lieu {i}", -4.30 - i * 0.001, 15.30, "poi") for i in range(500)}
+        assert gestionnaire.ajouter_points_en_masse(lot) == 500
+        gestionnaire.retirer_point("Lieu 0")
+        try:
+            with gestionnaire.transaction():
+                gestionnaire.ajouter_point_interet("Annulé", Point("Annulé", -4.3, 15.3))
+                raise RuntimeError("abandon")
+        except RuntimeError:
+            pass
+            
+        # Lot interrompu en fin de journal : ignoré au rechargement
+        with open(config.FICHIER_JOURNAL_POINTS_INTERET, 'a', encoding='utf-8') as f:
+            f.write('{"operations": [{"op": "ajouter", "cle": "Inter')
+        relu = GestionnaireDonnees()
+        assert dict(relu.points_interet) == dict(gestionnaire.points_interet)
+        assert "Lieu 0" not in relu.points_interet and "Annulé" not in relu.points_interet
+        assert relu.points_proches(-4.301, 15.30, 1)[0][0].nom == "Lieu 1"
+        
+        relu.compacter()
+        assert os.path.getsize(config.FICHIER_JOURNAL_POINTS_INTERET) == 0
+        assert dict(GestionnaireDonnees().points_interet) == dict(gestionnaire.points_interet)
+    
+    print("✅ Journal rejoué puis compacté")
+
+def test_import_points():
+    """Test de l'import en flux (CSV et GeoJSON) avec dédoublonnage"""
+    print("\n🧪 Test de l'import de points...")
+    
+    with donnees_temporaires() as dossier:
+        gestionnaire = GestionnaireDonnees()
+        fichier_csv = os.path.join(dossier, "arrets.csv")
+        with open(fichier_csv, 'w', encoding='utf-8') as f:
+            f.write("nom;lat;lon;commune;highway\n"
+                    "Arrêt Ngaba;-4,3800;15,3200;Ngaba;bus_stop\n"
+                    "Arrêt Ngaba;-4.3801;15.3201;Ngaba;bus_stop\n"
+                    "Sans coordonnées;;;Lemba;bus_stop\n")
+        progression = importer_fichier(fichier_csv, gestionnaire=gestionnaire, rappel=None)
+        assert (progression.importes, progression.doublons, progression.ignores) == (1, 1, 1)
+        assert gestionnaire.arrets_bus["Arrêt Ngaba"].commune == "Ngaba"
+        
+        fichier_geojson = os.path.join(dossier, "lieux.geojson")
+        features = [
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [15.31, -4.325]},
+             "properties": {"name": "Marché Central", "amenity": "marketplace"}},
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [15.305, -4.33]},
+             "properties": {"name": "Hôpital du Cinquantenaire", "amenity": "hospital"}}
+        ]
+        with open(fichier_geojson, 'w', encoding='utf-8') as f:
+            json.dump({"type": "FeatureCollection", "features": features}, f)
+        progression = importer_fichier(fichier_geojson, gestionnaire=gestionnaire, rappel=None)
+        assert (progression.importes, progression.doublons) == (1, 1)
+        assert gestionnaire.points_interet["Hôpital du Cinquantenaire"].type_point == "hopital"
+        
+        fichier_osm = os.path.join(dossier, "kinshasa.osm")
+        with open(fichier_osm, 'w', encoding='utf-8') as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n<osm version="0.6">\n'
+                    '<node id="1" lat="-4.3700" lon="15.2900"><tag k="highway" v="bus_stop"/>'
+                    '<tag k="name" v="Arrêt Kintambo Magasin"/></node>\n'
+                    '<node id="2" lat="-4.3310" lon="15.2700"><tag k="amenity" v="marketplace"/>'
+                    '<tag k="name:fr" v="Marché Gambela"/><tag k="addr:suburb" v="Kasa-Vubu"/></node>\n'
+                    '<node id="3" lat="-4.3320" lon="15.2710"><tag k="natural" v="tree"/></node>\n'
+                    '<node id="4" lat="-4.3330" lon="15.2720"><tag k="name" v="Lampadaire"/></node>\n'
+                    '<node id="5" lat="-4.3340" lon="15.2730"/>\n'
+                    '<way id="6"><nd ref="1"/><nd ref="2"/><tag k="name" v="Avenue"/></way>\n</osm>\n')
+        progression = importer_fichier(fichier_osm, gestionnaire=gestionnaire, rappel=None)
+        assert (progression.lus, progression.importes, progression.arrets_bus, progression.ignores) == (4, 2, 1, 2)
+        assert gestionnaire.points_interet["Marché Gambela"].commune == "Kasa-Vubu"
+        assert progression.octets_lus == progression.taille_octets
+        
+    # Lecture en flux : premier objet plus grand que TAILLE_MAX_OBJET_UNIQUE, petits blocs
+    features = [{"type": "Feature", "geometry": {"type": "Point", "coordinates": [15.3, -4.3 - i * 0.001]},
+                 "properties": {"name": f"Lieu {i}", "description": "x" * 150}} for i in range(40)]
+    textes = {
+        "collection": json.dumps({"type": "FeatureCollection", "features": features}),
+        "collection, features en premier": json.dumps({"features": features, "bbox": [15.3, -4.4, 15.3, -4.3],
+                                                        "type": "FeatureCollection"}),
+        "collection avec crs": json.dumps({"type": "FeatureCollection", "crs": {"type": "name", "properties": {
+            "name": "urn:ogc:def:crs:OGC:1.3:CRS84"}}, "features": features}),
+        "GeoJSON Lines": "\n".join(json.dumps(feature) for feature in features) + "\n",
+        "séquence RFC 8142": "".join("\x1e" + json.dumps(feature) + "\n" for feature in features)
+    }
+    taille_max = import_points.TAILLE_MAX_OBJET_UNIQUE
+    import_points.TAILLE_MAX_OBJET_UNIQUE = 100
+    try:
+        for nom, texte in textes.items():
+            lus = list(objets_geojson(io.StringIO(texte), taille_bloc=64))
+            assert lus == features, nom
+        assert list(objets_geojson(io.StringIO("  \n"), taille_bloc=64)) == []
+    finally:
+        import_points.TAILLE_MAX_OBJET_UNIQUE = taille_max
+    
+    print(f"✅ Import terminé ({progression.debit:.0f} enregistrements/s)")
+
+def test_cache_sqlite():
+    """Test du cache SQLite : TTL, éviction LRU et migration JSON"""
+    print("\n🧪 Test du cache SQLite...")
+    
+    with tempfile.TemporaryDirectory() as dossier:
+        cache = CacheGeocodingSQLite(os.path.join(dossier, "cache.db"), ttl_defaut=0, max_entrees=3)
+        point = {"nom": "Gare Centrale", "latitude": -4.316, "longitude": 15.313, "type_point": "geocode"}
+        
+        cache.enregistrer("gare", point)
+        assert cache.obtenir("gare") == point
+        
+        cache.enregistrer("expire", point, ttl=0.01)
+        time.sleep(0.02)
+        assert cache.obtenir("expire") is None
+        
+        for i in range(5):
+            cache.enregistrer(f"lieu {i}", point)
+        cache.evincer()
+        assert len(cache) == 3
+        assert cache.obtenir("lieu 4") == point
+        
+        fichier_json = os.path.join(dossier, "cache.json")
+        with open(fichier_json, 'w', encoding='utf-8') as f:
+            f.write('{"Ancien, Kinshasa": {"nom": "Ancien", "latitude": 1.0, "longitude": 2.0}}')
+        assert cache.migrer_depuis_json(fichier_json) == 1
+        assert cache.migrer_depuis_json(fichier_json) == 0
+        cache.fermer()
+        
+        # Cache JSON (repli) : même TTL, négatifs compris, conservé à la migration
+        fichier_json = os.path.join(dossier, "repli.json")
+        cache_json = CacheGeocodingJSON(fichier_json, ttl_defaut=0)
+        cache_json.enregistrer("gare", point)
+        cache_json.enregistrer("introuvable", {"introuvable": True}, ttl=0.05)
+        cache_json.enregistrer("durable", point, ttl=3600)
+        assert cache_json.obtenir("gare") == point and cache_json.obtenir("durable") == point
+        assert cache_json.obtenir("introuvable") == {"introuvable": True}
+        time.sleep(0.06)
+        assert cache_json.obtenir("introuvable") is None and len(cache_json) == 2
+        assert CacheGeocodingJSON(fichier_json).obtenir("durable") == point
+        cache_json.enregistrer("expire", point, ttl=0.01)
+        time.sleep(0.02)
+        cache = CacheGeocodingSQLite(os.path.join(dossier, "migre.db"), ttl_defaut=0)
+        assert cache.migrer_depuis_json(fichier_json) == 2
+        assert cache.obtenir("durable") == point and cache.obtenir("expire") is None
+        cache.fermer()
+    
+    # Backend incomplet : refusé dès l'instanciation
+    class CacheIncomplet(CacheGeocoding):
+        def obtenir(self, cle):
+            return None
+    try:
+        CacheIncomplet()
+        assert False, "backend incomplet instancié"
+    except TypeError:
+        pass
+    
+    print("✅ Cache SQLite opérationnel")
+
+def test_gazetteer():
+    """Test de la résolution locale tolérante aux fautes"""
+    print("\n🧪 Test du gazetteer...")
+    
+    gazetteer = obtenir_gazetteer()
+    assert gazetteer.resoudre("Rond-Point Victoire").nom == "Place de la Victoire"
+    assert gazetteer.resoudre("stade des martirs").nom == "Stade des Martyrs"
+    assert gazetteer.resoudre("HOPITAL GENERAL").nom == "Hôpital Général de Kinshasa"
+    assert gazetteer.resoudre("sozacom").nom == "Immeuble Sozacom"
+    assert gazetteer.resoudre("Avenue de la Paix") is None
+    assert obtenir_gazetteer() is gazetteer
+    
+    # Points ajoutés, importés ou retirés après la construction
+    with donnees_temporaires() as dossier:
+        gestionnaire = GestionnaireDonnees()
+        assert obtenir_gazetteer(gestionnaire).resoudre("Marché de Matete") is None
+        gestionnaire.ajouter_point_interet("Marché de Matete", Point("Marché de Matete", -4.385, 15.345, "marche"))
+        assert obtenir_gazetteer(gestionnaire).resoudre("marche de matete").latitude == -4.385
+        fichier_csv = os.path.join(dossier, "arrets.csv")
+        with open(fichier_csv, 'w', encoding='utf-8') as f:
+            f.write("nom;lat;lon\nArrêt Kingabwa;-4.335;15.355\n")
+        importer_fichier(fichier_csv, gestionnaire=gestionnaire, rappel=None)
+        assert obtenir_gazetteer(gestionnaire).resoudre("arret kingabwa").longitude == 15.355
+        gestionnaire.retirer_point("Marché de Matete")
+        assert obtenir_gazetteer(gestionnaire).resoudre("Marché de Matete") is None
+    
+    print(f"✅ Gazetteer: {len(gazetteer)} noms indexés")
+
+def test_serveur_nominatim_local():
+    """Test du géocodage contre le serveur Nominatim local (sans Internet)"""
+    print("\n🧪 Test avec le serveur Nominatim local...")
+    
+    lieu = "Rond-point Ngaba"
+    with geocodage_local(fixtures_recherche({lieu: (-4.39, 15.315)}), latence=0.01) as (service, serveur):
+        assert service.verifier_connectivite()
+        point = service.geocoder_lieu(lieu)
+        assert point is not None and abs(point.latitude + 4.39) < 1e-6
+        assert service.geocoder_lieu("Lieu introuvable") is None
+    
+    print(f"✅ Serveur local: {serveur.nombre_requetes} requêtes servies")
+
+def test_geocodage_lots():
+    """Test du géocodage par lot : dédoublonnage, ordre et seuls vrais manques interrogés"""
+    print("\n🧪 Test du géocodage par lot...")
+    
+    fixtures = fixtures_recherche({"Parcelle Kimbondo": (-4.44, 15.28), "Dépôt Mitendi": (-4.47, 15.22)})
+    lieux = ["Parcelle Kimbondo", "Gare Centrale", "  parcelle   KIMBONDO ", "", "Dépôt Mitendi",
+             "Lieu sans réponse", "Parcelle Kimbondo", None]
+    with geocodage_local(fixtures) as (service, serveur):
+        resultats = service.geocoder_lots(lieux)
+        assert [resultat.lieu for resultat in resultats] == lieux
+        assert [resultat.statut for resultat in resultats] == ["api", "predefini", "api", "invalide", "api",
+                                                               "introuvable", "api", "invalide"]
+        assert resultats[0].point.latitude == resultats[2].point.latitude == -4.44
+        assert resultats[4].point.longitude == 15.22 and not resultats[5].trouve
+        assert serveur.nombre_requetes == 3
+        
+        # Deuxième lot : tout est résolu par le cache (positif ou négatif)
+        relus = service.geocoder_lots(lieux)
+        assert [resultat.statut for resultat in relus] == ["cache", "predefini", "cache", "invalide", "cache",
+                                                           "negatif", "cache", "invalide"]
+        assert serveur.nombre_requetes == 3
+    
+    print(f"✅ {len(lieux)} lieux, {serveur.nombre_requetes} requêtes Nominatim")
+
+def test_geocodage_async():
+    """Test du client asynchrone : requêtes simultanées sur une seule session"""
+    print("\n🧪 Test du géocodage asynchrone...")
+    
+    lieux = {f"Parcelle {i} Mont-Ngafula": (-4.45 - i * 0.001, 15.27) for i in range(6)}
+    latence = 0.2
+    
+    async def scenario(service):
+        async with ServiceGeocodingAsync(service, max_connexions=6) as geocodeur:
+            session = geocodeur._session
+            debut = time.perf_counter()
+            points = await asyncio.gather(*(geocodeur.geocoder_lieu(lieu) for lieu in list(lieux) * 2))
+            duree = time.perf_counter() - debut
+            resultats = await geocodeur.geocoder_lots(list(lieux) + ["Lieu sans réponse"])
+            assert geocodeur._session is session and not session.closed
+        assert session.closed
+        return points, duree, resultats
+    
+    with geocodage_local(fixtures_recherche(lieux), latence=latence) as (service, serveur):
+        points, duree, resultats = asyncio.run(scenario(service))
+        assert [point.latitude for point in points] == [latitude for latitude, _ in lieux.values()] * 2
+        assert duree < 3 * latence, f"{duree:.2f} s : requêtes non simultanées"
+        assert [resultat.statut for resultat in resultats] == ["cache"] * 6 + ["introuvable"]
+        assert serveur.nombre_requetes == 7
+        assert service.cache.obtenir(f"Lieu sans réponse, {config.VILLE_DEFAUT}, {config.PAYS_DEFAUT}") is not None
+        
+        # Cache lent (base verrouillée) : les lectures ne bloquent pas la boucle d'événements
+        obtenir = service.cache.obtenir
+        def obtenir_lent(cle):
+            time.sleep(latence)
+            return obtenir(cle)
+        service.cache.obtenir = obtenir_lent
+        
+        async def cache_lent():
+            ecarts, fin = [], False
+            async def horloge():
+                precedent = time.perf_counter()
+                while not fin:
+                    await asyncio.sleep(0.01)
+                    ecarts.append(time.perf_counter() - precedent)
+                    precedent = time.perf_counter()
+            tache = asyncio.create_task(horloge())
+            async with ServiceGeocodingAsync(service) as geocodeur:
+                debut = time.perf_counter()
+                points = await asyncio.gather(*(geocodeur.geocoder_lieu(lieu) for lieu in lieux),
+                                              geocodeur.obtenir_adresse_inverse(-4.6, 15.6))
+                duree = time.perf_counter() - debut
+            fin = True
+            await tache
+            return points, duree, max(ecarts)
+        
+        points_lents, duree_lente, ecart_max = asyncio.run(cache_lent())
+        assert [point.latitude for point in points_lents[:-1]] == [latitude for latitude, _ in lieux.values()]
+        assert ecart_max < latence / 2, f"boucle bloquée {ecart_max:.2f} s"
+        assert duree_lente < 5 * latence, f"{duree_lente:.2f} s : lectures du cache non simultanées"
+        assert serveur.nombre_requetes == 8
+    
+    print(f"✅ {len(points)} géocodages asynchrones en {duree * 1000:.0f} ms, {serveur.nombre_requetes} requêtes")
+
+def test_recherches_locales():
+    """Test des points proches et du géocodage inverse résolus sans Nominatim"""
+    print("\n🧪 Test des recherches locales...")
+    
+    fixtures = FixturesNominatim()
+    fixtures.reponses['reverse'][cle_requete('reverse', {'lat': '-4.5', 'lon': '15.5', 'zoom': '18'})] = {
+        'display_name': "Route de Kasangulu, Mont-Ngafula"
+    }
+    gare = gestionnaire_donnees.points_interet["Gare Centrale"]
+    with geocodage_local(fixtures) as (service, serveur):
+        proches = service.rechercher_points_proches(gare, rayon_km=1.0)
+        assert proches and all(point.nom != gare.nom for point in proches)
+        assert all(calculer_distance_haversine(gare, point) <= 1.0 for point in proches)
+        adresse = service.obtenir_adresse_inverse(gare.latitude + 0.0001, gare.longitude)
+        assert adresse.startswith("Gare Centrale")
+        assert serveur.nombre_requetes == 0
+        
+        # Position éloignée des points connus : une requête, puis le cache quantifié
+        assert service.obtenir_adresse_inverse(-4.5, 15.5) == "Route de Kasangulu, Mont-Ngafula"
+        assert service.obtenir_adresse_inverse(-4.50001, 15.50002) == "Route de Kasangulu, Mont-Ngafula"
+        assert serveur.nombre_requetes == 1
+        assert service.telemetrie.valeur("geocodage_inverse_total", niveau="local") == 2
+    
+    print(f"✅ {len(proches)} points proches et 3 adresses, {serveur.nombre_requetes} requête Nominatim")
+
+def test_disjoncteur():
+    """Test des reprises, de Retry-After et du disjoncteur contre le serveur local"""
+    print("\n🧪 Test du disjoncteur...")
+    
+    with geocodage_local(fixtures_recherche({"Dépôt Kingasani": (-4.40, 15.40)})) as (service, serveur):
+        disjoncteur = service.client.disjoncteur = Disjoncteur(seuil_echecs=2, duree_ouverture=0.2)
+        url_recherche = config.NOMINATIM_URL
+        
+        # Pannes (503) : le disjoncteur s'ouvre au deuxième échec, les appels suivants échouent sans réseau
+        serveur.taux_erreur = 1.0
+        assert service.geocoder_lieu("Dépôt Kingasani") is None
+        assert disjoncteur.etat == Disjoncteur.OUVERT and serveur.nombre_requetes == 2
+        assert service.telemetrie.valeur("nominatim_reprises_total", point_acces="search") == 2
+        assert service.geocoder_lieu("Dépôt Kingasani") is None and serveur.nombre_requetes == 2
+        
+        # Appel d'essai terminé par une erreur client (404) : le disjoncteur se referme
+        serveur.taux_erreur = 0.0
+        time.sleep(0.25)
+        config.NOMINATIM_URL = f"{serveur.url}/inconnu"
+        try:
+            assert service.geocoder_lieu("Dépôt Kingasani") is None
+        finally:
+            config.NOMINATIM_URL = url_recherche
+        assert disjoncteur.etat == Disjoncteur.FERME and not disjoncteur._essai_en_cours
+        assert service.geocoder_lieu("Dépôt Kingasani").latitude == -4.40
+        
+        # Même essai par le client asynchrone
+        for _ in range(disjoncteur.seuil_echecs):
+            disjoncteur.signaler_echec()
+        disjoncteur._ouvert_jusqua = 0.0
+        geocodeur = ServiceGeocodingAsync(service)
+        async def essai_asynchrone():
+            try:
+                await geocodeur._requete_json(f"{serveur.url}/inconnu", {})
+            except Exception as e:
+                return e
+            finally:
+                await geocodeur.fermer()
+        assert getattr(asyncio.run(essai_asynchrone()), "status", None) == 404
+        assert disjoncteur.etat == Disjoncteur.FERME and not disjoncteur._essai_en_cours
+        
+        # Retry-After au-delà du backoff maximal : aucune reprise, disjoncteur ouvert pendant Retry-After
+        serveur.taux_limitation = 1.0
+        requetes, backoff_max = serveur.nombre_requetes, config.NOMINATIM_BACKOFF_MAX
+        config.NOMINATIM_BACKOFF_MAX = 0.5
+        try:
+            debut = time.perf_counter()
+            assert service.geocoder_lieu("Lieu suspendu") is None
+            assert time.perf_counter() - debut < 0.5 and serveur.nombre_requetes == requetes + 1
+            assert disjoncteur.etat == Disjoncteur.OUVERT and disjoncteur._ouvert_jusqua - time.monotonic() > 0.5
+            assert service.geocoder_lieu("Autre lieu suspendu") is None and serveur.nombre_requetes == requetes + 1
+            disjoncteur.signaler_succes()
+            async def limitation_asynchrone():
+                try:
+                    await geocodeur._requete_json(url_recherche, {"q": "Lieu suspendu"})
+                except Exception as e:
+                    return e
+                finally:
+                    await geocodeur.fermer()
+            debut = time.perf_counter()
+            assert getattr(asyncio.run(limitation_asynchrone()), "status", None) == 429
+            assert time.perf_counter() - debut < 0.5 and serveur.nombre_requetes == requetes + 2
+            assert disjoncteur.etat == Disjoncteur.OUVERT
+        finally:
+            config.NOMINATIM_BACKOFF_MAX = backoff_max
+        disjoncteur.signaler_succes()
+        
+        # Limitation (429, Retry-After: 1) : attente imposée par le serveur, puis ouverture d'au moins 1 s
+        debut = time.perf_counter()
+        assert service.geocoder_lieu("Lieu limité") is None
+        assert time.perf_counter() - debut >= 1.0
+        assert disjoncteur.etat == Disjoncteur.OUVERT and disjoncteur._ouvert_jusqua - time.monotonic() > 0.5
+    
+    print(f"✅ Disjoncteur ouvert puis refermé, {serveur.nombre_requetes} requêtes")
+
+def test_regroupement_requetes():
+    """Test du regroupement des requêtes simultanées identiques"""
+    print("\n🧪 Test du regroupement des requêtes...")
+    
+    with geocodage_local(latence=0.2) as (service, serveur):
+        threads = [threading.Thread(target=service.geocoder_lieu, args=("Lieu simultané",)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert serveur.nombre_requetes == 1
+    
+    print("✅ 8 appels simultanés → 1 requête Nominatim")
+
+def test_instantane_hors_ligne():
+    """Test de l'instantané compilé en mode hors ligne"""
+    print("\n🧪 Test de l'instantané hors ligne...")
+    
+    serveur = demarrer_serveur_local()
+    url_origine = config.NOMINATIM_URL
+    instantane_origine = service_geocoding.instantane
+    config.NOMINATIM_URL = f"{serveur.url}/search"
+    config.GEOCODAGE_HORS_LIGNE = True
+    with tempfile.TemporaryDirectory() as dossier:
+        fichier = os.path.join(dossier, "instantane.bin")
+        cle = service_geocoding._cle_vol("Lieu compilé", config.VILLE_DEFAUT, config.PAYS_DEFAUT)
+        compiler_instantane({cle: Point("Lieu compilé", -4.33, 15.31, "poi")}, fichier)
+        try:
+            assert service_geocoding.charger_instantane(fichier)
+            resultat = service_geocoding.geocoder_lots(["lieu  COMPILÉ", "Lieu absent de l'instantané"])
+            assert resultat[0].statut == "instantane" and resultat[0].point.latitude == -4.33
+            assert not resultat[1].trouve
+            assert serveur.nombre_requetes == 0
+        finally:
+            config.GEOCODAGE_HORS_LIGNE = False
+            config.NOMINATIM_URL = url_origine
+            service_geocoding.instantane = instantane_origine
+            serveur.shutdown()
+    
+    print("✅ Lieux résolus depuis l'instantané, aucune requête réseau")
+
+def test_metriques():
+    """Test des métriques de géocodage"""
+    print("\n🧪 Test des métriques...")
+    
+    avant = service_geocoding.telemetrie.valeur("geocodage_resolutions_total", niveau="predefini")
+    service_geocoding.geocoder_lieu("Gare Centrale")
+    apres = service_geocoding.telemetrie.valeur("geocodage_resolutions_total", niveau="predefini")
+    assert apres == avant + 1
+    
+    texte = service_geocoding.exporter_metriques("prometheus")
+    assert "# TYPE geocodage_duree_secondes histogram" in texte
+    assert 'geocodage_duree_secondes_bucket{niveau="predefini",le="+Inf"}' in texte
+    assert "jauges" in service_geocoding.obtenir_metriques()
+    
+    print(f"✅ Métriques: {int(apres)} résolutions par points prédéfinis")
+
+def test_arrets_transport():
+    """Test des arrêts de bus les plus proches d'un lot de points"""
+    print("\n🧪 Test des arrêts de transport...")
+    
+    service = ServiceArrets(gestionnaire_donnees)
+    arrets = gestionnaire_donnees.obtenir_arrets_bus()
+    points = [Point(f"P{i}", arret.latitude + 0.003, arret.longitude - 0.002) for i, arret in enumerate(arrets)]
+    proches = service.arrets_proches_points(points, k=2)
+    for i, point in enumerate(points):
+        attendus = gestionnaire_donnees.points_proches(point.latitude, point.longitude, k=2, type_point="arret_bus")
+        trouves = proches.arrets(i)
+        assert [arret.nom for arret, _, _ in trouves] == [arret.nom for arret, _ in attendus]
+        assert abs(trouves[0][1] - attendus[0][1] * config.MARCHE_FACTEUR_DETOUR) < 1e-9
+        assert abs(trouves[0][2] - trouves[0][1] / config.VITESSE_MARCHE_KMH * 60) < 1e-9
+    assert service.arrets_proches_points(points[:1], k=1, rayon_max_km=0.01).arrets(0) == []
+    
+    accessibilite = service.accessibilite(arrets[:2])
+    assert accessibilite["accessibilite_transport"] == 1.0
+    with tempfile.TemporaryDirectory() as dossier:
+        decideur = DecisionMaker(service,
+                                 service_matrice=ServiceMatrice(fichier=os.path.join(dossier, "matrice.npz"), charger_graphe=False),
+                                 generateur_alternatives=GenerateurAlternatives(gestionnaire=gestionnaire_donnees, charger_graphe=False))
+        routes = decideur.generer_routes_alternatives(points[0], points[1])
+    assert routes and all(0 <= route.caracteristiques["accessibilite_transport"] <= 1 for route in routes)
+    
+    print(f"✅ {len(points)} points, {len(service)} arrêts, accessibilité {accessibilite}")
+
+# Carré A-B-C-D : A-B-C en voie principale (A-B avec un sommet
+# intermédiaire), A-D-C en voie résidentielle, D→B en sens unique
+CARRE_A, CARRE_B, CARRE_C, CARRE_D = [15.30, -4.32], [15.31, -4.32], [15.31, -4.33], [15.30, -4.33]
+
+def ecrire_reseau_carre(dossier: str) -> str:
+    """GeoJSON du carré, avec une voie isolée et une voie piétonne (ignorées)"""
+    a, b, c, d = CARRE_A, CARRE_B, CARRE_C, CARRE_D
+    voies = [
+        ([a, [15.305, -4.3205], b], {"highway": "primary"}),
+        ([b, c], {"highway": "primary"}),
+        ([a, d], {"highway": "residential"}),
+        ([d, c], {"highway": "residential"}),
+        ([d, b], {"highway": "primary", "oneway": "yes"}),
+        ([[15.40, -4.40], [15.41, -4.40]], {"highway": "primary"}),  # isolé
+        ([a, c], {"highway": "footway"})  # ignoré
+    ]
+    features = [{"type": "Feature", "geometry": {"type": "LineString", "coordinates": ligne},
+                 "properties": proprietes} for ligne, proprietes in voies]
+    fichier = os.path.join(dossier, "routes.geojson")
+    with open(fichier, 'w', encoding='utf-8') as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f)
+    return fichier
+
+def test_graphe_routier():
+    """Test de la compilation du réseau routier et des itinéraires A*"""
+    print("\n🧪 Test du graphe routier...")
+    
+    a, b, c, d = CARRE_A, CARRE_B, CARRE_C, CARRE_D
+    with tempfile.TemporaryDirectory() as dossier:
+        graphe = compiler_graphe(ecrire_reseau_carre(dossier))
+        graphe.enregistrer(os.path.join(dossier, "routes.npz"))
+        recharge = GrapheRoutier.charger(os.path.join(dossier, "routes.npz"))
+    assert (graphe.nombre_noeuds, recharge.nombre_arcs) == (4, graphe.nombre_arcs) == (4, 9)
+    
+    noeud = {nom: graphe.noeud_proche(lat, lon)[0] for nom, (lon, lat) in zip("abcd", (a, b, c, d))}
+    assert graphe.noeud_proche(-4.3201, 15.3001)[0] == noeud["a"]
+    itineraire = graphe.itineraire(noeud["a"], noeud["c"])
+    assert itineraire.noeuds == [noeud["a"], noeud["b"], noeud["c"]]
+    assert len(itineraire.latitudes) == 4 and 2100 < itineraire.distance_m < 2300
+    assert abs(itineraire.duree_s - itineraire.distance_m / (35 / 3.6)) < 1
+    assert graphe.itineraire(noeud["d"], noeud["b"]).noeuds == [noeud["d"], noeud["b"]]
+    assert len(graphe.itineraire(noeud["b"], noeud["d"]).noeuds) == 3
+    
+    routing = ServiceRouting(graphe)
+    depart, arrivee = Point("Départ", -4.3202, 15.3001), Point("Arrivée", -4.3298, 15.3101)
+    trajet = routing.calculer_trajet(depart, arrivee)
+    assert trajet.distance_km > itineraire.distance_m / 1000
+    assert [p.type_point for p in trajet.points_intermediaires] == ["trace"] * 4
+    
+    print(f"✅ {graphe}, A→C {itineraire.distance_m:.0f} m en {itineraire.duree_s:.0f} s")
+
+def test_hierarchie_routiere():
+    """Test de la hiérarchie de contraction (mêmes durées que A*)"""
+    print("\n🧪 Test de la hiérarchie routière...")
+    
+    # Grille 12 × 12 : une rue sur quatre en artère, une sur trois à sens unique
+    constructeur = ConstructeurGraphe()
+    for i in range(12):
+        for j in range(12):
+            constructeur.ajouter_noeud(i * 12 + j, -4.30 - i * 0.001, 15.30 + j * 0.001 + (i % 3) * 1e-4)
+    for k in range(12):
+        vitesse = 35 if k % 4 == 0 else 18
+        sens = SENS_DIRECT if k % 3 == 1 else SENS_DOUBLE
+        constructeur.ajouter_voie([k * 12 + j for j in range(12)], vitesse, sens)
+        constructeur.ajouter_voie([i * 12 + k for i in range(12)], vitesse)
+    graphe = constructeur.construire()
+    hierarchie = construire_hierarchie(graphe)
+    
+    with tempfile.TemporaryDirectory() as dossier:
+        fichier = os.path.join(dossier, "routes.ch.npz")
+        hierarchie.enregistrer(fichier)
+        graphe.hierarchie = charger_hierarchie(graphe, fichier)
+    assert isinstance(graphe.hierarchie, HierarchieContraction)
+    
+    for source in range(0, graphe.nombre_noeuds, 7):
+        for cible in range(graphe.nombre_noeuds):
+            reference = graphe.plus_court_chemin_astar(source, cible)
+            noeuds, arcs, duree_s = graphe.plus_court_chemin(source, cible)
+            assert abs(duree_s - reference[2]) < 1e-6
+            assert noeuds[0] == source and noeuds[-1] == cible and len(noeuds) == len(arcs) + 1
+            assert abs(float(graphe.durees_s[arcs].sum()) - duree_s) < 1e-6
+            
+    graphe.durees_s = graphe.durees_s * 1.5
+    assert not hierarchie.correspond(graphe)
+    
+    print(f"✅ {graphe} : {hierarchie}")
+
+def test_matrice_trajets():
+    """Test de la matrice des trajets (lot, cache persistant, version)"""
+    print("\n🧪 Test de la matrice des trajets...")
+    
+    with tempfile.TemporaryDirectory() as dossier:
+        graphe = compiler_graphe(ecrire_reseau_carre(dossier))
+        fichier = os.path.join(dossier, "matrice.npz")
+        points = [Point("Départ", -4.3202, 15.3001), Point("Arrivée", -4.3298, 15.3101),
+                  Point("Coin", -4.3299, 15.3002)]
+        service = ServiceMatrice(graphe, fichier)
+        distances, durees = service.matrice(points[:2], points)
+        assert distances.shape == (2, 3) and distances[0, 0] == durees[1, 1] == 0
+        trajet = ServiceRouting(graphe).calculer_trajet(points[0], points[1])
+        assert abs(distances[0, 1] - trajet.distance_km) < 1e-9
+        assert abs(durees[0, 1] - trajet.duree_estimee_min) < 1e-9
+        assert len(service) == 3 and service.modifiee and not os.path.exists(fichier)
+        assert service.enregistrer() and not service.modifiee
+        
+        # Rechargée par une autre instance : aucun recalcul pour les points connus
+        recharge = ServiceMatrice(graphe, fichier)
+        recharge.calculer = None
+        assert recharge.cout(points[0], points[1]) == (distances[0, 1], durees[0, 1])
+        segments = recharge.couts_segments(points)
+        assert abs(segments[0].sum() - distances[0, 1] - recharge.cout(points[1], points[2])[0]) < 1e-9
+        
+        # Autre jeu de données (vitesses modifiées) : la matrice enregistrée est ignorée
+        graphe.durees_s = graphe.durees_s * 2
+        assert len(ServiceMatrice(graphe, fichier)) == 0
+        
+        # Enregistrement par lots et éviction des points les moins récemment utilisés
+        max_points, lot = config.MATRICE_MAX_POINTS, config.MATRICE_LOT_SAUVEGARDE
+        config.MATRICE_MAX_POINTS, config.MATRICE_LOT_SAUVEGARDE = 8, 4
+        try:
+            fichier = os.path.join(dossier, "lots.npz")
+            service = ServiceMatrice(fichier=fichier, charger_graphe=False)
+            grille = [Point(f"G{i}", -4.33 + 0.004 * (i % 4), 15.30 + 0.004 * (i // 4)) for i in range(10)]
+            service.matrice(grille[:3], grille[:3])
+            assert len(service) == 3 and service.modifiee and not os.path.exists(fichier)
+            service.cout(grille[3], grille[4])
+            assert os.path.exists(fichier) and not service.modifiee
+            service.cout(grille[0], grille[1])
+            distances_lot, durees_lot = service.matrice(grille[5:], grille[:2] + grille[5:])
+            assert len(service) == 7 and not service.modifiee  # lot atteint : réécrite
+            assert len(ServiceMatrice(fichier=fichier, charger_graphe=False)) == 7
+            attendues = service.calculer(grille[:2] + grille[5:], grille[:2] + grille[5:])
+            service.calculer = None  # G0 et G1, utilisés en dernier, ont été gardés
+            assert abs(service.matrice(grille[:2] + grille[5:], grille[:2] + grille[5:])[0] - attendues[0]).max() < 1e-9
+            assert abs(distances_lot - attendues[0][2:]).max() < 1e-9 and abs(durees_lot - attendues[1][2:]).max() < 1e-9
+        finally:
+            config.MATRICE_MAX_POINTS, config.MATRICE_LOT_SAUVEGARDE = max_points, lot
+    
+    print(f"✅ Matrice {distances.shape}, Départ → Arrivée {distances[0, 1]:.2f} km en {durees[0, 1]:.1f} min")
+
+def test_optimisation_tournee():
+    """Test de l'ordre de visite (plus proche voisin, 2-opt, Or-opt)"""
+    print("\n🧪 Test de l'optimisation de tournée...")
+    
+    # Petites matrices asymétriques : ordre valide, jamais pire que le plus proche voisin
+    tirage = random.Random(3)
+    for essai in range(50):
+        couts = [[0 if i == j else tirage.uniform(1, 10) for j in range(7)] for i in range(7)]
+        fixer_depart, fixer_arrivee = essai % 2 == 0, essai % 3 == 0
+        ordre = optimiser_ordre(couts, fixer_depart, fixer_arrivee)
+        assert sorted(ordre) == list(range(7))
+        assert (not fixer_depart or ordre[0] == 0) and (not fixer_arrivee or ordre[-1] == 6)
+        if fixer_depart and not fixer_arrivee:
+            voisin, restants = [0], set(range(1, 7))
+            while restants:
+                voisin.append(min(restants, key=lambda j: couts[voisin[-1]][j]))
+                restants.remove(voisin[-1])
+            assert cout_chemin(couts, ordre) <= cout_chemin(couts, voisin) + 1e-9
+    
+    # Tournée de 200 livraisons au départ de la Place de la Victoire
+    victoire = Point("Place de la Victoire", -4.3376, 15.3047)
+    livraisons = [Point(f"Livraison {i}", -4.3376 + tirage.uniform(-0.06, 0.06), 15.3047 + tirage.uniform(-0.08, 0.08))
+                  for i in range(199)]
+    with tempfile.TemporaryDirectory() as dossier:
+        routing = ServiceRouting(service_matrice=ServiceMatrice(fichier=os.path.join(dossier, "matrice.npz")))
+        debut = time.perf_counter()
+        tournee = routing.optimiser_ordre_points([victoire] + livraisons, fixer_arrivee=False)
+        duree = time.perf_counter() - debut
+        distance_avant = routing.service_matrice.distance_totale([victoire] + livraisons)
+        distance_apres = routing.service_matrice.distance_totale(tournee)
+    assert tournee[0] is victoire and len(set(p.nom for p in tournee)) == 200
+    assert distance_apres < distance_avant / 4 and duree < 1.0
+    
+    print(f"✅ 200 arrêts ordonnés en {duree:.2f} s : {distance_avant:.0f} → {distance_apres:.0f} km")
+
+def test_routes_alternatives():
+    """Test des routes alternatives diversifiées (méthode des pénalités)"""
+    print("\n🧪 Test des routes alternatives...")
+    
+    # Grille 12 × 12 : une rue sur quatre en artère
+    constructeur = ConstructeurGraphe()
+    for i in range(12):
+        for j in range(12):
+            constructeur.ajouter_noeud(i * 12 + j, -4.30 - i * 0.001, 15.30 + j * 0.001)
+    for k in range(12):
+        vitesse = 35 if k % 4 == 0 else 18
+        constructeur.ajouter_voie([k * 12 + j for j in range(12)], vitesse)
+        constructeur.ajouter_voie([i * 12 + k for i in range(12)], vitesse)
+    graphe = constructeur.construire()
+    graphe.hierarchie = construire_hierarchie(graphe)
+    
+    source, cible = graphe.noeud_proche(-4.301, 15.301)[0], graphe.noeud_proche(-4.310, 15.310)[0]
+    chemins = chemins_diversifies(graphe, source, cible, 4, 0.3, 0.5, 1.4, time.perf_counter() + 5)
+    assert 2 <= len(chemins) <= 4
+    assert abs(chemins[0].duree_s - graphe.plus_court_chemin_astar(source, cible)[2]) < 1e-6
+    for i, chemin in enumerate(chemins):
+        assert chemin.noeuds[0] == source and chemin.noeuds[-1] == cible
+        assert chemin.duree_s <= 1.5 * chemins[0].duree_s + 1e-6
+        for precedent in chemins[:i]:
+            communs = set(chemin.arcs) & set(precedent.arcs)
+            assert 1 - float(graphe.longueurs_m[list(communs)].sum()) / chemin.distance_m >= 0.3
+            
+    with tempfile.TemporaryDirectory() as dossier:
+        matrice = ServiceMatrice(graphe, fichier=os.path.join(dossier, "matrice.npz"))
+        
+        # Sur le graphe routier : n'importe quel couple de points
+        decideur = DecisionMaker(service_matrice=matrice, generateur_alternatives=GenerateurAlternatives(graphe))
+        depart, arrivee = Point("Départ", -4.3012, 15.3011, "depart"), Point("Arrivée", -4.3098, 15.3102, "arrivee")
+        debut = time.perf_counter()
+        routes = decideur.generer_routes_alternatives(depart, arrivee, k=4)
+        duree = time.perf_counter() - debut
+        assert 2 <= len(routes) <= 4 and routes[0].nom == "Route la plus rapide"
+        assert len({route.nom for route in routes}) == len(routes)
+        assert all(route.points[0] is depart and route.points[-1] is arrivee for route in routes)
+        assert all(route.caracteristiques["distance_km"] > 0 for route in routes)
+        assert len(decideur.generer_routes_alternatives(depart, arrivee, k=1)) == 1
+        
+        # Sans graphe routier : chemins entre les lieux connus
+        generateur = GenerateurAlternatives(gestionnaire=gestionnaire_donnees, charger_graphe=False)
+        victoire, gare = Point("Place de la Victoire", -4.33787, 15.30553), Point("Gare Centrale", -4.31600, 15.31300)
+        matrice_lieux = ServiceMatrice(fichier=os.path.join(dossier, "lieux.npz"), charger_graphe=False)
+        routes_lieux = DecisionMaker(service_matrice=matrice_lieux,
+                                     generateur_alternatives=generateur).generer_routes_alternatives(victoire, gare)
+    assert len(routes_lieux) >= 2 and generateur.graphe is None and matrice_lieux.graphe is None
+    connus = set(gestionnaire_donnees.points_interet) | set(gestionnaire_donnees.arrets_bus)
+    assert all(point.nom in connus for route in routes_lieux for point in route.points[1:-1])
+    durees = sorted(itineraire.duree_s for itineraire in generateur.generer(victoire, gare))
+    assert all(b - a > 1e-3 * a for a, b in zip(durees, durees[1:]))
+    
+    # Sans graphe : ruelle directe ou détour par le boulevard, choisis selon la stratégie
+    with donnees_temporaires() as dossier:
+        gestionnaire = GestionnaireDonnees()
+        lieux = {"Ruelle Kasa": (-4.38, 15.41), "Ruelle Lubefu": (-4.38, 15.42),
+                 "Boulevard Lumumba Ouest": (-4.372, 15.403), "Boulevard Lumumba": (-4.372, 15.415),
+                 "Boulevard Lumumba Est": (-4.372, 15.427)}
+        gestionnaire.ajouter_points_en_masse({nom: Point(nom, lat, lon, "intermediaire") for nom, (lat, lon) in lieux.items()})
+        decideur = DecisionMaker(service_matrice=ServiceMatrice(fichier=os.path.join(dossier, "matrice.npz"), charger_graphe=False),
+                                 generateur_alternatives=GenerateurAlternatives(gestionnaire=gestionnaire, charger_graphe=False))
+        routes_axes = decideur.generer_routes_alternatives(Point("Départ", -4.38, 15.40), Point("Arrivée", -4.38, 15.43))
+        rapide, _ = decideur.choisir_meilleure_route(routes_axes, decideur.definir_strategie("rapide"))
+        securise, _ = decideur.choisir_meilleure_route(routes_axes, decideur.definir_strategie("securise"))
+    assert len({route.caracteristiques["niveau_securite"] for route in routes_axes}) > 1
+    assert rapide.nom == "Route la plus rapide" and securise.nom != rapide.nom
+    assert securise.caracteristiques["niveau_securite"] > rapide.caracteristiques["niveau_securite"]
+    assert any(point.nom.startswith("Boulevard") for point in securise.points)
+        
+    print(f"✅ {len(routes)} routes sur la grille en {duree * 1000:.0f} ms, {len(routes_lieux)} entre lieux connus")
+
+def test_profils_trafic():
+    """Test des profils de trafic et du choix de route selon l'heure de départ"""
+    print("\n🧪 Test des profils de trafic...")
+    
+    profils = ProfilsTrafic.par_defaut()
+    assert profils.pourcentages.shape == (4, CRENEAUX) and profils.pourcentages.nbytes == 4 * CRENEAUX
+    pointe, dimanche = datetime(2024, 3, 4, 8, 0), datetime(2024, 3, 10, 9, 0)  # lundi 8 h, dimanche 9 h
+    artere = profils.noms.index("artere_centre")
+    assert profils.facteurs([artere], heure_semaine(pointe))[0] < 0.5 < 1 < profils.facteurs([artere], heure_semaine(dimanche))[0]
+    
+    # Un appel vectorisé = parcours segment par segment à la vitesse du créneau d'entrée
+    tirage = random.Random(5)
+    durees = [tirage.uniform(60, 900) for _ in range(40)]
+    indices = [tirage.randrange(len(profils)) for _ in range(40)]
+    departs = [heure_semaine(pointe) - 3600, heure_semaine(dimanche)]
+    calculees = profils.durees_trafic(durees, indices, departs)
+    assert calculees.shape == (2, 40)
+    for ligne, depart in zip(calculees.tolist(), departs):
+        instant = depart
+        for duree, indice, calculee in zip(durees, indices, ligne):
+            attendue = duree / float(profils.facteurs([indice], instant)[0])
+            assert abs(calculee - attendue) < 1e-3 * attendue
+            instant += attendue
+            
+    # Artère en L (35 km/h, 2 km) ou voie locale en diagonale (25 km/h, 1,45 km), au centre-ville
+    constructeur = ConstructeurGraphe()
+    for identifiant, (latitude, longitude) in enumerate([(-4.316, 15.313), (-4.316, 15.322),
+                                                         (-4.325, 15.322), (-4.3195, 15.3185)]):
+        constructeur.ajouter_noeud(identifiant, latitude, longitude)
+    constructeur.ajouter_voie([0, 1, 2], 35)
+    constructeur.ajouter_voie([0, 3, 2], 25)
+    graphe = constructeur.construire()
+    depart, arrivee = Point("Gare Centrale", -4.316, 15.313, "depart"), Point("Arrivée", -4.325, 15.322, "arrivee")
+    
+    with tempfile.TemporaryDirectory() as dossier:
+        matrice = ServiceMatrice(graphe, fichier=os.path.join(dossier, "matrice.npz"))
+        decideur = DecisionMaker(service_matrice=matrice, generateur_alternatives=GenerateurAlternatives(graphe),
+                                 profils_trafic=profils)
+        choix = {}
+        for nom, heure in (("pointe", pointe), ("dimanche", dimanche)):
+            routes = decideur.generer_routes_alternatives(depart, arrivee, heure_depart=heure)
+            assert len(routes) == 2
+            choix[nom], _ = decideur.choisir_meilleure_route(routes, decideur.definir_strategie("rapide"))
+        routing = ServiceRouting(graphe, matrice, profils)
+        arrivees_pointe = routing.estimer_arrivees(choix["dimanche"].points, pointe)
+        arrivees_dimanche = routing.estimer_arrivees(choix["dimanche"].points, dimanche)
+    assert choix["pointe"].nom != choix["dimanche"].nom
+    assert choix["pointe"].caracteristiques["confort_route"] < choix["dimanche"].caracteristiques["confort_route"]
+    assert choix["pointe"].caracteristiques["niveau_embouteillage"] > 0.3
+    assert arrivees_pointe[0] == pointe and arrivees_pointe == sorted(arrivees_pointe)
+    assert arrivees_pointe[-1] - pointe > 2 * (arrivees_dimanche[-1] - dimanche)
+    estimer = routing.obtenir_temps_trajet_estime
+    assert estimer(10, heure_depart=pointe, position=depart) > estimer(10, heure_depart=dimanche, position=depart)
+    
+    # Sans position : voie locale en périphérie ; conditions fixes comme auparavant
+    peripherie = Point("Périphérie", config.LATITUDE_GARE + 0.5, config.LONGITUDE_GARE)
+    assert estimer(10, heure_depart=pointe) == estimer(10, heure_depart=pointe, position=peripherie)
+    normal = estimer(10, "normal")
+    assert abs(estimer(10, "dense") - 1.3 * normal) < 1e-9 and abs(estimer(10, "fluid") - 0.8 * normal) < 1e-9
+    assert estimer(10, "bouchons") == normal
+    
+    print(f"✅ Lundi 8 h: {choix['pointe'].nom}, dimanche 9 h: {choix['dimanche'].nom}")
+
+# Budget d'import (secondes) : modules chargés par les CLI et les workers de courte durée
+BUDGETS_IMPORT = {
+    "src.core.decision_maker": 0.15,
+    "src.services.geocoding": 0.5,
+    "src.core.agent": 0.6
+}
+MODULES_LOURDS = ("numpy", "requests", "folium", "asyncio")
+
+def test_initialisation_paresseuse():
+    """Test des singletons paresseux et du budget d'import"""
+    print("\n🧪 Test de l'initialisation paresseuse...")
+    
+    constructions = []
+    barriere = threading.Barrier(8)
+    def construire():
+        constructions.append(1)
+        time.sleep(0.05)
+        return {"valeur": 42}
+    instance = SingletonParesseux(construire, "test")
+    assert not est_charge(instance)
+    
+    def lire():
+        barriere.wait()
+        assert instance.get("valeur") == 42
+    threads = [threading.Thread(target=lire) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(constructions) == 1 and est_charge(instance)
+    
+    environnement = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    for module, budget in BUDGETS_IMPORT.items():
+        code = (
+            "import sys, time\n"
+            "debut = time.perf_counter()\n"
+            f"import {module}\n"
+            "print(time.perf_counter() - debut)\n"
+            f"print(','.join(m for m in {MODULES_LOURDS!r} if m in sys.modules))"
+        )
+        sortie = subprocess.run([sys.executable, "-c", code], env=environnement,
+                                capture_output=True, text=True, check=True).stdout.split("\n")
+        duree, charges = float(sortie[0]), sortie[1]
+        assert not charges, f"{module} importe {charges}"
+        assert duree < budget, f"{module}: {duree:.3f} s (budget {budget} s)"
+        print(f"✅ {module}: {duree * 1000:.0f} ms (budget {budget * 1000:.0f} ms)")
+
 def test_connectivite():
     """Test de connectivité à l'API"""
     print("\n🧪 Test de connectivité...")
@@ -49,8 +1102,33 @@ if __name__ == "__main__":
     print("=" * 40)
     
     test_connectivite()
+    test_cache_sqlite()
+    test_gazetteer()
+    test_serveur_nominatim_local()
+    test_geocodage_lots()
+    test_geocodage_async()
+    test_recherches_locales()
+    test_disjoncteur()
+    test_regroupement_requetes()
+    test_instantane_hors_ligne()
+    test_metriques()
     test_geocoding_basique()
     test_points_interet()
+    test_index_spatial_donnees()
+    test_recherche_noms()
+    test_point_store()
+    test_distances_vectorisees()
+    test_jeu_points_binaire()
+    test_journal_points()
+    test_import_points()
+    test_arrets_transport()
+    test_graphe_routier()
+    test_hierarchie_routiere()
+    test_matrice_trajets()
+    test_optimisation_tournee()
+    test_routes_alternatives()
+    test_profils_trafic()
+    test_initialisation_paresseuse()
     
     print("\n" + "=" * 40)
     print("✅ Tests terminés")
\ No newline at end of file